@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Poll Path Benchmarks - Throughput, latency, allocations and database growth
+
+Runs the monitor's hot path against the stand-in rippled (see stand_in.py)
+and a temporary SQLite file:
+
+- poll: FastPoller.poll() end to end. Database writes and metric updates
+  run inline, the way they do when the pipeline is not started.
+- db_write: Database.write_metrics / write_state_transition /
+  write_ledger_validation
+- validation_stats: Database.get_validation_stats over a populated table
+- exporter: the Prometheus update path for one poll sample
+
+Each benchmark reports ops/sec, p50/p99/max latency, allocations per
+operation (measured in a separate tracemalloc pass so they do not skew the
+timings) and, for writers, database growth per 10k operations. Results are
+written as JSON, so runs on two branches can be compared:
+
+    python benchmarks/poll_path.py -o base.json
+    git checkout my-branch
+    python benchmarks/poll_path.py -o mine.json --compare base.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.stand_in import StandInTransport
+from src.utils.rippled_api import RippledAPI
+from src.storage.database import Database
+from src.alerts.alerter import Alerter
+from src.collectors.fast_poller import FastPoller
+from src.exporters.prometheus_exporter import PrometheusExporter
+from src.processors.pipeline import Pipeline
+from src.processors.samples import PollSample
+
+BENCHMARKS = ('poll', 'db_write', 'validation_stats', 'exporter')
+
+# Metrics shown against a baseline report, and the ones where higher is better
+COMPARED = ('ops_per_sec', 'p50_ms', 'p99_ms', 'max_ms', 'alloc_peak_bytes_per_op',
+            'retained_bytes_per_op', 'retained_blocks_per_op', 'db_growth_per_10k_ops_bytes')
+HIGHER_IS_BETTER = ('ops_per_sec',)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list
+
+    Args:
+        sorted_values: Values in ascending order
+        fraction: Percentile as a fraction (0.99 for p99)
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def db_size(db: Database) -> int:
+    """Bytes used by a SQLite database once buffered rows and its WAL are written out"""
+    if db.write_buffer is not None:
+        db.write_buffer.flush()
+    with db.get_connection() as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    db_path = db.db_path
+    total = 0
+    for suffix in ('', '-wal', '-journal'):
+        path = db_path + suffix
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def measure(op: Callable[[int], Any], ops: int, warmup: int,
+            alloc_ops: int) -> Dict[str, Any]:
+    """
+    Time op(i) for each i and count its allocations
+
+    Args:
+        op: Operation to benchmark, called with a running index
+        ops: Timed calls
+        warmup: Untimed calls first (caches, first-time imports, schema)
+        alloc_ops: Calls made under tracemalloc afterwards (0 skips)
+
+    Returns:
+        Result dict (ops, seconds, ops_per_sec, latency and allocation stats)
+    """
+    i = 0
+    for _ in range(warmup):
+        op(i)
+        i += 1
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(ops):
+        t0 = time.perf_counter()
+        op(i)
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        'ops': ops,
+        'seconds': round(elapsed, 4),
+        'ops_per_sec': round(ops / elapsed, 1) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'max_ms': round(latencies[-1] * 1000, 4) if latencies else 0.0
+    }
+
+    if alloc_ops:
+        # tracemalloc only sees live memory: report the high-water mark each
+        # call reaches (transient allocations) and what it leaves behind
+        peak_total = 0
+        retained_total = 0
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        try:
+            for _ in range(alloc_ops):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                op(i)
+                i += 1
+                after, peak = tracemalloc.get_traced_memory()
+                peak_total += peak - before
+                retained_total += after - before
+        finally:
+            tracemalloc.stop()
+        result['alloc_peak_bytes_per_op'] = round(peak_total / alloc_ops)
+        result['retained_bytes_per_op'] = round(retained_total / alloc_ops)
+        result['retained_blocks_per_op'] = round((sys.getallocatedblocks() - blocks_before) / alloc_ops, 1)
+
+    return result
+
+
+class Harness:
+    """
+    Monitor wired to the stand-in rippled and a temporary database
+    """
+
+    def __init__(self, workdir: str, prometheus: PrometheusExporter,
+                 recording: Optional[str] = None, latency: float = 0.0,
+                 write_buffer_rows: int = 200, write_buffer_delay: float = 1.0):
+        """
+        Build one poller
+
+        Args:
+            workdir: Directory for the database and alerts log
+            prometheus: Shared exporter (prometheus_client metrics are global)
+            recording: Recording file for the stand-in (None: synthetic)
+            latency: Stand-in round-trip time in seconds
+            write_buffer_rows: Rows per group commit (0 writes every row directly)
+            write_buffer_delay: Longest time a row stays buffered (seconds)
+        """
+        if recording:
+            self.transport = StandInTransport.from_file(recording, latency=latency)
+        else:
+            self.transport = StandInTransport(latency=latency)
+
+        self.db_path = os.path.join(workdir, 'monitor.db')
+        self.db = Database(self.db_path)
+        if write_buffer_rows:
+            self.db.enable_write_buffer(max_rows=write_buffer_rows, max_delay=write_buffer_delay,
+                                        prometheus=prometheus)
+        self.api = RippledAPI(transport=self.transport)
+        self.prometheus = prometheus.for_node('bench')
+        self.pipeline = Pipeline(self.db, prometheus)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.poller = FastPoller(self.api, self.db,
+                                     Alerter(os.path.join(workdir, 'alerts.log'), node='bench'),
+                                     self.prometheus, interval=3, node='bench',
+                                     pipeline=self.pipeline)
+
+    def close(self):
+        """Stop the poller's background threads and close the database"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.poller.close()
+        self.db.close()
+
+
+def bench_poll(harness: Harness, args) -> Dict[str, Any]:
+    """FastPoller.poll() end to end, with peers refreshed at the default cadence"""
+    poller = harness.poller
+    size_before = db_size(harness.db)
+
+    # Status lines go to a buffer: formatting is measured, the terminal is not
+    sink = io.StringIO()
+
+    def op(i):
+        with contextlib.redirect_stdout(sink):
+            # peers runs every 10th poll by default
+            if i % 10 == 0:
+                poller._refresh_peer_details()
+            poller.poll()
+        sink.seek(0)
+        sink.truncate()
+
+    result = measure(op, args.polls, args.warmup, args.alloc_ops)
+    polls = args.warmup + args.polls + args.alloc_ops
+    growth = db_size(harness.db) - size_before
+    result['db_growth_per_10k_ops_bytes'] = round(growth * 10000 / polls)
+    result['rippled_requests_per_op'] = round(harness.transport.requests / polls, 2)
+    result['api_errors'] = poller.api_errors
+    return result
+
+
+def bench_db_write(harness: Harness, args) -> Dict[str, Any]:
+    """One write_metrics and one ledger validation, and every 10th op a state transition"""
+    db = harness.db
+    size_before = db_size(harness.db)
+    base_seq = 80000000
+    now = time.time()
+
+    def op(i):
+        timestamp = now + i
+        db.write_metrics(timestamp=timestamp, server_state='proposing', ledger_seq=base_seq + i,
+                         peers=21, load_factor=1.0, node='bench_db')
+        if i % 10 == 0:
+            db.write_state_transition(timestamp=timestamp, old_state='full', new_state='proposing',
+                                      duration=30.0, ledger_seq=base_seq + i, peers=21,
+                                      load_factor=1.0, node='bench_db')
+        db.write_ledger_validation(timestamp=timestamp, ledger_seq=base_seq + i,
+                                   server_state='proposing', was_proposing=True,
+                                   should_validate=True, did_validate=True, agreed=True,
+                                   peers=21, load_factor=1.0, node='bench_db',
+                                   ledger_hash=f"{base_seq + i:064X}", close_time=timestamp)
+
+    ops = args.db_ops
+    result = measure(op, ops, args.warmup, args.alloc_ops)
+    growth = db_size(harness.db) - size_before
+    result['db_growth_per_10k_ops_bytes'] = round(growth * 10000 / (args.warmup + ops + args.alloc_ops))
+    return result
+
+
+def bench_validation_stats(harness: Harness, args) -> Dict[str, Any]:
+    """get_validation_stats over a day of ledger validations"""
+    db = harness.db
+    # One ledger every ~3.5s for 24h, written once outside the timed loop
+    rows = int(86400 / 3.5)
+    now = time.time()
+    proposing = db.state_id('proposing')
+    with db.get_connection() as conn:
+        conn.executemany(db.INSERTS['ledger_validations'], [
+            (now - (rows - i) * 3.5, 70000000 + i, proposing, True, True,
+             i % 500 != 0, i % 500 != 0, 21, 1.0, 'bench_stats', None, None)
+            for i in range(rows)])
+
+    def op(i):
+        db.get_validation_stats(hours=24, node='bench_stats')
+
+    result = measure(op, args.query_ops, min(args.warmup, 10), min(args.alloc_ops, 20))
+    result['rows'] = rows
+    return result
+
+
+def bench_exporter(harness: Harness, args) -> Dict[str, Any]:
+    """Prometheus updates for one poll sample"""
+    pipeline = harness.pipeline
+    now = time.time()
+
+    def op(i):
+        pipeline.export(PollSample(
+            node='bench_export',
+            timestamp=now + i * 3,
+            server_state='proposing',
+            time_in_state=float(i * 3),
+            ledger_seq=60000000 + i,
+            ledger_age=1,
+            peers=21,
+            peer_details={'inbound': 7, 'outbound': 14, 'insane': 0, 'p90_latency': 120},
+            peer_disconnects=12,
+            peer_disconnects_resources=0,
+            base_fee=1e-05,
+            reserve_base=1.0,
+            reserve_inc=0.2,
+            load_factor=1.0,
+            io_latency=1,
+            converge_time=2.0,
+            jq_trans_overflow=0,
+            throughput={'1m': {'tps': 12.0, 'ledger_interval': 3.5, 'ledgers': 17}},
+            validation_quorum=28,
+            proposers=35,
+            state_accounting={'proposing': {'duration_us': '1000', 'transitions': '1'}},
+            uptime=86400 + i * 3,
+            initial_sync_us=300000000,
+            server_state_duration_us=i * 3000000,
+            api_cache_hits=0,
+            api_cache_misses=0
+        ))
+
+    return measure(op, args.polls, args.warmup, args.alloc_ops)
+
+
+RUNNERS = {
+    'poll': bench_poll,
+    'db_write': bench_db_write,
+    'validation_stats': bench_validation_stats,
+    'exporter': bench_exporter
+}
+
+
+def git_revision() -> Optional[str]:
+    """Current commit of the checkout, if it is a git repository"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(args) -> Dict[str, Any]:
+    """Run the selected benchmarks and return the report"""
+    prometheus = PrometheusExporter(port=0)
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': args.recording or 'synthetic',
+        'write_buffer_rows': args.write_buffer_rows,
+        'benchmarks': {}
+    }
+
+    for name in args.only or BENCHMARKS:
+        # Fresh database per benchmark so growth and query costs don't mix
+        with tempfile.TemporaryDirectory(prefix='xrpl-monitor-bench-') as workdir:
+            harness = Harness(workdir, prometheus, recording=args.recording, latency=args.latency,
+                              write_buffer_rows=args.write_buffer_rows,
+                              write_buffer_delay=args.write_buffer_delay_ms / 1000)
+            try:
+                print(f"Running {name}...", file=sys.stderr)
+                report['benchmarks'][name] = RUNNERS[name](harness, args)
+            finally:
+                harness.close()
+
+    return report
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """Print a readable summary (with changes against a baseline report)"""
+    print(f"\nBenchmarks @ {report.get('git_revision') or 'unknown revision'} "
+          f"(python {report['python']}, {report['source']})", file=sys.stderr)
+    for name, result in report['benchmarks'].items():
+        print(f"  {name}", file=sys.stderr)
+        previous = (baseline or {}).get('benchmarks', {}).get(name, {})
+        for key, value in result.items():
+            line = f"    {key:30s} {value}"
+            old = previous.get(key)
+            if key in COMPARED and isinstance(old, (int, float)) and old:
+                change = (value - old) / old * 100
+                better = change > 0 if key in HIGHER_IS_BETTER else change < 0
+                line += f"  ({change:+.1f}% vs {old}{', better' if better and abs(change) >= 1 else ''})"
+            print(line, file=sys.stderr)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the monitor poll path')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help='Benchmarks to run (default: all)')
+    parser.add_argument('--polls', type=int, default=2000, help='Timed polls / exporter updates')
+    parser.add_argument('--db-ops', type=int, default=2000, help='Timed database write rounds')
+    parser.add_argument('--query-ops', type=int, default=200, help='Timed validation stats queries')
+    parser.add_argument('--warmup', type=int, default=50, help='Untimed calls before each benchmark')
+    parser.add_argument('--alloc-ops', type=int, default=100,
+                        help='Calls traced with tracemalloc after timing (0 skips)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Stand-in rippled round-trip time in seconds')
+    parser.add_argument('--write-buffer-rows', type=int, default=200,
+                        help='Rows per database group commit (0 disables the write buffer)')
+    parser.add_argument('--write-buffer-delay-ms', type=float, default=1000,
+                        help='Longest time a row stays in the write buffer')
+    parser.add_argument('--recording', help='Replay responses recorded with stand_in.py record')
+    parser.add_argument('-o', '--output', help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    report = run(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
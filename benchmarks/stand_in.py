@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Stand-in rippled - Serves server_info, peers and ledger without a validator
+
+Plugs into RippledAPI as its transport. Responses are kept as JSON bytes and
+decoded on every request, so the benchmarks pay the same decoding cost as
+the real HTTP / docker transports.
+
+Two sources:
+- synthetic: a validator that closes one ledger per server_info call, with
+  an occasional state flap
+- recorded: responses captured from a real rippled with `record`, replayed
+  in a loop (ledger sequences keep increasing across loops)
+
+Record from a live node:
+    python benchmarks/stand_in.py record --host localhost --port 5005 \\
+        --count 50 -o recording.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.rippled_api import RIPPLE_EPOCH
+from src.utils.transports import HTTPTransport, TransportError
+
+
+def _encode(result: Dict[str, Any]) -> bytes:
+    """Serialize a response the way it arrives on the wire"""
+    return json.dumps(result).encode('utf-8')
+
+
+class StandInTransport:
+    """
+    Transport answering rippled commands from synthetic or recorded data
+    """
+
+    def __init__(self, recording: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 seed: int = 1, start_seq: int = 90000000, flap_every: int = 1000,
+                 peers: int = 21, txns_per_ledger: int = 40, latency: float = 0.0):
+        """
+        Initialize stand-in
+
+        Args:
+            recording: Command -> list of recorded results (None: synthetic)
+            seed: Random seed for synthetic data
+            start_seq: First validated ledger sequence (synthetic)
+            flap_every: server_info calls between proposing -> full -> proposing
+                        flaps (0 never flaps)
+            peers: Connected peers reported (synthetic)
+            txns_per_ledger: Average transactions per ledger (synthetic)
+            latency: Seconds every request sleeps, to mimic a round trip
+        """
+        self.recording = recording
+        self.random = random.Random(seed)
+        self.seq = start_seq
+        self.flap_every = flap_every
+        self.peers = peers
+        self.txns_per_ledger = txns_per_ledger
+        self.latency = latency
+
+        self.requests = 0
+        self._server_info_calls = 0
+        self._started = time.time()
+
+        if recording is not None:
+            self._prepare_recording(recording)
+        else:
+            self._peers_payload = _encode(self._synthetic_peers())
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'StandInTransport':
+        """
+        Load a recording written by `record`
+
+        Args:
+            path: Recording file
+            **kwargs: Passed to the constructor
+        """
+        with open(path) as f:
+            return cls(recording=json.load(f), **kwargs)
+
+    def describe(self) -> str:
+        """Human readable description of the endpoint"""
+        return 'stand-in rippled (recorded)' if self.recording is not None else 'stand-in rippled (synthetic)'
+
+    def close(self):
+        """Nothing to release"""
+
+    def request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Answer one command
+
+        Args:
+            command: rippled command
+            params: Optional parameters dict
+
+        Returns:
+            Result dictionary, decoded from JSON
+
+        Raises:
+            TransportError: For commands the stand-in does not know
+        """
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if command == 'server_info':
+            payload = self._server_info()
+        elif command == 'peers':
+            payload = self._peers_payload
+        elif command == 'ledger':
+            payload = self._ledger((params or {}).get('ledger_index'))
+        else:
+            raise TransportError(f"stand-in does not implement {command}")
+        return json.loads(payload)
+
+    # Synthetic data
+
+    def _synthetic_peers(self) -> Dict[str, Any]:
+        """peers result with a spread of latencies and directions"""
+        return {
+            'status': 'success',
+            'peers': [{
+                'address': f"10.0.{i // 250}.{i % 250}:51235",
+                'inbound': i % 3 == 0,
+                'latency': self.random.randint(5, 250),
+                'complete_ledgers': f"32570-{self.seq}",
+                'public_key': f"n9Peer{i:04d}",
+                'uptime': self.random.randint(100, 100000),
+                'version': 'rippled-2.2.0'
+            } for i in range(self.peers)]
+        }
+
+    def _synthetic_server_info(self) -> Dict[str, Any]:
+        """server_info result for the current ledger"""
+        calls = self._server_info_calls
+        state = 'proposing'
+        if self.flap_every and calls % self.flap_every == self.flap_every - 1:
+            state = 'full'
+        uptime = int(time.time() - self._started) + 86400
+
+        return {
+            'status': 'success',
+            'info': {
+                'build_version': '2.2.0',
+                'complete_ledgers': f"32570-{self.seq}",
+                'io_latency_ms': 1,
+                'jq_trans_overflow': '0',
+                'last_close': {'converge_time_s': 2.0, 'proposers': 35},
+                'load_factor': 1,
+                'node_size': 'medium',
+                'peer_disconnects': '12',
+                'peer_disconnects_resources': '0',
+                'peers': self.peers,
+                'pubkey_validator': 'nHBenchStandInValidatorKey',
+                'server_state': state,
+                'server_state_duration_us': str(calls * 3500000),
+                'state_accounting': {
+                    name: {'duration_us': str(calls * 1000), 'transitions': '1'}
+                    for name in ('connected', 'disconnected', 'full', 'syncing', 'tracking', 'proposing')
+                },
+                'initial_sync_duration_us': '300000000',
+                'uptime': uptime,
+                'validated_ledger': {
+                    'age': self.random.randint(0, 3),
+                    'base_fee_xrp': 1e-05,
+                    'hash': f"{self.seq:064X}",
+                    'reserve_base_xrp': 1,
+                    'reserve_inc_xrp': 0.2,
+                    'seq': self.seq
+                },
+                'validation_quorum': 28
+            }
+        }
+
+    def _synthetic_ledger(self, seq: int) -> Dict[str, Any]:
+        """ledger result for seq (one ledger every ~3.5s ending now)"""
+        close_time = int(time.time() - (self.seq - seq) * 3.5) - RIPPLE_EPOCH
+        txn_count = max(0, int(self.random.gauss(self.txns_per_ledger, self.txns_per_ledger / 4)))
+        return {
+            'status': 'success',
+            'ledger': {
+                'ledger_index': str(seq),
+                'ledger_hash': f"{seq:064X}",
+                'close_time': close_time,
+                'transactions': [f"{seq:032X}{i:032X}" for i in range(txn_count)]
+            }
+        }
+
+    # Recorded data
+
+    def _prepare_recording(self, recording: Dict[str, List[Dict[str, Any]]]):
+        """Pre-encode recorded responses"""
+        server_infos = recording.get('server_info') or []
+        if not server_infos:
+            raise ValueError("Recording has no server_info responses")
+
+        seqs = [int(r.get('info', {}).get('validated_ledger', {}).get('seq', 0)) for r in server_infos]
+        # Each replay loop moves ledgers forward by the recorded span
+        self._recorded_span = max(seqs) - min(seqs) + 1
+        self._server_infos = server_infos
+
+        peers = recording.get('peers') or [self._synthetic_peers()]
+        self._peers_payload = _encode(peers[-1])
+        self._ledger_template = (recording.get('ledger') or [None])[-1]
+
+    def _recorded_server_info(self, loop: int, index: int) -> Dict[str, Any]:
+        """Recorded server_info shifted forward for later replay loops"""
+        result = self._server_infos[index]
+        if loop == 0:
+            return result
+        result = copy.deepcopy(result)
+        info = result.setdefault('info', {})
+        validated = info.setdefault('validated_ledger', {})
+        validated['seq'] = int(validated.get('seq', 0)) + loop * self._recorded_span
+        info['uptime'] = int(info.get('uptime', 0)) + loop * self._recorded_span * 4
+        return result
+
+    def _recorded_ledger(self, seq: int) -> Dict[str, Any]:
+        """Recorded ledger result relabelled as seq"""
+        if self._ledger_template is None:
+            return self._synthetic_ledger(seq)
+        result = copy.deepcopy(self._ledger_template)
+        ledger = result.setdefault('ledger', {})
+        ledger['ledger_index'] = str(seq)
+        ledger['ledger_hash'] = f"{seq:064X}"
+        return result
+
+    # Dispatch
+
+    def _server_info(self) -> bytes:
+        """Encoded server_info for this call"""
+        calls = self._server_info_calls
+        self._server_info_calls += 1
+        if self.recording is None:
+            self.seq += 1
+            return _encode(self._synthetic_server_info())
+
+        loop, index = divmod(calls, len(self._server_infos))
+        result = self._recorded_server_info(loop, index)
+        self.seq = int(result['info']['validated_ledger']['seq'])
+        return _encode(result)
+
+    def _ledger(self, ledger_index) -> bytes:
+        """Encoded ledger for a sequence (or the validated ledger)"""
+        seq = self.seq if ledger_index in (None, 'validated') else int(ledger_index)
+        if self.recording is None:
+            return _encode(self._synthetic_ledger(seq))
+        return _encode(self._recorded_ledger(seq))
+
+
+def record(host: str, port: int, count: int, interval: float, output: str):
+    """
+    Capture responses from a live rippled for replay
+
+    Args:
+        host: rippled admin host
+        port: rippled admin JSON-RPC port
+        count: server_info responses to capture
+        interval: Seconds between captures
+        output: Recording file to write
+    """
+    transport = HTTPTransport(host, port)
+    recording = {'server_info': [], 'peers': [], 'ledger': []}
+    try:
+        for i in range(count):
+            recording['server_info'].append(transport.request('server_info'))
+            if i < count - 1:
+                time.sleep(interval)
+        recording['peers'].append(transport.request('peers'))
+        recording['ledger'].append(transport.request('ledger', {
+            'ledger_index': 'validated',
+            'transactions': True
+        }))
+    finally:
+        transport.close()
+
+    with open(output, 'w') as f:
+        json.dump(recording, f)
+    print(f"Recorded {count} server_info responses to {output}")
+
+
+def main():
+    """Command line entry point (recording)"""
+    parser = argparse.ArgumentParser(description='Record rippled responses for the benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='Capture responses from a live rippled')
+    record_parser.add_argument('--host', default='localhost')
+    record_parser.add_argument('--port', type=int, default=5005)
+    record_parser.add_argument('--count', type=int, default=50, help='server_info responses to capture')
+    record_parser.add_argument('--interval', type=float, default=3.0, help='Seconds between captures')
+    record_parser.add_argument('-o', '--output', required=True, help='Recording file')
+
+    args = parser.parse_args()
+    record(args.host, args.port, args.count, args.interval, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,12 +15,13 @@ class Alerter:
     Can be extended for email, Slack, Discord, etc.
     """
     
-    def __init__(self, alerts_file: Optional[str] = None):
+    def __init__(self, alerts_file: Optional[str] = None, node: Optional[str] = None):
         """
         Initialize alerter
         
         Args:
             alerts_file: Path to alerts log file (default: data/alerts.log)
+            node: Node name prefixed to alert titles (multi-node setups)
         """
         if alerts_file is None:
             alerts_file = os.path.join(
@@ -29,6 +30,7 @@ class Alerter:
             )
         
         self.alerts_file = alerts_file
+        self.node = node
         
         # Ensure directory exists
         alerts_dir = os.path.dirname(alerts_file)
@@ -46,6 +48,9 @@ class Alerter:
         """
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
+        if self.node:
+            title = f"[{self.node}] {title}"
+        
         # Format alert
         alert_text = f"[{timestamp}] [{level}] {title}\n{message}\n"
         
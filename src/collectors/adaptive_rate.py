@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Adaptive Poll Rate - Polls fast during incidents and backs off when healthy
+"""
+
+import time
+from typing import Optional
+
+
+class AdaptivePollRate:
+    """
+    Chooses the server_state poll interval from validator health
+
+    Any sign of trouble drops the interval to min_interval and holds it
+    there for `hold` seconds:
+    - the state changed since the last poll
+    - the validator is not in a healthy state
+    - the validated ledger is stale and getting older
+    - rippled did not answer
+
+    Once the hold expires, every healthy poll multiplies the interval by
+    `backoff`, up to max_interval.
+    """
+
+    HEALTHY_STATES = ('proposing', 'full', 'validating')
+
+    def __init__(self, base_interval: float, min_interval: float = 0.5,
+                 max_interval: float = 15, backoff: float = 1.5,
+                 hold: float = 30, stale_ledger_age: int = 10):
+        """
+        Initialize adaptive rate
+
+        Args:
+            base_interval: Interval used until the first observation
+            min_interval: Interval while something is wrong
+            max_interval: Ceiling reached when stable
+            backoff: Growth factor per healthy poll after the hold
+            hold: Seconds to keep polling fast after the last sign of trouble
+            stale_ledger_age: Ledger age (seconds) from which a rising age counts as trouble
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.hold = hold
+        self.stale_ledger_age = stale_ledger_age
+
+        self.interval = base_interval
+        self.fast_until = 0.0
+        self.last_state: Optional[str] = None
+        self.last_ledger_age: Optional[int] = None
+
+    def _update(self, unstable: bool) -> float:
+        """Apply one observation and return the new interval"""
+        now = time.monotonic()
+        if unstable:
+            self.fast_until = now + self.hold
+            self.interval = self.min_interval
+        elif now >= self.fast_until:
+            self.interval = min(self.max_interval, max(self.min_interval, self.interval * self.backoff))
+        return self.interval
+
+    def observe(self, state: str, ledger_age: int) -> float:
+        """
+        Record a successful poll
+
+        Args:
+            state: server_state from the poll
+            ledger_age: Age of the validated ledger in seconds
+
+        Returns:
+            Interval until the next poll
+        """
+        unstable = (
+            (self.last_state is not None and state != self.last_state)
+            or state not in self.HEALTHY_STATES
+            or (ledger_age >= self.stale_ledger_age
+                and self.last_ledger_age is not None
+                and ledger_age > self.last_ledger_age)
+        )
+        self.last_state = state
+        self.last_ledger_age = ledger_age
+        return self._update(unstable)
+
+    def observe_error(self) -> float:
+        """
+        Record a failed poll
+
+        Returns:
+            Interval until the next poll
+        """
+        return self._update(True)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Ledger Backfill - Records ledgers the live path skipped from their real headers
+
+When a poll jumps more than one ledger (validator restart, network hiccup,
+slow poll), the skipped ledgers are queued in the database and fetched in
+the background with bounded parallelism. Each ledger is recorded with its
+real hash and close time instead of the state seen by the next poll. The
+queue lives in SQLite, so a restart picks up where the last run stopped.
+"""
+
+import sys
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, Tuple
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.rippled_api import RIPPLE_EPOCH, RippledAPIError
+from src.utils.nodes import DEFAULT_NODE
+
+
+class LedgerBackfill:
+    """
+    Background worker that fills ledger gaps
+    """
+
+    def __init__(self, api, db, validation_tracker, prometheus=None,
+                 node: str = DEFAULT_NODE, max_workers: int = 4,
+                 max_gap: int = 10000, max_attempts: int = 3,
+                 batch_size: int = 32, retry_delay: float = 10, ledger_window=None):
+        """
+        Initialize backfill worker
+
+        Args:
+            api: RippledAPI instance
+            db: Database holding the backfill queue
+            validation_tracker: ValidationTracker that records the ledgers
+            prometheus: PrometheusExporter (node view)
+            node: Monitored node name
+            max_workers: Ledgers fetched in parallel
+            max_gap: Most ledgers queued for a single gap (newest are kept)
+            max_attempts: Fetch attempts before a ledger is given up
+            batch_size: Ledgers taken from the queue per round
+            retry_delay: Seconds to wait after a round where every fetch failed
+            ledger_window: LedgerWindow of ledgers already recorded - those
+                           are skipped, and backfilled ones are marked in it
+        """
+        self.api = api
+        self.db = db
+        self.validation_tracker = validation_tracker
+        self.prometheus = prometheus
+        self.node = node
+        self.max_workers = max_workers
+        self.max_gap = max_gap
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.ledger_window = ledger_window
+        self.log_prefix = f"[{node}] " if node != DEFAULT_NODE else ''
+
+        # Gaps reported by the poll thread, persisted by the worker thread
+        self._incoming = deque()
+        self._lock = threading.Lock()
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='backfill')
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Statistics
+        self.ledgers_backfilled = 0
+        self.ledgers_abandoned = 0
+
+    def enqueue(self, ledger_seqs: Iterable[int]):
+        """
+        Queue skipped ledgers (cheap - safe to call from the poll thread)
+
+        Args:
+            ledger_seqs: Ledger sequence numbers to backfill
+        """
+        seqs = list(ledger_seqs)
+        if len(seqs) > self.max_gap:
+            print(f"{self.log_prefix}Warning: gap of {len(seqs)} ledgers, "
+                  f"backfilling only the newest {self.max_gap}")
+            seqs = seqs[-self.max_gap:]
+        if not seqs:
+            return
+
+        with self._lock:
+            self._incoming.extend(seqs)
+        self._wake.set()
+
+    def _flush_incoming(self):
+        """Move gaps reported since the last round into the database queue"""
+        with self._lock:
+            seqs = list(self._incoming)
+            self._incoming.clear()
+        if seqs:
+            self.db.queue_backfill(seqs, node=self.node)
+
+    def _fetch(self, ledger_seq: int) -> Tuple[str, float]:
+        """
+        Fetch one ledger header
+
+        Returns:
+            Tuple of (ledger hash, close time as Unix timestamp)
+        """
+        ledger = self.api.get_ledger(ledger_seq)
+        ledger_hash = ledger.get('ledger_hash') or ledger.get('hash')
+        close_time = ledger.get('close_time')
+        if not ledger_hash or close_time is None:
+            raise RippledAPIError(f"Ledger {ledger_seq} header is incomplete")
+        return ledger_hash, int(close_time) + RIPPLE_EPOCH
+
+    def run_batch(self) -> Tuple[int, int]:
+        """
+        Backfill one batch of queued ledgers
+
+        Returns:
+            Tuple of (ledgers attempted, ledgers recorded)
+        """
+        self._flush_incoming()
+        batch = self.db.get_backfill_batch(limit=self.batch_size, node=self.node)
+        if not batch:
+            return 0, 0
+
+        # Recorded by the live path in the meantime - just dequeue those
+        recorded = []
+        if self.ledger_window is not None:
+            recorded = [seq for seq, _ in batch if seq in self.ledger_window]
+
+        futures = [(seq, attempts, self.executor.submit(self._fetch, seq))
+                   for seq, attempts in batch if seq not in recorded]
+
+        done = []
+        failed = []
+        abandoned = []
+        last_error = None
+        for seq, attempts, future in futures:
+            try:
+                ledger_hash, close_time = future.result()
+                self.validation_tracker.record_backfilled_ledger(seq, ledger_hash, close_time)
+                if self.ledger_window is not None:
+                    self.ledger_window.mark(seq)
+                done.append(seq)
+            except Exception as e:
+                last_error = e
+                if attempts + 1 >= self.max_attempts:
+                    abandoned.append(seq)
+                else:
+                    failed.append(seq)
+
+        self.db.remove_backfill(done + recorded + abandoned, node=self.node)
+        self.db.record_backfill_failure(failed, node=self.node)
+
+        self.ledgers_backfilled += len(done)
+        self.ledgers_abandoned += len(abandoned)
+        if abandoned:
+            print(f"{self.log_prefix}Warning: gave up backfilling {len(abandoned)} ledgers "
+                  f"({min(abandoned)}-{max(abandoned)}): {last_error}")
+
+        if self.prometheus:
+            if done:
+                self.prometheus.increment_ledgers_backfilled(len(done))
+            self.prometheus.update_backfill_pending(self.db.count_backfill_pending(node=self.node))
+
+        return len(batch), len(done) + len(recorded)
+
+    def _run(self):
+        """Backfill loop executed by the background thread"""
+        while not self._stop.is_set():
+            try:
+                attempted, recorded = self.run_batch()
+            except Exception as e:
+                timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                print(f"[{timestamp_str}] {self.log_prefix}[ERROR] Backfill failed: {e}")
+                attempted, recorded = 1, 0
+
+            if attempted == 0:
+                # Queue empty - sleep until the poller reports a gap
+                self._wake.wait()
+                self._wake.clear()
+            elif recorded == 0:
+                # rippled unreachable or missing these ledgers - back off
+                self._wake.wait(self.retry_delay)
+                self._wake.clear()
+
+    def start(self):
+        """Start backfilling in a background daemon thread (resumes a persisted queue)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"backfill-{self.node}",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Stop the background thread
+
+        Ledgers not yet fetched stay queued for the next start.
+
+        Args:
+            timeout: Seconds to wait for the current batch to finish
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.executor.shutdown(wait=False)
+        # Keep gaps reported after the last round
+        self._flush_incoming()
@@ -7,18 +7,35 @@ Supports both Docker and native rippled deployments
 
 import sys
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
-from src.utils.rippled_api import RippledAPI, RippledAPIError
+from src.utils.rippled_api import RIPPLE_EPOCH, RippledAPI, RippledAPIError
 from src.storage.database import Database
+from src.storage.rollups import Rollups
 from src.collectors.validation_tracker import ValidationTracker
+from src.collectors.backfill import LedgerBackfill
+from src.collectors.adaptive_rate import AdaptivePollRate
 from src.alerts.alerter import Alerter
 from src.exporters.prometheus_exporter import PrometheusExporter
 from src.utils.config import Config
+from src.utils.db_size_scanner import DatabaseSizeScanner
+from src.utils.nodes import DEFAULT_NODE, load_node_configs
+from src.utils.ledger_window import LedgerWindow
+from src.collectors.scheduler import PollScheduler
+from src.collectors.stream_subscriber import StreamSubscriber
+from src.processors.pipeline import Pipeline
+from src.processors.samples import (
+    MetricsSample, StateTransitionSample, PollSample, LedgerCloseSample,
+    CheckpointSample, SeriesSample, SnapshotSample
+)
+from src.processors.throughput import ThroughputTracker
+from src.utils.instrumentation import instrumentation, stage
 
 
 class FastPoller:
@@ -27,15 +44,70 @@ class FastPoller:
     """
     
     def __init__(self, api: RippledAPI, db: Database, alerter: Alerter, 
-                 prometheus: PrometheusExporter = None, interval: int = 3):
+                 prometheus: PrometheusExporter = None, interval: int = 3,
+                 poll_deadline: float = None, db_size_scanner=None,
+                 node: str = DEFAULT_NODE, periods: dict = None,
+                 pipeline: Pipeline = None, backfill_workers: int = 0,
+                 backfill_max_gap: int = 10000, adaptive: AdaptivePollRate = None,
+                 clock=time.time):
         """
         Initialize fast poller
+        
+        Args:
+            poll_deadline: Seconds a poll waits for its rippled responses
+                           (default: the poll interval)
+            db_size_scanner: Background DatabaseSizeScanner (stopped on close)
+            node: Name of the monitored node (database column / metric label)
+            periods: Per-task period overrides in seconds (server_state,
+                     peers, db_sizes, checkpoint)
+            pipeline: Pipeline database writes and metric updates go through
+                      (default: handled synchronously on the poll thread)
+            backfill_workers: Parallel fetches for skipped ledgers
+                              (0 keeps the old state-based guess for gaps)
+            backfill_max_gap: Most ledgers backfilled for a single gap
+            adaptive: AdaptivePollRate that varies the server_state period
+                      with validator health (None polls at a fixed interval)
+            clock: Source of sample timestamps (replay uses archive time)
         """
         self.api = api
         self.db = db
         self.alerter = alerter
         self.prometheus = prometheus
         self.interval = interval
+        self.poll_deadline = poll_deadline or interval
+        self.db_size_scanner = db_size_scanner
+        self.node = node
+        self.clock = clock
+        self.pipeline = pipeline or Pipeline(db, prometheus)
+        self.log_prefix = f"[{node}] " if node != DEFAULT_NODE else ''
+        self._stop = threading.Event()
+        
+        # Each task runs on its own cadence (see build_scheduler)
+        self.periods = {
+            'server_state': interval,
+            'peers': interval * 10,
+            'db_sizes': 180,
+            'checkpoint': 60
+        }
+        self.periods.update(periods or {})
+        self.scheduler = None
+        self.adaptive = adaptive
+        
+        # rippled commands run side by side in the background
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='rippled')
+        self._peers_future = None
+        
+        # Ledger close fetches (ledger with transactions) can be slow, so they
+        # get their own worker and never hold up server_info. One runs at a
+        # time; ledgers closed meanwhile are picked up by the next one.
+        self.ledger_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ledger')
+        self._ledger_future = None
+        self._ledger_fetched_seq = None
+        
+        # Throughput from closed ledgers. The stream subscriber turns the
+        # fetch off and records ledgerClosed messages directly.
+        self.throughput = ThroughputTracker()
+        self.fetch_ledger_closes = True
         
         # State tracking
         self.last_state = None
@@ -43,16 +115,31 @@ class FastPoller:
         self.last_ledger_seq = None
         self.last_ledger_time = None
         self.last_ledger_txn_count = None
+        self.last_uptime = None
         
         # Validation tracker
-        self.validation_tracker = ValidationTracker(api, db)
+        self.validation_tracker = ValidationTracker(api, db, node=node, pipeline=self.pipeline,
+                                                    clock=clock)
+        
+        # Ledgers already recorded (shared with the backfill worker)
+        self.checked_ledgers = LedgerWindow(size=2048)
         
-        # Track ledgers checked
-        self.checked_ledgers = set()
+        # Skipped ledgers are fetched in the background (resumes a saved queue)
+        self.backfill = None
+        if backfill_workers > 0:
+            self.backfill = LedgerBackfill(api, db, self.validation_tracker, prometheus,
+                                           node=node, max_workers=backfill_workers,
+                                           max_gap=backfill_max_gap,
+                                           ledger_window=self.checked_ledgers)
+            self.backfill.start()
         
         # Error tracking
         self.consecutive_errors = 0
         self.max_errors_before_alert = 2
+        # Failed polls count for the poll time they span, not their number,
+        # so the faster adaptive rate after an error does not alert sooner
+        self.unreachable_after = interval * self.max_errors_before_alert
+        self.unreachable_for = 0.0
         
         # Statistics
         self.poll_count = 0
@@ -68,7 +155,7 @@ class FastPoller:
     def _update_server_info(self):
         """Update static server info metrics once"""
         try:
-            state_info = self.api.get_server_state()
+            state_info = self.api.get_static_info()
             self.prometheus.update_server_info(
                 build_version=state_info.get('build_version', 'unknown'),
                 node_size=state_info.get('node_size', 'unknown'),
@@ -80,200 +167,210 @@ class FastPoller:
     
     def poll(self):
         """Poll validator once and update all metrics"""
+        started = time.perf_counter()
+        instrumentation.begin_trace()
         try:
-            state_info = self.api.get_server_state()
-            
-            # Reset error counter on success
-            self.consecutive_errors = 0
-            
-            # Extract basic metrics with type safety
-            current_state = state_info.get('server_state', 'unknown')
-            current_seq = int(state_info.get('validated_ledger', {}).get('seq', 0))
-            peers = int(state_info.get('peers', 0))
-            load_factor = float(state_info.get('load_factor', 0))
-            
-            # Extract validation metrics
-            validation_quorum = int(state_info.get('validation_quorum', 0))
-            proposers = int(state_info.get('last_close', {}).get('proposers', 0))
-            
-            # Extract performance metrics
-            io_latency = int(state_info.get('io_latency_ms', 0))
-            converge_time = float(state_info.get('last_close', {}).get('converge_time_s', 0))
-            jq_trans_overflow = int(state_info.get('jq_trans_overflow', 0))
-            
-            # Extract peer metrics
-            peer_disconnects = int(state_info.get('peer_disconnects', 0))
-            peer_disconnects_resources = int(state_info.get('peer_disconnects_resources', 0))
-            
-            # Extract system metrics
-            uptime = int(state_info.get('uptime', 0))
-            initial_sync_us = int(state_info.get('initial_sync_duration_us', 0))
-            server_state_duration_us = int(state_info.get('server_state_duration_us', 0))
-            
-            # Extract validated ledger details
-            validated_ledger = state_info.get('validated_ledger', {})
-            ledger_age = int(validated_ledger.get('age', 0))
-            base_fee = float(validated_ledger.get('base_fee_xrp', 0))
-            reserve_base = float(validated_ledger.get('reserve_base_xrp', 0))
-            reserve_inc = float(validated_ledger.get('reserve_inc_xrp', 0))
+            # Bound so the request's stages (rippled.*, json_decode) join this
+            # poll's trace although they run on a worker thread
+            server_future = self.executor.submit(instrumentation.bind(self.api.get_server_state))
+            try:
+                with stage('wait.server_info'):
+                    state_info = server_future.result(timeout=self.poll_deadline)
+            except FutureTimeoutError:
+                raise RippledAPIError(f"server_info missed the {self.poll_deadline}s poll deadline")
             
-            # Extract state accounting
-            state_accounting = state_info.get('state_accounting', {})
+            # The whole response goes to the snapshot archive, if enabled
+            self.pipeline.persist(SnapshotSample(self.node, self.clock(), 'server_info', state_info))
             
-            # Get detailed peer information (every 10 polls to reduce overhead)
-            peer_details = {'inbound': 0, 'outbound': 0, 'insane': 0, 'p90_latency': 0}
-            if self.poll_count % 10 == 0:
-                try:
-                    peer_details = self._get_peer_details()
-                except Exception as e:
-                    print(f"Warning: Could not get peer details: {e}")
-            
-            # Get database sizes (every 60 polls = 3 minutes)
-            db_sizes = {'ledger_db': 0, 'nudb': 0}
-            if self.poll_count % 60 == 0:
-                try:
-                    db_sizes = self.api.get_database_sizes()
-                except Exception as e:
-                    print(f"Warning: Could not get DB sizes: {e}")
-            
-            # Calculate transaction rate
-            txn_rate = 0
-            if self.last_ledger_seq and self.last_ledger_time:
-                try:
-                    txn_rate = self._calculate_transaction_rate(current_seq)
-                except Exception as e:
-                    print(f"Warning: Could not calculate txn rate: {e}")
-            
-            self.poll_count += 1
-            timestamp = time.time()
-            timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Check for state change
-            if self.last_state and current_state != self.last_state:
-                duration = timestamp - self.state_entered_at
-                
-                # Record to database
-                self.db.write_state_transition(
-                    timestamp=timestamp,
-                    old_state=self.last_state,
-                    new_state=current_state,
-                    duration=duration,
-                    ledger_seq=current_seq,
-                    peers=peers,
-                    load_factor=load_factor
-                )
-                
-                self.state_changes += 1
-                
-                # Send alert
-                self.alerter.state_change(
-                    old_state=self.last_state,
-                    new_state=current_state,
-                    duration=duration,
-                    ledger_seq=current_seq
-                )
-                self.alerts_sent += 1
-                
-                # Update Prometheus
-                if self.prometheus:
-                    self.prometheus.increment_state_changes()
-                    self.prometheus.increment_alerts_sent()
-                
-                self.state_entered_at = timestamp
-            elif self.last_state is None:
-                self.state_entered_at = timestamp
+            self.process_server_info(state_info)
+        except RippledAPIError as e:
+            self._handle_api_error(e)
+        except Exception as e:
+            self._handle_unexpected_error(e)
+        finally:
+            if instrumentation.enabled:
+                instrumentation.end_trace(f"{self.log_prefix}poll #{self.poll_count}",
+                                          time.perf_counter() - started)
+    
+    def process_server_info(self, state_info: dict):
+        """
+        Run one server_info snapshot through state, validation, database
+        and Prometheus tracking
+        
+        Shared by the polling loop and the stream subscriber, which builds
+        the same server_info shape from push messages.
+        
+        Args:
+            state_info: The 'info' object of a server_info response
+        """
+        # Reset error counter on success
+        self.consecutive_errors = 0
+        
+        # Extract basic metrics with type safety
+        current_state = state_info.get('server_state', 'unknown')
+        current_seq = int(state_info.get('validated_ledger', {}).get('seq', 0))
+        peers = int(state_info.get('peers', 0))
+        load_factor = float(state_info.get('load_factor', 0))
+        
+        # Extract validation metrics
+        validation_quorum = int(state_info.get('validation_quorum', 0))
+        proposers = int(state_info.get('last_close', {}).get('proposers', 0))
+        
+        # Extract performance metrics
+        io_latency = int(state_info.get('io_latency_ms', 0))
+        converge_time = float(state_info.get('last_close', {}).get('converge_time_s', 0))
+        jq_trans_overflow = int(state_info.get('jq_trans_overflow', 0))
+        
+        # Extract peer metrics
+        peer_disconnects = int(state_info.get('peer_disconnects', 0))
+        peer_disconnects_resources = int(state_info.get('peer_disconnects_resources', 0))
+        
+        # Extract system metrics
+        uptime = int(state_info.get('uptime', 0))
+        initial_sync_us = int(state_info.get('initial_sync_duration_us', 0))
+        server_state_duration_us = int(state_info.get('server_state_duration_us', 0))
+        
+        # rippled restarted - cached static answers (version, keys) may be stale
+        if self.last_uptime is not None and uptime < self.last_uptime:
+            print(f"rippled restart detected (uptime {self.last_uptime}s -> {uptime}s), clearing API cache")
+            self.api.invalidate_cache()
+            if self.prometheus:
+                self._update_server_info()
+        self.last_uptime = uptime
+        
+        # Extract validated ledger details
+        validated_ledger = state_info.get('validated_ledger', {})
+        ledger_age = int(validated_ledger.get('age', 0))
+        base_fee = float(validated_ledger.get('base_fee_xrp', 0))
+        reserve_base = float(validated_ledger.get('reserve_base_xrp', 0))
+        reserve_inc = float(validated_ledger.get('reserve_inc_xrp', 0))
+        
+        # Extract state accounting
+        state_accounting = state_info.get('state_accounting', {})
+        
+        # peers is fetched in the background by its scheduled task and
+        # picked up by whichever poll sees it finished, so a slow response
+        # never holds up this one
+        peer_details = self._collect_peer_details()
+        
+        # Newly validated ledgers' close data is fetched the same way
+        self._collect_ledger_closes()
+        if (self.fetch_ledger_closes and self._ledger_future is None
+                and current_seq > (self._ledger_fetched_seq or self.last_ledger_seq or 0)):
+            fetched = self._ledger_fetched_seq or self.last_ledger_seq
+            first = max(fetched + 1, current_seq - 7) if fetched else current_seq
+            self._ledger_future = self.ledger_executor.submit(
+                instrumentation.bind(self._fetch_ledger_closes), list(range(first, current_seq + 1))
+            )
+            self._ledger_fetched_seq = current_seq
+        
+        self.poll_count += 1
+        timestamp = self.clock()
+        timestamp_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Check for state change
+        if self.last_state and current_state != self.last_state:
+            duration = timestamp - self.state_entered_at
             
-            # Check validations
-            if self.last_ledger_seq:
-                for seq in range(self.last_ledger_seq, current_seq):
-                    if seq not in self.checked_ledgers and seq > 0:
-                        self.validation_tracker.check_ledger_validation(
-                            ledger_seq=seq,
-                            server_state=self.last_state or current_state,
-                            peers=peers,
-                            load_factor=load_factor
-                        )
-                        self.checked_ledgers.add(seq)
-                        self.validations_checked += 1
-                        
-                        # Update Prometheus
-                        if self.prometheus:
-                            self.prometheus.increment_validations_checked()
-                        
-                        if len(self.checked_ledgers) > 1000:
-                            oldest = sorted(self.checked_ledgers)[:500]
-                            self.checked_ledgers -= set(oldest)
+            # Record to database
+            self.pipeline.persist(StateTransitionSample(
+                timestamp=timestamp,
+                old_state=self.last_state,
+                new_state=current_state,
+                duration=duration,
+                ledger_seq=current_seq,
+                peers=peers,
+                load_factor=load_factor,
+                node=self.node
+            ))
             
-            # Check for ledger gaps
-            if self.last_ledger_seq:
-                gap = current_seq - self.last_ledger_seq
-                if gap > 1:
-                    print(f"\n[WARNING] LEDGER GAP: Jumped {gap} ledgers ({self.last_ledger_seq} -> {current_seq})\n")
+            self.state_changes += 1
             
-            # Calculate time in state
-            time_in_state = timestamp - self.state_entered_at if self.state_entered_at else 0
+            # Send alert
+            self.alerter.state_change(
+                old_state=self.last_state,
+                new_state=current_state,
+                duration=duration,
+                ledger_seq=current_seq
+            )
+            self.alerts_sent += 1
             
-            # Update Prometheus metrics
+            # Update Prometheus
             if self.prometheus:
-                # State metrics
-                self.prometheus.update_state(current_state, time_in_state)
-                
-                # Ledger metrics
-                self.prometheus.update_ledger(current_seq)
-                self.prometheus.update_ledger_details(ledger_age, base_fee, reserve_base, reserve_inc)
-                
-                # Peer metrics
-                self.prometheus.update_peers(peers)
-                self.prometheus.update_peer_disconnects(peer_disconnects, peer_disconnects_resources)
-                
-                # Peer details (only update if we fetched them)
-                if peer_details['inbound'] > 0 or peer_details['outbound'] > 0:
-                    self.prometheus.update_peer_details(
-                        peer_details['inbound'],
-                        peer_details['outbound'],
-                        peer_details['insane'],
-                        peer_details['p90_latency']
-                    )
-                
-                # Performance metrics
-                self.prometheus.update_load_factor(load_factor)
-                self.prometheus.update_performance(io_latency, converge_time)
-                self.prometheus.update_jq_trans_overflow(jq_trans_overflow)
-                
-                # Transaction rate
-                if txn_rate > 0:
-                    self.prometheus.update_transaction_rate(txn_rate)
-                
-                # Validation metrics
-                self.prometheus.update_validation_quorum(validation_quorum)
-                self.prometheus.update_proposers(proposers)
-                
-                # State accounting
-                self.prometheus.update_state_accounting(state_accounting)
-                
-                # System metrics
-                self.prometheus.update_system_metrics(uptime, initial_sync_us, server_state_duration_us)
-                self.prometheus.update_monitor_uptime()
-                
-                # Database sizes (only if we fetched them)
-                if db_sizes['ledger_db'] > 0 or db_sizes['nudb'] > 0:
-                    self.prometheus.update_database_sizes(db_sizes['ledger_db'], db_sizes['nudb'])
-                
-                # Update validation stats every 10 polls
-                if self.poll_count % 10 == 0:
-                    stats = self.db.get_validation_stats(hours=24)
-                    self.prometheus.update_validation_stats(
-                        stats['agreement_rate'],
-                        stats['validation_rate']
+                self.prometheus.increment_state_changes()
+                self.prometheus.increment_alerts_sent()
+            
+            self.state_entered_at = timestamp
+        elif self.last_state is None:
+            self.state_entered_at = timestamp
+        
+        # Check validations. With backfill enabled only the previous ledger is
+        # judged from live state; skipped ones are recorded from their headers.
+        if self.last_ledger_seq:
+            check_seqs = range(self.last_ledger_seq, current_seq)
+            if self.backfill and current_seq - self.last_ledger_seq > 1:
+                self.backfill.enqueue(range(self.last_ledger_seq + 1, current_seq))
+                check_seqs = [self.last_ledger_seq]
+            for seq in check_seqs:
+                if seq not in self.checked_ledgers and seq > 0:
+                    self.validation_tracker.check_ledger_validation(
+                        ledger_seq=seq,
+                        server_state=self.last_state or current_state,
+                        peers=peers,
+                        load_factor=load_factor
                     )
+                    self.checked_ledgers.mark(seq)
+                    self.validations_checked += 1
                     
-                    # Update period validation stats
-                    stats_1h = self.db.get_validation_stats_period(hours=1)
-                    stats_24h = self.db.get_validation_stats_period(hours=24)
-                    self.prometheus.update_validation_period_stats(stats_1h, stats_24h)
-            
-            # Print status
-            print(f"[{timestamp_str}] Poll #{self.poll_count:4d} | "
+                    # Update Prometheus
+                    if self.prometheus:
+                        self.prometheus.increment_validations_checked()
+        
+        # Check for ledger gaps
+        if self.last_ledger_seq:
+            gap = current_seq - self.last_ledger_seq
+            if gap > 1:
+                action = ", queued for backfill" if self.backfill else ""
+                print(f"\n[WARNING] LEDGER GAP: Jumped {gap} ledgers ({self.last_ledger_seq} -> {current_seq}){action}\n")
+        
+        # Calculate time in state
+        time_in_state = timestamp - self.state_entered_at if self.state_entered_at else 0
+        
+        # Hand the snapshot to the export stage
+        self.pipeline.export(PollSample(
+            node=self.node,
+            timestamp=timestamp,
+            server_state=current_state,
+            time_in_state=time_in_state,
+            ledger_seq=current_seq,
+            ledger_age=ledger_age,
+            base_fee=base_fee,
+            reserve_base=reserve_base,
+            reserve_inc=reserve_inc,
+            peers=peers,
+            peer_disconnects=peer_disconnects,
+            peer_disconnects_resources=peer_disconnects_resources,
+            peer_details=peer_details,
+            load_factor=load_factor,
+            io_latency=io_latency,
+            converge_time=converge_time,
+            jq_trans_overflow=jq_trans_overflow,
+            throughput=self.throughput.rates(now=timestamp) if self.throughput.ledgers_recorded else {},
+            validation_quorum=validation_quorum,
+            proposers=proposers,
+            state_accounting=dict(state_accounting),
+            uptime=uptime,
+            initial_sync_us=initial_sync_us,
+            server_state_duration_us=server_state_duration_us,
+            api_cache_hits=self.api.cache_hits,
+            api_cache_misses=self.api.cache_misses
+        ))
+        
+        self._adapt_poll_rate(current_state, ledger_age)
+        
+        # Print status
+        with stage('print'):
+            print(f"[{timestamp_str}] {self.log_prefix}Poll #{self.poll_count:4d} | "
                   f"State: {current_state:10s} ({time_in_state:6.0f}s) | "
                   f"Ledger: {current_seq:9d} (age: {ledger_age}s) | "
                   f"Peers: {peers:2d} | "
@@ -281,29 +378,184 @@ class FastPoller:
                   f"Proposers: {proposers:2d} | "
                   f"IO: {io_latency}ms | "
                   f"Validated: {self.validations_checked:4d}")
+        
+        # Write to database
+        self.pipeline.persist(MetricsSample(
+            timestamp=timestamp,
+            server_state=current_state,
+            ledger_seq=current_seq,
+            peers=peers,
+            load_factor=load_factor,
+            node=self.node
+        ))
+        self.pipeline.persist(SeriesSample(
+            node=self.node,
+            timestamp=timestamp,
+            peers=peers,
+            load_factor=load_factor,
+            io_latency=io_latency,
+            converge_time=converge_time,
+            ledger_age=ledger_age,
+            proposers=proposers
+        ))
+        
+        # Update tracking
+        self.last_state = current_state
+        self.last_ledger_seq = current_seq
+        self.last_ledger_time = timestamp
+    
+    def _refresh_peer_details(self):
+        """Scheduled task: fetch peer details in the background"""
+        if self._peers_future is None:
+            self._peers_future = self.executor.submit(self._get_peer_details)
+    
+    def save_checkpoint(self):
+        """Scheduled task: persist the state a warm restart needs as one row"""
+        if self.last_state is None:
+            return
+        window_base, window_bits = self.checked_ledgers.to_bits()
+        self.pipeline.persist(CheckpointSample(
+            saved_at=self.clock(),
+            server_state=self.last_state,
+            state_entered_at=self.state_entered_at,
+            last_ledger_seq=self.last_ledger_seq,
+            last_uptime=self.last_uptime,
+            window_base=window_base,
+            window_bits=window_bits,
+            node=self.node
+        ))
+    
+    def restore_state(self, max_age: float = 600) -> bool:
+        """
+        Pick up where the previous run stopped
+        
+        Reads the checkpoint row plus the few rows written after it (all
+        indexed reads). Ledgers already checked are always restored, so
+        they are not validated again. State, time in state and the last
+        ledger are only restored if the previous run stopped less than
+        max_age seconds ago - after a longer outage they would be guesses.
+        
+        Args:
+            max_age: Seconds after which the previous state is stale
             
-            # Write to database
-            self.db.write_metrics(
-                timestamp=timestamp,
-                server_state=current_state,
-                ledger_seq=current_seq,
-                peers=peers,
-                load_factor=load_factor
-            )
-            
-            # Update tracking
-            self.last_state = current_state
-            self.last_ledger_seq = current_seq
-            self.last_ledger_time = timestamp
+        Returns:
+            True if state and last ledger were restored
+        """
+        checkpoint = self.db.get_checkpoint(node=self.node)
+        last_metrics = self.db.get_last_metrics(node=self.node)
+        last_transition = self.db.get_last_transition(node=self.node)
+        if checkpoint is None and last_metrics is None:
+            return False
+        
+        # Checked ledgers: checkpoint bitmap, then any recorded since
+        last_seq = last_metrics[2] if last_metrics else checkpoint['last_ledger_seq']
+        first_unsaved = (last_seq or 0) - self.checked_ledgers.size + 1
+        if checkpoint is not None:
+            self.checked_ledgers.load_bits(checkpoint['window_base'], checkpoint['window_bits'])
+            if self.checked_ledgers.newest is not None:
+                first_unsaved = max(first_unsaved, self.checked_ledgers.newest + 1)
+        if last_seq:
+            for seq in self.db.get_ledger_validation_seqs(first_unsaved, last_seq, node=self.node):
+                self.checked_ledgers.mark(seq)
+        
+        # Rows written after the checkpoint are newer
+        if last_metrics and (checkpoint is None or last_metrics[0] >= checkpoint['saved_at']):
+            saved_at, state = last_metrics[0], last_metrics[1]
+        else:
+            saved_at, state = checkpoint['saved_at'], checkpoint['server_state']
+        
+        if checkpoint is not None and checkpoint['server_state'] == state:
+            entered_at = checkpoint['state_entered_at']
+        elif last_transition and last_transition[2] == state:
+            entered_at = last_transition[0]
+        else:
+            entered_at = saved_at
+        
+        age = self.clock() - saved_at
+        if age > max_age:
+            print(f"{self.log_prefix}Previous run stopped {age:.0f}s ago - "
+                  f"restored {len(self.checked_ledgers)} checked ledgers only")
+            return False
+        
+        self.last_state = state
+        self.state_entered_at = entered_at
+        self.last_ledger_seq = last_seq
+        if checkpoint is not None:
+            self.last_uptime = checkpoint['last_uptime']
+        
+        print(f"{self.log_prefix}Warm restart: {state} since "
+              f"{datetime.fromtimestamp(entered_at).strftime('%Y-%m-%d %H:%M:%S')}, "
+              f"ledger {last_seq}, {len(self.checked_ledgers)} checked ledgers")
+        return True
+    
+    def build_scheduler(self, main_task: tuple = None) -> PollScheduler:
+        """
+        Register this poller's periodic tasks
+        
+        Args:
+            main_task: (name, period, callback) replacing the server_state
+                       poll (the stream subscriber's server_info refresh)
             
-        except RippledAPIError as e:
-            self._handle_api_error(e)
-        except Exception as e:
-            self._handle_unexpected_error(e)
+        Returns:
+            PollScheduler (also stored as self.scheduler)
+        """
+        scheduler = PollScheduler(prometheus=self.prometheus)
+        
+        if main_task is None:
+            main_task = ('server_state', self.periods['server_state'], self.poll)
+        scheduler.add(*main_task)
+        scheduler.add('peers', self.periods['peers'], self._refresh_peer_details)
+        if self.db_size_scanner:
+            scheduler.add('db_sizes', self.periods['db_sizes'], self.db_size_scanner.trigger)
+        scheduler.add('checkpoint', self.periods['checkpoint'], self.save_checkpoint)
+        
+        self.scheduler = scheduler
+        return scheduler
+    
+    def _poll_period(self) -> float:
+        """Seconds between server_state polls at the moment"""
+        task = self.scheduler.get('server_state') if self.scheduler else None
+        return task.period if task else self.interval
+    
+    def _adapt_poll_rate(self, state: str = None, ledger_age: int = 0):
+        """
+        Retune the server_state period from the latest poll outcome
+        
+        Args:
+            state: server_state of a successful poll (None after an error)
+            ledger_age: Validated ledger age of a successful poll
+        """
+        # Only a timer-driven poll can change its pace (not stream mode)
+        if self.adaptive is None or not self.scheduler or not self.scheduler.get('server_state'):
+            return
+        
+        if state is None:
+            interval = self.adaptive.observe_error()
+        else:
+            interval = self.adaptive.observe(state, ledger_age)
+        
+        self.scheduler.set_period('server_state', interval)
+        if self.prometheus:
+            self.prometheus.update_poll_rate(interval)
+    
+    def _collect_peer_details(self) -> dict:
+        """Return finished background peer details, or zeros if none are ready"""
+        peer_details = {'inbound': 0, 'outbound': 0, 'insane': 0, 'p90_latency': 0}
+        
+        if self._peers_future is not None and self._peers_future.done():
+            future, self._peers_future = self._peers_future, None
+            try:
+                peer_details = future.result()
+            except Exception as e:
+                print(f"Warning: Could not get peer details: {e}")
+        
+        return peer_details
     
     def _get_peer_details(self) -> dict:
         """Get detailed peer information"""
-        peers_list = self.api.get_peers()
+        result = self.api.get_peers_result()
+        self.pipeline.persist(SnapshotSample(self.node, self.clock(), 'peers', result))
+        peers_list = result.get('peers', [])
         
         inbound_count = 0
         outbound_count = 0
@@ -343,61 +595,100 @@ class FastPoller:
             'p90_latency': p90_latency
         }
     
-    def _calculate_transaction_rate(self, current_seq: int) -> float:
-        """Calculate transactions per second from fee info"""
-        try:
-            # Get fee info which includes current ledger size
-            fee_info = self.api.get_fee()
-            current_ledger_size = int(fee_info.get('current_ledger_size', 0))
-            
-            # Average ledger close time is ~3.5 seconds
-            avg_ledger_time = 3.5
-            
-            # Calculate TPS
-            if current_ledger_size > 0:
-                rate = current_ledger_size / avg_ledger_time
-                return rate
-            return 0
-        except Exception:
-            return 0
+    def _fetch_ledger_closes(self, ledger_seqs: list) -> list:
+        """
+        Fetch close time and transaction count of validated ledgers
+        
+        Returns:
+            List of (ledger_seq, close_time, txn_count) tuples
+        """
+        closes = []
+        for seq in ledger_seqs:
+            ledger = self.api.get_ledger(seq, transactions=True)
+            close_time = ledger.get('close_time')
+            if close_time is None:
+                continue
+            closes.append((seq, int(close_time) + RIPPLE_EPOCH, len(ledger.get('transactions', []))))
+        return closes
+    
+    def _collect_ledger_closes(self):
+        """Record the background ledger fetch if it has finished"""
+        if self._ledger_future is not None and self._ledger_future.done():
+            future, self._ledger_future = self._ledger_future, None
+            try:
+                for seq, close_time, txn_count in future.result():
+                    self.record_ledger_close(seq, close_time, txn_count)
+            except Exception as e:
+                print(f"Warning: Could not get ledger close data: {e}")
+    
+    def record_ledger_close(self, ledger_seq: int, close_time: float, txn_count: int):
+        """
+        Feed one closed ledger into the throughput windows
+        
+        Args:
+            ledger_seq: Ledger sequence number
+            close_time: Close time as a Unix timestamp
+            txn_count: Transactions in the ledger
+        """
+        interval = self.throughput.record_ledger(ledger_seq, close_time, txn_count)
+        if interval is not None:
+            self.pipeline.export(LedgerCloseSample(
+                node=self.node,
+                ledger_seq=ledger_seq,
+                close_time=close_time,
+                txn_count=txn_count,
+                interval=interval
+            ))
     
     def _handle_api_error(self, error: Exception):
         """Handle API errors gracefully"""
         self.consecutive_errors += 1
         self.api_errors += 1
         
+        # Time since the first failed poll, in scheduled poll time (the
+        # period is still the one set after the previous failure)
+        if self.consecutive_errors == 1:
+            self.unreachable_for = 0.0
+        else:
+            self.unreachable_for += self._poll_period()
+        unreachable = self.unreachable_for >= self.unreachable_after
+        
         # Update Prometheus
         if self.prometheus:
             self.prometheus.increment_api_errors()
         
-        timestamp = time.time()
-        timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._adapt_poll_rate()
+        
+        timestamp = self.clock()
+        timestamp_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
         current_state = 'unreachable'
         
         if self.consecutive_errors == 1:
-            print(f"[{timestamp_str}] [WARNING] Validator unreachable (attempt {self.consecutive_errors})")
-        elif self.consecutive_errors <= self.max_errors_before_alert:
-            print(f"[{timestamp_str}] [WARNING] Still unreachable (attempt {self.consecutive_errors})")
+            print(f"[{timestamp_str}] {self.log_prefix}[WARNING] Validator unreachable (attempt {self.consecutive_errors})")
+        elif not unreachable:
+            print(f"[{timestamp_str}] {self.log_prefix}[WARNING] Still unreachable (attempt {self.consecutive_errors})")
         else:
             if self.last_state and self.last_state != 'unreachable':
                 duration = timestamp - self.state_entered_at if self.state_entered_at else 0
                 
-                self.db.write_state_transition(
+                self.pipeline.persist(StateTransitionSample(
                     timestamp=timestamp,
                     old_state=self.last_state,
                     new_state=current_state,
                     duration=duration,
                     ledger_seq=self.last_ledger_seq or 0,
                     peers=0,
-                    load_factor=0
-                )
+                    load_factor=0,
+                    node=self.node
+                ))
                 
                 self.state_changes += 1
                 
                 self.alerter.alert(
                     level='CRITICAL',
                     title='Validator Unreachable',
-                    message=f'Unable to connect to validator after {self.consecutive_errors} attempts.\n'
+                    message=f'Unable to connect to validator after {self.consecutive_errors} attempts '
+                            f'over {self.unreachable_for:.0f}s.\n'
                             f'Previous state: {self.last_state}\n'
                             f'Likely cause: Validator down, restarting, or network issue'
                 )
@@ -411,24 +702,29 @@ class FastPoller:
                 
                 self.state_entered_at = timestamp
             
-            print(f"[{timestamp_str}] [CRITICAL] Validator unreachable (attempt {self.consecutive_errors})")
+            print(f"[{timestamp_str}] {self.log_prefix}[CRITICAL] Validator unreachable (attempt {self.consecutive_errors})")
         
-        if self.consecutive_errors > self.max_errors_before_alert:
+        if unreachable:
             self.last_state = 'unreachable'
     
     def _handle_unexpected_error(self, error: Exception):
         """Handle unexpected errors"""
         timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"[{timestamp_str}] [ERROR] Unexpected error: {error}")
+        print(f"[{timestamp_str}] {self.log_prefix}[ERROR] Unexpected error: {error}")
         import traceback
         traceback.print_exc()
     
-    def run(self):
-        """Run polling loop"""
+    def print_banner(self, mode: str):
+        """
+        Print startup banner
+        
+        Args:
+            mode: One-line description of how the validator is watched
+        """
         print("=" * 80)
         print("XRPL Monitor - Fast Poller (Full Tracking + Prometheus)")
         print("=" * 80)
-        print(f"Polling every {self.interval} seconds")
+        print(mode)
         print(f"Database: {self.db.db_path}")
         print(f"Alerts: {self.alerter.alerts_file}")
         if self.prometheus:
@@ -443,51 +739,168 @@ class FastPoller:
         print("Press Ctrl+C to stop")
         print("=" * 80)
         print()
+    
+    def close(self):
+        """Stop background rippled requests and release connections"""
+        self.save_checkpoint()
+        self.executor.shutdown(wait=False)
+        self.ledger_executor.shutdown(wait=False)
+        if self.backfill:
+            self.backfill.stop()
+        if self.db_size_scanner:
+            self.db_size_scanner.stop()
+        self.api.close()
+    
+    def print_summary(self):
+        """Print totals when the monitor is stopped"""
+        print("\n")
+        print("=" * 80)
+        print(f"{self.log_prefix}Polling stopped by user")
+        print(f"Total polls: {self.poll_count}")
+        print(f"State changes: {self.state_changes}")
+        print(f"Alerts sent: {self.alerts_sent}")
+        print(f"API errors: {self.api_errors}")
+        print(f"Validations checked: {self.validations_checked}")
+        if self.scheduler:
+            for task in self.scheduler.tasks:
+                print(f"Task {task.name}: {task.runs} runs, {task.overruns} overruns, "
+                      f"max {task.max_duration:.3f}s")
+        print("=" * 80)
+    
+    def stop(self):
+        """Ask loop() to return after the current poll"""
+        self._stop.set()
+    
+    def _pace(self) -> str:
+        """How often server_state is polled, for banners"""
+        if self.adaptive:
+            return (f"every {self.adaptive.min_interval}-{self.adaptive.max_interval}s "
+                    f"(adaptive)")
+        return f"every {self.interval}s"
+    
+    def describe(self) -> str:
+        """One-line description for startup banners"""
+        return f"{self.node}: polling {self.api.describe()} {self._pace()}"
+    
+    def loop(self):
+        """Run the scheduled tasks until stop() is called"""
+        scheduler = self.scheduler or self.build_scheduler()
+        scheduler.run(self._stop)
+    
+    def run(self):
+        """Run polling loop"""
+        self.print_banner(f"Polling {self._pace()}")
         
         try:
-            while True:
-                self.poll()
-                time.sleep(self.interval)
-        
+            self.loop()
         except KeyboardInterrupt:
-            print("\n")
-            print("=" * 80)
-            print("Polling stopped by user")
-            print(f"Total polls: {self.poll_count}")
-            print(f"State changes: {self.state_changes}")
-            print(f"Alerts sent: {self.alerts_sent}")
-            print(f"API errors: {self.api_errors}")
-            print(f"Validations checked: {self.validations_checked}")
-            print("=" * 80)
+            self.close()
+            self.print_summary()
 
 
-def main():
-    """Main entry point"""
-    
-    # Load configuration
-    config = Config()
+def build_api(node: dict, cache_ttls: dict = None) -> RippledAPI:
+    """
+    Create the RippledAPI client for one node's settings
     
+    Args:
+        node: Node dictionary from load_node_configs()
+        cache_ttls: Per-command cache TTL overrides
+        
+    Returns:
+        RippledAPI instance
+    """
     # FIXED: Support both Docker and native rippled
-    rippled_mode = config.get('monitoring.rippled_mode', 'native')  # Default to native
+    rippled_mode = node.get('rippled_mode', 'native')  # Default to native
+    rippled_host = node.get('rippled_host', 'localhost')
+    rippled_port = node.get('rippled_port', 5005)
     
     if rippled_mode == 'docker':
-        # Docker mode - connect via container name
-        container_name = config.get('monitoring.container_name', 'rippledvalidator')
-        api = RippledAPI(container_name=container_name)
-        print(f"Connecting to rippled via Docker container: {container_name}")
+        # Docker mode - 'http' uses the admin port published by the container,
+        # 'socket' runs exec through the Docker Engine API, 'exec' shells out
+        # to the docker CLI
+        container_name = node.get('container_name', 'rippledvalidator')
+        docker_transport = node.get('docker_transport', 'exec')
+        if docker_transport == 'http':
+            api = RippledAPI(container_name=container_name, host=rippled_host, port=rippled_port,
+                             cache_ttls=cache_ttls)
+        elif docker_transport == 'socket':
+            docker_socket = node.get('docker_socket', '/var/run/docker.sock')
+            api = RippledAPI(container_name=container_name, docker_socket=docker_socket,
+                             cache_ttls=cache_ttls)
+        else:
+            api = RippledAPI(container_name=container_name, cache_ttls=cache_ttls)
+        print(f"[{node['name']}] Connecting to rippled in Docker container {container_name} via {api.describe()}")
     else:
         # Native mode - connect via host:port
-        rippled_host = config.get('monitoring.rippled_host', 'localhost')
-        rippled_port = config.get('monitoring.rippled_port', 5005)
-        api = RippledAPI(host=rippled_host, port=rippled_port)
-        print(f"Connecting to native rippled at {rippled_host}:{rippled_port}")
+        api = RippledAPI(host=rippled_host, port=rippled_port, cache_ttls=cache_ttls)
+        print(f"[{node['name']}] Connecting to native rippled at {api.describe()}")
     
-    # Create database
-    db_path = config.get('database.path', '${INSTALL_DIR}/data/monitor.db')
-    db = Database(db_path)
+    return api
+
+
+def run_monitors(monitors: list):
+    """
+    Run several node monitors concurrently, one thread each
+    
+    Each node has its own thread, API client and error state, so an
+    unreachable node only ever delays itself.
+    
+    Args:
+        monitors: FastPoller or StreamSubscriber instances
+    """
+    print("=" * 80)
+    print(f"XRPL Monitor - {len(monitors)} nodes")
+    print("=" * 80)
+    for monitor in monitors:
+        print(monitor.describe())
+    print("Press Ctrl+C to stop")
+    print("=" * 80)
+    print()
+    
+    threads = []
+    for monitor in monitors:
+        thread = threading.Thread(target=monitor.loop, name=f"monitor-{monitor.node}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        stop_monitors(monitors, threads)
+
+
+def stop_monitors(monitors: list, threads: list, timeout: float = 5):
+    """
+    Stop node monitors and release their resources once their loops return
+    
+    Args:
+        monitors: FastPoller or StreamSubscriber instances
+        threads: Thread running each monitor's loop, in the same order
+        timeout: Seconds to wait for each loop to return
+    """
+    for monitor in monitors:
+        monitor.stop()
+    for monitor, thread in zip(monitors, threads):
+        # Closing under a running poll would fail its requests and writes
+        thread.join(timeout)
+        if thread.is_alive():
+            print(f"Warning: {monitor.node} did not stop within {timeout}s, closing it anyway")
+        monitor.close()
+        monitor.print_summary()
+
+
+def main():
+    """Main entry point"""
+    
+    # Load configuration
+    config = Config()
     
-    # Create alerter
-    alerter = Alerter()
+    # One entry per monitored rippled server
+    nodes = load_node_configs(config)
+    cache_ttls = config.get('monitoring.cache_ttls', None)
+    multi_node = len(nodes) > 1
     
     # Create Prometheus exporter if enabled
     prometheus = None
@@ -497,12 +910,163 @@ def main():
         prometheus = PrometheusExporter(port=prom_port, host=prom_host)
         prometheus.start()
     
+    # Create database
+    db_path = config.get('database.path', '${INSTALL_DIR}/data/monitor.db')
+    db = Database(
+        db_path,
+        cache_size_mb=config.get('database.cache_size_mb', 16),
+        mmap_size_mb=config.get('database.mmap_size_mb', 64),
+        synchronous=config.get('database.synchronous', 'NORMAL'),
+        max_readers=config.get('database.max_readers', 8),
+        prometheus=prometheus
+    )
+    
+    # Per-stage timing of the poll path (off unless enabled)
+    if config.get('monitoring.instrumentation.enabled', False):
+        instrumentation.enable(
+            prometheus,
+            trace_interval=config.get('monitoring.instrumentation.trace_interval', 300)
+        )
+    
+    # Rows are grouped into one commit per batch unless disabled
+    if config.get('database.write_buffer.enabled', True):
+        db.enable_write_buffer(
+            max_rows=config.get('database.write_buffer.max_rows', 200),
+            max_delay=config.get('database.write_buffer.max_delay_ms', 1000) / 1000,
+            prometheus=prometheus
+        )
+    
+    # Dense numeric series go to memory-mapped ring buffers next to the database
+    timeseries_dir = None
+    if config.get('database.timeseries.enabled', True):
+        timeseries_dir = config.get('database.timeseries.path',
+                                    os.path.join(os.path.dirname(db.db_path), 'timeseries'))
+    
+    # Raw server_info / peers responses, compressed, for forensics and replay
+    archive_dir = None
+    archive_options = None
+    if config.get('database.archive.enabled', True):
+        archive_dir = config.get('database.archive.path',
+                                 os.path.join(os.path.dirname(db.db_path), 'archive'))
+        archive_options = {
+            'codec': config.get('database.archive.codec', 'auto'),
+            'segment_seconds': config.get('database.archive.segment_seconds', 3600),
+            'retention_days': config.get('database.archive.retention_days', 30)
+        }
+    
+    # Database writes and metric updates run off the poll threads
+    pipeline = Pipeline(
+        db, prometheus,
+        persist_queue_size=config.get('monitoring.pipeline.persist_queue_size', 10000),
+        export_queue_size=config.get('monitoring.pipeline.export_queue_size', 100),
+        persist_policy=config.get('monitoring.pipeline.persist_policy', 'block'),
+        export_policy=config.get('monitoring.pipeline.export_policy', 'drop_oldest'),
+        timeseries_dir=timeseries_dir,
+        timeseries_capacity=config.get('database.timeseries.capacity', 524288),
+        archive_dir=archive_dir,
+        archive_options=archive_options
+    )
+    pipeline.start()
+    
+    # Long-term history: rollup tiers, retention and incremental vacuum
+    rollups = None
+    if config.get('database.retention.enabled', True):
+        rollups = Rollups(
+            db, [node['name'] for node in nodes],
+            raw_days=config.get('database.retention.raw_days', 14),
+            minute_days=config.get('database.retention.minute_days', 90),
+            hour_days=config.get('database.retention.hour_days', 0),
+            interval=config.get('database.retention.interval', 300),
+            vacuum_pages=config.get('database.retention.vacuum_pages', 2000),
+            prometheus=prometheus
+        )
+        rollups.start()
+    
     # Get poll interval
     interval = config.get('monitoring.poll_interval', 3)
+    poll_deadline = config.get('monitoring.poll_deadline', interval)
+    collector = config.get('monitoring.collector', 'poll')
     
-    # Create and run poller
-    poller = FastPoller(api, db, alerter, prometheus, interval=interval)
-    poller.run()
+    # Skipped ledgers are backfilled from their headers unless disabled
+    backfill_workers = 0
+    if config.get('monitoring.backfill.enabled', True):
+        backfill_workers = config.get('monitoring.backfill.workers', 4)
+    backfill_max_gap = config.get('monitoring.backfill.max_gap', 10000)
+    
+    # Adaptive polling: fast while the validator is unhealthy, slow when stable
+    adaptive_enabled = config.get('monitoring.adaptive.enabled', False)
+    
+    # Warm restart: continue from the state saved by the previous run
+    warm_restart = config.get('monitoring.warm_restart.enabled', True)
+    warm_restart_max_age = config.get('monitoring.warm_restart.max_age', 600)
+    
+    # Per-task periods - monitoring.periods wins over the older single keys
+    periods = {'db_sizes': config.get('monitoring.db_size_interval', 180)}
+    periods.update(config.get('monitoring.periods', None) or {})
+    
+    def build_monitor(node: dict):
+        """Create the poller (or stream subscriber) for one node"""
+        name = node['name']
+        api = build_api(node, cache_ttls)
+        node_prometheus = prometheus.for_node(name) if prometheus else None
+        
+        # Measure rippled's databases in the background, off the poll thread.
+        # Only nodes whose data directory is on this host can be measured.
+        db_size_scanner = None
+        data_dir = node.get('rippled_data_dir')
+        if data_dir is None and not multi_node:
+            data_dir = '${INSTALL_DIR}/rippled/data'
+        if data_dir:
+            # Scans are triggered by the poller's db_sizes task
+            db_size_scanner = DatabaseSizeScanner(data_dir, interval=None,
+                                                  prometheus=node_prometheus)
+            db_size_scanner.start()
+        
+        adaptive = None
+        if adaptive_enabled and collector != 'stream':
+            adaptive = AdaptivePollRate(
+                interval,
+                min_interval=config.get('monitoring.adaptive.min_interval', 0.5),
+                max_interval=config.get('monitoring.adaptive.max_interval', 15),
+                backoff=config.get('monitoring.adaptive.backoff', 1.5),
+                hold=config.get('monitoring.adaptive.hold', 30),
+                stale_ledger_age=config.get('monitoring.adaptive.stale_ledger_age', 10)
+            )
+        
+        alerter = Alerter(node=name if multi_node else None)
+        poller = FastPoller(api, db, alerter, node_prometheus, interval=interval,
+                            poll_deadline=poll_deadline, db_size_scanner=db_size_scanner,
+                            node=name, periods=periods, pipeline=pipeline,
+                            backfill_workers=backfill_workers, backfill_max_gap=backfill_max_gap,
+                            adaptive=adaptive)
+        if warm_restart:
+            poller.restore_state(max_age=warm_restart_max_age)
+        
+        # 'stream' drives the poller from WebSocket subscriptions instead of a timer
+        if collector == 'stream':
+            return StreamSubscriber(
+                poller,
+                url=node.get('websocket_url', 'ws://localhost:6006'),
+                server_info_interval=config.get('monitoring.server_info_interval', 30)
+            )
+        return poller
+    
+    # Pollers fetch server info at startup - build them side by side so one
+    # unreachable node doesn't hold up the others
+    with ThreadPoolExecutor(max_workers=len(nodes)) as pool:
+        monitors = list(pool.map(build_monitor, nodes))
+    
+    try:
+        if multi_node:
+            run_monitors(monitors)
+        else:
+            monitors[0].run()
+    finally:
+        # Write out whatever is still queued
+        if rollups:
+            rollups.stop()
+        pipeline.stop()
+        db.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Replay - Feed archived server_info / peers snapshots back through FastPoller
+
+Reads a node's snapshot archive (see storage/archive.py) and runs every
+server_info snapshot through FastPoller.poll against a scratch database,
+with the poller's clock set to the archived time. State transitions,
+validation rows, rollup input and alerts come out as they did live, so an
+incident can be re-examined (or a tracking change re-run over it) offline:
+
+    python -m src.collectors.replay --start 2026-09-14T02:00 --end 2026-09-14T04:00
+    python -m src.outputs.export transitions --db /tmp/replay-validator.db --iso
+
+By default snapshots are replayed as fast as they decode; --speed 60 plays
+an hour in a minute.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.rippled_api import RippledAPI
+from src.utils.transports import TransportError
+from src.utils.nodes import DEFAULT_NODE
+from src.storage.database import Database
+from src.storage.archive import ArchiveReader
+from src.alerts.alerter import Alerter
+from src.collectors.fast_poller import FastPoller
+from src.processors.pipeline import Pipeline
+from src.outputs.export import parse_time
+
+
+class ArchiveTransport:
+    """
+    Transport answering server_info and peers with the snapshot being replayed
+
+    Every other command fails the way an unreachable rippled would, so
+    features that need them (ledger close fetches, backfill) stay off.
+    """
+
+    def __init__(self, node: str):
+        """
+        Initialize transport
+
+        Args:
+            node: Node whose archive is replayed (for describe())
+        """
+        self.node = node
+        self.now = 0.0
+        self.server_info: Optional[Dict[str, Any]] = None
+        self.peers: Optional[Dict[str, Any]] = None
+        self.requests = 0
+
+    def describe(self) -> str:
+        """Human readable description of the endpoint"""
+        return f"snapshot archive ({self.node})"
+
+    def close(self):
+        """Nothing to release"""
+
+    def request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Answer one command from the current snapshots
+
+        Raises:
+            TransportError: For commands (or snapshots) the archive lacks
+        """
+        self.requests += 1
+        if command == 'server_info' and self.server_info is not None:
+            return {'status': 'success', 'info': self.server_info}
+        if command == 'peers' and self.peers is not None:
+            return self.peers
+        raise TransportError(f"{command} is not in the snapshot archive")
+
+
+def alerts_path(db_path: str) -> str:
+    """Alerts log kept alongside a replay database"""
+    return os.path.splitext(db_path)[0] + '-alerts.log'
+
+
+def replay(reader: ArchiveReader, db: Database, start: Optional[float] = None,
+           end: Optional[float] = None, speed: float = 0, alerts_file: Optional[str] = None,
+           quiet: bool = False) -> Dict[str, Any]:
+    """
+    Run archived snapshots through a FastPoller
+
+    Samples are handled synchronously (the pipeline is not started), so
+    each poll's rows are written before the next snapshot is read.
+
+    Args:
+        reader: Archive of the node to replay
+        db: Database the replayed rows are written to
+        start: Oldest archived timestamp replayed
+        end: Archived timestamp replay stops at (excluded)
+        speed: Archived seconds per wall-clock second (0 = no pacing)
+        alerts_file: Where replayed alerts are logged (default: next to
+                     db, never the live alerts log)
+        quiet: Suppress the per-poll status lines
+
+    Returns:
+        Dict with snapshots, polls, archived and wall-clock seconds
+    """
+    if alerts_file is None:
+        alerts_file = alerts_path(db.db_path)
+
+    transport = ArchiveTransport(reader.node)
+    # The poller reads static info (validator key) when it is created
+    primer = next(reader.iter_snapshots(start, end, ['server_info']), None)
+    if primer is not None:
+        transport.now, _, transport.server_info = primer
+    poller = FastPoller(RippledAPI(transport=transport), db, Alerter(alerts_file, node=reader.node),
+                        node=reader.node, pipeline=Pipeline(db), clock=lambda: transport.now)
+    poller.fetch_ledger_closes = False
+
+    snapshots = 0
+    first = last = None
+    started = time.monotonic()
+    output = open(os.devnull, 'w') if quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            for timestamp, kind, snapshot in reader.iter_snapshots(start, end):
+                if first is None:
+                    first = timestamp
+                last = timestamp
+                snapshots += 1
+
+                if speed:
+                    delay = started + (timestamp - first) / speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                transport.now = timestamp
+                if kind == 'peers':
+                    # Fetched the way the scheduled task does, and finished
+                    # before the next poll picks the details up
+                    transport.peers = snapshot
+                    poller._refresh_peer_details()
+                    poller._peers_future.exception()
+                else:
+                    transport.server_info = snapshot
+                    poller.poll()
+    finally:
+        poller.close()
+        if quiet:
+            output.close()
+
+    return {
+        'snapshots': snapshots,
+        'polls': poller.poll_count,
+        'state_changes': poller.state_changes,
+        'archived_seconds': (last - first) if snapshots else 0.0,
+        'wall_seconds': time.monotonic() - started
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Replay archived snapshots through the poller')
+    parser.add_argument('--archive', help='Archive root (default: database.archive.path from config.yaml)')
+    parser.add_argument('--node', default=DEFAULT_NODE, help=f"Node to replay (default: {DEFAULT_NODE})")
+    parser.add_argument('--start', help='Oldest snapshot replayed: Unix seconds or ISO date/time')
+    parser.add_argument('--end', help='Stop before this time: Unix seconds or ISO date/time')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='Archived seconds per second, e.g. 60 (default: as fast as possible)')
+    parser.add_argument('--db', help='Database the replay writes (default: a new file in the temp directory)')
+    parser.add_argument('--quiet', action='store_true', help='Hide per-poll status lines')
+    args = parser.parse_args()
+
+    try:
+        start = parse_time(args.start) if args.start else None
+        end = parse_time(args.end) if args.end else None
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    archive_dir = args.archive
+    if archive_dir is None:
+        from src.utils.config import Config
+        config = Config()
+        db_path = config.get('database.path', '${INSTALL_DIR}/data/monitor.db')
+        archive_dir = config.get('database.archive.path',
+                                 os.path.join(os.path.dirname(db_path), 'archive'))
+
+    reader = ArchiveReader(archive_dir, args.node)
+    if not reader.segments():
+        parser.error(f"No archive segments in {reader.directory}")
+
+    db_path = args.db or os.path.join(tempfile.gettempdir(), f"replay-{args.node}.db")
+    if os.path.exists(db_path):
+        parser.error(f"{db_path} already exists - replay writes to a new database")
+    db = Database(db_path)
+
+    try:
+        result = replay(reader, db, start, end, speed=args.speed, quiet=args.quiet)
+    finally:
+        db.close()
+
+    wall = result['wall_seconds']
+    speedup = result['archived_seconds'] / wall if wall else 0
+    print(f"Replayed {result['snapshots']} snapshots ({result['polls']} polls, "
+          f"{result['state_changes']} state changes) covering {result['archived_seconds'] / 3600:.1f}h "
+          f"in {wall:.1f}s ({speedup:.0f}x real time)")
+    print(f"Database: {db_path}")
+    print(f"Alerts: {alerts_path(db_path)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Poll Scheduler - Drift-free periodic tasks on monotonic deadlines
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+
+class ScheduledTask:
+    """
+    One periodic task and its run statistics
+    """
+
+    def __init__(self, name: str, period: float, callback: Callable[[], None]):
+        """
+        Initialize task
+
+        Args:
+            name: Task name (used in logs and metric labels)
+            period: Seconds between runs
+            callback: Function to call
+        """
+        self.name = name
+        self.period = float(period)
+        self.callback = callback
+
+        self.next_due = None
+        self.running = False
+        self.runs = 0
+        self.overruns = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+
+class PollScheduler:
+    """
+    Runs tasks with independent periods without drift
+
+    Each task's deadlines are fixed points on the monotonic clock
+    (start + phase + k * period), so time spent running tasks never
+    stretches the period. Tasks are phase-shifted evenly across the
+    shortest period so heavy tasks never share a tick.
+
+    A task counts an overrun when one run takes longer than its period or
+    when it starts late by a full period or more. Missed slots are skipped,
+    not replayed in a burst.
+    """
+
+    def __init__(self, prometheus=None):
+        """
+        Initialize scheduler
+
+        Args:
+            prometheus: PrometheusExporter (node view) for task metrics
+        """
+        self.prometheus = prometheus
+        self.tasks: List[ScheduledTask] = []
+        self.started = False
+
+    def add(self, name: str, period: float, callback: Callable[[], None]):
+        """
+        Register a task (before the scheduler starts)
+
+        Args:
+            name: Task name
+            period: Seconds between runs (tasks with period <= 0 are skipped)
+            callback: Function to call
+        """
+        if period and period > 0:
+            self.tasks.append(ScheduledTask(name, period, callback))
+
+    def start(self, now: Optional[float] = None):
+        """
+        Set each task's first deadline, staggered across the shortest period
+
+        Args:
+            now: Monotonic start time (default: now)
+        """
+        if not self.tasks:
+            self.started = True
+            return
+
+        now = time.monotonic() if now is None else now
+        spacing = min(task.period for task in self.tasks) / len(self.tasks)
+        for index, task in enumerate(self.tasks):
+            task.next_due = now + index * spacing
+        self.started = True
+
+    def get(self, name: str) -> Optional[ScheduledTask]:
+        """Registered task called name, or None"""
+        for task in self.tasks:
+            if task.name == name:
+                return task
+        return None
+
+    def set_period(self, name: str, period: float):
+        """
+        Change a task's period, re-anchoring its next deadline on the last one
+
+        Args:
+            name: Task name
+            period: New period in seconds
+        """
+        task = self.get(name)
+        if task is None or task.period == period:
+            return
+        if task.running:
+            # Called from the task's own callback - its deadline has not
+            # moved on yet, _run_task advances it with the new period
+            task.period = float(period)
+            return
+        if task.next_due is not None:
+            # A shorter period can land in the past - that is a reschedule,
+            # not a missed slot, so run it now instead of counting an overrun
+            last_due = task.next_due - task.period
+            task.next_due = max(last_due + period, time.monotonic())
+        task.period = float(period)
+
+    @property
+    def overruns(self) -> int:
+        """Total overruns across all tasks"""
+        return sum(task.overruns for task in self.tasks)
+
+    def _run_task(self, task: ScheduledTask, now: float):
+        """Run one due task and advance its deadline"""
+        overruns = 0
+
+        # Late by whole periods - skip those slots instead of catching up
+        late = now - task.next_due
+        if late >= task.period:
+            missed = int(late // task.period)
+            task.next_due += missed * task.period
+            overruns += missed
+
+        period = task.period
+        started = time.monotonic()
+        task.running = True
+        try:
+            task.callback()
+        except Exception as e:
+            timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            print(f"[{timestamp_str}] [ERROR] Task {task.name} failed: {e}")
+        finally:
+            task.running = False
+        duration = time.monotonic() - started
+
+        if duration > period:
+            overruns += 1
+
+        task.next_due += task.period
+        if task.period != period:
+            # Retuned by its own callback (see set_period)
+            task.next_due = max(task.next_due, time.monotonic())
+        task.runs += 1
+        task.overruns += overruns
+        task.last_duration = duration
+        task.max_duration = max(task.max_duration, duration)
+
+        if self.prometheus:
+            self.prometheus.record_task_run(task.name, duration, overruns)
+
+    def run_pending(self) -> float:
+        """
+        Run every task that is due, earliest deadline first
+
+        Each task runs at most once per call, so tasks that keep overrunning
+        still hand control back to the caller between rounds.
+
+        Returns:
+            Seconds until the next deadline (0 if a task is already due again)
+        """
+        if not self.started:
+            self.start()
+        if not self.tasks:
+            return 1.0
+
+        now = time.monotonic()
+        due = sorted((t for t in self.tasks if t.next_due <= now), key=lambda t: t.next_due)
+        for task in due:
+            self._run_task(task, time.monotonic())
+
+        next_due = min(task.next_due for task in self.tasks)
+        return max(0.0, next_due - time.monotonic())
+
+    def run(self, stop_event):
+        """
+        Run tasks until stop_event is set
+
+        Args:
+            stop_event: threading.Event that ends the loop
+        """
+        while not stop_event.is_set():
+            stop_event.wait(self.run_pending())
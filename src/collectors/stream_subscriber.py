@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Stream Subscriber - Push-driven monitoring over rippled's WebSocket API
+
+Subscribes to the ledger, server and validations streams and feeds every
+change through FastPoller.process_server_info, so state transitions,
+validation tracking, database writes and Prometheus updates behave exactly
+as in polling mode. A low-frequency server_info poll fills in the fields
+the streams do not carry (peers, io_latency, state_accounting, ...); it
+runs on the poller's scheduler alongside the peers and stats tasks.
+"""
+
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.processors.samples import SnapshotSample
+from src.utils.rippled_api import RIPPLE_EPOCH, RippledAPIError
+from src.utils.websocket_client import WebSocketClient, WebSocketError
+
+
+class StreamSubscriber:
+    """
+    Drives a FastPoller from rippled subscription streams
+    """
+
+    STREAMS = ['ledger', 'server', 'validations']
+
+    # Shortest read between scheduled tasks (seconds)
+    MIN_READ_WAIT = 0.01
+
+    def __init__(self, poller, url: str = 'ws://localhost:6006',
+                 server_info_interval: float = 30, reconnect_delay: float = 5):
+        """
+        Initialize stream subscriber
+
+        Args:
+            poller: FastPoller whose tracking paths receive the updates
+            url: rippled admin WebSocket URL
+            server_info_interval: Seconds between full server_info refreshes
+            reconnect_delay: Seconds to wait before reconnecting after a failure
+        """
+        self.poller = poller
+        self.url = url
+        self.server_info_interval = server_info_interval
+        self.reconnect_delay = reconnect_delay
+
+        self.node = poller.node
+        poller.fetch_ledger_closes = False
+        self.ws = None
+        self.state_info = {}
+        self.scheduler = poller.build_scheduler(
+            ('server_info', server_info_interval, self._scheduled_refresh)
+        )
+        self._stop = threading.Event()
+
+        # Statistics
+        self.messages_received = 0
+        self.ledgers_received = 0
+        self.validations_received = 0
+        self.reconnects = 0
+
+    def _refresh_server_info(self):
+        """Replace the cached snapshot with a fresh server_info response"""
+        state_info = self.poller.api.get_server_state()
+        # The response as rippled sent it goes to the snapshot archive, if
+        # enabled (stream messages are not archived, so replay runs at
+        # server_info_interval resolution)
+        self.poller.pipeline.persist(SnapshotSample(self.node, self.poller.clock(),
+                                                    'server_info', state_info))
+
+        # Copy - the API may share this response with other callers
+        info = dict(state_info)
+
+        # Keep the newest validated ledger if the stream is ahead of server_info
+        streamed = self.state_info.get('validated_ledger', {})
+        polled = info.get('validated_ledger', {})
+        if int(streamed.get('seq', 0)) > int(polled.get('seq', 0)):
+            info['validated_ledger'] = streamed
+
+        self.state_info = info
+
+    def _scheduled_refresh(self):
+        """Scheduled task: refresh server_info and process the snapshot"""
+        try:
+            self._refresh_server_info()
+        except RippledAPIError as e:
+            self.poller._handle_api_error(e)
+            return
+        self._process()
+
+    def _process(self):
+        """Run the merged snapshot through the poller's tracking paths"""
+        try:
+            self.poller.process_server_info(self.state_info)
+        except Exception as e:
+            self.poller._handle_unexpected_error(e)
+
+    def _apply_ledger(self, message: Dict[str, Any]) -> bool:
+        """
+        Merge a ledgerClosed message (or the subscribe response) into the snapshot
+
+        Returns:
+            True if a newer validated ledger arrived
+        """
+        if 'ledger_index' not in message:
+            return False
+
+        seq = int(message['ledger_index'])
+        validated = dict(self.state_info.get('validated_ledger', {}))
+        if seq <= int(validated.get('seq', 0)):
+            return False
+
+        close_time = int(message.get('ledger_time', 0)) + RIPPLE_EPOCH
+        validated.update({
+            'seq': seq,
+            'hash': message.get('ledger_hash', ''),
+            'age': max(0, int(time.time() - close_time)),
+            'close_time': close_time,
+            'txn_count': int(message.get('txn_count', 0)),
+            'base_fee_xrp': int(message.get('fee_base', 0)) / 1_000_000,
+            'reserve_base_xrp': int(message.get('reserve_base', 0)) / 1_000_000,
+            'reserve_inc_xrp': int(message.get('reserve_inc', 0)) / 1_000_000
+        })
+        self.state_info['validated_ledger'] = validated
+
+        if 'validated_ledgers' in message:
+            self.state_info['complete_ledgers'] = message['validated_ledgers']
+
+        self.poller.validation_tracker.record_validated_ledger(seq, validated['hash'])
+        self.poller.record_ledger_close(seq, close_time, validated['txn_count'])
+        self.ledgers_received += 1
+        return True
+
+    def _apply_server_status(self, message: Dict[str, Any]) -> bool:
+        """
+        Merge a serverStatus message (or the subscribe response) into the snapshot
+
+        Returns:
+            True if the server state changed
+        """
+        changed = False
+
+        status = message.get('server_status')
+        if status and status != self.state_info.get('server_state'):
+            self.state_info['server_state'] = status
+            changed = True
+
+        # Streams report load in units of load_base; server_info reports a multiplier
+        if 'load_factor' in message:
+            load_base = int(message.get('load_base', 256)) or 256
+            self.state_info['load_factor'] = int(message['load_factor']) / load_base
+
+        return changed
+
+    def _apply_validation(self, message: Dict[str, Any]):
+        """Record validations signed by our own validator"""
+        self.validations_received += 1
+
+        pubkey = self.poller.validation_tracker.validator_pubkey
+        if not pubkey:
+            return
+
+        if pubkey in (message.get('master_key'), message.get('validation_public_key')):
+            self.poller.validation_tracker.record_own_validation(
+                int(message.get('ledger_index', 0)),
+                message.get('ledger_hash', '')
+            )
+
+    def handle_message(self, message: Dict[str, Any]):
+        """
+        Dispatch one stream message
+
+        Args:
+            message: Decoded WebSocket message
+        """
+        self.messages_received += 1
+        msg_type = message.get('type')
+
+        if msg_type == 'ledgerClosed':
+            if self._apply_ledger(message):
+                self._process()
+        elif msg_type == 'serverStatus':
+            if self._apply_server_status(message):
+                self._process()
+        elif msg_type == 'validationReceived':
+            self._apply_validation(message)
+        elif msg_type == 'response' and message.get('status') == 'error':
+            raise RippledAPIError(f"Subscribe failed: {message.get('error', 'unknown error')}")
+
+    def _subscribe(self):
+        """Open the WebSocket and subscribe to all streams"""
+        self.ws = WebSocketClient(self.url)
+        self.ws.connect()
+        self.ws.send_json({'id': 1, 'command': 'subscribe', 'streams': self.STREAMS})
+
+        # The subscribe response carries the current ledger and server status
+        response = self.ws.recv_json(timeout=self.ws.timeout)
+        if response is None:
+            raise WebSocketError("No response to subscribe request")
+        if response.get('status') == 'error':
+            raise RippledAPIError(f"Subscribe failed: {response.get('error', 'unknown error')}")
+
+        result = response.get('result', {})
+        self._refresh_server_info()
+        self._apply_ledger(result)
+        self._apply_server_status(result)
+        self._process()
+
+    def run_once(self, duration: float = None):
+        """
+        Connect, subscribe and process messages until the connection drops
+
+        Args:
+            duration: Stop after this many seconds (None runs until failure)
+        """
+        deadline = time.monotonic() + duration if duration else None
+        self._subscribe()
+
+        try:
+            while not self._stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                # Run due tasks, then read messages until the next deadline,
+                # waking up at least once a second to notice stop(). A task
+                # that fell due while another ran leaves no wait: read briefly
+                # anyway so a slow task cannot starve the stream
+                wait = min(self.scheduler.run_pending(), 1.0)
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                wait = max(wait, self.MIN_READ_WAIT)
+
+                message = self.ws.recv_json(timeout=wait)
+                if message is not None:
+                    self.handle_message(message)
+        finally:
+            self._disconnect()
+
+    def _disconnect(self):
+        """Close the WebSocket connection"""
+        if self.ws:
+            self.ws.close()
+            self.ws = None
+
+    def close(self):
+        """Close the WebSocket and release the poller's resources"""
+        self._disconnect()
+        self.poller.close()
+
+    def stop(self):
+        """Ask loop() to return"""
+        self._stop.set()
+
+    def describe(self) -> str:
+        """One-line description for startup banners"""
+        return f"{self.node}: subscribed to {', '.join(self.STREAMS)} at {self.url}"
+
+    def loop(self):
+        """Process stream messages until stop(), reconnecting after failures"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except (WebSocketError, RippledAPIError) as e:
+                self.poller._handle_api_error(e)
+                timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                print(f"[{timestamp_str}] {self.poller.log_prefix}[WARNING] Stream lost ({e}), "
+                      f"reconnecting in {self.reconnect_delay}s")
+                self.reconnects += 1
+                self._stop.wait(self.reconnect_delay)
+
+    def print_summary(self):
+        """Print totals when the monitor is stopped"""
+        self.poller.print_summary()
+        print(f"{self.poller.log_prefix}Stream messages: {self.messages_received} "
+              f"(ledgers: {self.ledgers_received}, validations: {self.validations_received}, "
+              f"reconnects: {self.reconnects})")
+
+    def run(self):
+        """Run the subscription loop, reconnecting after failures"""
+        self.poller.print_banner(
+            f"Subscribed to {', '.join(self.STREAMS)} streams at {self.url} "
+            f"(server_info every {self.server_info_interval}s)"
+        )
+
+        try:
+            self.loop()
+        except KeyboardInterrupt:
+            self.close()
+            self.print_summary()
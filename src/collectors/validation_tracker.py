@@ -5,13 +5,18 @@ Validation Tracker - State-based validation tracking (lightweight)
 
 import sys
 import os
+import time
 from typing import Dict, Any, Optional
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from src.utils.rippled_api import RippledAPI, RippledAPIError
+from src.utils.nodes import DEFAULT_NODE
+from src.utils.ledger_window import LedgerWindow
 from src.storage.database import Database
+from src.processors.pipeline import Pipeline
+from src.processors.samples import LedgerValidationSample
 
 
 class ValidationTracker:
@@ -21,10 +26,18 @@ class ValidationTracker:
     Simple logic:
     - If in 'proposing' state -> validator is validating (agreed=True)
     - If not proposing but should be -> missed validation (agreed=False)
+    
+    When the stream subscriber feeds observed validations, did_validate and
+    agreed come from our own validation messages and the validated ledger
+    hashes instead of being inferred from state.
     """
     
+    # Ledgers of observed validation data kept in memory
+    OBSERVED_WINDOW = 2048
+    
     def __init__(self, api: RippledAPI, db: Database, 
-                 validator_pubkey: Optional[str] = None):
+                 validator_pubkey: Optional[str] = None, node: str = DEFAULT_NODE,
+                 pipeline: Optional[Pipeline] = None, clock=time.time):
         """
         Initialize validation tracker
         
@@ -32,11 +45,23 @@ class ValidationTracker:
             api: RippledAPI instance
             db: Database instance
             validator_pubkey: Your validator's public key (optional, will auto-detect)
+            node: Monitored node name
+            pipeline: Pipeline validation rows are persisted through
+                      (default: write synchronously to db)
+            clock: Source of row timestamps
         """
         self.api = api
         self.db = db
+        self.node = node
+        self.pipeline = pipeline or Pipeline(db)
+        self.clock = clock
         self.validator_pubkey = validator_pubkey
         
+        # Observed validation data (only populated in stream mode)
+        self.observing = False
+        self.own_validations = LedgerWindow(self.OBSERVED_WINDOW)
+        self.validated_hashes = LedgerWindow(self.OBSERVED_WINDOW)
+        
         # Auto-detect validator public key if not provided
         if not self.validator_pubkey:
             self.validator_pubkey = self._get_validator_pubkey()
@@ -49,7 +74,7 @@ class ValidationTracker:
             Validator public key or None
         """
         try:
-            info = self.api.get_server_info()
+            info = self.api.get_static_info()
             pubkey = info.get('pubkey_validator')
             if pubkey:
                 print(f"Auto-detected validator pubkey: {pubkey}")
@@ -58,6 +83,27 @@ class ValidationTracker:
             print(f"Warning: Could not auto-detect validator pubkey: {e}")
             return None
     
+    def record_own_validation(self, ledger_seq: int, ledger_hash: str):
+        """
+        Record a validation our validator signed (from the validations stream)
+        
+        Args:
+            ledger_seq: Ledger sequence the validation is for
+            ledger_hash: Ledger hash our validator signed
+        """
+        self.observing = True
+        self.own_validations.mark(ledger_seq, ledger_hash)
+    
+    def record_validated_ledger(self, ledger_seq: int, ledger_hash: str):
+        """
+        Record the network's validated hash for a ledger (from the ledger stream)
+        
+        Args:
+            ledger_seq: Validated ledger sequence
+            ledger_hash: Validated ledger hash
+        """
+        self.validated_hashes.mark(ledger_seq, ledger_hash)
+    
     def check_ledger_validation(self, ledger_seq: int, server_state: str,
                                 peers: int, load_factor: float) -> Dict[str, Any]:
         """
@@ -72,8 +118,6 @@ class ValidationTracker:
         Returns:
             Dictionary with validation info
         """
-        import time
-        
         # Determine validation based on state
         was_proposing = (server_state == 'proposing')
         
@@ -82,9 +126,19 @@ class ValidationTracker:
         did_validate = was_proposing
         agreed = was_proposing
         
+        # Prefer what we actually saw on the validations stream
+        if self.observing:
+            own_hash = self.own_validations.get(ledger_seq)
+            network_hash = self.validated_hashes.get(ledger_seq)
+            did_validate = own_hash is not None
+            if network_hash is not None and did_validate:
+                agreed = own_hash == network_hash
+            else:
+                agreed = did_validate
+        
         # Record the validation
-        self.db.write_ledger_validation(
-            timestamp=time.time(),
+        self.pipeline.persist(LedgerValidationSample(
+            timestamp=self.clock(),
             ledger_seq=ledger_seq,
             server_state=server_state,
             was_proposing=was_proposing,
@@ -92,8 +146,10 @@ class ValidationTracker:
             did_validate=did_validate,
             agreed=agreed,
             peers=peers,
-            load_factor=load_factor
-        )
+            load_factor=load_factor,
+            node=self.node,
+            ledger_hash=self.validated_hashes.get(ledger_seq)
+        ))
         
         return {
             'ledger_seq': ledger_seq,
@@ -102,3 +158,48 @@ class ValidationTracker:
             'did_validate': did_validate,
             'agreed': agreed
         }
+    
+    def record_backfilled_ledger(self, ledger_seq: int, ledger_hash: str,
+                                 close_time: float) -> Dict[str, Any]:
+        """
+        Record a ledger the live path skipped, from its fetched header
+        
+        The server state during the gap is unknown, so nothing is inferred
+        from it: did_validate/agreed are only set when our own validation
+        for the ledger was observed on the validations stream.
+        
+        Args:
+            ledger_seq: Ledger sequence number
+            ledger_hash: Ledger hash from the ledger header
+            close_time: Ledger close time (Unix timestamp)
+            
+        Returns:
+            Dictionary with validation info
+        """
+        did_validate = None
+        agreed = None
+        own_hash = self.own_validations.get(ledger_seq) if self.observing else None
+        if own_hash is not None:
+            did_validate = True
+            agreed = own_hash == ledger_hash
+        
+        self.pipeline.persist(LedgerValidationSample(
+            timestamp=close_time,
+            ledger_seq=ledger_seq,
+            server_state='unknown',
+            was_proposing=False,
+            should_validate=bool(did_validate),
+            did_validate=did_validate,
+            agreed=agreed,
+            peers=0,
+            load_factor=0,
+            node=self.node,
+            ledger_hash=ledger_hash,
+            close_time=close_time
+        ))
+        
+        return {
+            'ledger_seq': ledger_seq,
+            'did_validate': did_validate,
+            'agreed': agreed
+        }
@@ -4,92 +4,149 @@ Prometheus Exporter for XRPL Monitor
 Exposes validator metrics in Prometheus format
 """
 
-from prometheus_client import start_http_server, Gauge, Counter, Info
+from prometheus_client import start_http_server, Gauge, Counter, Histogram, Info
+import copy
+import os
+import sys
 import time
 
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.nodes import DEFAULT_NODE
+
 
 class PrometheusExporter:
     """
     Exports XRPL validator metrics to Prometheus
+    
+    Every per-server metric carries a `node` label. One exporter serves all
+    monitored nodes; for_node() returns a view whose update methods write
+    that node's series.
     """
     
-    def __init__(self, port: int = 9091, host: str = '0.0.0.0'):
+    def __init__(self, port: int = 9091, host: str = '0.0.0.0', node: str = DEFAULT_NODE):
         """
         Initialize Prometheus exporter
         
         Args:
             port: Port to expose metrics on
             host: Host to bind to
+            node: Node label used by this instance's update methods
         """
         self.port = port
         self.host = host
+        self.node = node
         
         # State metrics
-        self.validator_state = Gauge('xrpl_validator_state_value', 'Validator state as numeric value')
-        self.validator_state_info = Info('xrpl_validator_state', 'Current validator state')
-        self.time_in_state = Gauge('xrpl_time_in_current_state_seconds', 'Time spent in current state (seconds)')
-        self.server_state_duration = Gauge('xrpl_server_state_duration_seconds', 'Time in current state from server')
+        self.validator_state = Gauge('xrpl_validator_state_value', 'Validator state as numeric value', ['node'])
+        self.validator_state_info = Info('xrpl_validator_state', 'Current validator state', ['node'])
+        self.time_in_state = Gauge('xrpl_time_in_current_state_seconds', 'Time spent in current state (seconds)', ['node'])
+        self.server_state_duration = Gauge('xrpl_server_state_duration_seconds', 'Time in current state from server', ['node'])
         
         # Ledger metrics
-        self.ledger_sequence = Gauge('xrpl_ledger_sequence', 'Current validated ledger sequence')
-        self.ledger_age = Gauge('xrpl_ledger_age_seconds', 'Age of last validated ledger')
-        self.base_fee = Gauge('xrpl_base_fee_xrp', 'Network base transaction fee (XRP)')
-        self.reserve_base = Gauge('xrpl_reserve_base_xrp', 'Base account reserve (XRP)')
-        self.reserve_inc = Gauge('xrpl_reserve_inc_xrp', 'Owner reserve increment (XRP)')
+        self.ledger_sequence = Gauge('xrpl_ledger_sequence', 'Current validated ledger sequence', ['node'])
+        self.ledger_age = Gauge('xrpl_ledger_age_seconds', 'Age of last validated ledger', ['node'])
+        self.base_fee = Gauge('xrpl_base_fee_xrp', 'Network base transaction fee (XRP)', ['node'])
+        self.reserve_base = Gauge('xrpl_reserve_base_xrp', 'Base account reserve (XRP)', ['node'])
+        self.reserve_inc = Gauge('xrpl_reserve_inc_xrp', 'Owner reserve increment (XRP)', ['node'])
         
         # Peer metrics
-        self.peer_count = Gauge('xrpl_peer_count', 'Number of connected peers')
-        self.peers_inbound = Gauge('xrpl_peers_inbound', 'Number of inbound peers')
-        self.peers_outbound = Gauge('xrpl_peers_outbound', 'Number of outbound peers')
-        self.peers_insane = Gauge('xrpl_peers_insane', 'Number of peers on wrong ledger')
-        self.peer_latency_p90 = Gauge('xrpl_peer_latency_p90_ms', '90th percentile peer latency (ms)')
-        self.peer_disconnects = Counter('xrpl_peer_disconnects_total', 'Total peer disconnections')
-        self.peer_disconnects_resources = Counter('xrpl_peer_disconnects_resources_total', 'Disconnections due to resources')
+        self.peer_count = Gauge('xrpl_peer_count', 'Number of connected peers', ['node'])
+        self.peers_inbound = Gauge('xrpl_peers_inbound', 'Number of inbound peers', ['node'])
+        self.peers_outbound = Gauge('xrpl_peers_outbound', 'Number of outbound peers', ['node'])
+        self.peers_insane = Gauge('xrpl_peers_insane', 'Number of peers on wrong ledger', ['node'])
+        self.peer_latency_p90 = Gauge('xrpl_peer_latency_p90_ms', '90th percentile peer latency (ms)', ['node'])
+        self.peer_disconnects = Counter('xrpl_peer_disconnects_total', 'Total peer disconnections', ['node'])
+        self.peer_disconnects_resources = Counter('xrpl_peer_disconnects_resources_total', 'Disconnections due to resources', ['node'])
         
         # Performance metrics
-        self.load_factor = Gauge('xrpl_load_factor', 'Server load factor')
-        self.io_latency = Gauge('xrpl_io_latency_ms', 'Disk I/O latency (ms)')
-        self.converge_time = Gauge('xrpl_consensus_converge_time_seconds', 'Time to reach consensus (seconds)')
-        self.jq_trans_overflow = Counter('xrpl_jq_trans_overflow_total', 'Transaction queue overflows')
+        self.load_factor = Gauge('xrpl_load_factor', 'Server load factor', ['node'])
+        self.io_latency = Gauge('xrpl_io_latency_ms', 'Disk I/O latency (ms)', ['node'])
+        self.converge_time = Gauge('xrpl_consensus_converge_time_seconds', 'Time to reach consensus (seconds)', ['node'])
+        self.jq_trans_overflow = Counter('xrpl_jq_trans_overflow_total', 'Transaction queue overflows', ['node'])
         
         # Transaction metrics
-        self.transaction_rate = Gauge('xrpl_transaction_rate', 'Transactions per second')
+        self.transaction_rate = Gauge('xrpl_transaction_rate', 'Transactions per second', ['node'])
+        self.throughput_tps = Gauge('xrpl_throughput_tps', 'Transactions per second over a rolling window of closed ledgers', ['node', 'window'])
+        self.ledger_interval_avg = Gauge('xrpl_ledger_interval_avg_seconds', 'Average ledger close interval over a rolling window', ['node', 'window'])
+        self.ledger_interval = Histogram('xrpl_ledger_interval_seconds', 'Time between consecutive ledger closes', ['node'],
+                                         buckets=(2, 3, 3.5, 4, 4.5, 5, 6, 8, 10, 15, 30, 60))
+        self.ledger_transactions = Histogram('xrpl_ledger_transactions', 'Transactions per closed ledger', ['node'],
+                                             buckets=(0, 10, 25, 50, 100, 200, 400, 800, 1600))
         
         # Validation metrics
-        self.validation_quorum = Gauge('xrpl_validation_quorum', 'Validators needed for consensus')
-        self.proposers = Gauge('xrpl_proposers', 'Proposers in last consensus round')
-        self.validations_checked = Counter('xrpl_validations_checked_total', 'Total validations checked')
-        self.validation_agreement_rate = Gauge('xrpl_validation_agreement_rate', 'Validation agreement rate (%)')
-        self.validation_rate = Gauge('xrpl_validation_rate', 'Validation rate (%)')
+        self.validation_quorum = Gauge('xrpl_validation_quorum', 'Validators needed for consensus', ['node'])
+        self.proposers = Gauge('xrpl_proposers', 'Proposers in last consensus round', ['node'])
+        self.validations_checked = Counter('xrpl_validations_checked_total', 'Total validations checked', ['node'])
+        self.validation_agreement_rate = Gauge('xrpl_validation_agreement_rate', 'Validation agreement rate (%)', ['node'])
+        self.validation_rate = Gauge('xrpl_validation_rate', 'Validation rate (%)', ['node'])
         
         # Validation period stats
-        self.validation_agreements_1h = Gauge('xrpl_validation_agreements_1h', 'Validations agreed in last 1h')
-        self.validation_missed_1h = Gauge('xrpl_validation_missed_1h', 'Validations missed in last 1h')
-        self.validation_agreements_24h = Gauge('xrpl_validation_agreements_24h', 'Validations agreed in last 24h')
-        self.validation_missed_24h = Gauge('xrpl_validation_missed_24h', 'Validations missed in last 24h')
-        self.validation_agreement_pct_1h = Gauge('xrpl_validation_agreement_pct_1h', 'Agreement percentage last 1h')
-        self.validation_agreement_pct_24h = Gauge('xrpl_validation_agreement_pct_24h', 'Agreement percentage last 24h')
+        self.validation_agreements_1h = Gauge('xrpl_validation_agreements_1h', 'Validations agreed in last 1h', ['node'])
+        self.validation_missed_1h = Gauge('xrpl_validation_missed_1h', 'Validations missed in last 1h', ['node'])
+        self.validation_agreements_24h = Gauge('xrpl_validation_agreements_24h', 'Validations agreed in last 24h', ['node'])
+        self.validation_missed_24h = Gauge('xrpl_validation_missed_24h', 'Validations missed in last 24h', ['node'])
+        self.validation_agreement_pct_1h = Gauge('xrpl_validation_agreement_pct_1h', 'Agreement percentage last 1h', ['node'])
+        self.validation_agreement_pct_24h = Gauge('xrpl_validation_agreement_pct_24h', 'Agreement percentage last 24h', ['node'])
+        self.validation_agreements_7d = Gauge('xrpl_validation_agreements_7d', 'Validations agreed in last 7d', ['node'])
+        self.validation_missed_7d = Gauge('xrpl_validation_missed_7d', 'Validations missed in last 7d', ['node'])
+        self.validation_agreement_pct_7d = Gauge('xrpl_validation_agreement_pct_7d', 'Agreement percentage last 7d', ['node'])
         
         # State accounting
-        self.state_duration = Gauge('xrpl_state_accounting_duration_seconds', 'Time in each state', ['state'])
-        self.state_transitions = Gauge('xrpl_state_accounting_transitions', 'Transitions to each state', ['state'])
+        self.state_duration = Gauge('xrpl_state_accounting_duration_seconds', 'Time in each state', ['node', 'state'])
+        self.state_transitions = Gauge('xrpl_state_accounting_transitions', 'Transitions to each state', ['node', 'state'])
         
         # System metrics
-        self.uptime = Gauge('xrpl_validator_uptime_seconds', 'Validator uptime (seconds)')
-        self.initial_sync_duration = Gauge('xrpl_initial_sync_duration_seconds', 'Initial sync duration (seconds)')
+        self.uptime = Gauge('xrpl_validator_uptime_seconds', 'Validator uptime (seconds)', ['node'])
+        self.initial_sync_duration = Gauge('xrpl_initial_sync_duration_seconds', 'Initial sync duration (seconds)', ['node'])
         self.monitor_uptime = Gauge('xrpl_monitor_uptime_seconds', 'Monitor uptime (seconds)')
         
         # Database size metrics
-        self.ledger_db_size = Gauge('xrpl_ledger_db_bytes', 'Main ledger database size (bytes)')
-        self.nudb_size = Gauge('xrpl_ledger_nudb_bytes', 'NuDB size (bytes)')
+        self.ledger_db_size = Gauge('xrpl_ledger_db_bytes', 'Main ledger database size (bytes)', ['node'])
+        self.nudb_size = Gauge('xrpl_ledger_nudb_bytes', 'NuDB size (bytes)', ['node'])
         
         # Counters
-        self.state_changes = Counter('xrpl_state_changes_total', 'Total state changes')
-        self.alerts_sent = Counter('xrpl_alerts_sent_total', 'Total alerts sent')
-        self.api_errors = Counter('xrpl_api_errors_total', 'Total API errors')
+        self.state_changes = Counter('xrpl_state_changes_total', 'Total state changes', ['node'])
+        self.alerts_sent = Counter('xrpl_alerts_sent_total', 'Total alerts sent', ['node'])
+        self.api_errors = Counter('xrpl_api_errors_total', 'Total API errors', ['node'])
+        self.api_cache_hits = Counter('xrpl_monitor_api_cache_hits_total', 'rippled API responses served from cache', ['node'])
+        self.api_cache_misses = Counter('xrpl_monitor_api_cache_misses_total', 'Cacheable rippled API requests sent to rippled', ['node'])
+        
+        # Poll path instrumentation (see src/utils/instrumentation.py)
+        self.stage_seconds = Histogram('xrpl_monitor_stage_seconds', 'Latency of one poll path stage', ['stage'],
+                                       buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                                                0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+        
+        # Scheduler metrics
+        self.poll_rate = Gauge('xrpl_monitor_poll_rate', 'Effective server_state polls per second', ['node'])
+        self.task_duration = Gauge('xrpl_monitor_task_duration_seconds', 'Duration of the last run of a scheduled task', ['node', 'task'])
+        self.task_overruns = Counter('xrpl_monitor_task_overruns_total', 'Scheduled task runs that missed or exceeded their period', ['node', 'task'])
+        
+        # Backfill metrics
+        self.backfill_pending = Gauge('xrpl_monitor_backfill_pending', 'Skipped ledgers waiting to be backfilled', ['node'])
+        self.ledgers_backfilled = Counter('xrpl_monitor_ledgers_backfilled_total', 'Skipped ledgers recorded from their headers', ['node'])
+        
+        # Pipeline metrics (shared by all nodes)
+        self.queue_depth = Gauge('xrpl_monitor_queue_depth', 'Samples waiting in a pipeline queue', ['queue'])
+        self.queue_dropped = Counter('xrpl_monitor_queue_dropped_total', 'Samples dropped by a full pipeline queue', ['queue'])
+        
+        # Database group commit metrics (shared by all nodes)
+        self.db_rows_per_commit = Histogram('xrpl_monitor_db_rows_per_commit', 'Rows written by one write buffer commit',
+                                            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000))
+        self.db_flush_seconds = Histogram('xrpl_monitor_db_flush_seconds', 'Duration of one write buffer commit',
+                                          buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+        self.db_pruned = Counter('xrpl_monitor_db_pruned_rows_total', 'Rows deleted by the retention policy', ['table'])
+        self.db_rows_dropped = Counter('xrpl_monitor_db_rows_dropped_total', 'Buffered rows dropped after failed write buffer commits')
+        
+        # Database connection metrics (shared by all nodes)
+        self.db_readers_active = Gauge('xrpl_monitor_db_readers_active', 'Database queries running on read-only connections')
+        self.db_reader_connections = Gauge('xrpl_monitor_db_reader_connections', 'Open read-only database connections')
+        self.db_lock_wait = Histogram('xrpl_monitor_db_lock_wait_seconds', 'Time spent waiting for the database writer or a reader slot', ['lock'],
+                                      buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5))
         
         # Info metrics
-        self.server_info = Info('xrpl_server', 'Server information')
+        self.server_info = Info('xrpl_server', 'Server information', ['node'])
         
         # Start time & state mapping
         self.start_time = time.time()
@@ -98,6 +155,25 @@ class PrometheusExporter:
             'tracking': 4, 'full': 5, 'proposing': 6, 'unreachable': 7
         }
     
+    def for_node(self, node: str) -> 'PrometheusExporter':
+        """
+        Get a view of this exporter that labels updates with node
+        
+        Shares the metric objects and HTTP server; keeps its own baselines
+        for counters that are fed cumulative totals.
+        
+        Args:
+            node: Node label value
+            
+        Returns:
+            PrometheusExporter bound to node
+        """
+        view = copy.copy(self)
+        view.node = node
+        for attr in [a for a in vars(view) if a.startswith('_last_')]:
+            delattr(view, attr)
+        return view
+    
     def start(self):
         """Start the Prometheus HTTP server"""
         start_http_server(self.port, addr=self.host)
@@ -107,33 +183,33 @@ class PrometheusExporter:
     def update_state(self, state: str, time_in_state: float = 0):
         """Update validator state metrics"""
         state_value = self.state_values.get(state.lower(), 0)
-        self.validator_state.set(state_value)
-        self.validator_state_info.info({'state': state})
-        self.time_in_state.set(time_in_state)
+        self.validator_state.labels(node=self.node).set(state_value)
+        self.validator_state_info.labels(node=self.node).info({'state': state})
+        self.time_in_state.labels(node=self.node).set(time_in_state)
     
     # Ledger methods
     def update_ledger(self, ledger_seq: int):
         """Update ledger sequence"""
-        self.ledger_sequence.set(ledger_seq)
+        self.ledger_sequence.labels(node=self.node).set(ledger_seq)
     
     def update_ledger_details(self, age: int, base_fee: float, reserve_base: float, reserve_inc: float):
         """Update ledger details"""
-        self.ledger_age.set(age)
-        self.base_fee.set(base_fee)
-        self.reserve_base.set(reserve_base)
-        self.reserve_inc.set(reserve_inc)
+        self.ledger_age.labels(node=self.node).set(age)
+        self.base_fee.labels(node=self.node).set(base_fee)
+        self.reserve_base.labels(node=self.node).set(reserve_base)
+        self.reserve_inc.labels(node=self.node).set(reserve_inc)
     
     # Peer methods
     def update_peers(self, peers: int):
         """Update peer count"""
-        self.peer_count.set(peers)
+        self.peer_count.labels(node=self.node).set(peers)
     
     def update_peer_details(self, inbound: int, outbound: int, insane: int, p90_latency: float):
         """Update detailed peer metrics"""
-        self.peers_inbound.set(inbound)
-        self.peers_outbound.set(outbound)
-        self.peers_insane.set(insane)
-        self.peer_latency_p90.set(p90_latency)
+        self.peers_inbound.labels(node=self.node).set(inbound)
+        self.peers_outbound.labels(node=self.node).set(outbound)
+        self.peers_insane.labels(node=self.node).set(insane)
+        self.peer_latency_p90.labels(node=self.node).set(p90_latency)
     
     def update_peer_disconnects(self, total: int, resources: int):
         """Update peer disconnect counters"""
@@ -145,9 +221,9 @@ class PrometheusExporter:
         resources_inc = resources - self._last_peer_disconnects_resources
         
         if total_inc > 0:
-            self.peer_disconnects.inc(total_inc)
+            self.peer_disconnects.labels(node=self.node).inc(total_inc)
         if resources_inc > 0:
-            self.peer_disconnects_resources.inc(resources_inc)
+            self.peer_disconnects_resources.labels(node=self.node).inc(resources_inc)
         
         self._last_peer_disconnects = total
         self._last_peer_disconnects_resources = resources
@@ -155,12 +231,12 @@ class PrometheusExporter:
     # Performance methods
     def update_load_factor(self, load_factor: float):
         """Update load factor"""
-        self.load_factor.set(load_factor)
+        self.load_factor.labels(node=self.node).set(load_factor)
     
     def update_performance(self, io_latency: int, converge_time: float):
         """Update performance metrics"""
-        self.io_latency.set(io_latency)
-        self.converge_time.set(converge_time)
+        self.io_latency.labels(node=self.node).set(io_latency)
+        self.converge_time.labels(node=self.node).set(converge_time)
     
     def update_jq_trans_overflow(self, count: int):
         """Update job queue overflow counter"""
@@ -168,40 +244,65 @@ class PrometheusExporter:
             self._last_jq_overflow = 0
         inc = count - self._last_jq_overflow
         if inc > 0:
-            self.jq_trans_overflow.inc(inc)
+            self.jq_trans_overflow.labels(node=self.node).inc(inc)
         self._last_jq_overflow = count
     
     def update_transaction_rate(self, rate: float):
         """Update transaction rate"""
-        self.transaction_rate.set(rate)
+        self.transaction_rate.labels(node=self.node).set(rate)
+    
+    def update_throughput(self, rates: dict):
+        """
+        Update rolling throughput gauges
+        
+        Args:
+            rates: ThroughputTracker.rates() output (window -> tps, ledger_interval)
+        """
+        for window, values in rates.items():
+            self.throughput_tps.labels(node=self.node, window=window).set(values['tps'])
+            self.ledger_interval_avg.labels(node=self.node, window=window).set(values['ledger_interval'])
+        
+        # xrpl_transaction_rate follows the shortest window
+        if '1m' in rates:
+            self.update_transaction_rate(rates['1m']['tps'])
+    
+    def observe_ledger_close(self, txn_count: int, interval: float):
+        """Record one closed ledger in the interval and size histograms"""
+        self.ledger_interval.labels(node=self.node).observe(interval)
+        self.ledger_transactions.labels(node=self.node).observe(txn_count)
     
     # Validation methods
     def update_validation_quorum(self, quorum: int):
         """Update validation quorum"""
-        self.validation_quorum.set(quorum)
+        self.validation_quorum.labels(node=self.node).set(quorum)
     
     def update_proposers(self, proposers: int):
         """Update proposers count"""
-        self.proposers.set(proposers)
+        self.proposers.labels(node=self.node).set(proposers)
     
     def increment_validations_checked(self):
         """Increment validations checked counter"""
-        self.validations_checked.inc()
+        self.validations_checked.labels(node=self.node).inc()
     
     def update_validation_stats(self, agreement_rate: float, validation_rate: float):
         """Update validation statistics"""
-        self.validation_agreement_rate.set(agreement_rate)
-        self.validation_rate.set(validation_rate)
+        self.validation_agreement_rate.labels(node=self.node).set(agreement_rate)
+        self.validation_rate.labels(node=self.node).set(validation_rate)
     
-    def update_validation_period_stats(self, stats_1h: dict, stats_24h: dict):
+    def update_validation_period_stats(self, stats_1h: dict, stats_24h: dict, stats_7d: dict = None):
         """Update validation period statistics"""
-        self.validation_agreements_1h.set(stats_1h.get('validated_count', 0))
-        self.validation_missed_1h.set(stats_1h.get('missed_count', 0))
-        self.validation_agreement_pct_1h.set(stats_1h.get('agreement_rate', 0))
+        self.validation_agreements_1h.labels(node=self.node).set(stats_1h.get('validated_count', 0))
+        self.validation_missed_1h.labels(node=self.node).set(stats_1h.get('missed_count', 0))
+        self.validation_agreement_pct_1h.labels(node=self.node).set(stats_1h.get('agreement_rate', 0))
         
-        self.validation_agreements_24h.set(stats_24h.get('validated_count', 0))
-        self.validation_missed_24h.set(stats_24h.get('missed_count', 0))
-        self.validation_agreement_pct_24h.set(stats_24h.get('agreement_rate', 0))
+        self.validation_agreements_24h.labels(node=self.node).set(stats_24h.get('validated_count', 0))
+        self.validation_missed_24h.labels(node=self.node).set(stats_24h.get('missed_count', 0))
+        self.validation_agreement_pct_24h.labels(node=self.node).set(stats_24h.get('agreement_rate', 0))
+        
+        if stats_7d is not None:
+            self.validation_agreements_7d.labels(node=self.node).set(stats_7d.get('validated_count', 0))
+            self.validation_missed_7d.labels(node=self.node).set(stats_7d.get('missed_count', 0))
+            self.validation_agreement_pct_7d.labels(node=self.node).set(stats_7d.get('agreement_rate', 0))
     
     # State accounting
     def update_state_accounting(self, state_accounting: dict):
@@ -209,26 +310,26 @@ class PrometheusExporter:
         for state_name, state_data in state_accounting.items():
             duration_us = int(state_data.get('duration_us', 0))
             duration_s = duration_us / 1_000_000
-            self.state_duration.labels(state=state_name).set(duration_s)
+            self.state_duration.labels(node=self.node, state=state_name).set(duration_s)
             
             transitions = int(state_data.get('transitions', 0))
-            self.state_transitions.labels(state=state_name).set(transitions)
+            self.state_transitions.labels(node=self.node, state=state_name).set(transitions)
     
     # System methods
     def update_system_metrics(self, uptime: int, initial_sync_us: int, server_state_duration_us: int):
         """Update system metrics"""
-        self.uptime.set(uptime)
-        self.initial_sync_duration.set(initial_sync_us / 1_000_000)
-        self.server_state_duration.set(server_state_duration_us / 1_000_000)
+        self.uptime.labels(node=self.node).set(uptime)
+        self.initial_sync_duration.labels(node=self.node).set(initial_sync_us / 1_000_000)
+        self.server_state_duration.labels(node=self.node).set(server_state_duration_us / 1_000_000)
     
     def update_database_sizes(self, ledger_db: int, nudb: int):
         """Update database size metrics"""
-        self.ledger_db_size.set(ledger_db)
-        self.nudb_size.set(nudb)
+        self.ledger_db_size.labels(node=self.node).set(ledger_db)
+        self.nudb_size.labels(node=self.node).set(nudb)
     
     def update_server_info(self, build_version: str, node_size: str, pubkey_validator: str, complete_ledgers: str):
         """Update server info metadata"""
-        self.server_info.info({
+        self.server_info.labels(node=self.node).info({
             'build_version': build_version,
             'node_size': node_size,
             'pubkey_validator': pubkey_validator,
@@ -238,15 +339,84 @@ class PrometheusExporter:
     # Counter methods
     def increment_state_changes(self):
         """Increment state changes counter"""
-        self.state_changes.inc()
+        self.state_changes.labels(node=self.node).inc()
     
     def increment_alerts_sent(self):
         """Increment alerts sent counter"""
-        self.alerts_sent.inc()
+        self.alerts_sent.labels(node=self.node).inc()
     
     def increment_api_errors(self):
         """Increment API errors counter"""
-        self.api_errors.inc()
+        self.api_errors.labels(node=self.node).inc()
+    
+    def update_api_cache_stats(self, hits: int, misses: int):
+        """Update API cache counters from the client's running totals"""
+        if not hasattr(self, '_last_cache_hits'):
+            self._last_cache_hits = 0
+            self._last_cache_misses = 0
+        
+        if hits > self._last_cache_hits:
+            self.api_cache_hits.labels(node=self.node).inc(hits - self._last_cache_hits)
+        if misses > self._last_cache_misses:
+            self.api_cache_misses.labels(node=self.node).inc(misses - self._last_cache_misses)
+        
+        self._last_cache_hits = hits
+        self._last_cache_misses = misses
+    
+    def observe_stage(self, stage: str, seconds: float):
+        """Record the latency of one poll path stage"""
+        self.stage_seconds.labels(stage=stage).observe(seconds)
+    
+    def update_poll_rate(self, interval: float):
+        """Update the effective poll rate from the current poll interval"""
+        self.poll_rate.labels(node=self.node).set(1 / interval if interval > 0 else 0)
+    
+    def record_task_run(self, task: str, duration: float, overruns: int = 0):
+        """Record one run of a scheduled task"""
+        self.task_duration.labels(node=self.node, task=task).set(duration)
+        if overruns:
+            self.task_overruns.labels(node=self.node, task=task).inc(overruns)
+    
+    def update_backfill_pending(self, pending: int):
+        """Update the number of ledgers waiting to be backfilled"""
+        self.backfill_pending.labels(node=self.node).set(pending)
+    
+    def increment_ledgers_backfilled(self, count: int = 1):
+        """Count ledgers recorded by the backfill worker"""
+        self.ledgers_backfilled.labels(node=self.node).inc(count)
+    
+    def update_queue_depth(self, queue: str, depth: int):
+        """Update the depth of a pipeline queue"""
+        self.queue_depth.labels(queue=queue).set(depth)
+    
+    def increment_queue_dropped(self, queue: str):
+        """Count a sample dropped by a full pipeline queue"""
+        self.queue_dropped.labels(queue=queue).inc()
+    
+    def observe_db_commit(self, rows: int, seconds: float):
+        """Record one write buffer commit"""
+        self.db_rows_per_commit.observe(rows)
+        self.db_flush_seconds.observe(seconds)
+    
+    def increment_db_rows_dropped(self, rows: int):
+        """Count buffered rows given up on after failed commits"""
+        self.db_rows_dropped.inc(rows)
+    
+    def increment_db_pruned(self, table: str, rows: int):
+        """Count rows deleted by the retention policy"""
+        self.db_pruned.labels(table=table).inc(rows)
+    
+    def update_db_readers_active(self, count: int):
+        """Update the number of queries in progress"""
+        self.db_readers_active.set(count)
+    
+    def update_db_reader_connections(self, count: int):
+        """Update the number of open read-only connections"""
+        self.db_reader_connections.set(count)
+    
+    def observe_db_lock_wait(self, lock: str, seconds: float):
+        """Record time spent waiting for the writer ('writer') or a reader slot ('reader')"""
+        self.db_lock_wait.labels(lock=lock).observe(seconds)
     
     # Uptime methods
     def update_monitor_uptime(self):
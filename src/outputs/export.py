@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Export - Stream monitor history to stdout as CSV or JSON lines
+
+Reads any range of a node's history (raw metrics, state transitions,
+ledger validations, rollup buckets or the time series store) and writes it
+with constant memory, however long the range:
+
+    python -m src.outputs.export validations --since 30d --format csv > validations.csv
+    python -m src.outputs.export metrics --start 2026-09-01 --end 2026-09-08 --iso
+    python -m src.outputs.export validations --by ledger_seq --start 95000000 --end 95001000
+    python -m src.outputs.export series --node hub1 --since 6h --format ndjson
+    python -m src.outputs.export history --since 90d --max-points 500 --format csv
+
+Database rows are paged with Database.iter_range (keyset pagination) over
+read-only connections, so an export never blocks the running monitor. Time
+series samples come straight from the memory-mapped ring. `history` is the
+exception: it returns at most about --max-points rows from whichever of the
+raw metrics and rollup tiers covers the range (Database.get_metrics_history),
+for charting long periods. Status messages go to stderr, so stdout only
+ever holds the export.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.database import Database
+from src.storage.timeseries import TimeSeriesStore
+from src.utils.nodes import DEFAULT_NODE
+
+# Export name -> Database table (None: the node's time series store,
+# 'history': Database.get_metrics_history)
+TABLES = {
+    'metrics': 'validator_metrics',
+    'transitions': 'state_transitions',
+    'validations': 'ledger_validations',
+    'rollup_1m': 'rollup_1m',
+    'rollup_1h': 'rollup_1h',
+    'series': None,
+    'history': 'history'
+}
+
+# Columns of a history export (state shares are fractions of each row's time)
+HISTORY_COLUMNS = (['time', 'resolution', 'samples', 'ledger_seq_max',
+                    'peers_min', 'peers_max', 'peers_avg',
+                    'load_factor_min', 'load_factor_max', 'load_factor_avg']
+                   + [f"{state}_share" for state in Database.ROLLUP_STATES]
+                   + list(Database.ROLLUP_VALIDATIONS))
+
+# Columns rendered as dates by --iso
+TIME_COLUMNS = ('timestamp', 'bucket', 'time')
+
+# Suffix of a relative --since -> seconds
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_time(value: str) -> float:
+    """
+    Parse a range bound: Unix seconds or an ISO date/time (local time
+    unless it carries an offset)
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is neither Unix seconds nor an ISO date/time")
+
+
+def parse_age(value: str) -> float:
+    """Parse a relative --since such as 90m, 12h or 30d into seconds"""
+    unit = UNITS.get(value[-1:].lower())
+    try:
+        return float(value[:-1]) * unit if unit else float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not an age like 90m, 12h or 30d")
+
+
+def write_csv(out: TextIO, columns: List[str], rows: Iterable[tuple]) -> int:
+    """Write a header and one CSV line per row"""
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(out: TextIO, columns: List[str], rows: Iterable[tuple]) -> int:
+    """Write one JSON object per line (JSON Lines / NDJSON)"""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(columns, row)), separators=(',', ':')))
+        out.write('\n')
+        count += 1
+    return count
+
+
+# Output format -> writer (JSONL and NDJSON are the same format)
+FORMATS: Dict[str, Callable[[TextIO, List[str], Iterable[tuple]], int]] = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+    'ndjson': write_jsonl
+}
+
+
+def series_rows(store: TimeSeriesStore, start: Optional[float],
+                end: Optional[float]) -> Iterable[tuple]:
+    """Time series samples with missing values (NaN) as None"""
+    for row in store.iter_rows(start, end):
+        yield tuple(None if math.isnan(value) else value for value in row)
+
+
+def history_rows(db: Database, start: Optional[float], end: Optional[float],
+                 node: str, max_points: int) -> Iterable[tuple]:
+    """
+    Metrics history at the resolution get_metrics_history picks, as
+    HISTORY_COLUMNS tuples (validation counts are None for raw rows)
+    """
+    if end is None:
+        end = time.time()
+    if start is None:
+        oldest = [db.get_oldest_time(table, node)
+                  for table in ['validator_metrics'] + [f"rollup_{tier}" for tier in db.ROLLUP_TIERS]]
+        oldest = [value for value in oldest if value is not None]
+        if not oldest:
+            return
+        start = min(oldest)
+
+    resolution, rows = db.get_metrics_history(start, end, node=node, max_points=max_points)
+    for row in rows:
+        shares = row['state_shares']
+        yield tuple(
+            [row['time'], resolution]
+            + [row.get(column) for column in HISTORY_COLUMNS[2:10]]
+            + [shares.get(state, 0.0) for state in db.ROLLUP_STATES]
+            + [row.get(column) for column in db.ROLLUP_VALIDATIONS]
+        )
+
+
+def iso_rows(columns: List[str], rows: Iterable[tuple]) -> Iterable[tuple]:
+    """Rows with their time columns as ISO-8601 local times"""
+    positions = [i for i, column in enumerate(columns) if column in TIME_COLUMNS]
+    for row in rows:
+        row = list(row)
+        for i in positions:
+            if row[i] is not None:
+                row[i] = datetime.fromtimestamp(row[i]).astimezone().isoformat(timespec='seconds')
+        yield tuple(row)
+
+
+def load_paths(args) -> None:
+    """Fill in --db and --timeseries from config.yaml when not given"""
+    if args.db and (args.timeseries or args.table != 'series'):
+        return
+    from src.utils.config import Config
+    config = Config(args.config) if args.config else Config()
+    if not args.db:
+        args.db = config.get('database.path', '${INSTALL_DIR}/data/monitor.db')
+    if not args.timeseries:
+        args.timeseries = config.get('database.timeseries.path',
+                                     os.path.join(os.path.dirname(args.db), 'timeseries'))
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Stream monitor history to stdout')
+    parser.add_argument('table', choices=TABLES, help='What to export')
+    parser.add_argument('--node', default=DEFAULT_NODE, help=f"Monitored node (default: {DEFAULT_NODE})")
+    parser.add_argument('--start', help='First key included: Unix seconds / ISO date, '
+                                        'or a ledger with --by ledger_seq (default: oldest)')
+    parser.add_argument('--end', help='Key excluded, same forms as --start (default: newest)')
+    parser.add_argument('--since', type=parse_age, help='Start this long ago, e.g. 90m, 12h, 30d')
+    parser.add_argument('--by', choices=('timestamp', 'ledger_seq'), default='timestamp',
+                        help='Range key (ledger_seq: validations only)')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl', help='Output format')
+    parser.add_argument('--iso', action='store_true', help='Write times as ISO-8601 instead of Unix seconds')
+    parser.add_argument('--page-size', type=int, default=1000, help='Rows read per query')
+    parser.add_argument('--max-points', type=int, default=1000,
+                        help='history: preferred largest number of rows (picks the resolution)')
+    parser.add_argument('--db', help='SQLite database (default: database.path from config.yaml)')
+    parser.add_argument('--timeseries', help='Time series directory (default: database.timeseries.path)')
+    parser.add_argument('--config', help='config.yaml to read paths from')
+    args = parser.parse_args()
+
+    if args.since is not None and args.start is not None:
+        parser.error('--since and --start are mutually exclusive')
+    if args.by == 'ledger_seq' and args.table != 'validations':
+        parser.error('--by ledger_seq is only supported for validations')
+
+    try:
+        if args.by == 'ledger_seq':
+            start = int(args.start) if args.start is not None else None
+            end = int(args.end) if args.end is not None else None
+        else:
+            start = parse_time(args.start) if args.start is not None else None
+            end = parse_time(args.end) if args.end is not None else None
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+    if args.since is not None:
+        start = time.time() - args.since
+
+    # Anything the loaders print must not end up in the export
+    with contextlib.redirect_stdout(sys.stderr):
+        load_paths(args)
+        if args.table == 'series':
+            path = os.path.join(args.timeseries, f"{args.node}.ts")
+            if not os.path.exists(path):
+                parser.error(f"No time series store at {path}")
+            source = TimeSeriesStore(path, readonly=True)
+            columns = list(source.columns)
+            rows = series_rows(source, start, end)
+        else:
+            try:
+                source = Database(args.db, readonly=True)
+            except ValueError as e:
+                parser.error(str(e))
+            table = TABLES[args.table]
+            if table == 'history':
+                columns = HISTORY_COLUMNS
+                rows = history_rows(source, start, end, args.node, args.max_points)
+            else:
+                columns = source.range_columns(table)
+                rows = source.iter_range(table, start, end, node=args.node, key=args.by,
+                                         page_size=args.page_size)
+
+    if args.iso:
+        rows = iso_rows(columns, rows)
+
+    started = time.monotonic()
+    try:
+        count = FORMATS[args.format](sys.stdout, columns, rows)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head) - not an error
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return
+    finally:
+        source.close()
+
+    print(f"Exported {count} {args.table} rows in {time.monotonic() - started:.1f}s",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Pipeline - Decouples collection from persistence and metric export
+
+Collectors produce immutable samples (see samples.py). A persistence worker
+writes them to SQLite and an exporter worker applies them to Prometheus,
+each fed through its own bounded queue, so a slow disk or a locked database
+never delays the next poll.
+
+Numeric series samples skip SQLite: the persistence worker appends them to
+a per-node memory-mapped TimeSeriesStore instead. Raw response snapshots go
+to a per-node SnapshotArchive the same way.
+"""
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.utils.instrumentation import instrumentation, stage
+from src.processors.samples import (
+    MetricsSample, StateTransitionSample, LedgerValidationSample, CheckpointSample,
+    PollSample, LedgerCloseSample, SeriesSample, SnapshotSample
+)
+from src.processors.validation_stats import RollingValidationStats
+from src.storage.timeseries import TimeSeriesStore
+from src.storage.archive import SnapshotArchive
+
+
+class BoundedQueue:
+    """
+    Fixed-size queue with an explicit overflow policy
+
+    Policies:
+        block: Wait up to put_timeout for space (backpressure on the
+               producer), then drop the new item
+        drop_oldest: Never wait - evict the oldest queued item instead
+    """
+
+    POLICIES = ('block', 'drop_oldest')
+
+    def __init__(self, name: str, maxsize: int, policy: str = 'block',
+                 put_timeout: float = 1.0, prometheus=None):
+        """
+        Initialize queue
+
+        Args:
+            name: Queue name (metric label)
+            maxsize: Maximum number of queued items
+            policy: 'block' or 'drop_oldest'
+            put_timeout: Seconds a 'block' put waits for space
+            prometheus: PrometheusExporter for depth and drop metrics
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}' (expected one of {self.POLICIES})")
+
+        self.name = name
+        self.policy = policy
+        self.put_timeout = put_timeout
+        self.prometheus = prometheus
+        self._queue = queue.Queue(maxsize=maxsize)
+
+        # Statistics
+        self.enqueued = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of queued items"""
+        return self._queue.qsize()
+
+    def _drop(self):
+        """Count one dropped item"""
+        self.dropped += 1
+        if self.prometheus:
+            self.prometheus.increment_queue_dropped(self.name)
+
+    def put(self, item) -> bool:
+        """
+        Queue an item according to the overflow policy
+
+        Returns:
+            True if the item was queued
+        """
+        if self.policy == 'drop_oldest':
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self._drop()
+                    except queue.Empty:
+                        pass
+        else:
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+            except queue.Full:
+                self._drop()
+                return False
+
+        self.enqueued += 1
+        return True
+
+    def get(self, timeout: float):
+        """
+        Take the next item
+
+        Returns:
+            The item, or None if nothing arrived within timeout
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class _TracedSample:
+    """A sample queued by a traced poll, handled in that poll's context"""
+
+    __slots__ = ('sample', 'context')
+
+    def __init__(self, sample, context):
+        self.sample = sample
+        self.context = context
+
+
+class Pipeline:
+    """
+    Persistence and export stages fed by bounded queues
+
+    Until start() is called every sample is handled synchronously on the
+    caller's thread, so a collector works the same with or without workers.
+    """
+
+    # Sample type -> Database method it is written with
+    WRITERS = {
+        MetricsSample: 'write_metrics',
+        StateTransitionSample: 'write_state_transition',
+        LedgerValidationSample: 'write_ledger_validation',
+        CheckpointSample: 'write_checkpoint'
+    }
+
+    def __init__(self, db, prometheus=None, persist_queue_size: int = 10000,
+                 export_queue_size: int = 100, persist_policy: str = 'block',
+                 export_policy: str = 'drop_oldest', put_timeout: float = 1.0,
+                 timeseries_dir: Optional[str] = None, timeseries_capacity: int = 524288,
+                 archive_dir: Optional[str] = None, archive_options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize pipeline
+
+        Args:
+            db: Database the persistence stage writes to
+            prometheus: PrometheusExporter the export stage updates
+            persist_queue_size: Maximum samples waiting to be written
+            export_queue_size: Maximum samples waiting to be exported
+            persist_policy: Overflow policy of the persistence queue
+            export_policy: Overflow policy of the export queue (newer
+                           snapshots supersede older ones, so dropping the
+                           oldest loses nothing that matters)
+            put_timeout: Seconds a 'block' queue holds the collector back
+            timeseries_dir: Directory of the per-node time series stores
+                            (None = series samples are discarded)
+            timeseries_capacity: Samples each store keeps
+            archive_dir: Directory of the per-node snapshot archives
+                         (None = snapshots are discarded)
+            archive_options: Keyword arguments for each SnapshotArchive
+        """
+        self.db = db
+        self.prometheus = prometheus
+
+        self.persist_queue = BoundedQueue('persist', persist_queue_size, persist_policy,
+                                          put_timeout, prometheus)
+        self.export_queue = BoundedQueue('export', export_queue_size, export_policy,
+                                         put_timeout, prometheus)
+
+        # Per-node exporter views, owned by the export stage
+        self._views: Dict[str, Any] = {}
+
+        # Per-node rolling validation stats, fed by the persistence stage
+        self._validation_stats: Dict[str, RollingValidationStats] = {}
+        self._stats_lock = threading.Lock()
+
+        # Per-node time series stores, appended to by the persistence stage
+        self.timeseries_dir = timeseries_dir
+        self.timeseries_capacity = timeseries_capacity
+        self._series: Dict[str, TimeSeriesStore] = {}
+        self._series_lock = threading.Lock()
+
+        # Per-node raw snapshot archives, appended to by the persistence stage
+        self.archive_dir = archive_dir
+        self.archive_options = archive_options or {}
+        self._archives: Dict[str, SnapshotArchive] = {}
+
+        self._stop = threading.Event()
+        self._threads = []
+
+        # Statistics
+        self.persisted = 0
+        self.exported = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        """True while the worker threads are running"""
+        return bool(self._threads)
+
+    @staticmethod
+    def _traced(sample):
+        """The sample, carrying the poll trace it was queued from (if any)"""
+        context = instrumentation.trace_context()
+        return sample if context is None else _TracedSample(sample, context)
+
+    def persist(self, sample) -> bool:
+        """
+        Hand a sample to the persistence stage
+
+        Returns:
+            False if the sample was dropped
+        """
+        if not self.running:
+            self._write(sample)
+            return True
+        with stage('enqueue.persist'):
+            return self.persist_queue.put(self._traced(sample))
+
+    def export(self, sample) -> bool:
+        """
+        Hand a sample to the export stage
+
+        Returns:
+            False if the sample was dropped
+        """
+        if self.prometheus is None:
+            return True
+        if not self.running:
+            self._apply(sample)
+            return True
+        with stage('enqueue.export'):
+            return self.export_queue.put(self._traced(sample))
+
+    def _log_error(self, stage: str, error: Exception):
+        """Report a failed sample without stopping the worker"""
+        self.errors += 1
+        timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp_str}] [ERROR] {stage} stage failed: {error}")
+
+    def validation_stats(self, node: str) -> RollingValidationStats:
+        """
+        Rolling validation stats for a node
+        
+        Seeded from the database on first use, then kept current by every
+        ledger validation the persistence stage writes.
+        """
+        with self._stats_lock:
+            stats = self._validation_stats.get(node)
+            if stats is None:
+                stats = RollingValidationStats()
+                since = time.time() - stats.horizon * stats.bucket_seconds
+                stats.seed(self.db.get_validation_bucket_counts(
+                    since, bucket_seconds=stats.bucket_seconds, node=node))
+                self._validation_stats[node] = stats
+            return stats
+
+    def timeseries(self, node: str) -> Optional[TimeSeriesStore]:
+        """
+        Time series store for a node (opened on first use)
+
+        Returns:
+            The store, or None if no timeseries_dir was configured
+        """
+        if self.timeseries_dir is None:
+            return None
+        with self._series_lock:
+            store = self._series.get(node)
+            if store is None:
+                store = TimeSeriesStore(os.path.join(self.timeseries_dir, f"{node}.ts"),
+                                        SeriesSample._fields[2:], self.timeseries_capacity)
+                self._series[node] = store
+            return store
+
+    def archive(self, node: str) -> Optional[SnapshotArchive]:
+        """
+        Snapshot archive for a node (opened on first use)
+
+        Returns:
+            The archive, or None if no archive_dir was configured
+        """
+        if self.archive_dir is None:
+            return None
+        with self._series_lock:
+            archive = self._archives.get(node)
+            if archive is None:
+                archive = SnapshotArchive(self.archive_dir, node, **self.archive_options)
+                self._archives[node] = archive
+            return archive
+
+    def _write(self, sample):
+        """Write one sample to the database (or its node's time series store)"""
+        try:
+            if isinstance(sample, SeriesSample):
+                store = self.timeseries(sample.node)
+                if store is not None:
+                    store.append(sample.timestamp, sample[2:])
+                self.persisted += 1
+                return
+            if isinstance(sample, SnapshotSample):
+                archive = self.archive(sample.node)
+                if archive is not None:
+                    archive.append(sample.kind, sample.timestamp, sample.data)
+                self.persisted += 1
+                return
+            stats = None
+            if isinstance(sample, LedgerValidationSample):
+                # Seed before the write so the row is not counted twice
+                stats = self.validation_stats(sample.node)
+            getattr(self.db, self.WRITERS[type(sample)])(**sample._asdict())
+            if stats is not None:
+                stats.record(sample.ledger_seq, sample.timestamp, sample.should_validate,
+                             sample.did_validate, sample.agreed)
+            self.persisted += 1
+        except Exception as e:
+            self._log_error('persist', e)
+
+    def _view(self, node: str):
+        """Exporter view for node (created on first use)"""
+        view = self._views.get(node)
+        if view is None:
+            view = self.prometheus.for_node(node)
+            self._views[node] = view
+        return view
+
+    def _apply(self, sample):
+        """Apply one sample to Prometheus"""
+        try:
+            if isinstance(sample, PollSample):
+                with stage('export.poll'):
+                    self._apply_poll(sample)
+            elif isinstance(sample, LedgerCloseSample):
+                self._view(sample.node).observe_ledger_close(sample.txn_count, sample.interval)
+            self.exported += 1
+        except Exception as e:
+            self._log_error('export', e)
+
+    def _apply_poll(self, sample: PollSample):
+        """Update every per-poll metric from a snapshot"""
+        prometheus = self._view(sample.node)
+
+        # State metrics
+        prometheus.update_state(sample.server_state, sample.time_in_state)
+
+        # Ledger metrics
+        prometheus.update_ledger(sample.ledger_seq)
+        prometheus.update_ledger_details(sample.ledger_age, sample.base_fee,
+                                         sample.reserve_base, sample.reserve_inc)
+
+        # Peer metrics
+        prometheus.update_peers(sample.peers)
+        prometheus.update_peer_disconnects(sample.peer_disconnects,
+                                           sample.peer_disconnects_resources)
+
+        # Peer details (only update if we fetched them)
+        details = sample.peer_details
+        if details['inbound'] > 0 or details['outbound'] > 0:
+            prometheus.update_peer_details(
+                details['inbound'],
+                details['outbound'],
+                details['insane'],
+                details['p90_latency']
+            )
+
+        # Performance metrics
+        prometheus.update_load_factor(sample.load_factor)
+        prometheus.update_performance(sample.io_latency, sample.converge_time)
+        prometheus.update_jq_trans_overflow(sample.jq_trans_overflow)
+
+        # Throughput from closed ledgers
+        if sample.throughput:
+            prometheus.update_throughput(sample.throughput)
+
+        # Validation metrics
+        prometheus.update_validation_quorum(sample.validation_quorum)
+        prometheus.update_proposers(sample.proposers)
+
+        # State accounting
+        prometheus.update_state_accounting(sample.state_accounting)
+
+        # System metrics
+        prometheus.update_system_metrics(sample.uptime, sample.initial_sync_us,
+                                         sample.server_state_duration_us)
+        prometheus.update_monitor_uptime()
+        prometheus.update_api_cache_stats(sample.api_cache_hits, sample.api_cache_misses)
+
+        # Validation stats are O(1) to read, so they are exported every poll
+        self._apply_validation_stats(sample.node)
+
+    def _apply_validation_stats(self, node: str):
+        """Export agreement and validation rates from the rolling stats (no queries)"""
+        prometheus = self._view(node)
+        rolling = self.validation_stats(node)
+
+        stats = rolling.validation_stats('24h')
+        prometheus.update_validation_stats(
+            stats['agreement_rate'],
+            stats['validation_rate']
+        )
+
+        # Update period validation stats
+        prometheus.update_validation_period_stats(rolling.period_stats('1h'),
+                                                  rolling.period_stats('24h'),
+                                                  rolling.period_stats('7d'))
+
+    def _publish_depths(self):
+        """Export current queue depths"""
+        if self.prometheus:
+            self.prometheus.update_queue_depth(self.persist_queue.name, self.persist_queue.depth)
+            self.prometheus.update_queue_depth(self.export_queue.name, self.export_queue.depth)
+
+    def _worker(self, source: BoundedQueue, handle):
+        """Drain source until stop() - then finish whatever is still queued"""
+        while True:
+            sample = source.get(timeout=0.5)
+            if sample is None:
+                if self._stop.is_set():
+                    break
+                continue
+            if isinstance(sample, _TracedSample):
+                sample.context.run(handle, sample.sample)
+            else:
+                handle(sample)
+            self._publish_depths()
+
+    def start(self):
+        """Start the persistence and export worker threads"""
+        if self._threads:
+            return
+        self._stop.clear()
+        for name, source, handle in (('persist', self.persist_queue, self._write),
+                                     ('export', self.export_queue, self._apply)):
+            thread = threading.Thread(target=self._worker, args=(source, handle),
+                                      name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 5):
+        """
+        Flush queued samples and stop the workers
+
+        Args:
+            timeout: Seconds to wait for each worker to drain its queue
+        """
+        self._stop.set()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        self._threads = []
+
+        with self._series_lock:
+            for store in self._series.values():
+                store.close()
+            self._series = {}
+            for archive in self._archives.values():
+                archive.close()
+            self._archives = {}
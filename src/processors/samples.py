@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Samples - Immutable records passed from collectors to the pipeline stages
+
+Persisted samples have exactly the fields of the matching Database.write_*
+method, so the persistence worker can hand them over as keyword arguments.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class MetricsSample(NamedTuple):
+    """One validator_metrics row (Database.write_metrics)"""
+    timestamp: float
+    server_state: str
+    ledger_seq: int
+    peers: int
+    load_factor: float
+    node: str
+
+
+class StateTransitionSample(NamedTuple):
+    """One state_transitions row (Database.write_state_transition)"""
+    timestamp: float
+    old_state: str
+    new_state: str
+    duration: float
+    ledger_seq: int
+    peers: int
+    load_factor: float
+    node: str
+
+
+class LedgerValidationSample(NamedTuple):
+    """One ledger_validations row (Database.write_ledger_validation)"""
+    timestamp: float
+    ledger_seq: int
+    server_state: str
+    was_proposing: bool
+    should_validate: bool
+    did_validate: Optional[bool]
+    agreed: Optional[bool]
+    peers: int
+    load_factor: float
+    node: str
+    ledger_hash: Optional[str] = None
+    close_time: Optional[float] = None
+
+
+class CheckpointSample(NamedTuple):
+    """Poller state saved for warm restarts (replaces the node's previous one)"""
+    saved_at: float
+    server_state: Optional[str]
+    state_entered_at: Optional[float]
+    last_ledger_seq: Optional[int]
+    last_uptime: Optional[int]
+    window_base: Optional[int]
+    window_bits: bytes
+    node: str
+
+
+class PollSample(NamedTuple):
+    """
+    Everything one server_info snapshot contributes to Prometheus
+
+    Peer details are all zeros when no fresh peers response arrived with
+    this snapshot. state_accounting and throughput are private copies and
+    are never mutated.
+    """
+    node: str
+    timestamp: float
+    server_state: str
+    time_in_state: float
+    ledger_seq: int
+    ledger_age: int
+    base_fee: float
+    reserve_base: float
+    reserve_inc: float
+    peers: int
+    peer_disconnects: int
+    peer_disconnects_resources: int
+    peer_details: Dict[str, Any]
+    load_factor: float
+    io_latency: int
+    converge_time: float
+    jq_trans_overflow: int
+    throughput: Dict[str, Dict[str, float]]
+    validation_quorum: int
+    proposers: int
+    state_accounting: Dict[str, Any]
+    uptime: int
+    initial_sync_us: int
+    server_state_duration_us: int
+    api_cache_hits: int
+    api_cache_misses: int
+
+
+class LedgerCloseSample(NamedTuple):
+    """One closed ledger's size and close interval (for histograms)"""
+    node: str
+    ledger_seq: int
+    close_time: float
+    txn_count: int
+    interval: float
+
+
+class SeriesSample(NamedTuple):
+    """
+    One row of a node's numeric time series (TimeSeriesStore.append)
+
+    Every field after node and timestamp is a store column, in order.
+    """
+    node: str
+    timestamp: float
+    peers: int
+    load_factor: float
+    io_latency: int
+    converge_time: float
+    ledger_age: int
+    proposers: int
+
+
+class SnapshotSample(NamedTuple):
+    """
+    One raw rippled response for the snapshot archive (SnapshotArchive.append)
+
+    data is the server_info info object or the peers result, shared with
+    the API client - it is never mutated.
+    """
+    node: str
+    timestamp: float
+    kind: str
+    data: Dict[str, Any]
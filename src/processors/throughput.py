@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Throughput - Transaction rate and ledger interval from closed ledgers
+"""
+
+from typing import Dict, Optional
+
+
+class _BucketRing:
+    """
+    Fixed number of time buckets covering one rolling window
+
+    Each bucket holds the totals of the ledgers that closed inside it.
+    Buckets are reused once they fall out of the window, so memory does
+    not depend on how many ledgers close.
+    """
+
+    def __init__(self, seconds: float, buckets: int = 60):
+        self.seconds = seconds
+        self.width = seconds / buckets
+        self.buckets = buckets
+        self._ids = [None] * buckets
+        self._txns = [0] * buckets
+        self._ledgers = [0] * buckets
+        self._interval_sum = [0.0] * buckets
+
+    def add(self, close_time: float, txn_count: int, interval: float):
+        """Add one ledger with a known interval to its bucket"""
+        bucket_id = int(close_time // self.width)
+        index = bucket_id % self.buckets
+        if self._ids[index] != bucket_id:
+            self._ids[index] = bucket_id
+            self._txns[index] = 0
+            self._ledgers[index] = 0
+            self._interval_sum[index] = 0.0
+        self._txns[index] += txn_count
+        self._ledgers[index] += 1
+        self._interval_sum[index] += interval
+
+    def totals(self, now: float):
+        """
+        Sum the buckets inside the window ending at now
+
+        Returns:
+            Tuple of (transactions, ledgers, seconds covered by those ledgers)
+        """
+        oldest = int(now // self.width) - self.buckets + 1
+        txns = 0
+        ledgers = 0
+        seconds = 0.0
+        for i in range(self.buckets):
+            bucket_id = self._ids[i]
+            if bucket_id is not None and bucket_id >= oldest:
+                txns += self._txns[i]
+                ledgers += self._ledgers[i]
+                seconds += self._interval_sum[i]
+        return txns, ledgers, seconds
+
+
+class ThroughputTracker:
+    """
+    Rolling transactions-per-second and ledger interval over several windows
+
+    Fed with each closed ledger's transaction count and close time. A
+    ledger only counts once the previous ledger's close time is known, so
+    every transaction is divided by the real time its ledger took to close.
+    Ledgers that were missed just leave a hole in the data instead of
+    skewing the rate.
+
+    rippled rounds close times to the close time resolution (up to 10s),
+    so single intervals are coarse. Window averages are not.
+    """
+
+    # Window label -> seconds
+    WINDOWS = {
+        '1m': 60,
+        '5m': 300,
+        '1h': 3600
+    }
+
+    def __init__(self, windows: Optional[Dict[str, float]] = None, buckets: int = 60):
+        """
+        Initialize tracker
+
+        Args:
+            windows: Window label -> seconds (default: 1m, 5m, 1h)
+            buckets: Buckets per window (memory and resolution per window)
+        """
+        self.windows = {label: _BucketRing(seconds, buckets)
+                        for label, seconds in (windows or self.WINDOWS).items()}
+
+        self.last_seq = None
+        self.last_close_time = None
+        self.ledgers_recorded = 0
+
+    def record_ledger(self, seq: int, close_time: float, txn_count: int) -> Optional[float]:
+        """
+        Record one closed ledger
+
+        Args:
+            seq: Ledger sequence number
+            close_time: Close time as a Unix timestamp
+            txn_count: Number of transactions in the ledger
+
+        Returns:
+            Seconds since the previous ledger closed, or None if the previous
+            ledger was not seen (or this one is a duplicate)
+        """
+        if self.last_seq is not None and seq <= self.last_seq:
+            return None
+
+        interval = None
+        if self.last_seq is not None and seq == self.last_seq + 1:
+            interval = max(0.0, close_time - self.last_close_time)
+            for ring in self.windows.values():
+                ring.add(close_time, txn_count, interval)
+            self.ledgers_recorded += 1
+
+        self.last_seq = seq
+        self.last_close_time = close_time
+        return interval
+
+    def rates(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Current rolling rates
+
+        Args:
+            now: End of the windows (default: last close time seen)
+
+        Returns:
+            Window label -> {'tps', 'ledger_interval', 'ledgers'}
+        """
+        if now is None:
+            now = self.last_close_time or 0
+
+        rates = {}
+        for label, ring in self.windows.items():
+            txns, ledgers, seconds = ring.totals(now)
+            rates[label] = {
+                'tps': txns / seconds if seconds > 0 else 0.0,
+                'ledger_interval': seconds / ledgers if ledgers else 0.0,
+                'ledgers': ledgers
+            }
+        return rates
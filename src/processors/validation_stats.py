@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Validation Stats - Rolling validation counts without re-scanning the database
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from src.utils.ledger_window import LedgerWindow
+
+# Counters kept per bucket. Same meaning as the database stats queries:
+# missed / disagreed need an explicit False (unknown is not a miss).
+FIELDS = ('total', 'expected', 'validated', 'agreed', 'missed', 'disagreed', 'validated_agreed')
+
+
+def ledger_counts(should_validate, did_validate, agreed) -> tuple:
+    """Contribution of one ledger_validations row to each of FIELDS"""
+    return (
+        1,
+        1 if should_validate else 0,
+        1 if did_validate else 0,
+        1 if agreed else 0,
+        1 if should_validate and did_validate is not None and not did_validate else 0,
+        1 if did_validate and agreed is not None and not agreed else 0,
+        1 if did_validate and agreed else 0
+    )
+
+
+class RollingValidationStats:
+    """
+    Validation counts over several rolling windows, updated per ledger
+
+    Ledgers are counted in per-minute buckets held in a ring covering the
+    longest window. Each window keeps running totals: a ledger is added
+    in O(1), and buckets are subtracted once as they fall out of a
+    window, so reading any window is O(1) no matter how many ledgers it
+    covers.
+
+    Windows are aligned to whole minutes, so a window may include up to
+    one minute more than the equivalent database query.
+    """
+
+    # Window label -> seconds
+    WINDOWS = {
+        '1h': 3600,
+        '24h': 86400,
+        '7d': 604800
+    }
+
+    def __init__(self, windows: Optional[Dict[str, float]] = None,
+                 bucket_seconds: int = 60, recent_ledgers: int = 4096):
+        """
+        Initialize stats
+
+        Args:
+            windows: Window label -> seconds (default: 1h, 24h, 7d)
+            bucket_seconds: Bucket width
+            recent_ledgers: Ledgers remembered to undo a rewritten row
+        """
+        self.bucket_seconds = bucket_seconds
+        self.windows = {label: max(1, int(seconds // bucket_seconds))
+                        for label, seconds in (windows or self.WINDOWS).items()}
+        self.horizon = max(self.windows.values())
+
+        # Ring of buckets: bucket id (minute number) and FIELDS counts
+        self._ids = [None] * self.horizon
+        self._counts = [[0] * len(FIELDS) for _ in range(self.horizon)]
+
+        # Per window: running totals and the oldest bucket they include
+        self._sums = {label: [0] * len(FIELDS) for label in self.windows}
+        self._tails = {label: None for label in self.windows}
+
+        # Ledger -> (bucket id, counts), so INSERT OR REPLACE rewrites are not counted twice
+        self._recent = LedgerWindow(recent_ledgers)
+        self._newest = None
+        self._lock = threading.Lock()
+
+    def _advance(self, bucket_id: int):
+        """Move every window's end to bucket_id, subtracting expired buckets (lock held)"""
+        if self._newest is not None and bucket_id <= self._newest:
+            return
+        self._newest = bucket_id
+
+        for label, length in self.windows.items():
+            new_tail = bucket_id - length + 1
+            tail = self._tails[label]
+            sums = self._sums[label]
+            if tail is None or new_tail - tail >= length:
+                # Nothing counted so far is still inside the window
+                sums[:] = [0] * len(FIELDS)
+            else:
+                for expired in range(tail, new_tail):
+                    index = expired % self.horizon
+                    if self._ids[index] == expired:
+                        counts = self._counts[index]
+                        for i in range(len(FIELDS)):
+                            sums[i] -= counts[i]
+            self._tails[label] = new_tail if tail is None else max(tail, new_tail)
+
+    def _add(self, bucket_id: int, counts, sign: int = 1):
+        """Add (or with sign=-1 remove) counts in a bucket and the windows covering it (lock held)"""
+        if bucket_id <= self._newest - self.horizon:
+            return
+        index = bucket_id % self.horizon
+        if self._ids[index] != bucket_id:
+            if sign < 0:
+                return
+            self._ids[index] = bucket_id
+            self._counts[index] = [0] * len(FIELDS)
+        bucket = self._counts[index]
+        for i, count in enumerate(counts):
+            bucket[i] += sign * count
+
+        for label, tail in self._tails.items():
+            if bucket_id >= tail:
+                sums = self._sums[label]
+                for i, count in enumerate(counts):
+                    sums[i] += sign * count
+
+    def seed(self, rows: Iterable[tuple], now: Optional[float] = None):
+        """
+        Load history from the database
+
+        Args:
+            rows: (bucket id, *FIELDS) tuples (Database.get_validation_bucket_counts)
+            now: End of the windows (default: current time)
+        """
+        with self._lock:
+            self._advance(int((now or time.time()) // self.bucket_seconds))
+            for row in rows:
+                bucket_id = int(row[0])
+                self._advance(bucket_id)
+                self._add(bucket_id, [int(count or 0) for count in row[1:]])
+
+    def record(self, ledger_seq: int, timestamp: float, should_validate: bool,
+               did_validate: Optional[bool], agreed: Optional[bool]):
+        """
+        Count one ledger_validations row
+
+        Args:
+            ledger_seq: Ledger sequence number
+            timestamp: Row timestamp (Unix)
+            should_validate: Validator was expected to validate
+            did_validate: Validator validated (None if unknown)
+            agreed: Validation agreed with the network (None if unknown)
+        """
+        bucket_id = int(timestamp // self.bucket_seconds)
+        counts = ledger_counts(should_validate, did_validate, agreed)
+        with self._lock:
+            self._advance(bucket_id)
+            previous = self._recent.get(ledger_seq)
+            if previous is not None:
+                self._add(previous[0], previous[1], sign=-1)
+            self._add(bucket_id, counts)
+            self._recent.mark(ledger_seq, (bucket_id, counts))
+
+    def totals(self, window: str, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Counts in one window
+
+        Args:
+            window: Window label
+            now: End of the window (default: current time)
+
+        Returns:
+            FIELDS -> count
+        """
+        with self._lock:
+            self._advance(int((now or time.time()) // self.bucket_seconds))
+            return dict(zip(FIELDS, self._sums[window]))
+
+    def validation_stats(self, window: str = '24h', now: Optional[float] = None) -> Dict[str, Any]:
+        """Window stats in the shape of Database.get_validation_stats"""
+        counts = self.totals(window, now)
+        validated = counts['validated']
+        expected = counts['expected']
+        return {
+            'total_ledgers': counts['total'],
+            'expected_validations': expected,
+            'actual_validations': validated,
+            'agreements': counts['agreed'],
+            'disagreements': counts['disagreed'],
+            'missed': counts['missed'],
+            'agreement_rate': (counts['agreed'] / validated * 100) if validated > 0 else 0,
+            'validation_rate': (validated / expected * 100) if expected > 0 else 0
+        }
+
+    def period_stats(self, window: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Window stats in the shape of Database.get_validation_stats_period"""
+        counts = self.totals(window, now)
+        total = counts['total']
+        return {
+            'total_checked': total,
+            'validated_count': counts['validated_agreed'],
+            'missed_count': counts['missed'],
+            'agreement_rate': (counts['validated_agreed'] / total * 100) if total > 0 else 0,
+            'hours': self.windows[window] * self.bucket_seconds / 3600
+        }
@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Snapshot Archive - Compressed raw server_info and peers responses
+
+FastPoller keeps a couple of dozen server_info fields; this keeps the
+whole response (and every peers response) so an incident can be looked at
+afterwards, or replayed through the poller (see collectors/replay.py).
+
+Each node has a directory of append-only segment files, one per
+`segment_seconds`, named after the time of their first record:
+
+    <directory>/<node>/<start, 10-digit Unix seconds>.seg
+
+A segment starts with a header and the compression dictionary its records
+use, followed by records:
+
+    header  magic, version, codec, dictionary length, dictionary
+    record  timestamp (f64), kind, flags, payload length, payload
+
+A payload is the compressed JSON of either the full snapshot (a keyframe)
+or its delta from the previous snapshot of the same kind. The first
+snapshot of each kind in a segment is a keyframe, so every segment decodes
+on its own. Records are compressed one by one with a shared dictionary
+built from the previous segment's payloads, which is what makes
+small deltas compress well.
+
+zstd (with a trained dictionary) is used when the optional `zstandard`
+package is installed, zlib (with a preset dictionary) otherwise.
+"""
+
+import bisect
+import collections
+import copy
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Key listing the keys a delta removes
+REMOVED = '\u0000removed'
+
+DAY = 86400
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes that turn old into new
+
+    Nested objects are compared key by key; any other changed value
+    (including lists) is replaced whole.
+    """
+    delta = {}
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+        elif old[key] != value:
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                delta[key] = diff(old[key], value)
+            else:
+                delta[key] = value
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta[REMOVED] = removed
+    return delta
+
+
+def patch(old: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a diff() result to old (old is not modified)"""
+    result = dict(old)
+    for key, value in delta.items():
+        if key == REMOVED:
+            for removed in value:
+                result.pop(removed, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def peers_by_key(peers: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    A peers list as an object keyed by public key (address as fallback),
+    so a delta only holds the peers and fields that changed
+    """
+    keyed = {}
+    for index, peer in enumerate(peers):
+        key = peer.get('public_key') or peer.get('address') or f"#{index}"
+        while key in keyed:
+            key += '+'
+        keyed[key] = peer
+    return keyed
+
+
+class Codec:
+    """
+    Per-segment compressor / decompressor with an optional dictionary
+
+    Codec ids:
+        0  zlib with a preset dictionary (the dictionary is raw bytes)
+        1  zstd with a trained dictionary
+    """
+
+    ZLIB = 0
+    ZSTD = 1
+    NAMES = {'zlib': ZLIB, 'zstd': ZSTD}
+
+    # zlib looks back at most 32KB, so a larger preset dictionary is wasted
+    ZLIB_MAX_DICT = 32768
+
+    def __init__(self, codec: int, dictionary: bytes = b'', level: int = 6):
+        """
+        Initialize codec
+
+        Args:
+            codec: ZLIB or ZSTD
+            dictionary: Dictionary bytes (empty for none)
+            level: Compression level
+        """
+        if codec == self.ZSTD and zstandard is None:
+            raise ValueError("zstd segments need the 'zstandard' package")
+        self.codec = codec
+        self.dictionary = dictionary
+        self.level = level
+
+        if codec == self.ZSTD:
+            data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            self._compressor = zstandard.ZstdCompressor(level=level, dict_data=data)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=data)
+
+    @classmethod
+    def train(cls, codec: int, samples: List[bytes], size: int, level: int = 6) -> 'Codec':
+        """
+        Build a codec whose dictionary is trained on sample payloads
+
+        zstd trains a real dictionary. zlib has no trainer, so the most
+        recent distinct samples are packed into its preset dictionary,
+        newest last (zlib favours nearby matches).
+
+        Args:
+            codec: ZLIB or ZSTD
+            samples: Uncompressed payloads, oldest first
+            size: Largest dictionary in bytes
+            level: Compression level
+        """
+        dictionary = b''
+        if samples:
+            if codec == cls.ZSTD and zstandard is not None:
+                try:
+                    dictionary = zstandard.train_dictionary(size, samples).as_bytes()
+                except zstandard.ZstdError:
+                    # Too few or too similar samples - run without one
+                    dictionary = b''
+            elif codec == cls.ZLIB:
+                size = min(size, cls.ZLIB_MAX_DICT)
+                chosen = []
+                used = 0
+                for sample in reversed(list(dict.fromkeys(samples))):
+                    if used + len(sample) > size:
+                        continue
+                    chosen.append(sample)
+                    used += len(sample)
+                dictionary = b''.join(reversed(chosen))
+        return cls(codec, dictionary, level)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress one payload"""
+        if self.codec == self.ZSTD:
+            return self._compressor.compress(data)
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress one payload"""
+        if self.codec == self.ZSTD:
+            return self._decompressor.decompress(data)
+        if self.dictionary:
+            decompressor = zlib.decompressobj(zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class SegmentFormat:
+    """On-disk layout shared by the writer and the reader"""
+
+    MAGIC = b'XRPLSNP1'
+    VERSION = 1
+    # magic, version, codec, dictionary length
+    HEADER = struct.Struct('<8sBBI')
+    # timestamp, kind, flags, payload length
+    RECORD = struct.Struct('<dBBI')
+    SUFFIX = '.seg'
+
+    # Record kinds
+    KINDS = {'server_info': 1, 'peers': 2}
+    KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+    # Record flags
+    KEYFRAME = 1
+
+    @classmethod
+    def segment_name(cls, start: float) -> str:
+        """File name of a segment starting at start"""
+        return f"{int(start):010d}{cls.SUFFIX}"
+
+    @classmethod
+    def list_segments(cls, directory: str) -> List[Tuple[int, str]]:
+        """(start, path) of every segment in a node directory, oldest first"""
+        if not os.path.isdir(directory):
+            return []
+        segments = []
+        for name in os.listdir(directory):
+            stem = name[:-len(cls.SUFFIX)]
+            if name.endswith(cls.SUFFIX) and stem.isdigit():
+                segments.append((int(stem), os.path.join(directory, name)))
+        segments.sort()
+        return segments
+
+    @classmethod
+    def read_header(cls, f) -> Optional[Codec]:
+        """Codec of a segment opened at offset 0 (None if not a segment)"""
+        header = f.read(cls.HEADER.size)
+        if len(header) < cls.HEADER.size:
+            return None
+        magic, version, codec, dict_length = cls.HEADER.unpack(header)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            return None
+        dictionary = f.read(dict_length)
+        if len(dictionary) < dict_length:
+            return None
+        return Codec(codec, dictionary)
+
+
+class SnapshotArchive(SegmentFormat):
+    """
+    Append-only writer for one node's snapshot archive
+
+    Safe to call from several threads. A new segment is started every
+    segment_seconds, on every restart (the previous delta state is gone)
+    and never appended to again, so a crash can at most tear the last
+    record of the newest segment.
+    """
+
+    def __init__(self, directory: str, node: str, codec: str = 'auto', level: int = 6,
+                 segment_seconds: float = 3600, retention_days: float = 30,
+                 keyframe_every: int = 100, dict_size: int = 16384, train_samples: int = 256):
+        """
+        Initialize archive
+
+        Args:
+            directory: Archive root (node segments go in a subdirectory)
+            node: Monitored node name
+            codec: 'zstd', 'zlib' or 'auto' (zstd when zstandard is installed)
+            level: Compression level
+            segment_seconds: Seconds of snapshots per segment
+            retention_days: Segments older than this are deleted (0 = forever)
+            keyframe_every: Snapshots of a kind between keyframes (bounds the
+                            decoding needed to read from the middle of a segment)
+            dict_size: Largest compression dictionary in bytes
+            train_samples: Recent payloads the next dictionary is built from
+        """
+        if codec == 'auto':
+            codec = 'zstd' if zstandard is not None else 'zlib'
+        if codec not in Codec.NAMES:
+            raise ValueError(f"Unknown archive codec '{codec}' (expected one of {list(Codec.NAMES)})")
+
+        self.directory = os.path.join(directory, node)
+        self.node = node
+        self.codec_id = Codec.NAMES[codec]
+        self.level = level
+        self.segment_seconds = segment_seconds
+        self.retention = retention_days * DAY if retention_days else None
+        self.keyframe_every = keyframe_every
+        self.dict_size = dict_size
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Payloads the next segment's dictionary is built from: recent
+        # deltas plus the latest keyframe of each kind
+        self._samples = collections.deque(maxlen=train_samples)
+        self._keyframes: Dict[int, bytes] = {}
+
+        # Open segment: file, codec, end time, previous snapshot and
+        # snapshots since the last keyframe per kind
+        self._file = None
+        self._codec = self._reuse_codec()
+        self._segment_end = 0.0
+        self._previous: Dict[int, Dict[str, Any]] = {}
+        self._since_keyframe: Dict[int, int] = {}
+
+        # Statistics
+        self.records = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _reuse_codec(self) -> Optional[Codec]:
+        """Dictionary of the newest segment, so a restart keeps compressing well"""
+        segments = self.list_segments(self.directory)
+        if not segments:
+            return None
+        try:
+            with open(segments[-1][1], 'rb') as f:
+                codec = self.read_header(f)
+        except (OSError, ValueError):
+            return None
+        if codec is None or codec.codec != self.codec_id:
+            return None
+        return Codec(codec.codec, codec.dictionary, self.level)
+
+    def _start_segment(self, timestamp: float):
+        """Close the open segment and start a new one at timestamp"""
+        if self._file is not None:
+            self._file.close()
+            samples = list(self._samples) + list(self._keyframes.values())
+            self._codec = Codec.train(self.codec_id, samples, self.dict_size, self.level)
+        elif self._codec is None:
+            self._codec = Codec(self.codec_id, b'', self.level)
+
+        path = os.path.join(self.directory, self.segment_name(timestamp))
+        # Two segments starting in the same second: keep the first
+        if os.path.exists(path):
+            path = os.path.join(self.directory, self.segment_name(timestamp + 1))
+        self._file = open(path, 'ab')
+        dictionary = self._codec.dictionary
+        self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.codec_id, len(dictionary)))
+        self._file.write(dictionary)
+
+        self._segment_end = (timestamp // self.segment_seconds + 1) * self.segment_seconds
+        self._previous = {}
+        self._since_keyframe = {}
+        self._prune(timestamp)
+
+    def _prune(self, now: float):
+        """Delete segments past retention (a segment is kept until all of it is)"""
+        if self.retention is None:
+            return
+        segments = self.list_segments(self.directory)
+        # A segment ends where the next one starts
+        for (start, path), (next_start, _) in zip(segments, segments[1:]):
+            if next_start >= now - self.retention:
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Warning: Could not delete archive segment {path}: {e}")
+
+    def append(self, kind: str, timestamp: float, data: Dict[str, Any]):
+        """
+        Archive one snapshot
+
+        Args:
+            kind: 'server_info' (the info object) or 'peers' (the result
+                  object with its peers list)
+            timestamp: Unix time the snapshot was taken
+            data: The snapshot (not modified or kept by reference)
+        """
+        code = self.KINDS[kind]
+        if code == self.KINDS['peers']:
+            data = dict(data, peers=peers_by_key(data.get('peers', [])))
+
+        with self._lock:
+            if self._file is None or timestamp >= self._segment_end:
+                self._start_segment(timestamp)
+
+            previous = self._previous.get(code)
+            since = self._since_keyframe.get(code, 0)
+            if previous is None or since + 1 >= self.keyframe_every:
+                flags = self.KEYFRAME
+                body = data
+                self._since_keyframe[code] = 0
+            else:
+                flags = 0
+                body = diff(previous, data)
+                self._since_keyframe[code] = since + 1
+            # The caller may change data after we return (the stream
+            # subscriber patches server_info in place)
+            self._previous[code] = copy.deepcopy(data)
+
+            raw = json.dumps(body, separators=(',', ':')).encode('utf-8')
+            payload = self._codec.compress(raw)
+            self._file.write(self.RECORD.pack(timestamp, code, flags, len(payload)))
+            self._file.write(payload)
+            if flags & self.KEYFRAME:
+                self._keyframes[code] = raw
+            else:
+                self._samples.append(raw)
+
+            self.records += 1
+            self.raw_bytes += len(raw)
+            self.stored_bytes += self.RECORD.size + len(payload)
+
+    def flush(self):
+        """Push buffered records to the operating system"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """Close the open segment"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ArchiveReader(SegmentFormat):
+    """Reads snapshots back from one node's archive"""
+
+    def __init__(self, directory: str, node: str):
+        """
+        Initialize reader
+
+        Args:
+            directory: Archive root given to SnapshotArchive
+            node: Monitored node name
+        """
+        self.directory = os.path.join(directory, node)
+        self.node = node
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """(start, path) of every segment, oldest first"""
+        return self.list_segments(self.directory)
+
+    def _records(self, f) -> Iterator[Tuple[int, float, int, int, int]]:
+        """(offset, timestamp, kind, flags, payload length) of each whole record"""
+        size = os.fstat(f.fileno()).st_size
+        offset = f.tell()
+        while offset + self.RECORD.size <= size:
+            f.seek(offset)
+            timestamp, kind, flags, length = self.RECORD.unpack(f.read(self.RECORD.size))
+            if offset + self.RECORD.size + length > size:
+                # Torn by a crash mid-write
+                return
+            yield offset, timestamp, kind, flags, length
+            offset += self.RECORD.size + length
+
+    def _read_segment(self, path: str, start: Optional[float], end: Optional[float],
+                      kinds: Optional[set]) -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+        """Decode one segment, starting from the keyframes just before start"""
+        with open(path, 'rb') as f:
+            codec = self.read_header(f)
+            if codec is None:
+                print(f"Warning: {path} is not an archive segment - skipped")
+                return
+            records = f.tell()
+
+            # Each kind is decoded from its last keyframe before start
+            resume = {}
+            if start is not None:
+                for offset, timestamp, kind, flags, _ in self._records(f):
+                    if timestamp >= start:
+                        break
+                    if flags & self.KEYFRAME:
+                        resume[kind] = offset
+
+            f.seek(records)
+            current = {}
+            for offset, timestamp, kind, flags, length in self._records(f):
+                if end is not None and timestamp >= end:
+                    return
+                name = self.KIND_NAMES.get(kind)
+                if (name is None or (kinds is not None and name not in kinds)
+                        or offset < resume.get(kind, 0)):
+                    continue
+                f.seek(offset + self.RECORD.size)
+                body = json.loads(codec.decompress(f.read(length)))
+                if flags & self.KEYFRAME:
+                    snapshot = body
+                elif kind in current:
+                    snapshot = patch(current[kind], body)
+                else:
+                    # Delta without its keyframe (damaged segment)
+                    continue
+                current[kind] = snapshot
+                if start is None or timestamp >= start:
+                    if kind == self.KINDS['peers']:
+                        snapshot = dict(snapshot, peers=list(snapshot.get('peers', {}).values()))
+                    yield timestamp, name, snapshot
+
+    def iter_snapshots(self, start: Optional[float] = None, end: Optional[float] = None,
+                       kinds: Optional[List[str]] = None) -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+        """
+        Stream archived snapshots between start and end, oldest first
+
+        Args:
+            start: Oldest timestamp included (default: the oldest archived)
+            end: Timestamp excluded (default: after the newest)
+            kinds: Only these kinds ('server_info', 'peers')
+
+        Yields:
+            (timestamp, kind, snapshot) with snapshot in the shape it was
+            archived (peers lists keep their peers but not their order)
+        """
+        segments = self.segments()
+        first = 0
+        if start is not None:
+            # The last segment starting at or before start holds it
+            first = max(0, bisect.bisect_right([s for s, _ in segments], start) - 1)
+        wanted = set(kinds) if kinds is not None else None
+        for segment_start, path in segments[first:]:
+            if end is not None and segment_start >= end:
+                return
+            yield from self._read_segment(path, start, end, wanted)
+
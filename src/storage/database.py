@@ -1,4 +1,3 @@
-import time
 #!/usr/bin/env python3
 """
 Database module for XRPL Monitor
@@ -7,138 +6,677 @@ Simple SQLite database for storing validator metrics
 
 import sqlite3
 import os
-from typing import Dict, Any, Optional, List, Tuple
+import sys
+import threading
+import time
+import urllib.request
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from contextlib import contextmanager
+from datetime import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.nodes import DEFAULT_NODE
+from src.utils.instrumentation import timed
 
 
 class Database:
     """
     Simple SQLite database wrapper
+    
+    Every table carries a `node` column so one database can hold several
+    monitored rippled servers.
     """
     
-    def __init__(self, db_path: str):
+    # Layout version stored in PRAGMA user_version (see _init_db)
+    SCHEMA_VERSION = 1
+    
+    # Server state -> integer code stored in the tables (server_states).
+    # Codes match xrpl_state_value; unlisted states get the next free code.
+    STATE_CODES = {
+        'unknown': 0, 'disconnected': 1, 'connected': 2, 'syncing': 3,
+        'tracking': 4, 'full': 5, 'proposing': 6, 'unreachable': 7,
+        'validating': 8
+    }
+    
+    # Row inserts, shared by direct writes and the write buffer. States
+    # are passed as codes (state_id).
+    INSERTS = {
+        'validator_metrics': '''
+            INSERT INTO validator_metrics 
+            (timestamp, state, ledger_seq, peers, load_factor, node)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''',
+        'state_transitions': '''
+            INSERT INTO state_transitions 
+            (timestamp, old_state, new_state, duration_in_old_state, 
+             ledger_seq, peers, load_factor, node)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        # INSERT OR REPLACE handles duplicate ledger sequences
+        'ledger_validations': '''
+            INSERT OR REPLACE INTO ledger_validations
+            (timestamp, ledger_seq, state, was_proposing,
+             should_validate, did_validate, agreed, peers, load_factor, node,
+             ledger_hash, close_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+    }
+    
+    # Rollup tier -> bucket width in seconds. Each tier is built from the
+    # one before it (1m from raw rows, 1h from 1m buckets).
+    ROLLUP_TIERS = {
+        '1m': 60,
+        '1h': 3600
+    }
+    
+    # States whose time share is kept per bucket (<state>_seconds columns)
+    ROLLUP_STATES = ('disconnected', 'connected', 'syncing', 'tracking',
+                     'full', 'validating', 'proposing')
+    
+    # Validation counts kept per bucket
+    ROLLUP_VALIDATIONS = ('ledgers', 'expected', 'validated', 'agreed', 'missed', 'disagreed')
+    
+    # Longest gap between two metrics rows still counted as time in a state
+    # (a longer gap means the monitor was down)
+    ROLLUP_MAX_DWELL = 60
+    
+    # Prunable table -> (time column, column that identifies a row within a node)
+    RETENTION_COLUMNS = {
+        'validator_metrics': ('timestamp', 'id'),
+        'ledger_validations': ('timestamp', 'ledger_seq'),
+        'rollup_1m': ('bucket', 'bucket'),
+        'rollup_1h': ('bucket', 'bucket')
+    }
+    
+    # Typical spacing of raw metrics rows (history tier selection)
+    RAW_INTERVAL = 3
+    
+    # Range-readable table -> {range key: keyset columns}. The keyset is
+    # unique within a node and leads with the range key, so each page
+    # resumes with an index seek after the last row of the one before.
+    RANGE_KEYS = {
+        'validator_metrics': {'timestamp': ('timestamp', 'id')},
+        'state_transitions': {'timestamp': ('timestamp', 'id')},
+        'ledger_validations': {'timestamp': ('timestamp', 'ledger_seq'),
+                               'ledger_seq': ('ledger_seq',)},
+        'rollup_1m': {'timestamp': ('bucket',)},
+        'rollup_1h': {'timestamp': ('bucket',)}
+    }
+    
+    # Columns holding state codes, returned as names by range reads
+    STATE_COLUMNS = ('state', 'old_state', 'new_state')
+    
+    def __init__(self, db_path: str, cache_size_mb: float = 16, mmap_size_mb: float = 64,
+                 synchronous: str = 'NORMAL', busy_timeout: float = 10,
+                 max_readers: int = 8, readonly: bool = False, prometheus=None):
         """
         Initialize database
         
         Args:
             db_path: Path to SQLite database file
+            cache_size_mb: Page cache per connection
+            mmap_size_mb: Memory-mapped I/O window (0 disables)
+            synchronous: SQLite synchronous mode. NORMAL only syncs on WAL
+                         checkpoints; a power loss can drop the last commits
+                         but never corrupts the database.
+            busy_timeout: Seconds to wait for a lock held by another process
+            max_readers: Queries allowed to run at the same time (others
+                         wait for a free slot)
+            readonly: Open without a writer - for tools reading a database
+                      the monitor owns. Nothing is created or migrated.
+            prometheus: PrometheusExporter for reader and lock wait metrics
+        
+        Raises:
+            ValueError: If readonly and the database is missing or has not
+                        been migrated to the current layout yet
         """
         self.db_path = db_path
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.synchronous = synchronous
+        self.busy_timeout = busy_timeout
+        self.readonly = readonly
+        self.prometheus = prometheus
+        
+        # Group commit (see enable_write_buffer)
+        self.write_buffer = None
+        
+        # State name <-> code (server_states), filled by _init_db
+        self._state_ids = {}
+        self._state_names = {}
+        
+        # Read-only connections, checked out per query: at most max_readers
+        # are ever opened, and idle ones wait in _idle_readers for the next
+        # query on any thread
+        self.max_readers = max_readers
+        self._local = threading.local()
+        self._readers = []
+        self._idle_readers = []
+        self._readers_lock = threading.Lock()
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self.active_readers = 0
+        
+        self._write_lock = threading.RLock()
+        if readonly:
+            if not os.path.exists(db_path):
+                raise ValueError(f"No database at {db_path}")
+            self._writer = None
+            self._load_states()
+            return
         
         # Ensure directory exists
         db_dir = os.path.dirname(db_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
         
+        # One long-lived writer shared by all threads
+        self._writer = self._connect()
+        self._writer.execute('PRAGMA journal_mode=WAL')
+        
         # Initialize database
         self._init_db()
     
+    def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+        """
+        Open a connection with the performance pragmas applied
+        
+        Read-only connections are opened with a mode=ro URI, so SQLite
+        itself refuses writes. In WAL mode they read their own snapshot
+        and never take a lock that holds up the writer.
+        """
+        path = self.db_path
+        if readonly:
+            path = f"file:{urllib.request.pathname2url(os.path.abspath(path))}?mode=ro"
+        # Statements are compiled once per connection and reused from its cache
+        conn = sqlite3.connect(path, timeout=self.busy_timeout, uri=readonly,
+                               check_same_thread=False, cached_statements=256)
+        if not readonly:
+            conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_mb * 1024)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size_mb * 1024 * 1024)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
     @contextmanager
     def get_connection(self):
         """
-        Context manager for database connections
+        Context manager for writes: the shared writer connection, committed
+        on success and rolled back on error
         """
-        conn = sqlite3.connect(self.db_path)
+        if self._writer is None:
+            raise sqlite3.OperationalError('attempt to write a readonly database')
+        started = time.perf_counter()
+        with self._write_lock:
+            if self.prometheus:
+                self.prometheus.observe_db_lock_wait('writer', time.perf_counter() - started)
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    @contextmanager
+    def get_reader(self):
+        """
+        Context manager for queries: a read-only connection from the pool
+        
+        In WAL mode readers never block the writer or each other. At most
+        max_readers queries run at once; the time spent waiting for a slot
+        is exported as lock wait. The connection goes back to the pool
+        when the block ends, so threads that come and go don't each keep
+        one open. Nested use on one thread shares the outer connection and
+        slot.
+        """
+        if getattr(self._local, 'depth', 0):
+            self._local.depth += 1
+            try:
+                yield self._local.reader
+            finally:
+                self._local.depth -= 1
+            return
+        
+        started = time.perf_counter()
+        self._reader_slots.acquire()
+        conn = None
         try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+            with self._readers_lock:
+                if self._idle_readers:
+                    conn = self._idle_readers.pop()
+            if conn is None:
+                # Only while fewer than max_readers exist - every open
+                # connection is either idle or holds a slot
+                conn = self._connect(readonly=True)
+                with self._readers_lock:
+                    self._readers.append(conn)
+                    if self.prometheus:
+                        self.prometheus.update_db_reader_connections(len(self._readers))
+            self._local.reader = conn
+            with self._readers_lock:
+                self.active_readers += 1
+                active = self.active_readers
+            if self.prometheus:
+                self.prometheus.observe_db_lock_wait('reader', time.perf_counter() - started)
+                self.prometheus.update_db_readers_active(active)
+            self._local.depth = 1
+            try:
+                yield conn
+            finally:
+                self._local.depth = 0
+                self._local.reader = None
+                with self._readers_lock:
+                    self.active_readers -= 1
+                    active = self.active_readers
+                if self.prometheus:
+                    self.prometheus.update_db_readers_active(active)
         finally:
-            conn.close()
+            if conn is not None:
+                with self._readers_lock:
+                    if conn in self._readers:
+                        self._idle_readers.append(conn)
+            self._reader_slots.release()
+    
+    def enable_write_buffer(self, max_rows: int = 200, max_delay: float = 1.0,
+                            prometheus=None) -> 'WriteBuffer':
+        """
+        Group metrics, transition and validation rows into fewer commits
+        
+        Args:
+            max_rows: Buffered rows that trigger a flush
+            max_delay: Longest time a row waits in memory (seconds) - the
+                       most that is lost if the process dies
+            prometheus: PrometheusExporter for commit size / flush latency
+            
+        Returns:
+            The started WriteBuffer
+        """
+        if self.write_buffer is None:
+            self.write_buffer = WriteBuffer(self, max_rows=max_rows, max_delay=max_delay,
+                                            prometheus=prometheus)
+            self.write_buffer.start()
+        return self.write_buffer
+    
+    def _insert(self, table: str, row: tuple, flush: bool = False):
+        """
+        Insert one row now, or hand it to the write buffer
+        
+        Args:
+            table: Key of INSERTS
+            row: Values in INSERTS column order
+            flush: Commit the buffer right away (events that must not wait)
+        """
+        if self.write_buffer is not None:
+            self.write_buffer.add(table, row, flush=flush)
+            return
+        with self.get_connection() as conn:
+            conn.execute(self.INSERTS[table], row)
+    
+    def close(self):
+        """Close all connections (refresh query planner statistics first)"""
+        if self.write_buffer is not None:
+            self.write_buffer.stop()
+            self.write_buffer = None
+        if self._writer is not None:
+            with self._write_lock:
+                try:
+                    self._writer.execute('PRAGMA optimize')
+                except sqlite3.Error:
+                    pass
+                self._writer.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._idle_readers.clear()
     
     def _init_db(self):
         """
         Initialize database schema
+        
+        The layout version is kept in PRAGMA user_version. Databases from
+        before versioning (0) are rebuilt into the current layout once; new
+        databases are created in it directly.
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Simple metrics table - just the basics for now
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS validator_metrics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp REAL NOT NULL,
-                    server_state TEXT NOT NULL,
-                    ledger_seq INTEGER NOT NULL,
-                    peers INTEGER,
-                    load_factor REAL
-                )
-            ''')
-            
-            # Index for fast time-based queries
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_timestamp 
-                ON validator_metrics(timestamp)
-            ''')
-            
-            # Index for ledger sequence queries
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_ledger_seq 
-                ON validator_metrics(ledger_seq)
-            ''')
-            
-            # State transitions table - tracks every state change
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS state_transitions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp REAL NOT NULL,
-                    old_state TEXT NOT NULL,
-                    new_state TEXT NOT NULL,
-                    duration_in_old_state REAL,
-                    ledger_seq INTEGER,
-                    peers INTEGER,
-                    load_factor REAL
-                )
-            ''')
-            
-            # Index for time-based queries
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_transitions_timestamp 
-                ON state_transitions(timestamp)
-            ''')
-            
-            # Index for finding specific state changes
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_transitions_states 
-                ON state_transitions(old_state, new_state)
-            ''')
-            
-            # Validation tracking table - tracks ledger-by-ledger validation
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS ledger_validations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp REAL NOT NULL,
-                    ledger_seq INTEGER NOT NULL UNIQUE,
-                    server_state TEXT NOT NULL,
-                    was_proposing BOOLEAN NOT NULL,
-                    should_validate BOOLEAN NOT NULL,
-                    did_validate BOOLEAN,
-                    agreed BOOLEAN,
-                    peers INTEGER,
-                    load_factor REAL
-                )
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            migrated = version < 1 and self._table_exists(cursor, 'validator_metrics')
+            if migrated:
+                self._migrate_v1(cursor)
+            self._create_schema(cursor)
+            cursor.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        
+        self._load_states()
+        self._enable_incremental_vacuum(rebuild=migrated)
+    
+    def _load_states(self):
+        """Fill the state name <-> code maps from server_states"""
+        with self.get_reader() as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version < self.SCHEMA_VERSION:
+                raise ValueError(f"{self.db_path} has schema version {version} - start the "
+                                 f"monitor once to migrate it to {self.SCHEMA_VERSION}")
+            for code, name in conn.execute('SELECT id, name FROM server_states'):
+                self._state_ids[name] = code
+                self._state_names[code] = name
+    
+    def _table_exists(self, cursor, table: str) -> bool:
+        """True if the database has a table called table"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+    
+    def _create_schema(self, cursor):
+        """Create any missing tables and indexes of the current layout"""
+        # Integer codes for server states, stored instead of the names
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS server_states (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.executemany('INSERT OR IGNORE INTO server_states (id, name) VALUES (?, ?)',
+                           [(code, name) for name, code in self.STATE_CODES.items()])
+        
+        # Simple metrics table - just the basics for now
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS validator_metrics (
+                id INTEGER PRIMARY KEY,
+                timestamp REAL NOT NULL,
+                state INTEGER NOT NULL,
+                ledger_seq INTEGER NOT NULL,
+                peers INTEGER,
+                load_factor REAL,
+                node TEXT NOT NULL DEFAULT '{DEFAULT_NODE}'
+            )
+        ''')
+        
+        # State transitions table - tracks every state change
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS state_transitions (
+                id INTEGER PRIMARY KEY,
+                timestamp REAL NOT NULL,
+                old_state INTEGER NOT NULL,
+                new_state INTEGER NOT NULL,
+                duration_in_old_state REAL,
+                ledger_seq INTEGER,
+                peers INTEGER,
+                load_factor REAL,
+                node TEXT NOT NULL DEFAULT '{DEFAULT_NODE}'
+            )
+        ''')
+        
+        # Validation tracking table - one row per node and ledger. The
+        # key is the table itself, so no separate unique index is kept.
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS ledger_validations (
+                node TEXT NOT NULL DEFAULT '{DEFAULT_NODE}',
+                ledger_seq INTEGER NOT NULL,
+                timestamp REAL NOT NULL,
+                state INTEGER NOT NULL,
+                was_proposing BOOLEAN NOT NULL,
+                should_validate BOOLEAN NOT NULL,
+                did_validate BOOLEAN,
+                agreed BOOLEAN,
+                peers INTEGER,
+                load_factor REAL,
+                ledger_hash TEXT,
+                close_time REAL,
+                PRIMARY KEY (node, ledger_seq)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Skipped ledgers waiting to be backfilled (survives restarts)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS backfill_queue (
+                node TEXT NOT NULL DEFAULT '{DEFAULT_NODE}',
+                ledger_seq INTEGER NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                queued_at REAL NOT NULL,
+                PRIMARY KEY (node, ledger_seq)
+            )
+        ''')
+        
+        # Compact poller state for warm restarts (one row per node)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS poller_checkpoint (
+                node TEXT PRIMARY KEY,
+                saved_at REAL NOT NULL,
+                server_state TEXT,
+                state_entered_at REAL,
+                last_ledger_seq INTEGER,
+                last_uptime INTEGER,
+                window_base INTEGER,
+                window_bits BLOB
+            )
+        ''')
+        
+        # Rollup tiers: one row per node and bucket
+        state_columns = ''.join(f"{state}_seconds REAL NOT NULL DEFAULT 0,\n"
+                                for state in self.ROLLUP_STATES)
+        validation_columns = ''.join(f"{name} INTEGER NOT NULL DEFAULT 0,\n"
+                                     for name in self.ROLLUP_VALIDATIONS)
+        for tier in self.ROLLUP_TIERS:
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS rollup_{tier} (
+                    node TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    samples INTEGER NOT NULL DEFAULT 0,
+                    ledger_seq_min INTEGER,
+                    ledger_seq_max INTEGER,
+                    peers_min INTEGER,
+                    peers_max INTEGER,
+                    peers_avg REAL,
+                    load_factor_min REAL,
+                    load_factor_max REAL,
+                    load_factor_avg REAL,
+                    {state_columns}
+                    {validation_columns}
+                    PRIMARY KEY (node, bucket)
+                ) WITHOUT ROWID
             ''')
-            
-            # Indexes for validation queries
+        
+        # Every query and the retention policy select by node and time
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_metrics_node_timestamp
+            ON validator_metrics(node, timestamp)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_transitions_node_timestamp
+            ON state_transitions(node, timestamp)
+        ''')
+        
+        # Covers the validation stats queries, which never touch the table
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_validations_node_timestamp
+            ON ledger_validations(node, timestamp, should_validate, did_validate, agreed)
+        ''')
+        
+        # Missed validations only - a small fraction of all ledgers
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_validations_missed
+            ON ledger_validations(node, timestamp)
+            WHERE should_validate AND did_validate = 0
+        ''')
+    
+    def _migrate_v1(self, cursor):
+        """
+        Rebuild a database from before schema versioning
+        
+        - States are stored as server_states codes instead of names
+        - ledger_validations is a WITHOUT ROWID table keyed by
+          (node, ledger_seq) instead of an AUTOINCREMENT id plus a unique
+          index and a duplicate ledger_seq index
+        - AUTOINCREMENT and indexes no query uses are dropped
+        
+        Tables from before multi-node support (no node column) and
+        ledger_validations from before ledger header tracking (no
+        ledger_hash / close_time) are copied with those columns defaulted,
+        so every table is rebuilt exactly once.
+        
+        Runs in one transaction, so an interrupted migration leaves the old
+        layout untouched.
+        """
+        print("Migrating database to schema version 1 (compact layout)...")
+        cursor.execute('BEGIN')
+        
+        tables = ['validator_metrics', 'state_transitions', 'ledger_validations']
+        tables += [f"rollup_{tier}" for tier in self.ROLLUP_TIERS]
+        tables = [table for table in tables if self._table_exists(cursor, table)]
+        for table in tables:
+            # Renamed tables keep their indexes - drop them to free the names
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_validations_timestamp 
-                ON ledger_validations(timestamp)
+                SELECT name FROM sqlite_master
+                WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+            ''', (table,))
+            for (index,) in cursor.fetchall():
+                cursor.execute(f'DROP INDEX {index}')
+            cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_v0')
+        
+        self._create_schema(cursor)
+        
+        default_node = f"'{DEFAULT_NODE}'"
+        
+        # Every state name already stored gets a code
+        for table, columns in (('validator_metrics', ('server_state',)),
+                               ('state_transitions', ('old_state', 'new_state')),
+                               ('ledger_validations', ('server_state',))):
+            if table in tables:
+                for column in columns:
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO server_states (name)
+                        SELECT DISTINCT {column} FROM {table}_v0
+                    ''')
+        
+        if 'validator_metrics' in tables:
+            node = self._v0_column(cursor, 'validator_metrics', 'm', 'node', default_node)
+            cursor.execute(f'''
+                INSERT INTO validator_metrics
+                (id, timestamp, state, ledger_seq, peers, load_factor, node)
+                SELECT m.id, m.timestamp, s.id, m.ledger_seq, m.peers, m.load_factor, {node}
+                FROM validator_metrics_v0 m
+                JOIN server_states s ON s.name = m.server_state
+                ORDER BY m.id
             ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_validations_ledger 
-                ON ledger_validations(ledger_seq)
+        
+        if 'state_transitions' in tables:
+            node = self._v0_column(cursor, 'state_transitions', 't', 'node', default_node)
+            cursor.execute(f'''
+                INSERT INTO state_transitions
+                (id, timestamp, old_state, new_state, duration_in_old_state,
+                 ledger_seq, peers, load_factor, node)
+                SELECT t.id, t.timestamp, o.id, n.id, t.duration_in_old_state,
+                       t.ledger_seq, t.peers, t.load_factor, {node}
+                FROM state_transitions_v0 t
+                JOIN server_states o ON o.name = t.old_state
+                JOIN server_states n ON n.name = t.new_state
+                ORDER BY t.id
             ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_validations_should 
-                ON ledger_validations(should_validate, did_validate)
+        
+        if 'ledger_validations' in tables:
+            node = self._v0_column(cursor, 'ledger_validations', 'v', 'node', default_node)
+            ledger_hash = self._v0_column(cursor, 'ledger_validations', 'v', 'ledger_hash')
+            close_time = self._v0_column(cursor, 'ledger_validations', 'v', 'close_time')
+            # Key order makes the copy append-only
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO ledger_validations
+                (node, ledger_seq, timestamp, state, was_proposing, should_validate,
+                 did_validate, agreed, peers, load_factor, ledger_hash, close_time)
+                SELECT {node}, v.ledger_seq, v.timestamp, s.id, v.was_proposing,
+                       v.should_validate, v.did_validate, v.agreed, v.peers,
+                       v.load_factor, {ledger_hash}, {close_time}
+                FROM ledger_validations_v0 v
+                JOIN server_states s ON s.name = v.server_state
+                ORDER BY {node}, v.ledger_seq
             ''')
+        
+        columns = ', '.join(self._rollup_columns())
+        for tier in self.ROLLUP_TIERS:
+            if f"rollup_{tier}" in tables:
+                cursor.execute(f'''
+                    INSERT INTO rollup_{tier} ({columns})
+                    SELECT {columns} FROM rollup_{tier}_v0
+                    ORDER BY node, bucket
+                ''')
+        
+        for table in tables:
+            cursor.execute(f'DROP TABLE {table}_v0')
+        
+        # Planner statistics, so the small partial index is preferred
+        cursor.execute('PRAGMA analysis_limit=1000')
+        cursor.execute('ANALYZE')
+    
+    def _v0_column(self, cursor, table: str, alias: str, column: str,
+                   default: str = 'NULL') -> str:
+        """
+        SQL for a column of a renamed pre-v1 table
+        
+        Returns:
+            alias.column, or default if the old table predates the column
+        """
+        cursor.execute(f"PRAGMA table_info({table}_v0)")
+        if column in [row[1] for row in cursor.fetchall()]:
+            return f"{alias}.{column}"
+        return default
+    
+    def _enable_incremental_vacuum(self, rebuild: bool = False):
+        """
+        Switch the database to incremental auto-vacuum
+        
+        Pages freed by pruning then go back to the filesystem a few at a
+        time (incremental_vacuum) instead of needing a full VACUUM. The
+        mode only takes effect after a VACUUM, which is instant for a new
+        database and done once for an existing one.
+        
+        Args:
+            rebuild: VACUUM even if the mode is already set (after a
+                     migration, to give the old layout's pages back)
+        """
+        with self._write_lock:
+            conn = self._writer
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2 and not rebuild:
+                return
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            if conn.execute("SELECT COUNT(*) FROM validator_metrics").fetchone()[0]:
+                print("Compacting database (one-time VACUUM)...")
+            conn.execute('VACUUM')
     
+    def state_id(self, name: str) -> int:
+        """
+        Integer code stored for a server state
+        
+        States not seen before are added to server_states with the next
+        free code.
+        """
+        code = self._state_ids.get(name)
+        if code is None:
+            with self.get_connection() as conn:
+                conn.execute('INSERT OR IGNORE INTO server_states (name) VALUES (?)', (name,))
+                code = conn.execute('SELECT id FROM server_states WHERE name = ?',
+                                    (name,)).fetchone()[0]
+            self._state_names[code] = name
+            self._state_ids[name] = code
+        return code
+    
+    def state_name(self, code: Optional[int]) -> Optional[str]:
+        """Server state stored as code (codes added by another process are looked up)"""
+        if code is None:
+            return None
+        name = self._state_names.get(code)
+        if name is None:
+            with self.get_reader() as conn:
+                row = conn.execute('SELECT name FROM server_states WHERE id = ?', (code,)).fetchone()
+            name = row[0] if row else 'unknown'
+            self._state_names[code] = name
+        return name
+    
+    @timed('db.write_metrics')
     def write_metrics(self, timestamp: float, server_state: str, 
-                     ledger_seq: int, peers: int, load_factor: float):
+                     ledger_seq: int, peers: int, load_factor: float,
+                     node: str = DEFAULT_NODE):
         """
         Write validator metrics to database
         
@@ -148,34 +686,42 @@ class Database:
             ledger_seq: Ledger sequence number
             peers: Number of peers
             load_factor: Load factor
+            node: Monitored node name
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO validator_metrics 
-                (timestamp, server_state, ledger_seq, peers, load_factor)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (timestamp, server_state, ledger_seq, peers, load_factor))
+        self._insert('validator_metrics',
+                     (timestamp, self.state_id(server_state), ledger_seq, peers, load_factor, node))
     
-    def get_latest_metrics(self, limit: int = 10):
+    def get_latest_metrics(self, limit: int = 10, node: Optional[str] = None):
         """
         Get latest metrics from database
         
         Args:
             limit: Number of records to retrieve
+            node: Only this node's records (default: all nodes)
             
         Returns:
             List of tuples (timestamp, state, ledger_seq, peers, load_factor)
         """
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT timestamp, server_state, ledger_seq, peers, load_factor
-                FROM validator_metrics
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
-            return cursor.fetchall()
+            if node is None:
+                # Newest rows written (there is no node-less time index)
+                cursor.execute('''
+                    SELECT timestamp, state, ledger_seq, peers, load_factor
+                    FROM validator_metrics
+                    ORDER BY id DESC
+                    LIMIT ?
+                ''', (limit,))
+            else:
+                cursor.execute('''
+                    SELECT timestamp, state, ledger_seq, peers, load_factor
+                    FROM validator_metrics
+                    WHERE node = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                ''', (node, limit))
+            return [(timestamp, self.state_name(state), ledger_seq, peers, load_factor)
+                    for timestamp, state, ledger_seq, peers, load_factor in cursor.fetchall()]
     
     def get_record_count(self) -> int:
         """
@@ -184,14 +730,16 @@ class Database:
         Returns:
             Number of records
         """
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT COUNT(*) FROM validator_metrics')
             return cursor.fetchone()[0]
     
+    @timed('db.write_state_transition')
     def write_state_transition(self, timestamp: float, old_state: str, 
                               new_state: str, duration: float,
-                              ledger_seq: int, peers: int, load_factor: float):
+                              ledger_seq: int, peers: int, load_factor: float,
+                              node: str = DEFAULT_NODE):
         """
         Write state transition to database
         
@@ -203,41 +751,53 @@ class Database:
             ledger_seq: Current ledger sequence
             peers: Number of peers
             load_factor: Load factor
+            node: Monitored node name
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO state_transitions 
-                (timestamp, old_state, new_state, duration_in_old_state, 
-                 ledger_seq, peers, load_factor)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (timestamp, old_state, new_state, duration, 
-                  ledger_seq, peers, load_factor))
+        # Transitions are rare and matter most - commit them immediately
+        self._insert('state_transitions',
+                     (timestamp, self.state_id(old_state), self.state_id(new_state), duration,
+                      ledger_seq, peers, load_factor, node),
+                     flush=True)
     
-    def get_latest_transitions(self, limit: int = 10):
+    def get_latest_transitions(self, limit: int = 10, node: Optional[str] = None):
         """
         Get latest state transitions
         
         Args:
             limit: Number of transitions to retrieve
+            node: Only this node's transitions (default: all nodes)
             
         Returns:
             List of tuples (timestamp, old_state, new_state, duration)
         """
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT timestamp, old_state, new_state, duration_in_old_state
-                FROM state_transitions
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
-            return cursor.fetchall()
+            if node is None:
+                # Newest rows written (there is no node-less time index)
+                cursor.execute('''
+                    SELECT timestamp, old_state, new_state, duration_in_old_state
+                    FROM state_transitions
+                    ORDER BY id DESC
+                    LIMIT ?
+                ''', (limit,))
+            else:
+                cursor.execute('''
+                    SELECT timestamp, old_state, new_state, duration_in_old_state
+                    FROM state_transitions
+                    WHERE node = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                ''', (node, limit))
+            return [(timestamp, self.state_name(old_state), self.state_name(new_state), duration)
+                    for timestamp, old_state, new_state, duration in cursor.fetchall()]
     
+    @timed('db.write_ledger_validation')
     def write_ledger_validation(self, timestamp: float, ledger_seq: int,
                                 server_state: str, was_proposing: bool,
                                 should_validate: bool, did_validate: Optional[bool],
-                                agreed: Optional[bool], peers: int, load_factor: float):
+                                agreed: Optional[bool], peers: int, load_factor: float,
+                                node: str = DEFAULT_NODE, ledger_hash: Optional[str] = None,
+                                close_time: Optional[float] = None):
         """
         Write ledger validation record
         
@@ -251,24 +811,225 @@ class Database:
             agreed: Did validation agree with network (None if didn't validate)
             peers: Number of peers
             load_factor: Load factor
+            node: Monitored node name
+            ledger_hash: Ledger hash (None if not known)
+            close_time: Ledger close time as a Unix timestamp (None if not known)
+        """
+        self._insert('ledger_validations',
+                     (timestamp, ledger_seq, self.state_id(server_state), was_proposing,
+                      should_validate, did_validate, agreed, peers, load_factor, node,
+                      ledger_hash, close_time))
+    
+    def queue_backfill(self, ledger_seqs: List[int], node: str = DEFAULT_NODE):
+        """
+        Add skipped ledgers to the backfill queue
+        
+        Args:
+            ledger_seqs: Ledger sequence numbers to backfill
+            node: Monitored node name
         """
+        now = time.time()
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # Use INSERT OR REPLACE to handle duplicate ledger sequences
+            cursor.executemany('''
+                INSERT OR IGNORE INTO backfill_queue (node, ledger_seq, queued_at)
+                VALUES (?, ?, ?)
+            ''', [(node, seq, now) for seq in ledger_seqs])
+    
+    def get_backfill_batch(self, limit: int = 32, node: str = DEFAULT_NODE) -> List[Tuple[int, int]]:
+        """
+        Get queued ledgers, newest first
+        
+        Args:
+            limit: Maximum number of ledgers
+            node: Monitored node name
+            
+        Returns:
+            List of (ledger_seq, attempts) tuples
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
             cursor.execute('''
-                INSERT OR REPLACE INTO ledger_validations
-                (timestamp, ledger_seq, server_state, was_proposing,
-                 should_validate, did_validate, agreed, peers, load_factor)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (timestamp, ledger_seq, server_state, was_proposing,
-                  should_validate, did_validate, agreed, peers, load_factor))
+                SELECT ledger_seq, attempts FROM backfill_queue
+                WHERE node = ?
+                ORDER BY ledger_seq DESC
+                LIMIT ?
+            ''', (node, limit))
+            return cursor.fetchall()
+    
+    def count_backfill_pending(self, node: str = DEFAULT_NODE) -> int:
+        """Number of ledgers waiting to be backfilled for node"""
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM backfill_queue WHERE node = ?', (node,))
+            return cursor.fetchone()[0]
+    
+    def remove_backfill(self, ledger_seqs: List[int], node: str = DEFAULT_NODE):
+        """Remove finished (or abandoned) ledgers from the backfill queue"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('DELETE FROM backfill_queue WHERE node = ? AND ledger_seq = ?',
+                               [(node, seq) for seq in ledger_seqs])
+    
+    def record_backfill_failure(self, ledger_seqs: List[int], node: str = DEFAULT_NODE):
+        """Count one more failed attempt for each ledger"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE backfill_queue SET attempts = attempts + 1
+                WHERE node = ? AND ledger_seq = ?
+            ''', [(node, seq) for seq in ledger_seqs])
+    
+    def write_checkpoint(self, saved_at: float, server_state: Optional[str],
+                         state_entered_at: Optional[float], last_ledger_seq: Optional[int],
+                         last_uptime: Optional[int], window_base: Optional[int],
+                         window_bits: bytes, node: str = DEFAULT_NODE):
+        """
+        Replace a node's warm restart checkpoint
+        
+        Args:
+            saved_at: Unix timestamp of the checkpoint
+            server_state: Current server state
+            state_entered_at: Unix timestamp the current state was entered
+            last_ledger_seq: Last validated ledger seen
+            last_uptime: rippled uptime at the last poll
+            window_base: Oldest ledger covered by window_bits
+            window_bits: Bitmap of recently checked ledgers (LedgerWindow.to_bits)
+            node: Monitored node name
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO poller_checkpoint
+                (node, saved_at, server_state, state_entered_at, last_ledger_seq,
+                 last_uptime, window_base, window_bits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (node, saved_at, server_state, state_entered_at, last_ledger_seq,
+                  last_uptime, window_base, window_bits))
+    
+    def get_checkpoint(self, node: str = DEFAULT_NODE) -> Optional[Dict[str, Any]]:
+        """
+        Get a node's warm restart checkpoint
+        
+        Args:
+            node: Monitored node name
+            
+        Returns:
+            Dict with the write_checkpoint fields, or None if never saved
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT saved_at, server_state, state_entered_at, last_ledger_seq,
+                       last_uptime, window_base, window_bits
+                FROM poller_checkpoint
+                WHERE node = ?
+            ''', (node,))
+            row = cursor.fetchone()
+        
+        if row is None:
+            return None
+        return {
+            'saved_at': row[0],
+            'server_state': row[1],
+            'state_entered_at': row[2],
+            'last_ledger_seq': row[3],
+            'last_uptime': row[4],
+            'window_base': row[5],
+            'window_bits': bytes(row[6] or b'')
+        }
+    
+    def get_last_metrics(self, node: str = DEFAULT_NODE) -> Optional[Tuple[float, str, int]]:
+        """
+        Get a node's most recent metrics row (indexed, no scan)
+        
+        Returns:
+            Tuple (timestamp, server_state, ledger_seq), or None
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT timestamp, state, ledger_seq
+                FROM validator_metrics
+                WHERE node = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (node,))
+            row = cursor.fetchone()
+        return None if row is None else (row[0], self.state_name(row[1]), row[2])
+    
+    def get_last_transition(self, node: str = DEFAULT_NODE) -> Optional[Tuple[float, str, str]]:
+        """
+        Get a node's most recent state transition (indexed, no scan)
+        
+        Returns:
+            Tuple (timestamp, old_state, new_state), or None
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT timestamp, old_state, new_state
+                FROM state_transitions
+                WHERE node = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (node,))
+            row = cursor.fetchone()
+        return None if row is None else (row[0], self.state_name(row[1]), self.state_name(row[2]))
+    
+    def get_ledger_validation_seqs(self, start_seq: int, end_seq: int,
+                                   node: str = DEFAULT_NODE) -> List[int]:
+        """
+        Get the ledgers with a validation record in [start_seq, end_seq]
+        
+        A range scan of the (node, ledger_seq) key.
+        
+        Args:
+            start_seq: First ledger (inclusive)
+            end_seq: Last ledger (inclusive)
+            node: Monitored node name
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT ledger_seq FROM ledger_validations
+                WHERE node = ? AND ledger_seq BETWEEN ? AND ?
+            ''', (node, start_seq, end_seq))
+            return [row[0] for row in cursor.fetchall()]
+    
+    def get_missed_ledgers(self, since: float, node: str = DEFAULT_NODE,
+                           limit: int = 100) -> List[Tuple[int, float]]:
+        """
+        Get ledgers the validator should have validated but did not, newest first
+        
+        Reads only the partial idx_validations_missed index.
+        
+        Args:
+            since: Oldest timestamp included
+            node: Monitored node name
+            limit: Maximum number of ledgers
+            
+        Returns:
+            List of (ledger_seq, timestamp) tuples
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT ledger_seq, timestamp FROM ledger_validations
+                WHERE node = ? AND timestamp >= ? AND should_validate AND did_validate = 0
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ''', (node, since, limit))
+            return cursor.fetchall()
     
-    def get_validation_stats(self, hours: int = 24) -> Dict[str, Any]:
+    @timed('db.get_validation_stats')
+    def get_validation_stats(self, hours: int = 24, node: str = DEFAULT_NODE) -> Dict[str, Any]:
         """
         Get validation statistics for the last N hours
         
         Args:
             hours: Number of hours to look back
+            node: Monitored node name
             
         Returns:
             Dictionary with validation statistics
@@ -276,7 +1037,7 @@ class Database:
         import time
         cutoff = time.time() - (hours * 3600)
         
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.cursor()
             
             # Get counts
@@ -289,8 +1050,8 @@ class Database:
                     SUM(CASE WHEN should_validate AND NOT did_validate THEN 1 ELSE 0 END) as missed,
                     SUM(CASE WHEN did_validate AND NOT agreed THEN 1 ELSE 0 END) as disagreed
                 FROM ledger_validations
-                WHERE timestamp >= ?
-            ''', (cutoff,))
+                WHERE node = ? AND timestamp >= ?
+            ''', (node, cutoff))
             
             row = cursor.fetchone()
             
@@ -318,19 +1079,53 @@ class Database:
 
 
 
-    def get_validation_stats_period(self, hours: int = 1):
+    def get_validation_bucket_counts(self, since: float, bucket_seconds: int = 60,
+                                     node: str = DEFAULT_NODE) -> List[Tuple]:
+        """
+        Validation counts per time bucket (seeds RollingValidationStats)
+        
+        Args:
+            since: Oldest timestamp included
+            bucket_seconds: Bucket width
+            node: Monitored node name
+            
+        Returns:
+            List of tuples (bucket id, total, expected, validated, agreed,
+            missed, disagreed, validated_agreed)
+        """
+        with self.get_reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT 
+                    CAST(timestamp / ? AS INTEGER) as bucket,
+                    COUNT(*),
+                    SUM(CASE WHEN should_validate THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN did_validate THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN agreed THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN should_validate AND NOT did_validate THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN did_validate AND NOT agreed THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN did_validate AND agreed THEN 1 ELSE 0 END)
+                FROM ledger_validations
+                WHERE node = ? AND timestamp >= ?
+                GROUP BY bucket
+            ''', (bucket_seconds, node, since))
+            return cursor.fetchall()
+    
+    @timed('db.get_validation_stats_period')
+    def get_validation_stats_period(self, hours: int = 1, node: str = DEFAULT_NODE):
         """
         Get validation statistics for a specific time period
         
         Args:
             hours: Number of hours to look back
+            node: Monitored node name
             
         Returns:
             Dictionary with validation statistics
         """
         cutoff = time.time() - (hours * 3600)
         
-        with self.get_connection() as conn:
+        with self.get_reader() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT 
@@ -338,8 +1133,8 @@ class Database:
                     SUM(CASE WHEN did_validate = 1 AND agreed = 1 THEN 1 ELSE 0 END) as validated_count,
                     SUM(CASE WHEN should_validate = 1 AND did_validate = 0 THEN 1 ELSE 0 END) as missed_count
                 FROM ledger_validations
-                WHERE timestamp >= ?
-            """, (cutoff,))
+                WHERE node = ? AND timestamp >= ?
+            """, (node, cutoff))
             
             row = cursor.fetchone()
             
@@ -364,3 +1159,559 @@ class Database:
                 'agreement_rate': 0,
                 'hours': hours
             }
+    
+    def _rollup_columns(self) -> List[str]:
+        """Column order of the rollup tables"""
+        return (['node', 'bucket', 'samples', 'ledger_seq_min', 'ledger_seq_max',
+                 'peers_min', 'peers_max', 'peers_avg',
+                 'load_factor_min', 'load_factor_max', 'load_factor_avg']
+                + [f"{state}_seconds" for state in self.ROLLUP_STATES]
+                + list(self.ROLLUP_VALIDATIONS))
+    
+    def _rollup_raw(self, conn, width: int, start: float, end: float, node: str) -> List[tuple]:
+        """Aggregate raw metrics and validation rows into buckets of width seconds"""
+        # Time in a state is the gap to the next row, capped so monitor
+        # downtime is not counted. Rows just past the range give the last
+        # row in the range its gap.
+        state_sums = ''.join(f", SUM(CASE WHEN state = {self.state_id(state)} THEN dwell ELSE 0 END)"
+                             for state in self.ROLLUP_STATES)
+        metrics = {}
+        for row in conn.execute(f'''
+            WITH samples AS (
+                SELECT timestamp, state, ledger_seq, peers, load_factor,
+                       MIN(COALESCE(LEAD(timestamp) OVER (ORDER BY timestamp), timestamp) - timestamp,
+                           ?) AS dwell
+                FROM validator_metrics
+                WHERE node = ? AND timestamp >= ? AND timestamp < ?
+            )
+            SELECT CAST(timestamp / ? AS INTEGER) * ? AS bucket, COUNT(*),
+                   MIN(ledger_seq), MAX(ledger_seq),
+                   MIN(peers), MAX(peers), AVG(peers),
+                   MIN(load_factor), MAX(load_factor), AVG(load_factor)
+                   {state_sums}
+            FROM samples
+            WHERE timestamp < ?
+            GROUP BY bucket
+        ''', (self.ROLLUP_MAX_DWELL, node, start, end + self.ROLLUP_MAX_DWELL,
+              width, width, end)):
+            metrics[row[0]] = row[1:]
+        
+        validations = {}
+        for row in conn.execute('''
+            SELECT CAST(timestamp / ? AS INTEGER) * ? AS bucket,
+                COUNT(*),
+                SUM(CASE WHEN should_validate THEN 1 ELSE 0 END),
+                SUM(CASE WHEN did_validate THEN 1 ELSE 0 END),
+                SUM(CASE WHEN agreed THEN 1 ELSE 0 END),
+                SUM(CASE WHEN should_validate AND NOT did_validate THEN 1 ELSE 0 END),
+                SUM(CASE WHEN did_validate AND NOT agreed THEN 1 ELSE 0 END)
+            FROM ledger_validations
+            WHERE node = ? AND timestamp >= ? AND timestamp < ?
+            GROUP BY bucket
+        ''', (width, width, node, start, end)):
+            validations[row[0]] = row[1:]
+        
+        no_metrics = (0,) + (None,) * 8 + (0,) * len(self.ROLLUP_STATES)
+        no_validations = (0,) * len(self.ROLLUP_VALIDATIONS)
+        return [(node, bucket) + tuple(metrics.get(bucket, no_metrics))
+                + tuple(count or 0 for count in validations.get(bucket, no_validations))
+                for bucket in sorted(set(metrics) | set(validations))]
+    
+    def _rollup_tier(self, conn, source: str, width: int, start: float, end: float,
+                     node: str) -> List[tuple]:
+        """Aggregate the buckets of a finer rollup table into buckets of width seconds"""
+        sums = ''.join(f", SUM({column})" for column in
+                       [f"{state}_seconds" for state in self.ROLLUP_STATES]
+                       + list(self.ROLLUP_VALIDATIONS))
+        return conn.execute(f'''
+            SELECT node, bucket / ? * ? AS coarse, SUM(samples),
+                   MIN(ledger_seq_min), MAX(ledger_seq_max),
+                   MIN(peers_min), MAX(peers_max), SUM(peers_avg * samples) / SUM(samples),
+                   MIN(load_factor_min), MAX(load_factor_max),
+                   SUM(load_factor_avg * samples) / SUM(samples)
+                   {sums}
+            FROM rollup_{source}
+            WHERE node = ? AND bucket >= ? AND bucket < ?
+            GROUP BY coarse
+            ORDER BY coarse
+        ''', (width, width, node, start, end)).fetchall()
+    
+    def rollup(self, tier: str, start: float, end: float, node: str = DEFAULT_NODE) -> int:
+        """
+        (Re)build a node's rollup buckets in [start, end)
+        
+        Args:
+            tier: Key of ROLLUP_TIERS
+            start: First bucket start (aligned to the tier width)
+            end: End of the last bucket (aligned to the tier width)
+            node: Monitored node name
+            
+        Returns:
+            Buckets written
+        """
+        tiers = list(self.ROLLUP_TIERS)
+        width = self.ROLLUP_TIERS[tier]
+        columns = self._rollup_columns()
+        
+        with self.get_connection() as conn:
+            if tiers.index(tier) == 0:
+                rows = self._rollup_raw(conn, width, start, end, node)
+            else:
+                source = tiers[tiers.index(tier) - 1]
+                rows = self._rollup_tier(conn, source, width, start, end, node)
+            conn.executemany(f'''
+                INSERT OR REPLACE INTO rollup_{tier} ({', '.join(columns)})
+                VALUES ({', '.join('?' * len(columns))})
+            ''', rows)
+        return len(rows)
+    
+    def get_rollup_end(self, tier: str, node: str = DEFAULT_NODE) -> Optional[int]:
+        """
+        End of a node's newest rollup bucket (None if the tier is empty)
+        """
+        with self.get_reader() as conn:
+            row = conn.execute(f'''
+                SELECT MAX(bucket) FROM rollup_{tier} WHERE node = ?
+            ''', (node,)).fetchone()
+        return None if row[0] is None else row[0] + self.ROLLUP_TIERS[tier]
+    
+    def get_oldest_time(self, table: str, node: str = DEFAULT_NODE) -> Optional[float]:
+        """
+        Oldest timestamp (or bucket) a node has in a prunable table
+        
+        Args:
+            table: Key of RETENTION_COLUMNS
+            node: Monitored node name
+        """
+        column = self.RETENTION_COLUMNS[table][0]
+        with self.get_reader() as conn:
+            row = conn.execute(f'''
+                SELECT MIN({column}) FROM {table} WHERE node = ?
+            ''', (node,)).fetchone()
+        return row[0]
+    
+    @timed('db.prune')
+    def prune(self, table: str, before: float, node: str = DEFAULT_NODE,
+              batch_size: int = 5000) -> int:
+        """
+        Delete a node's rows older than a cutoff
+        
+        Each batch is its own transaction, so regular writes get the
+        writer between batches.
+        
+        Args:
+            table: Key of RETENTION_COLUMNS
+            before: Rows with an older timestamp (or bucket) are deleted
+            node: Monitored node name
+            batch_size: Rows deleted per transaction
+            
+        Returns:
+            Rows deleted
+        """
+        column, key = self.RETENTION_COLUMNS[table]
+        deleted = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.execute(f'''
+                    DELETE FROM {table} WHERE node = ? AND {key} IN (
+                        SELECT {key} FROM {table} WHERE node = ? AND {column} < ? LIMIT ?
+                    )
+                ''', (node, node, before, batch_size))
+                count = cursor.rowcount
+            deleted += count
+            if count < batch_size:
+                return deleted
+    
+    def incremental_vacuum(self, pages: int = 1000) -> int:
+        """
+        Return up to `pages` free pages to the filesystem
+        
+        Returns:
+            Pages released
+        """
+        with self._write_lock:
+            conn = self._writer
+            before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            # execute() would step the pragma once and free a single page
+            conn.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+            after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return before - after
+    
+    def _history_tier(self, start: float, end: float, node: str,
+                      max_points: int) -> Optional[str]:
+        """
+        Pick the table a history query reads (None: raw metrics)
+        
+        Raw rows are used while they still cover start and the range fits
+        in max_points. Otherwise the first rollup tier that does is used,
+        falling back to the coarsest one.
+        """
+        span = max(0, end - start)
+        candidates = [(None, self.RAW_INTERVAL)] + list(self.ROLLUP_TIERS.items())
+        for tier, width in candidates:
+            if span / width > max_points:
+                continue
+            oldest = self.get_oldest_time('rollup_' + tier if tier else 'validator_metrics', node)
+            if oldest is not None and oldest <= start:
+                return tier
+        return candidates[-1][0]
+    
+    def get_metrics_history(self, start: float, end: float, node: str = DEFAULT_NODE,
+                            max_points: int = 1000) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Metrics between start and end from the coarsest tier needed
+        
+        Long or old ranges are answered from the rollup tables, so they
+        never scan raw rows that retention has already pruned (or that
+        would exceed max_points).
+        
+        Args:
+            start: Range start (Unix)
+            end: Range end (Unix, exclusive)
+            node: Monitored node name
+            max_points: Preferred largest number of rows returned
+            
+        Returns:
+            Tuple (resolution in seconds - 0 for raw rows, rows). Every row
+            has time, samples, ledger_seq_max, peers_min/max/avg,
+            load_factor_min/max/avg and state_shares (state -> fraction
+            of the bucket); rollup rows also carry the validation counts.
+        """
+        tier = self._history_tier(start, end, node, max_points)
+        
+        with self.get_reader() as conn:
+            if tier is None:
+                cursor = conn.execute('''
+                    SELECT timestamp, state, ledger_seq, peers, load_factor
+                    FROM validator_metrics
+                    WHERE node = ? AND timestamp >= ? AND timestamp < ?
+                    ORDER BY timestamp
+                ''', (node, start, end))
+                return 0, [{
+                    'time': timestamp,
+                    'samples': 1,
+                    'ledger_seq_max': ledger_seq,
+                    'peers_min': peers, 'peers_max': peers, 'peers_avg': peers,
+                    'load_factor_min': load_factor, 'load_factor_max': load_factor,
+                    'load_factor_avg': load_factor,
+                    'state_shares': {self.state_name(state): 1.0}
+                } for timestamp, state, ledger_seq, peers, load_factor in cursor]
+            
+            width = self.ROLLUP_TIERS[tier]
+            columns = self._rollup_columns()
+            cursor = conn.execute(f'''
+                SELECT {', '.join(columns)} FROM rollup_{tier}
+                WHERE node = ? AND bucket >= ? AND bucket < ?
+                ORDER BY bucket
+            ''', (node, int(start // width) * width, end))
+            rows = []
+            for values in cursor:
+                row = dict(zip(columns, values))
+                seconds = {state: row.pop(f"{state}_seconds") for state in self.ROLLUP_STATES}
+                total = sum(seconds.values())
+                row.pop('node')
+                row['time'] = row.pop('bucket')
+                row['state_shares'] = {state: value / total for state, value in seconds.items()
+                                       if value} if total else {}
+                rows.append(row)
+            return width, rows
+    
+    def range_columns(self, table: str) -> List[str]:
+        """
+        Columns iter_range() returns for a table, in order
+        
+        Args:
+            table: Key of RANGE_KEYS
+        """
+        if table not in self.RANGE_KEYS:
+            raise ValueError(f"Unknown table '{table}' (expected one of {list(self.RANGE_KEYS)})")
+        if table.startswith('rollup_'):
+            return self._rollup_columns()[1:]
+        with self.get_reader() as conn:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        return [column for column in columns if column not in ('id', 'node')]
+    
+    def iter_range(self, table: str, start: Optional[float] = None,
+                   end: Optional[float] = None, node: str = DEFAULT_NODE,
+                   key: str = 'timestamp', page_size: int = 1000) -> Iterator[tuple]:
+        """
+        Stream a node's rows between start and end, oldest first
+        
+        Rows are read a page at a time with keyset pagination: each page
+        is one index range scan starting after the last row returned, and
+        no statement stays open between pages. Memory stays at one page
+        whatever the range, and a slow consumer never holds a read
+        snapshot (or the WAL) open.
+        
+        Args:
+            table: Key of RANGE_KEYS
+            start: First key included (default: the oldest row)
+            end: Key excluded (default: past the newest row)
+            node: Monitored node name
+            key: 'timestamp' or, for ledger_validations, 'ledger_seq'
+                 (rollup buckets are ranged by their start time)
+            page_size: Rows fetched per query
+            
+        Yields:
+            Tuples in range_columns(table) order, states as names
+        """
+        columns = self.range_columns(table)
+        keyset = self.RANGE_KEYS[table].get(key)
+        if keyset is None:
+            raise ValueError(f"{table} cannot be ranged by '{key}' "
+                             f"(expected one of {list(self.RANGE_KEYS[table])})")
+        
+        # Keyset columns not returned are selected after the others
+        extra = [column for column in keyset if column not in columns]
+        selected = columns + extra
+        positions = [selected.index(column) for column in keyset]
+        states = [i for i, column in enumerate(columns) if column in self.STATE_COLUMNS]
+        
+        order = ', '.join(keyset)
+        bounds = []
+        params = [node]
+        if end is not None:
+            bounds.append(f"{keyset[0]} < ?")
+            params.append(end)
+        if start is not None:
+            bounds.append(f"{keyset[0]} >= ?")
+            params.append(start)
+        query = f'''
+            SELECT {', '.join(selected)} FROM {table}
+            WHERE node = ? {''.join(' AND ' + bound for bound in bounds)} {{after}}
+            ORDER BY {order}
+            LIMIT ?
+        '''
+        first_page = query.format(after='')
+        next_page = query.format(after=f"AND ({order}) > ({', '.join('?' * len(keyset))})")
+        
+        last = None
+        while True:
+            with self.get_reader() as conn:
+                if last is None:
+                    cursor = conn.execute(first_page, params + [page_size])
+                else:
+                    cursor = conn.execute(next_page, params + list(last) + [page_size])
+                rows = cursor.fetchmany(page_size)
+                cursor.close()
+            
+            for row in rows:
+                if states or extra:
+                    row = list(row[:len(columns)])
+                    for i in states:
+                        row[i] = self.state_name(row[i])
+                    row = tuple(row)
+                yield row
+            
+            if len(rows) < page_size:
+                return
+            last = tuple(rows[-1][i] for i in positions)
+
+
+class WriteBuffer:
+    """
+    Group commit for Database row inserts
+    
+    Rows are collected in memory and written with one executemany per
+    table in a single transaction. A flush happens when max_rows are
+    buffered, when the oldest row has waited max_delay seconds, when a
+    caller forces one (state transitions) and on stop().
+    
+    A commit that fails with a retryable error (database locked or busy,
+    disk full) puts its rows back in front of the buffer and is retried
+    with exponential backoff. At most max_pending rows are held; beyond
+    that the oldest rows of the largest tables are dropped and counted.
+    
+    Queries do not see buffered rows until they are flushed.
+    """
+    
+    # Longest wait between retries of a failed commit (seconds)
+    MAX_BACKOFF = 30.0
+    
+    def __init__(self, db: Database, max_rows: int = 200, max_delay: float = 1.0,
+                 prometheus=None, max_pending: int = 20000):
+        """
+        Initialize write buffer
+        
+        Args:
+            db: Database the rows are written to
+            max_rows: Buffered rows that trigger a flush
+            max_delay: Longest time a row waits in memory (seconds)
+            prometheus: PrometheusExporter for commit size / flush latency
+            max_pending: Rows kept while commits are failing
+        """
+        self.db = db
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.prometheus = prometheus
+        self.max_pending = max_pending
+        
+        # table -> rows, in arrival order
+        self._pending = {}
+        self._count = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        # Serializes flushes so batches commit in the order they were taken
+        self._flush_lock = threading.Lock()
+        # Consecutive failed commits, and when the next retry is due
+        self._failures = 0
+        self._retry_at = 0.0
+        
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        
+        # Statistics
+        self.commits = 0
+        self.rows_written = 0
+        self.errors = 0
+        self.dropped = 0
+    
+    def add(self, table: str, row: tuple, flush: bool = False):
+        """
+        Buffer one row
+        
+        Args:
+            table: Key of Database.INSERTS
+            row: Values in INSERTS column order
+            flush: Commit the buffer right away
+        """
+        with self._lock:
+            self._pending.setdefault(table, []).append(row)
+            self._count += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                # Start the delay timer for this batch
+                self._wake.set()
+            full = self._count >= self.max_rows
+            # After a failed commit the flush thread retries on its backoff
+            backing_off = time.monotonic() < self._retry_at
+        
+        if (flush or full) and not backing_off:
+            self.flush()
+    
+    @timed('db.flush')
+    def flush(self) -> int:
+        """
+        Commit everything buffered
+        
+        Returns:
+            Rows written (0 if the commit failed - retryable rows stay
+            buffered)
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                count, self._count = self._count, 0
+                oldest, self._oldest = self._oldest, None
+            if not count:
+                return 0
+            
+            started = time.perf_counter()
+            try:
+                with self.db.get_connection() as conn:
+                    for table, rows in pending.items():
+                        conn.executemany(self.db.INSERTS[table], rows)
+            except sqlite3.Error as e:
+                self.errors += 1
+                timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                if isinstance(e, sqlite3.OperationalError):
+                    retry_in = self._requeue(pending, count, oldest)
+                    print(f"[{timestamp_str}] [ERROR] Write buffer flush of {count} rows failed: {e} "
+                          f"(retrying in {retry_in:.1f}s)")
+                else:
+                    # Not going to succeed on a retry (e.g. a constraint)
+                    self.dropped += count
+                    if self.prometheus:
+                        self.prometheus.increment_db_rows_dropped(count)
+                    print(f"[{timestamp_str}] [ERROR] Write buffer flush of {count} rows failed: {e} "
+                          f"(rows dropped)")
+                return 0
+            duration = time.perf_counter() - started
+            self._failures = 0
+            self._retry_at = 0.0
+        
+        self.commits += 1
+        self.rows_written += count
+        if self.prometheus:
+            self.prometheus.observe_db_commit(count, duration)
+        return count
+    
+    def _requeue(self, batch: dict, count: int, oldest: float) -> float:
+        """
+        Put the rows of a failed commit back in front of the buffer
+        
+        Args:
+            batch: table -> rows that were not written
+            count: Rows in batch
+            oldest: When the oldest of them was buffered
+            
+        Returns:
+            Seconds until the retry
+        """
+        self._failures += 1
+        backoff = min(self.max_delay * 2 ** (self._failures - 1), self.MAX_BACKOFF)
+        dropped_before = self.dropped
+        
+        with self._lock:
+            # Rows buffered during the commit go after the failed ones
+            for table, rows in self._pending.items():
+                batch.setdefault(table, []).extend(rows)
+            self._pending = batch
+            self._count += count
+            
+            excess = self._count - self.max_pending
+            if excess > 0:
+                # Drop the oldest rows of the busiest tables first, so rare
+                # rows such as state transitions are the last to go
+                for table in sorted(batch, key=lambda t: len(batch[t]), reverse=True):
+                    dropped = min(excess, len(batch[table]))
+                    del batch[table][:dropped]
+                    excess -= dropped
+                    self._count -= dropped
+                    self.dropped += dropped
+                    if not excess:
+                        break
+            
+            if self._oldest is None or oldest < self._oldest:
+                self._oldest = oldest
+            self._retry_at = time.monotonic() + backoff
+        
+        if self.prometheus and self.dropped > dropped_before:
+            self.prometheus.increment_db_rows_dropped(self.dropped - dropped_before)
+        self._wake.set()
+        return backoff
+    
+    def _run(self):
+        """Flush loop: commit each batch once its oldest row is max_delay old"""
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                oldest = self._oldest
+                retry_at = self._retry_at
+            if oldest is None:
+                continue
+            
+            remaining = max(oldest + self.max_delay, retry_at) - time.monotonic()
+            if remaining > 0 and self._stop.wait(remaining):
+                break
+            self.flush()
+    
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='db-write-buffer', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the flush thread and commit whatever is left"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Rollups - Long-term history tiers and retention for the monitor database
+
+Raw metrics and validation rows are aggregated into 1-minute buckets, and
+those into 1-hour buckets (Database.ROLLUP_TIERS). Once a range is rolled
+up, raw rows past the raw retention are deleted, then minute buckets past
+theirs, and the freed pages are returned with an incremental vacuum.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DAY = 86400
+
+
+class Rollups:
+    """
+    Background rollup, pruning and vacuum for one database
+
+    Buckets are only built once they are `settle` seconds in the past, so
+    rows still sitting in the pipeline or write buffer are never missed.
+    Nothing is pruned before it has been rolled up into the next tier.
+    """
+
+    def __init__(self, db, nodes: List[str], raw_days: float = 14, minute_days: float = 90,
+                 hour_days: float = 0, interval: float = 300, settle: float = 120,
+                 chunk: float = DAY, prune_batch: int = 5000, vacuum_pages: int = 2000,
+                 prometheus=None):
+        """
+        Initialize rollups
+
+        Args:
+            db: Database to maintain
+            nodes: Monitored node names
+            raw_days: Days raw metrics / validation rows are kept (0 = forever).
+                      Keep at least 7 - rolling validation stats are seeded
+                      from raw rows.
+            minute_days: Days 1-minute buckets are kept (0 = forever)
+            hour_days: Days 1-hour buckets are kept (0 = forever)
+            interval: Seconds between maintenance runs
+            settle: Seconds a bucket must be in the past before it is built
+            chunk: Seconds of history rolled up per transaction (catch-up)
+            prune_batch: Rows deleted per transaction
+            vacuum_pages: Most free pages released per run
+            prometheus: PrometheusExporter for pruned row counts
+        """
+        self.db = db
+        self.nodes = list(nodes)
+        self.interval = interval
+        self.settle = settle
+        self.chunk = chunk
+        self.prune_batch = prune_batch
+        self.vacuum_pages = vacuum_pages
+        self.prometheus = prometheus
+
+        # Retention per tier (None = forever); raw covers both raw tables
+        self.retention = {
+            'raw': raw_days * DAY if raw_days else None,
+            '1m': minute_days * DAY if minute_days else None,
+            '1h': hour_days * DAY if hour_days else None
+        }
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Statistics
+        self.runs = 0
+        self.buckets_written = 0
+        self.rows_pruned = 0
+        self.pages_vacuumed = 0
+        self.last_run_duration = 0.0
+
+    def _roll_up_node(self, node: str, now: float) -> int:
+        """Bring every tier of one node up to date"""
+        written = 0
+        source = None
+        source_end = now - self.settle
+        for tier, width in self.db.ROLLUP_TIERS.items():
+            # Only whole buckets whose source data is complete
+            end = int(source_end // width) * width
+            start = self.db.get_rollup_end(tier, node)
+            if start is None:
+                table = 'rollup_' + source if source else 'validator_metrics'
+                oldest = [self.db.get_oldest_time(table, node)]
+                if source is None:
+                    oldest.append(self.db.get_oldest_time('ledger_validations', node))
+                oldest = [t for t in oldest if t is not None]
+                if not oldest:
+                    break
+                start = int(min(oldest) // width) * width
+
+            # Catch up in chunks so the writer is never held for long
+            step = max(width, int(self.chunk // width) * width)
+            while start < end and not self._stop.is_set():
+                chunk_end = min(end, start + step)
+                written += self.db.rollup(tier, start, chunk_end, node)
+                start = chunk_end
+
+            source = tier
+            source_end = self.db.get_rollup_end(tier, node) or 0
+        return written
+
+    def _cutoff(self, retention: Optional[float], tier: Optional[str], node: str,
+                now: float) -> Optional[float]:
+        """
+        Oldest time to keep for a retention, held back until the node has
+        rolled that time up into tier
+        """
+        if retention is None:
+            return None
+        cutoff = now - retention
+        if tier is not None:
+            rolled = self.db.get_rollup_end(tier, node)
+            cutoff = min(cutoff, rolled if rolled is not None else 0)
+        return cutoff
+
+    def _prune(self, now: float) -> Dict[str, int]:
+        """Delete rows past retention"""
+        tiers = list(self.db.ROLLUP_TIERS)
+        pruned = {}
+        for node in self.nodes:
+            raw_cutoff = self._cutoff(self.retention['raw'], tiers[0], node, now)
+            cutoffs = {
+                'validator_metrics': raw_cutoff,
+                'ledger_validations': raw_cutoff
+            }
+            for index, tier in enumerate(tiers):
+                coarser = tiers[index + 1] if index + 1 < len(tiers) else None
+                cutoffs['rollup_' + tier] = self._cutoff(self.retention[tier], coarser, node, now)
+
+            for table, cutoff in cutoffs.items():
+                if cutoff is None or self._stop.is_set():
+                    continue
+                count = self.db.prune(table, cutoff, node=node, batch_size=self.prune_batch)
+                if count:
+                    pruned[table] = pruned.get(table, 0) + count
+                    if self.prometheus:
+                        self.prometheus.increment_db_pruned(table, count)
+        return pruned
+
+    def run_once(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Roll up, prune and vacuum once
+
+        Args:
+            now: Current time (default: time.time())
+
+        Returns:
+            Dict with buckets written, rows pruned and pages vacuumed
+        """
+        now = now or time.time()
+        started = time.monotonic()
+
+        written = sum(self._roll_up_node(node, now) for node in self.nodes)
+        pruned = self._prune(now)
+        vacuumed = self.db.incremental_vacuum(self.vacuum_pages) if self.vacuum_pages else 0
+
+        self.runs += 1
+        self.buckets_written += written
+        self.rows_pruned += sum(pruned.values())
+        self.pages_vacuumed += vacuumed
+        self.last_run_duration = time.monotonic() - started
+
+        if pruned:
+            timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            summary = ', '.join(f"{table}: {count}" for table, count in pruned.items())
+            print(f"[{timestamp_str}] Retention pruned {summary} "
+                  f"({vacuumed} pages released, {self.last_run_duration:.1f}s)")
+
+        return {'buckets': written, 'pruned': sum(pruned.values()), 'vacuumed': vacuumed}
+
+    def _run(self):
+        """Maintenance loop executed by the background thread"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                print(f"[{timestamp_str}] [ERROR] Rollup/retention run failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start maintenance in a background daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='db-rollups', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread
+
+        Args:
+            timeout: Seconds to wait for an in-progress run to finish
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Time Series Store - Dense numeric samples in a memory-mapped ring buffer
+
+Sits next to Database: SQLite keeps events and validations, this keeps
+high-rate numeric series (peers, load factor, latencies) in a fixed-size
+file that never grows and never needs pruning.
+
+File layout (little-endian, NumPy compatible):
+
+    offset 0     header: magic, version, column count, capacity, appends
+    offset 64    column names, 32 bytes each, NUL padded
+    DATA_OFFSET  one float64[capacity] array per column, 'timestamp' first
+
+Slot i of every column belongs to the same sample; the newest sample is
+in slot (appends - 1) % capacity. A column can be mapped without copying:
+
+    numpy.memmap(path, dtype='<f8', mode='r',
+                 offset=store.column_offset('peers'), shape=(store.capacity,))
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class TimeSeriesStore:
+    """
+    Column-per-metric ring buffer in a memory-mapped file
+
+    Appends are O(1): one float written per column and a counter bumped.
+    Range reads binary-search the timestamp column and return memoryview
+    segments straight into the mapping (no copies). Once capacity is
+    reached the oldest samples are overwritten.
+
+    One writer at a time. Segments alias the ring, so a caller that keeps
+    them past later appends should copy them first.
+    """
+
+    MAGIC = b'XRPLTS01'
+    VERSION = 1
+    # magic, version, column count, capacity, total appends
+    HEADER = struct.Struct('<8sIIQQ')
+    APPENDS = struct.Struct('<Q')
+    APPENDS_OFFSET = HEADER.size - APPENDS.size
+    NAME_SIZE = 32
+    NAMES_OFFSET = 64
+    # Columns start on a page boundary
+    DATA_OFFSET = 4096
+    MAX_COLUMNS = (DATA_OFFSET - NAMES_OFFSET) // NAME_SIZE
+
+    def __init__(self, path: str, columns: Sequence[str] = (), capacity: int = 524288,
+                 readonly: bool = False):
+        """
+        Open (or create) a store
+
+        Args:
+            path: Store file
+            columns: Metric column names (a 'timestamp' column is added first)
+            capacity: Samples kept before the oldest are overwritten
+            readonly: Map an existing file read-only (columns and capacity
+                      come from the file)
+
+        Raises:
+            ValueError: If an existing file is not a store, or readonly is
+                        set and its layout differs from the one asked for
+        """
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+
+        wanted = ['timestamp'] + [c for c in columns if c != 'timestamp']
+        if len(wanted) > self.MAX_COLUMNS:
+            raise ValueError(f"At most {self.MAX_COLUMNS - 1} columns are supported")
+
+        layout = self._read_layout(path) if os.path.exists(path) else None
+        if readonly:
+            if layout is None:
+                raise ValueError(f"{path} is not a time series store")
+            self.columns, self.capacity = layout
+        elif layout is None or (columns and layout != (wanted, capacity)):
+            if layout is not None:
+                print(f"Warning: {path} has a different layout - starting a new ring")
+            self.columns, self.capacity = wanted, capacity
+            self._create(path)
+        else:
+            self.columns, self.capacity = layout
+
+        self._file = open(path, 'rb' if readonly else 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0,
+                               access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        buffer = memoryview(self._mmap)
+        self._buffer = buffer
+        self._views = {}
+        for name in self.columns:
+            offset = self.column_offset(name)
+            self._views[name] = buffer[offset:offset + self.capacity * 8].cast('d')
+        self._times = self._views['timestamp']
+        self._metrics = [self._views[name] for name in self.columns[1:]]
+
+    @classmethod
+    def _read_layout(cls, path: str):
+        """(columns, capacity) of an existing file, or None if it is not a store"""
+        with open(path, 'rb') as f:
+            header = f.read(cls.DATA_OFFSET)
+        if len(header) < cls.DATA_OFFSET:
+            return None
+        magic, version, count, capacity, _ = cls.HEADER.unpack_from(header)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            return None
+        names = []
+        for i in range(count):
+            start = cls.NAMES_OFFSET + i * cls.NAME_SIZE
+            names.append(header[start:start + cls.NAME_SIZE].rstrip(b'\0').decode('ascii'))
+        return names, capacity
+
+    def _create(self, path: str):
+        """Write an empty store file (sparse until written)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = bytearray(self.DATA_OFFSET)
+        self.HEADER.pack_into(header, 0, self.MAGIC, self.VERSION, len(self.columns),
+                              self.capacity, 0)
+        for i, name in enumerate(self.columns):
+            encoded = name.encode('ascii')[:self.NAME_SIZE]
+            start = self.NAMES_OFFSET + i * self.NAME_SIZE
+            header[start:start + len(encoded)] = encoded
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.truncate(self.DATA_OFFSET + len(self.columns) * self.capacity * 8)
+
+    def column_offset(self, column: str) -> int:
+        """Byte offset of a column's float64[capacity] array in the file"""
+        return self.DATA_OFFSET + self.columns.index(column) * self.capacity * 8
+
+    @property
+    def appends(self) -> int:
+        """Samples ever appended"""
+        return self.APPENDS.unpack_from(self._mmap, self.APPENDS_OFFSET)[0]
+
+    def __len__(self) -> int:
+        """Samples currently held"""
+        return min(self.appends, self.capacity)
+
+    def append(self, timestamp: float, values: Sequence[Optional[float]]):
+        """
+        Add one sample, overwriting the oldest once full
+
+        Timestamps are kept non-decreasing (a clock stepping back repeats
+        the previous timestamp) so range reads can binary-search.
+
+        Args:
+            timestamp: Unix timestamp
+            values: One value per metric column, in column order (None is
+                    stored as NaN)
+        """
+        with self._lock:
+            appends = self.appends
+            slot = appends % self.capacity
+            if appends:
+                timestamp = max(timestamp, self._times[(appends - 1) % self.capacity])
+            for view, value in zip(self._metrics, values):
+                view[slot] = math.nan if value is None else value
+            self._times[slot] = timestamp
+            # The counter moves last, so readers never see a half-written slot
+            self.APPENDS.pack_into(self._mmap, self.APPENDS_OFFSET, appends + 1)
+
+    def _slot(self, appends: int, index: int) -> int:
+        """Ring slot of the index-th oldest held sample"""
+        return (appends - min(appends, self.capacity) + index) % self.capacity
+
+    def _bisect(self, appends: int, timestamp: float) -> int:
+        """Index (oldest = 0) of the first held sample at or after timestamp"""
+        low, high = 0, min(appends, self.capacity)
+        times = self._times
+        while low < high:
+            mid = (low + high) // 2
+            if times[self._slot(appends, mid)] < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _range(self, appends: int, start: Optional[float],
+               end: Optional[float]) -> Tuple[int, int]:
+        """Indexes (oldest = 0) of the first sample in a range and the one past it"""
+        first = 0 if start is None else self._bisect(appends, start)
+        last = min(appends, self.capacity) if end is None else self._bisect(appends, end)
+        return first, last
+
+    def read(self, column: str, start: Optional[float] = None,
+             end: Optional[float] = None) -> List[memoryview]:
+        """
+        Zero-copy read of a column between start and end
+
+        Args:
+            column: Column name ('timestamp' gives the sample times)
+            start: Oldest timestamp included (default: oldest held)
+            end: Timestamp excluded (default: after the newest)
+
+        Returns:
+            Oldest-first memoryview segments of float64 - two when the
+            range wraps around the end of the ring
+        """
+        view = self._views[column]
+        appends = self.appends
+        first, last = self._range(appends, start, end)
+        if last <= first:
+            return []
+
+        slot = self._slot(appends, first)
+        length = last - first
+        if slot + length <= self.capacity:
+            return [view[slot:slot + length]]
+        return [view[slot:], view[:length - (self.capacity - slot)]]
+
+    def iter_rows(self, start: Optional[float] = None,
+                  end: Optional[float] = None) -> Iterator[Tuple[float, ...]]:
+        """
+        Stream whole samples between start and end, oldest first
+
+        The range is fixed when iteration starts; samples appended later
+        are not included.
+
+        Yields:
+            (timestamp, value, ...) tuples in column order
+        """
+        appends = self.appends
+        first, last = self._range(appends, start, end)
+        views = [self._views[name] for name in self.columns]
+        for index in range(first, last):
+            slot = self._slot(appends, index)
+            yield tuple(view[slot] for view in views)
+
+    def window(self, column: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> Dict[str, float]:
+        """
+        Aggregate a column between start and end (NaN samples are skipped)
+
+        Returns:
+            Dict with count, min, max and avg (None when empty)
+        """
+        count = 0
+        total = 0.0
+        low = math.inf
+        high = -math.inf
+        for segment in self.read(column, start, end):
+            values = [v for v in segment if v == v]
+            if values:
+                count += len(values)
+                total += math.fsum(values)
+                low = min(low, min(values))
+                high = max(high, max(values))
+        if not count:
+            return {'count': 0, 'min': None, 'max': None, 'avg': None}
+        return {'count': count, 'min': low, 'max': high, 'avg': total / count}
+
+    def flush(self):
+        """Write dirty pages to disk"""
+        if not self.readonly:
+            self._mmap.flush()
+
+    def close(self):
+        """Flush and unmap the file"""
+        if self._mmap.closed:
+            return
+        self.flush()
+        for view in self._views.values():
+            view.release()
+        self._buffer.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds read() segments - unmapped once they go
+            pass
+        self._file.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Database Size Scanner - Measures rippled's on-disk databases off the poll thread
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class DatabaseSizeScanner:
+    """
+    Periodically sums the size of rippled's `db` and `nudb` directories
+
+    Runs in its own thread so a multi-terabyte tree never stalls polling.
+    Directory listings are cached keyed by the directory's mtime: the
+    mtime only changes when entries are added or removed, so unchanged
+    directories skip readdir entirely. File sizes are always re-read with a
+    single stat because rippled grows its database files in place.
+    """
+
+    # Reported name -> subdirectory of the rippled data directory
+    DIRECTORIES = {
+        'ledger_db': 'db',
+        'nudb': 'nudb'
+    }
+
+    def __init__(self, data_dir: str, interval: Optional[float] = 180, prometheus=None):
+        """
+        Initialize scanner
+
+        Args:
+            data_dir: rippled data directory (contains db/ and nudb/)
+            interval: Seconds between scans (None: scan only when triggered)
+            prometheus: PrometheusExporter to publish completed scans to
+        """
+        self.data_dir = data_dir
+        self.interval = interval
+        self.prometheus = prometheus
+
+        # path -> (mtime_ns, file names, subdirectory names)
+        self._listings = {}
+
+        self.latest_sizes = {name: 0 for name in self.DIRECTORIES}
+        self.last_scan_at = None
+        self.last_scan_duration = 0.0
+        self.scans_completed = 0
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _list_directory(self, path: str, mtime_ns: int):
+        """
+        Return (file names, subdirectory names) for path, from cache if unchanged
+        """
+        cached = self._listings.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1], cached[2]
+
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append(entry.name)
+                except OSError:
+                    continue
+
+        self._listings[path] = (mtime_ns, files, subdirs)
+        return files, subdirs
+
+    def _directory_size(self, path: str, seen: set) -> int:
+        """
+        Total size of all files under path
+
+        Args:
+            path: Directory to measure
+            seen: Directories visited during this scan (for cache pruning)
+
+        Returns:
+            Size in bytes
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            files, subdirs = self._list_directory(path, mtime_ns)
+        except OSError:
+            return 0
+
+        seen.add(path)
+        total = 0
+
+        for name in files:
+            try:
+                total += os.stat(os.path.join(path, name)).st_size
+            except FileNotFoundError:
+                # Removed since the listing was cached - relist next scan
+                self._listings.pop(path, None)
+            except OSError:
+                pass
+
+        for name in subdirs:
+            total += self._directory_size(os.path.join(path, name), seen)
+
+        return total
+
+    def scan(self) -> Dict[str, int]:
+        """
+        Measure all database directories once
+
+        Returns:
+            Dictionary with database sizes in bytes
+        """
+        started = time.monotonic()
+        seen = set()
+        sizes = {}
+
+        for name, subdir in self.DIRECTORIES.items():
+            sizes[name] = self._directory_size(os.path.join(self.data_dir, subdir), seen)
+
+        # Forget directories that no longer exist
+        for path in [p for p in self._listings if p not in seen]:
+            del self._listings[path]
+
+        self.latest_sizes = sizes
+        self.last_scan_at = time.time()
+        self.last_scan_duration = time.monotonic() - started
+        self.scans_completed += 1
+        return sizes
+
+    def _publish(self, sizes: Dict[str, int]):
+        """Push a completed scan to Prometheus"""
+        if self.prometheus and os.path.isdir(self.data_dir):
+            self.prometheus.update_database_sizes(sizes['ledger_db'], sizes['nudb'])
+
+    def _run(self):
+        """Scan loop executed by the background thread"""
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self._publish(self.scan())
+            except Exception as e:
+                print(f"Warning: Could not get DB sizes: {e}")
+
+    def trigger(self):
+        """Ask the background thread to scan now (or right after the current scan)"""
+        self._wake.set()
+
+    def start(self):
+        """Start scanning in a background daemon thread"""
+        if self._thread is not None:
+            return
+        # Timed scanners measure once right away; triggered ones wait to be asked
+        if self.interval is not None:
+            self._wake.set()
+        self._thread = threading.Thread(target=self._run, name='db-size-scanner', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread
+
+        Args:
+            timeout: Seconds to wait for an in-progress scan to finish
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
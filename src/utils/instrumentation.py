@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Instrumentation - Per-stage latency of the poll path
+
+Stages (rippled commands, JSON decoding, SQLite writes and queries, metric
+export, console output) are timed with `stage(name)` or `@timed(name)`
+and observed in the `xrpl_monitor_stage_seconds{stage}` histogram. The
+slowest poll of each reporting interval is printed with its stage
+breakdown, including the stages of work the poll handed to other threads
+(rippled requests on the executor, writes on the pipeline workers).
+
+Disabled by default. While disabled, `stage()` returns a shared no-op
+context manager and `@timed` adds a single attribute check per call.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from datetime import datetime
+
+
+class _NullStage:
+    """Context manager that does nothing (instrumentation disabled)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Times one stage and reports it on exit"""
+
+    __slots__ = ('instrumentation', 'name', 'started')
+
+    def __init__(self, instrumentation, name: str):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.instrumentation.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _Trace:
+    """Stages of one poll, in the order they finished"""
+
+    __slots__ = ('stages', 'after', 'finished')
+
+    def __init__(self):
+        self.stages = []
+        # Handed-off work that finished after the poll (pipeline writes)
+        self.after = []
+        self.finished = False
+
+
+class Instrumentation:
+    """
+    Collects stage timings and the slowest poll trace
+    """
+
+    def __init__(self):
+        """Initialize (disabled)"""
+        self.enabled = False
+        self.prometheus = None
+        self.trace_interval = 300
+
+        # Trace of the poll the current context belongs to. Work handed to
+        # other threads joins it through bind() / trace_context()
+        self._trace = contextvars.ContextVar('poll_trace', default=None)
+        self._lock = threading.Lock()
+
+        self.slowest_trace = None
+        self._next_report = 0.0
+
+    def enable(self, prometheus=None, trace_interval: float = 300):
+        """
+        Start timing stages
+
+        Args:
+            prometheus: PrometheusExporter with the stage histogram
+            trace_interval: Seconds between slowest-poll reports (0 disables them)
+        """
+        self.prometheus = prometheus
+        self.trace_interval = trace_interval
+        self._next_report = time.monotonic() + trace_interval
+        self.enabled = True
+
+    def disable(self):
+        """Stop timing stages"""
+        self.enabled = False
+
+    def stage(self, name: str):
+        """
+        Context manager timing one stage
+
+        Args:
+            name: Stage name (histogram label)
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, seconds: float):
+        """Report one stage timing"""
+        if self.prometheus:
+            self.prometheus.observe_stage(name, seconds)
+
+        trace = self._trace.get()
+        if trace is not None:
+            (trace.after if trace.finished else trace.stages).append((name, seconds))
+
+    def begin_trace(self):
+        """Start collecting the stages of a poll made from this context"""
+        if self.enabled:
+            self._trace.set(_Trace())
+
+    def trace_context(self):
+        """
+        Copy of the current context if it is tracing a poll
+
+        Returns:
+            contextvars.Context to run handed-off work in, or None
+        """
+        if self._trace.get() is None:
+            return None
+        return contextvars.copy_context()
+
+    def bind(self, func):
+        """
+        Wrap func so that stages it records on another thread join the
+        current poll trace (returns func unchanged when not tracing)
+
+        Args:
+            func: Callable about to be submitted to an executor
+        """
+        context = self.trace_context()
+        if context is None:
+            return func
+        return functools.partial(context.run, func)
+
+    def end_trace(self, label: str, seconds: float):
+        """
+        Finish the current context's poll trace
+
+        Args:
+            label: What was traced (e.g. 'validator poll #12')
+            seconds: Total poll duration
+        """
+        trace = self._trace.get()
+        self._trace.set(None)
+        if trace is None:
+            return
+        trace.finished = True
+        if not self.enabled:
+            return
+
+        self.record('poll', seconds)
+
+        with self._lock:
+            if self.slowest_trace is None or seconds > self.slowest_trace[1]:
+                self.slowest_trace = (label, seconds, trace)
+
+            if self.trace_interval and time.monotonic() >= self._next_report:
+                self._next_report = time.monotonic() + self.trace_interval
+                report, self.slowest_trace = self.slowest_trace, None
+            else:
+                report = None
+
+        if report:
+            self.print_trace(*report)
+
+    def print_trace(self, label: str, seconds: float, trace: _Trace):
+        """Print one poll's stage breakdown"""
+        timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        stages = ', '.join(f"{name} {duration * 1000:.1f}ms" for name, duration in trace.stages)
+        after = ', '.join(f"{name} {duration * 1000:.1f}ms" for name, duration in trace.after)
+        print(f"[{timestamp_str}] [TRACE] Slowest poll: {label} took {seconds * 1000:.1f}ms "
+              f"({stages or 'no stages recorded'})" + (f", then {after}" if after else ''))
+
+
+# Process-wide instance - the hooks in the poll path report here
+instrumentation = Instrumentation()
+
+
+def stage(name: str):
+    """Context manager timing one stage (no-op while disabled)"""
+    return instrumentation.stage(name)
+
+
+def timed(name: str):
+    """
+    Decorator timing every call of a function as one stage
+
+    Args:
+        name: Stage name (histogram label)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return func(*args, **kwargs)
+            with _Stage(instrumentation, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Ledger Window - Fixed-size sliding window over ledger sequence numbers
+"""
+
+import threading
+from typing import Any, List, Optional, Tuple
+
+
+class LedgerWindow:
+    """
+    Tracks which of the most recent `size` ledgers have been seen
+
+    Backed by a ring buffer indexed by `seq % size`: one byte per ledger,
+    plus an optional value per ledger (e.g. a hash). Marking, membership
+    and lookups are O(1). Sliding forward clears only the slots that are
+    reused, so it is O(1) per ledger. Ledgers older than the window are
+    forgotten: they are not members and marking them is refused.
+
+    Safe to share between threads (e.g. the poll thread and the backfill
+    worker).
+    """
+
+    def __init__(self, size: int = 2048):
+        """
+        Initialize window
+
+        Args:
+            size: Number of consecutive ledgers covered
+        """
+        if size <= 0:
+            raise ValueError("LedgerWindow size must be positive")
+
+        self.size = size
+        self._marks = bytearray(size)
+        self._values: Optional[List[Any]] = None
+        self._lock = threading.Lock()
+
+        # Oldest sequence covered (None until the first mark)
+        self.base: Optional[int] = None
+
+    @property
+    def newest(self) -> Optional[int]:
+        """Newest sequence covered"""
+        return None if self.base is None else self.base + self.size - 1
+
+    def _clear(self, start_seq: int, count: int):
+        """Clear count slots starting at the slot of start_seq (lock held)"""
+        start = start_seq % self.size
+        end = start + count
+        pieces = [(start, min(end, self.size))]
+        if end > self.size:
+            pieces.append((0, end - self.size))
+        for i, j in pieces:
+            self._marks[i:j] = bytes(j - i)
+            if self._values is not None:
+                self._values[i:j] = [None] * (j - i)
+
+    def _slide_to(self, seq: int):
+        """Move the window forward so seq is its newest ledger (lock held)"""
+        if self.base is None:
+            self.base = seq - self.size + 1
+            return
+
+        shift = seq - self.newest
+        if shift <= 0:
+            return
+        if shift >= self.size:
+            self._clear(0, self.size)
+        else:
+            # Slots of the `shift` oldest ledgers become the new ones
+            self._clear(self.base, shift)
+        self.base += shift
+
+    def mark(self, seq: int, value: Any = None) -> bool:
+        """
+        Mark a ledger as seen, sliding the window forward if needed
+
+        Args:
+            seq: Ledger sequence number
+            value: Optional value stored with the ledger
+
+        Returns:
+            False if seq is older than the window
+        """
+        with self._lock:
+            if self.base is None or seq > self.newest:
+                self._slide_to(seq)
+            if seq < self.base:
+                return False
+
+            index = seq % self.size
+            self._marks[index] = 1
+            if value is not None:
+                if self._values is None:
+                    self._values = [None] * self.size
+                self._values[index] = value
+            return True
+
+    def __contains__(self, seq: int) -> bool:
+        """True if seq is inside the window and marked"""
+        base = self.base
+        if base is None or not base <= seq < base + self.size:
+            return False
+        return self._marks[seq % self.size] == 1
+
+    def get(self, seq: int, default: Any = None) -> Any:
+        """
+        Value stored with a marked ledger
+
+        Args:
+            seq: Ledger sequence number
+            default: Returned if seq is not marked or has no value
+        """
+        with self._lock:
+            if seq not in self or self._values is None:
+                return default
+            value = self._values[seq % self.size]
+            return default if value is None else value
+
+    def __len__(self) -> int:
+        """Number of marked ledgers in the window"""
+        return self._marks.count(1)
+
+    def missing(self, start: int, end: int) -> List[int]:
+        """
+        Unmarked sequences in [start, end], clamped to the window
+
+        Args:
+            start: First sequence (inclusive)
+            end: Last sequence (inclusive)
+
+        Returns:
+            Sorted list of missing sequence numbers
+        """
+        with self._lock:
+            if self.base is None:
+                return []
+            start = max(start, self.base)
+            end = min(end, self.newest)
+            if start > end:
+                return []
+
+            missing = []
+            first = start % self.size
+            count = end - start + 1
+            pieces = [(first, min(first + count, self.size), start)]
+            if first + count > self.size:
+                pieces.append((0, first + count - self.size, start + self.size - first))
+
+            # bytearray.find walks the buffer in C - only gaps cost Python time
+            for i, j, seq_at_i in pieces:
+                index = self._marks.find(0, i, j)
+                while index != -1:
+                    missing.append(seq_at_i + index - i)
+                    index = self._marks.find(0, index + 1, j)
+            return missing
+
+    def missing_ranges(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Unmarked sequences in [start, end] as inclusive (first, last) ranges
+
+        Args:
+            start: First sequence (inclusive)
+            end: Last sequence (inclusive)
+        """
+        ranges = []
+        for seq in self.missing(start, end):
+            if ranges and ranges[-1][1] == seq - 1:
+                ranges[-1] = (ranges[-1][0], seq)
+            else:
+                ranges.append((seq, seq))
+        return ranges
+
+    def to_bits(self) -> Tuple[Optional[int], bytes]:
+        """
+        Compact copy of the marks (values are not included)
+
+        Returns:
+            Tuple of (oldest sequence covered, one bit per ledger from the
+            oldest, little-endian within each byte)
+        """
+        with self._lock:
+            if self.base is None:
+                return None, b''
+            start = self.base % self.size
+            ordered = self._marks[start:] + self._marks[:start]
+
+        bits = bytearray((len(ordered) + 7) // 8)
+        index = ordered.find(1)
+        while index != -1:
+            bits[index >> 3] |= 1 << (index & 7)
+            index = ordered.find(1, index + 1)
+        return self.base, bytes(bits)
+
+    def load_bits(self, base: Optional[int], bits: bytes):
+        """
+        Mark the ledgers of a to_bits() copy
+
+        Args:
+            base: Oldest sequence covered by the copy
+            bits: One bit per ledger from base
+        """
+        if base is None:
+            return
+        for byte_index, byte in enumerate(bits):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    self.mark(base + byte_index * 8 + bit)
+
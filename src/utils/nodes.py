@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Node definitions - Which rippled servers one monitor process watches
+"""
+
+from typing import Dict, Any, List
+
+
+# Name used for the single-node setup and for rows written before multi-node support
+DEFAULT_NODE = 'validator'
+
+# Per-node keys that fall back to the matching monitoring.* setting
+NODE_KEYS = (
+    'rippled_mode', 'rippled_host', 'rippled_port', 'container_name',
+    'docker_transport', 'docker_socket'
+)
+
+# Keys that only make sense for one server - never inherited by a node list
+LOCAL_KEYS = ('websocket_url', 'rippled_data_dir')
+
+
+def load_node_configs(config) -> List[Dict[str, Any]]:
+    """
+    Build the list of monitored nodes from configuration
+
+    Without `monitoring.nodes` the classic single-node settings describe
+    one node named `monitoring.node_name` (default 'validator'). With it,
+    each entry may override any of NODE_KEYS; missing keys inherit the
+    top-level monitoring value. LOCAL_KEYS must be set per node.
+
+    Example:
+        monitoring:
+          rippled_mode: native
+          nodes:
+            - name: validator
+              rippled_port: 5005
+            - name: hub1
+              rippled_host: 10.0.0.11
+
+    Args:
+        config: Config instance
+
+    Returns:
+        List of node dictionaries, each with a unique 'name'
+
+    Raises:
+        ValueError: If node names are missing or duplicated
+    """
+    defaults = {key: config.get(f'monitoring.{key}') for key in NODE_KEYS}
+    entries = config.get('monitoring.nodes')
+    if not entries:
+        single = {key: config.get(f'monitoring.{key}') for key in LOCAL_KEYS}
+        single['name'] = config.get('monitoring.node_name', DEFAULT_NODE)
+        entries = [{key: value for key, value in single.items() if value is not None}]
+
+    nodes = []
+    names = set()
+    for index, entry in enumerate(entries):
+        name = entry.get('name')
+        if not name:
+            raise ValueError(f"monitoring.nodes[{index}] has no name")
+        if name in names:
+            raise ValueError(f"Duplicate node name in monitoring.nodes: {name}")
+        names.add(name)
+
+        node = {key: value for key, value in defaults.items() if value is not None}
+        node.update(entry)
+        nodes.append(node)
+
+    return nodes
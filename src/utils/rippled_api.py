@@ -1,77 +1,218 @@
 #!/usr/bin/env python3
 """
-RippledAPI - Interface to rippled validator via Docker
+RippledAPI - Interface to rippled validator via HTTP JSON-RPC or Docker
 """
 
-import subprocess
-import json
+import sys
 import os
+import json
+import threading
+import time
 from typing import Dict, Any, Optional, List
 
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.db_size_scanner import DatabaseSizeScanner
+from src.utils.instrumentation import stage
+from src.utils.transports import (
+    DockerExecTransport, DockerSocketTransport, HTTPTransport, TransportError
+)
+
+
+# rippled timestamps are seconds since 2000-01-01T00:00:00Z
+RIPPLE_EPOCH = 946684800
+
 
 class RippledAPIError(Exception):
     """Raised when rippled API calls fail"""
     pass
 
 
+class _Flight:
+    """One in-progress request that identical concurrent callers wait on"""
+    
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
 class RippledAPI:
     """
-    Interface to rippled running in Docker container
+    Interface to rippled over the admin JSON-RPC port or docker exec
+    
+    Responses are cached per command for the TTLs in cache_ttls (0 = never
+    cached), and identical concurrent requests share a single round trip.
     """
     
-    def __init__(self, container_name: str = 'rippledvalidator'):
+    # Seconds each command's response stays fresh
+    DEFAULT_CACHE_TTLS = {
+        'validator_info': 300,
+        'validator_list_sites': 300,
+        'static_info': 3600
+    }
+    
+    def __init__(self, container_name: str = 'rippledvalidator',
+                 host: Optional[str] = None, port: int = 5005,
+                 timeout: float = 10, pool_size: int = 4,
+                 docker_socket: Optional[str] = None, transport=None,
+                 cache_ttls: Optional[Dict[str, float]] = None):
         """
         Initialize API client
         
         Args:
             container_name: Name of Docker container running rippled
+            host: rippled admin host (uses HTTP JSON-RPC when set)
+            port: rippled admin JSON-RPC port
+            timeout: Request timeout in seconds
+            pool_size: Keep-alive connections kept open for HTTP
+            docker_socket: Docker daemon socket (uses the Engine API exec
+                           endpoints instead of the docker CLI when set)
+            transport: Explicit transport instance (overrides the above)
+            cache_ttls: Per-command cache TTLs merged over DEFAULT_CACHE_TTLS
         """
         self.container_name = container_name
+        self.host = host
+        self.port = port
+        
+        if transport is not None:
+            self.transport = transport
+        elif host:
+            self.transport = HTTPTransport(host, port, timeout=timeout, pool_size=pool_size)
+        elif docker_socket:
+            self.transport = DockerSocketTransport(container_name, docker_socket,
+                                                   timeout=timeout, pool_size=pool_size)
+        else:
+            self.transport = DockerExecTransport(container_name, timeout=timeout)
+        
+        # Response cache
+        self.cache_ttls = dict(self.DEFAULT_CACHE_TTLS)
+        self.cache_ttls.update(cache_ttls or {})
+        self._cache = {}
+        self._inflight = {}
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        self._static_info = None
+        self._static_expires = 0
+        
+        # Cache statistics (commands with a TTL only)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_coalesced = 0
+    
+    def describe(self) -> str:
+        """Human readable description of the rippled endpoint"""
+        return self.transport.describe()
+    
+    def close(self):
+        """Release any connections held by the transport"""
+        self.transport.close()
     
     def _call(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """
-        Call rippled API via docker exec
+        Call rippled API, served from cache when a fresh response exists
+        
+        Concurrent identical requests are coalesced into one transport call.
         
         Args:
             command: rippled command to execute
             params: Optional parameters dict
             
         Returns:
-            Result dictionary from rippled
+            Result dictionary from rippled (shared - do not modify)
             
         Raises:
             RippledAPIError: If command fails
         """
-        try:
-            # Build command
-            cmd = ['docker', 'exec', self.container_name, 'rippled', command]
-            
-            # Add JSON params if provided
-            if params:
-                cmd.append(json.dumps(params))
+        key = (command, json.dumps(params, sort_keys=True) if params else '')
+        ttl = self.cache_ttls.get(command, 0)
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.cache_hits += 1
+                return entry[1]
             
-            # Execute
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight(self._cache_generation)
+                self._inflight[key] = flight
+            # Uncached commands are not cache misses
+            if ttl > 0:
+                if leader:
+                    self.cache_misses += 1
+                else:
+                    self.cache_coalesced += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = self._request(command, params)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._cache_lock:
+                del self._inflight[key]
+                # Don't store a response that started before an invalidation
+                if (flight.error is None and ttl > 0
+                        and flight.generation == self._cache_generation):
+                    self._cache[key] = (time.monotonic() + ttl, flight.result)
+            flight.done.set()
+    
+    def invalidate_cache(self, command: Optional[str] = None):
+        """
+        Drop cached responses (e.g. after rippled restarts)
+        
+        Args:
+            command: Only drop this command's entries (default: everything)
+        """
+        with self._cache_lock:
+            self._cache_generation += 1
+            if command is None:
+                self._cache.clear()
+                self._static_info = None
+            else:
+                for key in [k for k in self._cache if k[0] == command]:
+                    del self._cache[key]
+                if command == 'server_info':
+                    self._static_info = None
+    
+    def _request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Call rippled API through the configured transport
+        
+        Args:
+            command: rippled command to execute
+            params: Optional parameters dict
             
-            if result.returncode != 0:
-                raise RippledAPIError(f"Command failed: {result.stderr}")
+        Returns:
+            Result dictionary from rippled
             
-            # Parse JSON response
-            try:
-                data = json.loads(result.stdout)
-                return data.get('result', {})
-            except json.JSONDecodeError as e:
-                raise RippledAPIError(f"Invalid JSON response: {e}")
-        
-        except subprocess.TimeoutExpired:
-            raise RippledAPIError("Command timed out")
+        Raises:
+            RippledAPIError: If command fails
+        """
+        try:
+            with stage(f"rippled.{command}"):
+                result = self.transport.request(command, params)
+        except TransportError as e:
+            raise RippledAPIError(str(e))
         except Exception as e:
             raise RippledAPIError(f"Command failed: {e}")
+        
+        if result.get('status') == 'error':
+            message = result.get('error_message') or result.get('error', 'unknown error')
+            raise RippledAPIError(f"{command} returned error: {message}")
+        
+        return result
     
     def get_server_state(self) -> Dict[str, Any]:
         """
@@ -81,7 +222,31 @@ class RippledAPI:
             Dictionary with server info (from server_info command)
         """
         result = self._call('server_info')
-        return result.get('info', {})
+        info = result.get('info', {})
+        
+        # Every server_info refreshes the static snapshot for free
+        with self._cache_lock:
+            self._static_info = info
+            self._static_expires = time.monotonic() + self.cache_ttls.get('static_info', 0)
+        
+        return info
+    
+    def get_static_info(self) -> Dict[str, Any]:
+        """
+        Get a recent server_info snapshot for fields that rarely change
+        
+        Only read fields like build_version, pubkey_validator and node_size
+        from it - anything live may be up to the static_info TTL old.
+        
+        Returns:
+            Dictionary with server info
+        """
+        with self._cache_lock:
+            if self._static_info is not None and self._static_expires > time.monotonic():
+                self.cache_hits += 1
+                return self._static_info
+        
+        return self.get_server_state()
     
     def get_server_info(self) -> Dict[str, Any]:
         """
@@ -99,8 +264,16 @@ class RippledAPI:
         Returns:
             List of peer dictionaries
         """
-        result = self._call('peers')
-        return result.get('peers', [])
+        return self.get_peers_result().get('peers', [])
+    
+    def get_peers_result(self) -> Dict[str, Any]:
+        """
+        Get the whole peers response (peers list plus cluster info)
+        
+        Returns:
+            Result dictionary (shared - do not modify)
+        """
+        return self._call('peers')
     
     def get_ledger(self, ledger_index: Optional[int] = None, 
                    transactions: bool = False) -> Dict[str, Any]:
@@ -156,9 +329,12 @@ class RippledAPI:
         """
         return self._call('validator_info')
     
-    def get_database_sizes(self, data_dir: str = '/home/grapedrop/rippled/data') -> Dict[str, int]:
+    def get_database_sizes(self, data_dir: str) -> Dict[str, int]:
         """
-        Get database sizes from filesystem
+        Get database sizes from filesystem (one-shot, blocking)
+        
+        The poller uses a background DatabaseSizeScanner instead; this is
+        for ad-hoc callers.
         
         Args:
             data_dir: Path to rippled data directory
@@ -166,47 +342,7 @@ class RippledAPI:
         Returns:
             Dictionary with database sizes in bytes
         """
-        sizes = {
-            'ledger_db': 0,
-            'nudb': 0
-        }
-        
-        try:
-            # Check main database directory
-            db_path = os.path.join(data_dir, 'db')
-            if os.path.exists(db_path):
-                sizes['ledger_db'] = self._get_directory_size(db_path)
-            
-            # Check NuDB directory
-            nudb_path = os.path.join(data_dir, 'nudb')
-            if os.path.exists(nudb_path):
-                sizes['nudb'] = self._get_directory_size(nudb_path)
-        except Exception as e:
-            # If we can't access the directory, return zeros
-            pass
-        
-        return sizes
-    
-    def _get_directory_size(self, path: str) -> int:
-        """
-        Get total size of directory
-        
-        Args:
-            path: Directory path
-            
-        Returns:
-            Size in bytes
-        """
-        total = 0
-        try:
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total += os.path.getsize(filepath)
-        except Exception:
-            pass
-        return total
+        return DatabaseSizeScanner(data_dir).scan()
     
     def get_tx_history(self, start: int = 0) -> Dict[str, Any]:
         """
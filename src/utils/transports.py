@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Transports - How RippledAPI reaches rippled
+
+Each transport turns a rippled command into the raw ``result`` dictionary.
+RippledAPI picks one at construction time and never needs to know which.
+"""
+
+import http.client
+import json
+import queue
+import socket
+import struct
+import subprocess
+import threading
+from typing import Dict, Any, Optional
+
+from src.utils.instrumentation import stage
+
+
+class TransportError(Exception):
+    """Raised when a transport cannot deliver a command or read its response"""
+    pass
+
+
+class DockerExecTransport:
+    """
+    Runs `docker exec <container> rippled <command>` for every request
+    """
+
+    def __init__(self, container_name: str = 'rippledvalidator', timeout: float = 10):
+        """
+        Initialize docker exec transport
+
+        Args:
+            container_name: Name of Docker container running rippled
+            timeout: Seconds to wait for the command to finish
+        """
+        self.container_name = container_name
+        self.timeout = timeout
+
+    def describe(self) -> str:
+        """Human readable description of the endpoint"""
+        return f"docker exec {self.container_name}"
+
+    def request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Execute command inside the container
+
+        Args:
+            command: rippled command to execute
+            params: Optional parameters dict
+
+        Returns:
+            Result dictionary from rippled
+
+        Raises:
+            TransportError: If command fails
+        """
+        cmd = ['docker', 'exec', self.container_name, 'rippled', command]
+        if params:
+            cmd.append(json.dumps(params))
+
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise TransportError("Command timed out")
+        except OSError as e:
+            raise TransportError(f"Command failed: {e}")
+
+        if result.returncode != 0:
+            raise TransportError(f"Command failed: {result.stderr}")
+
+        try:
+            with stage('json_decode'):
+                data = json.loads(result.stdout)
+        except json.JSONDecodeError as e:
+            raise TransportError(f"Invalid JSON response: {e}")
+
+        return data.get('result', {})
+
+    def close(self):
+        """Nothing to release for subprocess calls"""
+        pass
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTPConnection over a unix domain socket (e.g. /var/run/docker.sock)
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 10):
+        """
+        Initialize connection
+
+        Args:
+            socket_path: Path of the unix socket
+            timeout: Socket timeout in seconds
+        """
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        """Connect to the unix socket instead of a TCP host"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class ConnectionPool:
+    """
+    Small LIFO pool of keep-alive HTTP connections
+
+    Concurrent callers each get their own connection. Idle connections are
+    reused, so once the pool is warm no request pays for a new handshake.
+    """
+
+    def __init__(self, factory, pool_size: int = 4):
+        """
+        Initialize pool
+
+        Args:
+            factory: Callable returning a new (unconnected) HTTPConnection
+            pool_size: Maximum number of idle connections kept open
+        """
+        self.factory = factory
+        self.pool_size = pool_size
+
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Statistics
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        """Create a fresh connection"""
+        with self._lock:
+            self.connections_opened += 1
+        return self.factory()
+
+    def _acquire(self):
+        """
+        Take an idle connection from the pool or open a new one
+
+        Returns:
+            Tuple of (connection, reused)
+        """
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, conn: http.client.HTTPConnection):
+        """Return a healthy connection to the pool"""
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send(self, conn: http.client.HTTPConnection, method: str, path: str,
+              body: Optional[bytes]):
+        """Send one request on conn and return (status, payload)"""
+        headers = {'Connection': 'keep-alive'}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        payload = response.read()
+
+        # Server asked us not to reuse this socket
+        if response.will_close:
+            conn.close()
+
+        return response.status, payload
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None):
+        """
+        Send a request on a pooled connection
+
+        Args:
+            method: HTTP method
+            path: Request path
+            body: Optional JSON body
+
+        Returns:
+            Tuple of (status, payload)
+
+        Raises:
+            TransportError: If the request cannot be completed
+        """
+        conn, reused = self._acquire()
+        try:
+            try:
+                status, payload = self._send(conn, method, path, body)
+            except (http.client.HTTPException, ConnectionError):
+                # A pooled keep-alive socket may have been closed by the
+                # server while idle - retry exactly once on a fresh connection
+                conn.close()
+                if not reused:
+                    raise
+                conn = self._new_connection()
+                status, payload = self._send(conn, method, path, body)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise TransportError(f"Request failed: {e}")
+
+        with self._lock:
+            self.requests_sent += 1
+        self._release(conn)
+        return status, payload
+
+    def close(self):
+        """Close all pooled connections"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class HTTPTransport:
+    """
+    JSON-RPC over HTTP to the rippled admin port
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 5005,
+                 timeout: float = 10, pool_size: int = 4):
+        """
+        Initialize HTTP transport
+
+        Args:
+            host: rippled admin host
+            port: rippled admin JSON-RPC port
+            timeout: Socket timeout in seconds
+            pool_size: Maximum number of idle connections kept open
+        """
+        self.host = host
+        self.port = int(port)
+        self.timeout = timeout
+        self.pool = ConnectionPool(
+            lambda: http.client.HTTPConnection(self.host, self.port, timeout=self.timeout),
+            pool_size=pool_size
+        )
+
+    def describe(self) -> str:
+        """Human readable description of the endpoint"""
+        return f"http://{self.host}:{self.port}"
+
+    def request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        POST a JSON-RPC request
+
+        Args:
+            command: rippled command to execute
+            params: Optional parameters dict
+
+        Returns:
+            Result dictionary from rippled
+
+        Raises:
+            TransportError: If the request fails
+        """
+        body = json.dumps({
+            'method': command,
+            'params': [params or {}]
+        }).encode('utf-8')
+
+        status, payload = self.pool.request('POST', '/', body)
+        if status != 200:
+            raise TransportError(f"HTTP {status}: {payload[:200]!r}")
+
+        try:
+            with stage('json_decode'):
+                data = json.loads(payload)
+        except json.JSONDecodeError as e:
+            raise TransportError(f"Invalid JSON response: {e}")
+
+        return data.get('result', {})
+
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
+
+
+class DockerSocketTransport:
+    """
+    Runs rippled commands through the Docker Engine API exec endpoints
+
+    Talks to the Docker daemon over its unix socket, so there is no docker
+    CLI process per request. Exec creation and inspection reuse pooled
+    keep-alive connections; the exec start call is hijacked by the daemon
+    into a raw output stream, so it gets a connection of its own.
+    """
+
+    API_VERSION = 'v1.41'
+
+    # Multiplexed stream ids in the raw exec output
+    STDOUT = 1
+    STDERR = 2
+
+    def __init__(self, container_name: str = 'rippledvalidator',
+                 socket_path: str = '/var/run/docker.sock',
+                 timeout: float = 10, pool_size: int = 4):
+        """
+        Initialize Docker socket transport
+
+        Args:
+            container_name: Name of Docker container running rippled
+            socket_path: Path of the Docker daemon socket
+            timeout: Socket timeout in seconds
+            pool_size: Maximum number of idle connections kept open
+        """
+        self.container_name = container_name
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.pool = ConnectionPool(self._connect, pool_size=pool_size)
+
+    def _connect(self) -> UnixHTTPConnection:
+        """Create a connection to the Docker daemon"""
+        return UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+
+    def describe(self) -> str:
+        """Human readable description of the endpoint"""
+        return f"docker API {self.socket_path} -> {self.container_name}"
+
+    def _api_json(self, method: str, path: str, body: Optional[Dict] = None,
+                  expected: tuple = (200, 201)) -> Dict[str, Any]:
+        """Call a JSON endpoint of the Docker API on a pooled connection"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        status, payload = self.pool.request(method, f"/{self.API_VERSION}{path}", data)
+        if status not in expected:
+            try:
+                message = json.loads(payload).get('message', payload)
+            except (json.JSONDecodeError, AttributeError):
+                message = payload[:200]
+            raise TransportError(f"Docker API {path} returned {status}: {message}")
+        try:
+            return json.loads(payload) if payload else {}
+        except json.JSONDecodeError as e:
+            raise TransportError(f"Invalid JSON from Docker API: {e}")
+
+    @classmethod
+    def demultiplex(cls, raw: bytes):
+        """
+        Split a multiplexed exec stream into stdout and stderr
+
+        Each frame is an 8-byte header (stream id, 3 padding bytes,
+        big-endian payload length) followed by the payload.
+
+        Args:
+            raw: Raw stream bytes
+
+        Returns:
+            Tuple of (stdout, stderr) bytes
+        """
+        stdout = []
+        stderr = []
+        offset = 0
+        while offset + 8 <= len(raw):
+            stream_id, length = struct.unpack('>BxxxL', raw[offset:offset + 8])
+            offset += 8
+            chunk = raw[offset:offset + length]
+            offset += length
+            if stream_id == cls.STDERR:
+                stderr.append(chunk)
+            else:
+                stdout.append(chunk)
+        return b''.join(stdout), b''.join(stderr)
+
+    def _start_exec(self, exec_id: str) -> bytes:
+        """Start an exec and read its raw output until the daemon closes it"""
+        conn = self._connect()
+        try:
+            conn.request(
+                'POST', f"/{self.API_VERSION}/exec/{exec_id}/start",
+                body=json.dumps({'Detach': False, 'Tty': False}).encode('utf-8'),
+                headers={'Content-Type': 'application/json'}
+            )
+            response = conn.getresponse()
+            raw = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            raise TransportError(f"Exec start failed: {e}")
+        finally:
+            conn.close()
+
+        if response.status != 200:
+            raise TransportError(f"Exec start returned {response.status}: {raw[:200]!r}")
+        return raw
+
+    def request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Execute command inside the container via the Docker API
+
+        Args:
+            command: rippled command to execute
+            params: Optional parameters dict
+
+        Returns:
+            Result dictionary from rippled
+
+        Raises:
+            TransportError: If the exec fails
+        """
+        cmd = ['rippled', command]
+        if params:
+            cmd.append(json.dumps(params))
+
+        created = self._api_json('POST', f"/containers/{self.container_name}/exec", {
+            'AttachStdout': True,
+            'AttachStderr': True,
+            'Tty': False,
+            'Cmd': cmd
+        })
+        exec_id = created.get('Id')
+        if not exec_id:
+            raise TransportError("Docker API did not return an exec id")
+
+        stdout, stderr = self.demultiplex(self._start_exec(exec_id))
+
+        try:
+            with stage('json_decode'):
+                data = json.loads(stdout)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Only pay for the inspect round trip when something went wrong
+            inspect = self._api_json('GET', f"/exec/{exec_id}/json")
+            raise TransportError(
+                f"Command failed (exit {inspect.get('ExitCode')}): "
+                f"{stderr.decode('utf-8', 'replace').strip() or stdout[:200]!r}"
+            )
+
+        return data.get('result', {})
+
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+WebSocketClient - Minimal RFC 6455 client for rippled subscriptions
+
+Only what the monitor needs: text frames, fragmentation, ping/pong and
+close. Keeps the monitor free of third-party WebSocket dependencies.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import socket
+import ssl
+import struct
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WebSocketError(Exception):
+    """Raised when the WebSocket handshake or connection fails"""
+    pass
+
+
+class WebSocketClient:
+    """
+    Blocking WebSocket client with receive timeouts
+    """
+
+    # Seconds recv_json waits when asked not to wait at all
+    POLL_TIMEOUT = 0.001
+
+    def __init__(self, url: str, timeout: float = 10):
+        """
+        Initialize client
+
+        Args:
+            url: ws:// or wss:// URL (e.g. ws://localhost:6006)
+            timeout: Connect and handshake timeout in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+        self.sock = None
+        self._buffer = b''
+        self._fragments = []
+
+    def connect(self):
+        """
+        Open the socket and perform the upgrade handshake
+
+        Raises:
+            WebSocketError: If the server rejects the upgrade
+        """
+        parsed = urlparse(self.url)
+        secure = parsed.scheme == 'wss'
+        host = parsed.hostname or 'localhost'
+        port = parsed.port or (443 if secure else 80)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+
+        try:
+            sock = socket.create_connection((host, port), timeout=self.timeout)
+            if secure:
+                sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        except OSError as e:
+            raise WebSocketError(f"Connect to {self.url} failed: {e}")
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            "\r\n"
+        )
+
+        try:
+            sock.sendall(request.encode('ascii'))
+            response = b''
+            while b'\r\n\r\n' not in response:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise WebSocketError("Connection closed during handshake")
+                response += chunk
+        except OSError as e:
+            sock.close()
+            raise WebSocketError(f"Handshake failed: {e}")
+
+        header_blob, self._buffer = response.split(b'\r\n\r\n', 1)
+        lines = header_blob.decode('latin-1').split('\r\n')
+        if len(lines[0].split()) < 2 or lines[0].split()[1] != '101':
+            sock.close()
+            raise WebSocketError(f"Upgrade rejected: {lines[0]}")
+
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        expected = base64.b64encode(
+            hashlib.sha1((key + WS_GUID).encode('ascii')).digest()
+        ).decode('ascii')
+        if headers.get('sec-websocket-accept') != expected:
+            sock.close()
+            raise WebSocketError("Invalid Sec-WebSocket-Accept in handshake")
+
+        self.sock = sock
+        self._fragments = []
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        """Send a single masked frame (clients must always mask)"""
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 65536:
+            header += bytes([0x80 | 126]) + struct.pack('!H', length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack('!Q', length)
+
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        try:
+            self.sock.sendall(header + mask + masked)
+        except OSError as e:
+            raise WebSocketError(f"Send failed: {e}")
+
+    def send_json(self, message: Dict[str, Any]):
+        """
+        Send a JSON message as a text frame
+
+        Args:
+            message: Dictionary to serialize
+        """
+        if self.sock is None:
+            raise WebSocketError("Not connected")
+        self._send_frame(OP_TEXT, json.dumps(message).encode('utf-8'))
+
+    def _parse_frame(self) -> Optional[Tuple[bool, int, bytes]]:
+        """
+        Parse one complete frame from the buffer
+
+        Returns:
+            (fin, opcode, payload) or None if the buffer holds a partial frame
+        """
+        buf = self._buffer
+        if len(buf) < 2:
+            return None
+
+        fin = bool(buf[0] & 0x80)
+        opcode = buf[0] & 0x0F
+        masked = bool(buf[1] & 0x80)
+        length = buf[1] & 0x7F
+        offset = 2
+
+        if length == 126:
+            if len(buf) < 4:
+                return None
+            length = struct.unpack('!H', buf[2:4])[0]
+            offset = 4
+        elif length == 127:
+            if len(buf) < 10:
+                return None
+            length = struct.unpack('!Q', buf[2:10])[0]
+            offset = 10
+
+        mask = b''
+        if masked:
+            if len(buf) < offset + 4:
+                return None
+            mask = buf[offset:offset + 4]
+            offset += 4
+
+        if len(buf) < offset + length:
+            return None
+
+        payload = buf[offset:offset + length]
+        if masked:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        self._buffer = buf[offset + length:]
+        return fin, opcode, payload
+
+    def recv_json(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Receive the next JSON message
+
+        Args:
+            timeout: Seconds to wait (None blocks forever, 0 or less only
+                     reads what has already arrived)
+
+        Returns:
+            Decoded message, or None if the timeout expired first
+
+        Raises:
+            WebSocketError: On connection loss, close frame or bad payload
+        """
+        if self.sock is None:
+            raise WebSocketError("Not connected")
+
+        # settimeout(0) would make the socket non-blocking, so recv raises
+        # BlockingIOError instead of timing out: poll with a short wait
+        if timeout is not None:
+            timeout = max(timeout, self.POLL_TIMEOUT)
+        self.sock.settimeout(timeout)
+
+        while True:
+            frame = self._parse_frame()
+            if frame is None:
+                try:
+                    chunk = self.sock.recv(65536)
+                except socket.timeout:
+                    return None
+                except OSError as e:
+                    raise WebSocketError(f"Receive failed: {e}")
+                if not chunk:
+                    raise WebSocketError("Connection closed by server")
+                self._buffer += chunk
+                continue
+
+            fin, opcode, payload = frame
+
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                self.close()
+                raise WebSocketError("Connection closed by server")
+
+            # Text/binary start or continuation of a fragmented message
+            self._fragments.append(payload)
+            if not fin:
+                continue
+
+            message = b''.join(self._fragments)
+            self._fragments = []
+            try:
+                return json.loads(message)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise WebSocketError(f"Invalid JSON message: {e}")
+
+    def close(self):
+        """Send a close frame (best effort) and close the socket"""
+        if self.sock is None:
+            return
+        try:
+            self._send_frame(OP_CLOSE, struct.pack('!H', 1000))
+        except WebSocketError:
+            pass
+        try:
+            self.sock.close()
+        finally:
+            self.sock = None
+            self._buffer = b''
+            self._fragments = []
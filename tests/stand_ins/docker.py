@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Stand-in Docker daemon - Serves the Engine API exec endpoints on a unix socket
+
+Plays the daemon DockerSocketTransport talks to: exec create, exec start
+(a multiplexed stdout/stderr stream, closed when the command ends) and
+exec inspect. The `rippled <command> [params]` each exec runs is answered
+by a stand-in rippled transport (rippled.StandInRippled by default),
+wrapped the way the rippled CLI prints it:
+
+    daemon = StandInDockerDaemon('/tmp/docker.sock')
+    daemon.start()
+    transport = DockerSocketTransport('rippledvalidator', socket_path=daemon.socket_path)
+    transport.request('server_info')
+    daemon.drop_idle()   # next pooled request finds its socket closed
+    daemon.close()
+"""
+
+import itertools
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.transports import DockerSocketTransport, TransportError
+from tests.stand_ins.rippled import StandInRippled
+
+
+def multiplex(stream_id: int, data: bytes) -> bytes:
+    """One frame of a multiplexed exec stream"""
+    return struct.pack('>BxxxL', stream_id, len(data)) + data
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Engine API requests (keep-alive, like the real daemon)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self) -> str:
+        return 'unix'
+
+    def setup(self):
+        super().setup()
+        self.server.owner._opened(self.connection)
+
+    def finish(self):
+        self.server.owner._closed(self.connection)
+        super().finish()
+
+    def _json(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def do_POST(self):
+        daemon = self.server.owner
+        parts = self.path.strip('/').split('/')
+        body = self._body()
+        if len(parts) == 4 and parts[1] == 'containers' and parts[3] == 'exec':
+            status, reply = daemon._create_exec(parts[2], body)
+            self._json(status, reply)
+        elif len(parts) == 4 and parts[1] == 'exec' and parts[3] == 'start':
+            stream = daemon._start_exec(parts[2])
+            if stream is None:
+                self._json(404, {'message': f"No such exec instance: {parts[2]}"})
+                return
+            # The daemon streams the output and closes the connection
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/vnd.docker.raw-stream')
+            self.end_headers()
+            self.wfile.write(stream)
+            self.close_connection = True
+        else:
+            self._json(404, {'message': 'page not found'})
+
+    def do_GET(self):
+        daemon = self.server.owner
+        parts = self.path.strip('/').split('/')
+        if len(parts) == 4 and parts[1] == 'exec' and parts[3] == 'json':
+            status, reply = daemon._inspect_exec(parts[2])
+            self._json(status, reply)
+        else:
+            self._json(404, {'message': 'page not found'})
+
+
+class StandInDockerDaemon:
+    """
+    Docker Engine API stand-in for one or more rippled containers
+    """
+
+    def __init__(self, socket_path: str, containers=('rippledvalidator',),
+                 rippled=None, chunk_size: int = 4096, stderr_noise: bytes = b''):
+        """
+        Initialize stand-in
+
+        Args:
+            socket_path: Unix socket to listen on (replaced if it exists)
+            containers: Container names that exist
+            rippled: Transport answering the rippled commands
+                     (default: a StandInRippled)
+            chunk_size: Bytes of stdout per stream frame
+            stderr_noise: Written to stderr between stdout frames (rippled
+                          logs there; it must not end up in the result)
+        """
+        self.socket_path = socket_path
+        self.containers = set(containers)
+        self.rippled = rippled or StandInRippled()
+        self.chunk_size = chunk_size
+        self.stderr_noise = stderr_noise
+
+        self.execs: Dict[str, Dict[str, Any]] = {}
+        self.commands: List[List[str]] = []
+        self.connections = 0
+        self.inspects = 0
+        self._ids = itertools.count(1)
+        self._sockets = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Listen on the socket in the background"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _Server(self.socket_path, _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,),
+                                        name='docker-stand-in', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop serving, drop every connection and remove the socket"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.drop_idle()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def drop_idle(self):
+        """
+        Close every open connection without telling the client
+
+        What the daemon does to keep-alive sockets left idle (or on restart):
+        a pooled connection only finds out on its next request.
+        """
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _opened(self, sock: socket.socket):
+        with self._lock:
+            self._sockets.add(sock)
+            self.connections += 1
+
+    def _closed(self, sock: socket.socket):
+        with self._lock:
+            self._sockets.discard(sock)
+
+    # Exec endpoints
+
+    def _create_exec(self, container: str, body: Dict[str, Any]):
+        if container not in self.containers:
+            return 404, {'message': f"No such container: {container}"}
+        exec_id = f"{next(self._ids):064x}"
+        with self._lock:
+            self.execs[exec_id] = {'Cmd': body.get('Cmd', []), 'ExitCode': None, 'Running': False}
+        return 201, {'Id': exec_id}
+
+    def _run(self, cmd: List[str]):
+        """stdout, stderr and exit code of one rippled CLI command"""
+        if len(cmd) < 2 or cmd[0] != 'rippled':
+            return b'', f"exec: {cmd[0] if cmd else ''}: not found\n".encode('utf-8'), 127
+        params: Optional[Dict[str, Any]] = json.loads(cmd[2]) if len(cmd) > 2 else None
+        try:
+            result = self.rippled.request(cmd[1], params)
+        except TransportError as e:
+            return b'', f"rippled: {e}\n".encode('utf-8'), 1
+        return json.dumps({'result': result}, indent=3).encode('utf-8'), b'', 0
+
+    def _start_exec(self, exec_id: str) -> Optional[bytes]:
+        with self._lock:
+            execution = self.execs.get(exec_id)
+        if execution is None:
+            return None
+        self.commands.append(execution['Cmd'])
+        stdout, stderr, code = self._run(execution['Cmd'])
+        execution['ExitCode'] = code
+
+        frames = []
+        for offset in range(0, len(stdout), self.chunk_size):
+            frames.append(multiplex(DockerSocketTransport.STDOUT, stdout[offset:offset + self.chunk_size]))
+            if self.stderr_noise:
+                frames.append(multiplex(DockerSocketTransport.STDERR, self.stderr_noise))
+        if stderr:
+            frames.append(multiplex(DockerSocketTransport.STDERR, stderr))
+        return b''.join(frames)
+
+    def _inspect_exec(self, exec_id: str):
+        with self._lock:
+            self.inspects += 1
+            execution = self.execs.get(exec_id)
+        if execution is None:
+            return 404, {'message': f"No such exec instance: {exec_id}"}
+        return 200, {'ID': exec_id, 'Running': execution['Running'],
+                     'ExitCode': execution['ExitCode'],
+                     'ProcessConfig': {'entrypoint': execution['Cmd'][0] if execution['Cmd'] else '',
+                                       'arguments': execution['Cmd'][1:]}}
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Stand-in rippled - Answers server_info, peers and ledger for the unit tests
+
+Plugs into RippledAPI as its transport. It plays a proposing validator that
+closes one ledger per server_info call; tests change `server_state` or
+subclass `request` to inject latency and failures:
+
+    transport = StandInRippled()
+    api = RippledAPI(transport=transport)
+    transport.server_state = 'full'
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.rippled_api import RIPPLE_EPOCH
+from src.utils.transports import TransportError
+
+VALIDATOR_KEY = 'nHStandInValidatorKey'
+
+
+class StandInRippled:
+    """
+    Transport answering rippled commands for a synthetic validator
+    """
+
+    def __init__(self, start_seq: int = 90000000, server_state: str = 'proposing',
+                 peers: int = 21, txns_per_ledger: int = 40):
+        """
+        Initialize stand-in
+
+        Args:
+            start_seq: Validated ledger before the first server_info call
+            server_state: State reported by server_info
+            peers: Connected peers reported
+            txns_per_ledger: Transactions in every ledger
+        """
+        self.seq = start_seq
+        self.server_state = server_state
+        self.peers = peers
+        self.txns_per_ledger = txns_per_ledger
+
+        self.requests = 0
+        self.commands = []
+
+    def describe(self) -> str:
+        """Human readable description of the endpoint"""
+        return 'stand-in rippled'
+
+    def close(self):
+        """Nothing to release"""
+
+    def request(self, command: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Answer one command
+
+        Args:
+            command: rippled command
+            params: Optional parameters dict
+
+        Returns:
+            Result dictionary
+
+        Raises:
+            TransportError: For commands the stand-in does not know
+        """
+        self.requests += 1
+        self.commands.append(command)
+
+        if command == 'server_info':
+            self.seq += 1
+            return self.server_info()
+        if command == 'peers':
+            return self.peer_list()
+        if command == 'ledger':
+            ledger_index = (params or {}).get('ledger_index')
+            return self.ledger(self.seq if ledger_index in (None, 'validated') else int(ledger_index))
+        raise TransportError(f"stand-in does not implement {command}")
+
+    def server_info(self) -> Dict[str, Any]:
+        """server_info result for the current ledger"""
+        return {
+            'status': 'success',
+            'info': {
+                'build_version': '2.2.0',
+                'complete_ledgers': f"32570-{self.seq}",
+                'io_latency_ms': 1,
+                'jq_trans_overflow': '0',
+                'last_close': {'converge_time_s': 2.0, 'proposers': 35},
+                'load_factor': 1,
+                'node_size': 'medium',
+                'peer_disconnects': '12',
+                'peer_disconnects_resources': '0',
+                'peers': self.peers,
+                'pubkey_validator': VALIDATOR_KEY,
+                'server_state': self.server_state,
+                'server_state_duration_us': '3500000',
+                'state_accounting': {
+                    name: {'duration_us': '1000', 'transitions': '1'}
+                    for name in ('connected', 'disconnected', 'full', 'syncing', 'tracking', 'proposing')
+                },
+                'initial_sync_duration_us': '300000000',
+                'uptime': 86400,
+                'validated_ledger': {
+                    'age': 1,
+                    'base_fee_xrp': 1e-05,
+                    'hash': f"{self.seq:064X}",
+                    'reserve_base_xrp': 1,
+                    'reserve_inc_xrp': 0.2,
+                    'seq': self.seq
+                },
+                'validation_quorum': 28
+            }
+        }
+
+    def peer_list(self) -> Dict[str, Any]:
+        """peers result"""
+        return {
+            'status': 'success',
+            'peers': [{
+                'address': f"10.0.{i // 250}.{i % 250}:51235",
+                'inbound': i % 3 == 0,
+                'latency': 5 + i % 250,
+                'complete_ledgers': f"32570-{self.seq}",
+                'public_key': f"n9Peer{i:04d}",
+                'uptime': 1000 + i,
+                'version': 'rippled-2.2.0'
+            } for i in range(self.peers)]
+        }
+
+    def ledger(self, seq: int) -> Dict[str, Any]:
+        """ledger result for seq (one ledger every 3.5s ending now)"""
+        close_time = int(time.time() - (self.seq - seq) * 3.5) - RIPPLE_EPOCH
+        return {
+            'status': 'success',
+            'ledger': {
+                'ledger_index': str(seq),
+                'ledger_hash': f"{seq:064X}",
+                'close_time': close_time,
+                'transactions': [f"{seq:032X}{i:032X}" for i in range(self.txns_per_ledger)]
+            }
+        }
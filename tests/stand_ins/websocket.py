@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Stand-in rippled WebSocket - Serves subscription streams without a validator
+
+A local RFC 6455 server for StreamSubscriber and WebSocketClient. It does
+the upgrade handshake, answers subscribe with the current ledger and server
+status, and lets the caller push stream messages, pings, fragmented or
+oversized frames, close frames and abrupt disconnects:
+
+    server = StandInWebSocketServer()
+    server.start()
+    subscriber = StreamSubscriber(poller, url=server.url)
+    ...
+    server.ledger_closed()
+    server.drop()        # subscriber reconnects
+    server.close()
+
+Server frames are never masked; client frames must be (RFC 6455 5.1).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.rippled_api import RIPPLE_EPOCH
+from src.utils.websocket_client import (
+    WS_GUID, OP_CONTINUATION, OP_TEXT, OP_CLOSE, OP_PING, OP_PONG
+)
+
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept for a client's Sec-WebSocket-Key"""
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def encode_frame(opcode: int, payload: bytes, fin: bool = True,
+                 mask: Optional[bytes] = None) -> bytes:
+    """
+    Build one frame
+
+    Args:
+        opcode: Frame opcode
+        payload: Frame payload
+        fin: Last frame of the message
+        mask: 4-byte masking key (clients), None for an unmasked frame
+
+    Returns:
+        Frame bytes
+    """
+    header = bytes([(0x80 if fin else 0) | opcode])
+    mask_bit = 0x80 if mask is not None else 0
+    length = len(payload)
+    if length < 126:
+        header += bytes([mask_bit | length])
+    elif length < 65536:
+        header += bytes([mask_bit | 126]) + struct.pack('!H', length)
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack('!Q', length)
+
+    if mask is None:
+        return header + payload
+    return header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+def decode_frame(buffer: bytes) -> Optional[Tuple[bool, int, bool, bytes, int]]:
+    """
+    Parse one frame from the start of buffer
+
+    Returns:
+        (fin, opcode, masked, payload, bytes consumed), or None if buffer
+        holds a partial frame
+    """
+    if len(buffer) < 2:
+        return None
+    fin = bool(buffer[0] & 0x80)
+    opcode = buffer[0] & 0x0F
+    masked = bool(buffer[1] & 0x80)
+    length = buffer[1] & 0x7F
+    offset = 2
+    if length == 126:
+        if len(buffer) < 4:
+            return None
+        length = struct.unpack('!H', buffer[2:4])[0]
+        offset = 4
+    elif length == 127:
+        if len(buffer) < 10:
+            return None
+        length = struct.unpack('!Q', buffer[2:10])[0]
+        offset = 10
+
+    mask = None
+    if masked:
+        if len(buffer) < offset + 4:
+            return None
+        mask = buffer[offset:offset + 4]
+        offset += 4
+    if len(buffer) < offset + length:
+        return None
+
+    payload = buffer[offset:offset + length]
+    if mask is not None:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return fin, opcode, masked, payload, offset + length
+
+
+class _Client:
+    """One accepted connection"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.subscribed = threading.Event()
+        self.closed = False
+
+    def send(self, data: bytes):
+        with self.lock:
+            if not self.closed:
+                self.sock.sendall(data)
+
+    def shutdown(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class StandInWebSocketServer:
+    """
+    rippled admin WebSocket stand-in for the ledger, server and validations streams
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, ledger_seq: int = 90000000,
+                 server_status: str = 'proposing', reject: bool = False,
+                 bad_accept: bool = False, subscribe_error: Optional[str] = None):
+        """
+        Initialize stand-in
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            ledger_seq: Validated ledger reported by subscribe
+            server_status: Server state reported by subscribe
+            reject: Answer the upgrade with 403 instead of 101
+            bad_accept: Send a wrong Sec-WebSocket-Accept
+            subscribe_error: Fail subscribe with this rippled error
+        """
+        self.host = host
+        self.port = port
+        self.ledger_seq = ledger_seq
+        self.status = server_status
+        self.reject = reject
+        self.bad_accept = bad_accept
+        self.subscribe_error = subscribe_error
+
+        self.connections = 0
+        self.received: List[Dict[str, Any]] = []
+        self.pongs: List[bytes] = []
+        self.close_frames = 0
+        self._clients: List[_Client] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """ws:// URL clients connect to"""
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        """Listen and accept connections in the background"""
+        self._server = socket.create_server((self.host, self.port))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, name='ws-stand-in', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop listening and drop every connection"""
+        if self._server is not None:
+            server, self._server = self._server, None
+            # Wakes the accept() in progress (closing alone leaves it listening)
+            try:
+                server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            server.close()
+            self._thread.join(timeout=5)
+        self.drop()
+
+    # Connections
+
+    def _accept_loop(self):
+        while self._server is not None:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _handshake(self, sock: socket.socket) -> Tuple[bool, bytes]:
+        """Answer the upgrade request; returns (upgraded, bytes read past it)"""
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return False, b''
+            data += chunk
+        head, rest = data.split(b'\r\n\r\n', 1)
+        headers = {}
+        for line in head.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if self.reject or 'sec-websocket-key' not in headers:
+            sock.sendall(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+            return False, b''
+
+        accept = accept_key(headers['sec-websocket-key'])
+        if self.bad_accept:
+            accept = accept_key('not-the-key')
+        sock.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n"
+            "\r\n"
+        ).encode('ascii'))
+        return True, rest
+
+    def _serve(self, sock: socket.socket):
+        """Handshake, then read client frames until the connection ends"""
+        try:
+            upgraded, buffer = self._handshake(sock)
+        except OSError:
+            upgraded = False
+        if not upgraded:
+            sock.close()
+            return
+
+        client = _Client(sock)
+        with self._changed:
+            self._clients.append(client)
+            self.connections += 1
+            self._changed.notify_all()
+
+        try:
+            while True:
+                frame = decode_frame(buffer)
+                if frame is None:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    continue
+                fin, opcode, masked, payload, used = frame
+                buffer = buffer[used:]
+                if not masked:
+                    # Unmasked client frame: protocol error (1002)
+                    client.send(encode_frame(OP_CLOSE, struct.pack('!H', 1002)))
+                    break
+                if opcode == OP_PONG:
+                    with self._changed:
+                        self.pongs.append(payload)
+                        self._changed.notify_all()
+                elif opcode == OP_CLOSE:
+                    with self._changed:
+                        self.close_frames += 1
+                        self._changed.notify_all()
+                    client.send(encode_frame(OP_CLOSE, payload))
+                    break
+                elif opcode == OP_TEXT:
+                    self._handle(client, json.loads(payload))
+        except OSError:
+            pass
+        finally:
+            client.shutdown()
+            with self._changed:
+                if client in self._clients:
+                    self._clients.remove(client)
+                self._changed.notify_all()
+
+    def _handle(self, client: _Client, request: Dict[str, Any]):
+        """Answer one client command"""
+        with self._changed:
+            self.received.append(request)
+        if request.get('command') != 'subscribe':
+            self._send(client, {'id': request.get('id'), 'status': 'error', 'type': 'response',
+                                'error': 'unknownCmd'})
+            return
+        if self.subscribe_error:
+            self._send(client, {'id': request.get('id'), 'status': 'error', 'type': 'response',
+                                'error': self.subscribe_error})
+            return
+
+        result = dict(self._ledger_fields(self.ledger_seq))
+        result.update({'server_status': self.status, 'load_base': 256, 'load_factor': 256})
+        # Subscribed before the response goes out: anything pushed once the
+        # client has read it reaches the client
+        with self._changed:
+            client.subscribed.set()
+            self._changed.notify_all()
+        self._send(client, {'id': request.get('id'), 'status': 'success', 'type': 'response',
+                            'result': result})
+
+    def _send(self, client: _Client, message: Dict[str, Any]):
+        client.send(encode_frame(OP_TEXT, json.dumps(message).encode('utf-8')))
+
+    def wait_for_subscriber(self, connections: int = 1, timeout: float = 5) -> bool:
+        """
+        Wait until `connections` connections were made and one is subscribed
+
+        Returns:
+            False if the timeout expired first
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not (self.connections >= connections
+                       and any(c.subscribed.is_set() for c in self._clients)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def wait_for_pong(self, timeout: float = 5) -> Optional[bytes]:
+        """Wait until a pong has arrived; returns the latest payload (None on timeout)"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not self.pongs:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+            return self.pongs[-1]
+
+    def wait_for_close(self, timeout: float = 5) -> bool:
+        """Wait until a client has sent a close frame"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not self.close_frames:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def _subscribed(self) -> List[_Client]:
+        with self._lock:
+            return [c for c in self._clients if c.subscribed.is_set()]
+
+    # Stream messages and control frames
+
+    def push(self, message: Dict[str, Any], fragments: int = 1):
+        """
+        Send a message to every subscribed client
+
+        Args:
+            message: Stream message
+            fragments: Split it over this many frames
+        """
+        payload = json.dumps(message).encode('utf-8')
+        if fragments <= 1:
+            data = encode_frame(OP_TEXT, payload)
+        else:
+            size = -(-len(payload) // fragments)
+            parts = [payload[i:i + size] for i in range(0, len(payload), size)]
+            data = b''.join(
+                encode_frame(OP_TEXT if i == 0 else OP_CONTINUATION, part, fin=i == len(parts) - 1)
+                for i, part in enumerate(parts)
+            )
+        for client in self._subscribed():
+            client.send(data)
+
+    def send_raw(self, data: bytes):
+        """Send raw bytes (e.g. a hand-built frame) to every subscribed client"""
+        for client in self._subscribed():
+            client.send(data)
+
+    def ping(self, payload: bytes = b'stand-in'):
+        """Ping every subscribed client"""
+        self.send_raw(encode_frame(OP_PING, payload))
+
+    def send_close(self, code: int = 1001):
+        """Start a clean close (going away) with every client"""
+        self.send_raw(encode_frame(OP_CLOSE, struct.pack('!H', code)))
+
+    def drop(self):
+        """Cut every connection without a close frame"""
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.shutdown()
+
+    def _ledger_fields(self, seq: int) -> Dict[str, Any]:
+        return {
+            'ledger_index': seq,
+            'ledger_hash': f"{seq:064X}",
+            'ledger_time': int(time.time()) - RIPPLE_EPOCH,
+            'fee_base': 10,
+            'reserve_base': 1000000,
+            'reserve_inc': 200000,
+            'txn_count': 40,
+            'validated_ledgers': f"32570-{seq}"
+        }
+
+    def ledger_closed(self) -> int:
+        """Close the next ledger on the ledger stream; returns its sequence"""
+        self.ledger_seq += 1
+        message = {'type': 'ledgerClosed'}
+        message.update(self._ledger_fields(self.ledger_seq))
+        self.push(message)
+        return self.ledger_seq
+
+    def server_status(self, status: str, load_factor: int = 256):
+        """Report a server state change on the server stream"""
+        self.status = status
+        self.push({'type': 'serverStatus', 'server_status': status,
+                   'load_base': 256, 'load_factor': load_factor})
+
+    def validation(self, master_key: str, ledger_seq: int, ledger_hash: str = None):
+        """Relay a validation on the validations stream"""
+        self.push({'type': 'validationReceived', 'master_key': master_key,
+                   'validation_public_key': f"n9{master_key}", 'ledger_index': str(ledger_seq),
+                   'ledger_hash': ledger_hash or f"{ledger_seq:064X}", 'full': True})
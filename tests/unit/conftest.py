@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Fixtures shared by the unit tests
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+
+@pytest.fixture(scope='session')
+def prometheus():
+    # Metrics register in the process-wide registry, so there is one
+    # exporter per test run (its HTTP server is never started)
+    from src.exporters.prometheus_exporter import PrometheusExporter
+    return PrometheusExporter()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the compressed snapshot archive
+"""
+
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.archive import ArchiveReader, SnapshotArchive
+from tests.stand_ins.rippled import StandInRippled
+
+
+def server_infos(count: int):
+    rippled = StandInRippled()
+    for _ in range(count):
+        yield rippled.request('server_info')['info']
+
+
+def test_snapshots_round_trip(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), 'test', codec='zlib', keyframe_every=4)
+    written = []
+    for i, info in enumerate(server_infos(10)):
+        archive.append('server_info', 1000.0 + i, info)
+        written.append(info)
+    archive.close()
+
+    snapshots = list(ArchiveReader(str(tmp_path), 'test').iter_snapshots())
+    assert [snapshot for _, _, snapshot in snapshots] == written
+    assert [timestamp for timestamp, _, _ in snapshots] == [1000.0 + i for i in range(10)]
+
+
+def test_changes_after_append_are_not_archived(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), 'test', codec='zlib')
+    first, second = server_infos(2)
+    archive.append('server_info', 1000.0, first)
+    # Patched in place the way the stream subscriber does
+    first['server_state'] = 'full'
+    first['validated_ledger']['seq'] = second['validated_ledger']['seq']
+    archive.append('server_info', 1001.0, second)
+    archive.close()
+
+    snapshots = [snapshot for _, _, snapshot in
+                 ArchiveReader(str(tmp_path), 'test').iter_snapshots()]
+    assert snapshots[0]['server_state'] == 'proposing'
+    assert snapshots[0]['validated_ledger']['seq'] == second['validated_ledger']['seq'] - 1
+    # The delta was taken against what was archived, not the patched dict
+    assert snapshots[1] == second
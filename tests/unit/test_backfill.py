@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the ledger gap backfill worker
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.collectors.backfill import LedgerBackfill
+from src.collectors.validation_tracker import ValidationTracker
+from src.storage.database import Database
+from src.utils.ledger_window import LedgerWindow
+from src.utils.rippled_api import RippledAPI
+from src.utils.transports import TransportError
+from tests.stand_ins.rippled import VALIDATOR_KEY, StandInRippled
+
+
+class MissingLedgers(StandInRippled):
+    """Stand-in that does not have the ledgers in missing"""
+
+    def __init__(self, missing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.missing = set(missing)
+        self.fetched = []
+
+    def request(self, command, params=None):
+        if command == 'ledger':
+            seq = int(params['ledger_index'])
+            self.fetched.append(seq)
+            if seq in self.missing:
+                raise TransportError(f"lgrNotFound {seq}")
+        return super().request(command, params)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def make_backfill(db):
+    made = []
+
+    def make(transport, **kwargs):
+        api = RippledAPI(transport=transport)
+        tracker = ValidationTracker(api, db, validator_pubkey=VALIDATOR_KEY, node='test')
+        backfill = LedgerBackfill(api, db, tracker, node='test', max_workers=2, **kwargs)
+        made.append(backfill)
+        return backfill
+
+    yield make
+    for backfill in made:
+        backfill.stop()
+
+
+def recorded(db: Database):
+    with db.get_reader() as conn:
+        return conn.execute('''
+            SELECT ledger_seq, ledger_hash FROM ledger_validations
+            WHERE node = 'test' ORDER BY ledger_seq
+        ''').fetchall()
+
+
+def test_gaps_are_recorded_from_real_headers(db, make_backfill):
+    backfill = make_backfill(MissingLedgers())
+    backfill.enqueue([90000001, 90000002, 90000003])
+
+    assert backfill.run_batch() == (3, 3)
+    assert recorded(db) == [(seq, f"{seq:064X}") for seq in (90000001, 90000002, 90000003)]
+    assert db.count_backfill_pending(node='test') == 0
+
+
+def test_the_queue_survives_a_restart(db, make_backfill):
+    first = make_backfill(MissingLedgers())
+    first.enqueue([90000001, 90000002])
+    # Never fetched: stop() persists what the worker had not taken yet
+    first.stop()
+    assert db.count_backfill_pending(node='test') == 2
+
+    transport = MissingLedgers()
+    second = make_backfill(transport)
+    assert second.run_batch() == (2, 2)
+    assert sorted(transport.fetched) == [90000001, 90000002]
+    assert db.count_backfill_pending(node='test') == 0
+
+
+def test_failed_fetches_are_retried_then_abandoned(db, make_backfill):
+    backfill = make_backfill(MissingLedgers(missing=[90000002]), max_attempts=2)
+    backfill.enqueue([90000001, 90000002])
+
+    assert backfill.run_batch() == (2, 1)
+    assert db.get_backfill_batch(node='test') == [(90000002, 1)]
+
+    assert backfill.run_batch() == (1, 0)
+    assert db.count_backfill_pending(node='test') == 0
+    assert backfill.ledgers_backfilled == 1
+    assert backfill.ledgers_abandoned == 1
+    assert [seq for seq, _ in recorded(db)] == [90000001]
+
+
+def test_ledgers_recorded_live_meanwhile_are_not_fetched(db, make_backfill):
+    window = LedgerWindow(64)
+    window.mark(90000002)
+    transport = MissingLedgers()
+    backfill = make_backfill(transport, ledger_window=window)
+    backfill.enqueue([90000001, 90000002])
+
+    assert backfill.run_batch() == (2, 2)
+    assert transport.fetched == [90000001]
+    # Backfilled ledgers join the window
+    assert 90000001 in window
+
+
+def test_only_the_newest_ledgers_of_a_huge_gap_are_queued(db, make_backfill):
+    backfill = make_backfill(MissingLedgers(), max_gap=3)
+    backfill.enqueue(range(90000001, 90000011))
+    backfill.stop()
+
+    assert [seq for seq, _ in db.get_backfill_batch(node='test')] == [90000010, 90000009, 90000008]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Smoke tests for the poll path benchmarks
+"""
+
+import argparse
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from benchmarks import poll_path
+from benchmarks.poll_path import BENCHMARKS, measure, percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) == 0.0
+
+
+def test_measure_counts_every_call():
+    calls = []
+    result = measure(calls.append, ops=5, warmup=2, alloc_ops=3)
+
+    assert calls == list(range(10))
+    assert result['ops'] == 5
+    assert result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
+    assert 'alloc_peak_bytes_per_op' in result
+    assert 'alloc_peak_bytes_per_op' not in measure(calls.append, ops=1, warmup=0, alloc_ops=0)
+
+
+@pytest.fixture
+def args():
+    return argparse.Namespace(only=None, polls=20, db_ops=20, query_ops=2, warmup=2, alloc_ops=2,
+                              latency=0.0, write_buffer_rows=200, write_buffer_delay_ms=1000,
+                              recording=None)
+
+
+def test_every_benchmark_runs(args, prometheus, monkeypatch, capsys):
+    # One exporter per process: the metrics live in the global registry
+    monkeypatch.setattr(poll_path, 'PrometheusExporter', lambda port: prometheus)
+    report = poll_path.run(args)
+
+    assert report['source'] == 'synthetic'
+    assert list(report['benchmarks']) == list(BENCHMARKS)
+    for result in report['benchmarks'].values():
+        assert result['ops'] > 0
+        assert result['ops_per_sec'] > 0
+
+    poll = report['benchmarks']['poll']
+    assert poll['api_errors'] == 0
+    assert poll['rippled_requests_per_op'] >= 1
+    assert 'db_growth_per_10k_ops_bytes' in report['benchmarks']['db_write']
+
+    poll_path.print_report(report, baseline=report)
+    assert 'ops_per_sec' in capsys.readouterr().err
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the poller checkpoint and warm restart
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.alerts.alerter import Alerter
+from src.collectors.fast_poller import FastPoller
+from src.storage.database import Database
+from src.utils.rippled_api import RippledAPI
+from tests.stand_ins.rippled import StandInRippled
+
+T0 = 1_700_000_000.0
+
+
+class Clock:
+    """Sample clock the test moves by hand"""
+
+    def __init__(self):
+        self.now = T0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def make_poller(tmp_path, db, clock):
+    pollers = []
+
+    def make():
+        poller = FastPoller(RippledAPI(transport=StandInRippled()), db,
+                            Alerter(str(tmp_path / 'alerts.log'), node='test'),
+                            node='test', interval=3, clock=clock)
+        poller.fetch_ledger_closes = False
+        pollers.append(poller)
+        return poller
+
+    yield make
+    for poller in pollers:
+        poller.close()
+
+
+def poll(poller, clock, count: int):
+    for _ in range(count):
+        poller.poll()
+        clock.now += 3
+
+
+def checked(poller) -> list:
+    window = poller.checked_ledgers
+    return [seq for seq in range(window.base, window.base + window.size) if seq in window]
+
+
+def test_checkpoint_round_trip(make_poller, clock):
+    first = make_poller()
+    poll(first, clock, 6)
+    first.save_checkpoint()
+
+    second = make_poller()
+    assert second.restore_state(max_age=600)
+    assert second.last_state == 'proposing'
+    assert second.state_entered_at == T0
+    assert second.last_ledger_seq == first.last_ledger_seq
+    assert second.last_uptime == first.last_uptime
+    assert checked(second) == checked(first)
+    assert len(checked(second)) == 5
+
+
+def test_ledgers_recorded_after_the_checkpoint_are_restored(make_poller, clock):
+    first = make_poller()
+    poll(first, clock, 4)
+    first.save_checkpoint()
+    # Validated after the last checkpoint, before the restart
+    poll(first, clock, 3)
+
+    second = make_poller()
+    assert second.restore_state(max_age=600)
+    assert second.last_ledger_seq == first.last_ledger_seq
+    assert checked(second) == checked(first)
+
+
+def test_a_stale_checkpoint_restores_checked_ledgers_only(make_poller, clock):
+    first = make_poller()
+    poll(first, clock, 4)
+    first.save_checkpoint()
+
+    clock.now += 3600
+    second = make_poller()
+    assert not second.restore_state(max_age=600)
+    assert second.last_state is None
+    assert checked(second) == checked(first)
+
+
+def test_nothing_to_restore_on_a_new_database(make_poller):
+    assert not make_poller().restore_state()
+
+
+def test_no_checkpoint_before_the_first_poll(make_poller, db):
+    make_poller().save_checkpoint()
+    assert db.get_checkpoint(node='test') is None
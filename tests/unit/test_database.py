@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the Database connection setup: WAL mode, pragmas and the writer
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+def pragma(conn, name: str):
+    return conn.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def count_metrics(db: Database) -> int:
+    with db.get_reader() as conn:
+        return conn.execute('SELECT COUNT(*) FROM validator_metrics').fetchone()[0]
+
+
+def test_database_is_in_wal_mode(db):
+    with db.get_connection() as conn:
+        assert pragma(conn, 'journal_mode') == 'wal'
+    with db.get_reader() as conn:
+        assert pragma(conn, 'journal_mode') == 'wal'
+
+
+def test_connection_pragmas(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'), cache_size_mb=4, mmap_size_mb=8,
+                  synchronous='FULL', busy_timeout=2.5)
+    try:
+        with db.get_connection() as conn:
+            assert pragma(conn, 'synchronous') == 2
+            assert pragma(conn, 'busy_timeout') == 2500
+            assert pragma(conn, 'cache_size') == -4096
+            assert pragma(conn, 'mmap_size') == 8 * 1024 * 1024
+            assert pragma(conn, 'temp_store') == 2
+        with db.get_reader() as conn:
+            assert pragma(conn, 'busy_timeout') == 2500
+            assert pragma(conn, 'cache_size') == -4096
+    finally:
+        db.close()
+
+
+def test_default_synchronous_is_normal(db):
+    with db.get_connection() as conn:
+        assert pragma(conn, 'synchronous') == 1
+
+
+def test_one_writer_connection_is_shared_by_all_threads(db):
+    seen = []
+
+    def write():
+        with db.get_connection() as conn:
+            seen.append(conn)
+
+    write()
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join()
+
+    assert seen[0] is seen[1] is db._writer
+
+
+def insert_metrics(db: Database, conn, timestamp: float):
+    conn.execute(db.INSERTS['validator_metrics'],
+                 (timestamp, db.state_id('proposing'), 90000000, 21, 1.0, 'test'))
+
+
+def test_failed_writes_are_rolled_back(db):
+    with pytest.raises(RuntimeError):
+        with db.get_connection() as conn:
+            insert_metrics(db, conn, 1000.0)
+            raise RuntimeError('fail mid-transaction')
+
+    assert count_metrics(db) == 0
+    assert not db._writer.in_transaction
+
+
+def test_readers_are_not_blocked_by_an_open_write(db):
+    db.write_metrics(1000.0, 'proposing', 90000000, 21, 1.0)
+    in_transaction = threading.Event()
+    release = threading.Event()
+
+    def long_write():
+        with db.get_connection() as conn:
+            insert_metrics(db, conn, 1001.0)
+            assert conn.in_transaction
+            in_transaction.set()
+            release.wait(timeout=5)
+
+    writer = threading.Thread(target=long_write)
+    writer.start()
+    try:
+        assert in_transaction.wait(timeout=5)
+        # Answered from the last committed snapshot, without waiting
+        assert count_metrics(db) == 1
+    finally:
+        release.set()
+        writer.join(timeout=5)
+    assert count_metrics(db) == 2
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the background rippled database size scanner
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils import db_size_scanner
+from src.utils.db_size_scanner import DatabaseSizeScanner
+
+
+def write(path, size: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+
+
+def touch_dir(path, seconds: int):
+    """Give a directory a distinct mtime, as adding an entry would"""
+    os.utime(path, ns=(seconds * 10**9, seconds * 10**9))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    write(str(tmp_path / 'db' / 'ledger.db'), 1000)
+    write(str(tmp_path / 'db' / 'transaction.db'), 500)
+    write(str(tmp_path / 'nudb' / 'shard' / 'nudb.dat'), 2000)
+    return tmp_path
+
+
+@pytest.fixture
+def listings(monkeypatch):
+    """Count directory listings"""
+    listed = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        listed.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(db_size_scanner.os, 'scandir', counting_scandir)
+    return listed
+
+
+def test_sizes_of_both_trees(data_dir):
+    assert DatabaseSizeScanner(str(data_dir)).scan() == {'ledger_db': 1500, 'nudb': 2000}
+
+
+def test_unchanged_directories_are_not_listed_again(data_dir, listings):
+    scanner = DatabaseSizeScanner(str(data_dir))
+    scanner.scan()
+    assert len(listings) == 3
+
+    # Files grown in place are measured without relisting
+    write(str(data_dir / 'nudb' / 'shard' / 'nudb.dat'), 3000)
+    listings.clear()
+    assert scanner.scan()['nudb'] == 3000
+    assert listings == []
+
+
+def test_a_changed_directory_is_listed_again(data_dir, listings):
+    scanner = DatabaseSizeScanner(str(data_dir))
+    scanner.scan()
+
+    write(str(data_dir / 'db' / 'wallet.db'), 250)
+    touch_dir(str(data_dir / 'db'), 2_000_000_000)
+    listings.clear()
+
+    assert scanner.scan()['ledger_db'] == 1750
+    assert listings == [os.path.join(str(data_dir), 'db')]
+
+
+def test_a_removed_file_is_relisted_on_the_next_scan(data_dir):
+    scanner = DatabaseSizeScanner(str(data_dir))
+    scanner.scan()
+    mtime = os.stat(str(data_dir / 'db')).st_mtime_ns
+
+    # Removed without the mtime changing (e.g. coarse timestamps)
+    os.remove(str(data_dir / 'db' / 'transaction.db'))
+    os.utime(str(data_dir / 'db'), ns=(mtime, mtime))
+
+    assert scanner.scan()['ledger_db'] == 1000
+    assert os.path.join(str(data_dir), 'db') not in scanner._listings
+    assert scanner.scan()['ledger_db'] == 1000
+
+
+def test_removed_directories_are_forgotten(data_dir):
+    scanner = DatabaseSizeScanner(str(data_dir))
+    scanner.scan()
+    shard = os.path.join(str(data_dir), 'nudb', 'shard')
+    assert shard in scanner._listings
+
+    os.remove(os.path.join(shard, 'nudb.dat'))
+    os.rmdir(shard)
+    assert scanner.scan()['nudb'] == 0
+    assert shard not in scanner._listings
+
+
+def test_triggered_scanner_scans_only_when_asked(data_dir):
+    scanner = DatabaseSizeScanner(str(data_dir), interval=None)
+    scanner.start()
+    try:
+        time.sleep(0.1)
+        assert scanner.scans_completed == 0
+        scanner.trigger()
+        deadline = time.monotonic() + 5
+        while scanner.scans_completed == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scanner.stop(timeout=5)
+
+    assert scanner.scans_completed == 1
+    assert scanner.latest_sizes['ledger_db'] == 1500
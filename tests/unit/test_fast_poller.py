@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for FastPoller background fetches and error handling
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.alerts.alerter import Alerter
+from src.collectors.adaptive_rate import AdaptivePollRate
+from src.collectors.fast_poller import FastPoller
+from src.storage.database import Database
+from src.utils.rippled_api import RippledAPI
+from src.utils.transports import TransportError
+from tests.stand_ins.rippled import StandInRippled
+
+
+class SlowLedgerTransport(StandInRippled):
+    """Stand-in whose ledger command takes ledger_latency seconds"""
+
+    def __init__(self, ledger_latency: float, **kwargs):
+        super().__init__(**kwargs)
+        self.ledger_latency = ledger_latency
+        self.ledger_calls = 0
+        self.ledger_active = 0
+        self.ledger_peak = 0
+        self._lock = threading.Lock()
+
+    def request(self, command, params=None):
+        if command != 'ledger':
+            return super().request(command, params)
+        with self._lock:
+            self.ledger_calls += 1
+            self.ledger_active += 1
+            self.ledger_peak = max(self.ledger_peak, self.ledger_active)
+        try:
+            time.sleep(self.ledger_latency)
+            return super().request(command, params)
+        finally:
+            with self._lock:
+                self.ledger_active -= 1
+
+
+@pytest.fixture
+def make_poller(tmp_path):
+    pollers = []
+
+    def make(transport, **kwargs):
+        db = Database(str(tmp_path / 'monitor.db'))
+        poller = FastPoller(RippledAPI(transport=transport), db,
+                            Alerter(str(tmp_path / 'alerts.log'), node='test'),
+                            node='test', **kwargs)
+        pollers.append((poller, db))
+        return poller
+
+    yield make
+    for poller, db in pollers:
+        poller.close()
+        db.close()
+
+
+def test_slow_ledger_fetches_do_not_delay_server_info(make_poller):
+    transport = SlowLedgerTransport(ledger_latency=0.4)
+    poller = make_poller(transport, interval=1, poll_deadline=0.2)
+
+    for _ in range(12):
+        poller.poll()
+
+    assert poller.api_errors == 0
+    assert poller.poll_count == 12
+    # One fetch at a time, however far behind it is
+    assert transport.ledger_peak == 1
+    assert transport.ledger_calls <= 8
+
+
+def test_ledger_fetch_widens_to_ledgers_closed_meanwhile(make_poller):
+    transport = SlowLedgerTransport(ledger_latency=0.05)
+    poller = make_poller(transport, interval=1)
+
+    poller.poll()
+    poller.poll()
+    poller.poll()
+    time.sleep(0.3)
+    poller.poll()
+    time.sleep(0.3)
+    poller.poll()
+
+    # The second fetch covers the ledgers of the polls made while the first
+    # was running, so every close interval up to the fourth poll is seen
+    assert poller.throughput.last_seq == transport.seq - 1
+    assert poller.throughput.ledgers_recorded == 3
+
+
+class SlowTransport(StandInRippled):
+    """Stand-in whose commands take latency[command] seconds"""
+
+    def __init__(self, **latency):
+        super().__init__()
+        self.latency = latency
+
+    def request(self, command, params=None):
+        time.sleep(self.latency.get(command, 0))
+        return super().request(command, params)
+
+
+def exported_polls(poller) -> list:
+    """Record the PollSamples the poller hands to the export stage"""
+    samples = []
+    poller.pipeline.export = samples.append
+    return samples
+
+
+def test_slow_peers_fetch_does_not_delay_polls(make_poller):
+    poller = make_poller(SlowTransport(peers=0.3), interval=1)
+    samples = exported_polls(poller)
+    poller.fetch_ledger_closes = False
+
+    poller._refresh_peer_details()
+    started = time.monotonic()
+    poller.poll()
+    assert time.monotonic() - started < 0.2
+    # Not ready yet: the poll goes ahead without peer details
+    assert samples[-1].peer_details['outbound'] == 0
+
+    # A refresh while one is in flight does not start another
+    poller._refresh_peer_details()
+    poller._peers_future.result(timeout=5)
+    poller.poll()
+    assert poller.api.transport.commands.count('peers') == 1
+    assert samples[-1].peer_details['inbound'] + samples[-1].peer_details['outbound'] == 21
+
+
+def test_server_info_past_the_deadline_fails_the_poll(make_poller):
+    poller = make_poller(SlowTransport(server_info=0.5), interval=1, poll_deadline=0.1)
+
+    started = time.monotonic()
+    poller.poll()
+
+    assert time.monotonic() - started < 0.4
+    assert poller.api_errors == 1
+    assert poller.poll_count == 0
+
+
+class FlakyTransport(StandInRippled):
+    """Stand-in that fails server_info while down is set"""
+
+    down = False
+
+    def request(self, command, params=None):
+        if self.down and command == 'server_info':
+            raise TransportError('connection refused')
+        return super().request(command, params)
+
+
+def failed_polls_until_unreachable(poller) -> int:
+    """Fail polls until the poller records the validator as unreachable"""
+    poller.api.transport.down = True
+    for attempt in range(1, 100):
+        poller.poll()
+        if poller.last_state == 'unreachable':
+            return attempt
+    return 0
+
+
+def test_unreachable_after_three_failed_polls_at_fixed_rate(make_poller):
+    poller = make_poller(FlakyTransport(), interval=3)
+    poller.build_scheduler()
+    poller.poll()
+
+    assert failed_polls_until_unreachable(poller) == 3
+    assert poller.unreachable_for == 6
+    assert poller.state_changes == 1
+
+
+def test_fast_adaptive_polling_does_not_alert_sooner(make_poller):
+    poller = make_poller(FlakyTransport(), interval=3,
+                         adaptive=AdaptivePollRate(3, min_interval=0.5, max_interval=15))
+    poller.build_scheduler()
+    poller.poll()
+
+    # The first failure drops the period to 0.5s - a 1.5s blip is not an outage
+    poller.api.transport.down = True
+    for _ in range(4):
+        poller.poll()
+    assert poller.last_state == 'proposing'
+
+    poller.api.transport.down = False
+    poller.poll()
+    assert poller.consecutive_errors == 0
+
+    # 6s of polls at 0.5s: the 13th failure
+    assert failed_polls_until_unreachable(poller) == 13
+    assert poller.state_changes == 1
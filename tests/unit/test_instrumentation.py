@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the slowest-poll trace
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.alerts.alerter import Alerter
+from src.collectors.fast_poller import FastPoller
+from src.processors.pipeline import Pipeline
+from src.storage.database import Database
+from src.utils.instrumentation import instrumentation, stage
+from src.utils.rippled_api import RippledAPI
+from src.utils.transports import DockerSocketTransport
+from tests.stand_ins.docker import StandInDockerDaemon
+from tests.stand_ins.rippled import StandInRippled
+
+
+@pytest.fixture(autouse=True)
+def tracing():
+    # Collect the slowest trace without printing it
+    instrumentation.enable(trace_interval=0)
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.slowest_trace = None
+
+
+def stage_names(stages):
+    return [name for name, _ in stages]
+
+
+def test_bound_work_joins_the_trace(tracing):
+    def request():
+        with stage('rippled.server_info'):
+            return threading.get_ident()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        tracing.begin_trace()
+        worker = executor.submit(tracing.bind(request)).result()
+        with stage('print'):
+            pass
+        tracing.end_trace('poll #1', 0.01)
+        # Not tracing: runs as is
+        executor.submit(tracing.bind(request)).result()
+
+    assert worker != threading.get_ident()
+    label, seconds, trace = tracing.slowest_trace
+    assert stage_names(trace.stages) == ['rippled.server_info', 'print']
+
+
+def test_poll_trace_includes_rippled_and_json_stages(tracing, tmp_path):
+    socket_path = os.path.join('/tmp', f"docker-stand-in-{os.getpid()}-trace.sock")
+    daemon = StandInDockerDaemon(socket_path)
+    daemon.start()
+    db = Database(str(tmp_path / 'monitor.db'))
+    poller = FastPoller(RippledAPI(transport=DockerSocketTransport(socket_path=socket_path, timeout=2)),
+                        db, Alerter(str(tmp_path / 'alerts.log'), node='test'), node='test')
+    try:
+        poller.poll()
+    finally:
+        poller.close()
+        db.close()
+        daemon.close()
+
+    label, seconds, trace = tracing.slowest_trace
+    names = stage_names(trace.stages)
+    # Run on the poller's executor, not the polling thread
+    assert 'rippled.server_info' in names
+    assert 'json_decode' in names
+    assert 'wait.server_info' in names
+
+
+def test_pipeline_writes_are_reported_after_the_poll(tracing, tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    pipeline = Pipeline(db)
+    pipeline.start()
+    poller = FastPoller(RippledAPI(transport=StandInRippled()), db,
+                        Alerter(str(tmp_path / 'alerts.log'), node='test'), node='test',
+                        pipeline=pipeline)
+    try:
+        poller.poll()
+    finally:
+        # Drains the queues
+        pipeline.stop()
+        poller.close()
+        db.close()
+
+    label, seconds, trace = tracing.slowest_trace
+    assert 'enqueue.persist' in stage_names(trace.stages)
+    assert 'db.write_metrics' in stage_names(trace.after)
+    assert 'db.write_metrics' not in stage_names(trace.stages)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset-paged range reads (Database.iter_range)
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+def write_metrics(db: Database, timestamps, node: str = 'test'):
+    for i, timestamp in enumerate(timestamps):
+        db.write_metrics(timestamp, 'proposing' if i % 2 else 'full', 90000000 + i, 20 + i, 1.0,
+                         node=node)
+
+
+def write_validations(db: Database, seqs, timestamp: float = 1000.0):
+    for seq in seqs:
+        db.write_ledger_validation(timestamp, seq, 'proposing', True, True, True, True, 21, 1.0,
+                                   node='test', ledger_hash=f"{seq:064X}", close_time=timestamp)
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 7, 100])
+def test_duplicate_timestamps_across_page_boundaries(db, page_size):
+    # Runs of equal timestamps longer than a page: rows are told apart by id
+    timestamps = [1000.0] * 5 + [1001.0] * 2 + [1002.0]
+    write_metrics(db, timestamps)
+
+    rows = list(db.iter_range('validator_metrics', node='test', page_size=page_size))
+    columns = db.range_columns('validator_metrics')
+    assert [row[columns.index('peers')] for row in rows] == list(range(20, 28))
+    assert [row[columns.index('timestamp')] for row in rows] == timestamps
+
+
+def test_a_range_that_fills_whole_pages(db):
+    write_metrics(db, [1000.0 + i for i in range(6)])
+
+    rows = list(db.iter_range('validator_metrics', node='test', page_size=3))
+    assert len(rows) == 6
+
+
+def test_start_is_included_and_end_excluded(db):
+    write_metrics(db, [1000.0 + i for i in range(10)])
+
+    rows = list(db.iter_range('validator_metrics', 1002, 1007, node='test', page_size=2))
+    assert [row[0] for row in rows] == [1002.0, 1003.0, 1004.0, 1005.0, 1006.0]
+
+
+def test_other_nodes_are_left_out(db):
+    write_metrics(db, [1000.0, 1001.0], node='test')
+    write_metrics(db, [1000.0, 1001.0, 1002.0], node='other')
+
+    assert len(list(db.iter_range('validator_metrics', node='test', page_size=1))) == 2
+
+
+def test_states_are_returned_as_names(db):
+    write_metrics(db, [1000.0, 1001.0])
+
+    columns = db.range_columns('validator_metrics')
+    assert 'id' not in columns and 'node' not in columns
+    rows = list(db.iter_range('validator_metrics', node='test', page_size=1))
+    assert [row[columns.index('state')] for row in rows] == ['full', 'proposing']
+
+
+def test_validations_ranged_by_ledger_sequence(db):
+    # Written out of order, all closing at the same time
+    write_validations(db, [90000005, 90000001, 90000003, 90000002, 90000004])
+
+    columns = db.range_columns('ledger_validations')
+    rows = list(db.iter_range('ledger_validations', 90000002, 90000005, node='test',
+                              key='ledger_seq', page_size=2))
+    assert [row[columns.index('ledger_seq')] for row in rows] == [90000002, 90000003, 90000004]
+    assert rows[0][columns.index('ledger_hash')] == f"{90000002:064X}"
+
+    # By time the equal timestamps are ordered by sequence
+    rows = list(db.iter_range('ledger_validations', node='test', page_size=2))
+    assert [row[columns.index('ledger_seq')] for row in rows] == list(range(90000001, 90000006))
+
+
+def test_rows_written_between_pages_are_picked_up(db):
+    write_metrics(db, [1000.0, 1001.0, 1002.0])
+
+    rows = db.iter_range('validator_metrics', node='test', page_size=2)
+    first = [next(rows), next(rows)]
+    # No read snapshot is held between pages
+    db.write_metrics(1003.0, 'full', 90000003, 23, 1.0, node='test')
+    assert [row[0] for row in first + list(rows)] == [1000.0, 1001.0, 1002.0, 1003.0]
+
+
+def test_unknown_keys_and_tables_are_rejected(db):
+    with pytest.raises(ValueError):
+        list(db.iter_range('validator_metrics', key='ledger_seq'))
+    with pytest.raises(ValueError):
+        db.range_columns('server_states')
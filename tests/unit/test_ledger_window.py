@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the sliding ledger window
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.ledger_window import LedgerWindow
+
+
+def test_marks_and_membership():
+    window = LedgerWindow(8)
+    assert 100 not in window
+    assert window.mark(100)
+
+    assert 100 in window
+    assert 99 not in window
+    assert len(window) == 1
+    assert window.newest == 100
+
+
+def test_sliding_forgets_the_oldest_ledgers():
+    window = LedgerWindow(8)
+    for seq in range(100, 108):
+        window.mark(seq)
+
+    window.mark(110)
+    assert window.base == 103
+    assert 102 not in window
+    assert all(seq in window for seq in range(103, 108))
+    # Slots reused for 108 and 109 were cleared, not inherited from 100 and 101
+    assert 108 not in window and 109 not in window
+    assert len(window) == 6
+
+
+def test_a_jump_past_the_whole_window_clears_it():
+    window = LedgerWindow(8)
+    for seq in range(100, 108):
+        window.mark(seq, value=f"hash{seq}")
+
+    window.mark(1000)
+    assert len(window) == 1
+    assert window.get(1000) is None
+    assert window.get(1000 - 8) is None
+
+
+def test_ledgers_older_than_the_window_are_refused():
+    window = LedgerWindow(8)
+    window.mark(100)
+
+    assert not window.mark(92)
+    assert window.mark(93)
+    assert window.base == 93
+
+
+def test_values_survive_wraparound():
+    window = LedgerWindow(4)
+    for seq in range(10, 20):
+        window.mark(seq, value=seq * 2)
+
+    assert [window.get(seq) for seq in range(16, 20)] == [32, 34, 36, 38]
+    assert window.get(15, 'gone') == 'gone'
+
+
+@pytest.mark.parametrize('base', [96, 99, 101])
+def test_missing_across_the_ring_boundary(base):
+    window = LedgerWindow(8)
+    marked = [base + i for i in (0, 1, 3, 6)]
+    for seq in marked:
+        window.mark(seq)
+    window.mark(base + 7)
+
+    assert window.missing(base, base + 7) == [base + 2, base + 4, base + 5]
+    assert window.missing_ranges(base, base + 7) == [(base + 2, base + 2), (base + 4, base + 5)]
+
+
+def test_missing_is_clamped_to_the_window():
+    window = LedgerWindow(8)
+    window.mark(100)
+
+    assert window.missing(0, 1000) == list(range(93, 100))
+    assert window.missing(101, 200) == []
+    assert LedgerWindow(8).missing(0, 10) == []
+
+
+def test_bits_round_trip():
+    window = LedgerWindow(16)
+    marked = [1003, 1004, 1010, 1015, 1017]
+    for seq in marked:
+        window.mark(seq)
+
+    copy = LedgerWindow(16)
+    copy.load_bits(*window.to_bits())
+
+    assert copy.base == window.base
+    assert [seq for seq in range(1000, 1020) if seq in copy] == marked
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        LedgerWindow(0)
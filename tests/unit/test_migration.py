@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tests for migrating databases from before schema versioning (v0) to v1
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.database import Database
+from src.utils.nodes import DEFAULT_NODE
+
+# The layout of the first release (no node column, no ledger header columns)
+V0_SCHEMA = '''
+    CREATE TABLE validator_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        server_state TEXT NOT NULL,
+        ledger_seq INTEGER NOT NULL,
+        peers INTEGER,
+        load_factor REAL
+    );
+    CREATE INDEX idx_timestamp ON validator_metrics(timestamp);
+    CREATE INDEX idx_ledger_seq ON validator_metrics(ledger_seq);
+    CREATE TABLE state_transitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        old_state TEXT NOT NULL,
+        new_state TEXT NOT NULL,
+        duration_in_old_state REAL,
+        ledger_seq INTEGER,
+        peers INTEGER,
+        load_factor REAL
+    );
+    CREATE INDEX idx_transitions_timestamp ON state_transitions(timestamp);
+    CREATE TABLE ledger_validations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        ledger_seq INTEGER NOT NULL UNIQUE,
+        server_state TEXT NOT NULL,
+        was_proposing BOOLEAN NOT NULL,
+        should_validate BOOLEAN NOT NULL,
+        did_validate BOOLEAN,
+        agreed BOOLEAN,
+        peers INTEGER,
+        load_factor REAL
+    );
+    CREATE INDEX idx_validations_ledger ON ledger_validations(ledger_seq);
+'''
+
+# The unversioned multi-node layout (node and ledger header columns added)
+V0_NODE_SCHEMA = '''
+    CREATE TABLE validator_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        server_state TEXT NOT NULL,
+        ledger_seq INTEGER NOT NULL,
+        peers INTEGER,
+        load_factor REAL,
+        node TEXT NOT NULL DEFAULT 'validator'
+    );
+    CREATE TABLE state_transitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        old_state TEXT NOT NULL,
+        new_state TEXT NOT NULL,
+        duration_in_old_state REAL,
+        ledger_seq INTEGER,
+        peers INTEGER,
+        load_factor REAL,
+        node TEXT NOT NULL DEFAULT 'validator'
+    );
+    CREATE TABLE ledger_validations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp REAL NOT NULL,
+        ledger_seq INTEGER NOT NULL,
+        server_state TEXT NOT NULL,
+        was_proposing BOOLEAN NOT NULL,
+        should_validate BOOLEAN NOT NULL,
+        did_validate BOOLEAN,
+        agreed BOOLEAN,
+        peers INTEGER,
+        load_factor REAL,
+        node TEXT NOT NULL DEFAULT 'validator',
+        ledger_hash TEXT,
+        close_time REAL,
+        UNIQUE (node, ledger_seq)
+    );
+'''
+
+
+def insert(conn: sqlite3.Connection, table: str, **row):
+    conn.execute(f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                 list(row.values()))
+
+
+def create_v0(path: str, schema: str, nodes=(None,)):
+    """Five metrics and ledgers plus one transition per node (None = no node column)"""
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    for node in nodes:
+        extra = {} if node is None else {'node': node}
+        for i in range(5):
+            insert(conn, 'validator_metrics', timestamp=1000.0 + i,
+                   server_state='full' if i < 2 else 'proposing', ledger_seq=100 + i,
+                   peers=21, load_factor=1.0, **extra)
+            insert(conn, 'ledger_validations', timestamp=1000.0 + i, ledger_seq=100 + i,
+                   server_state='proposing', was_proposing=1, should_validate=1,
+                   did_validate=i != 3, agreed=None if i == 3 else 1, peers=21,
+                   load_factor=1.0, **extra)
+        insert(conn, 'state_transitions', timestamp=1002.0, old_state='full',
+               new_state='proposing', duration_in_old_state=2.0, ledger_seq=102, peers=21,
+               load_factor=1.0, **extra)
+    conn.commit()
+    conn.close()
+
+
+def rows(db: Database, sql: str):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    opened = []
+
+    def open_v0(schema: str, nodes=(None,)):
+        path = str(tmp_path / 'monitor.db')
+        create_v0(path, schema, nodes)
+        db = Database(path)
+        opened.append(db)
+        return db
+
+    yield open_v0
+    for db in opened:
+        db.close()
+
+
+def test_first_release_rows_are_kept(migrated, capsys):
+    db = migrated(V0_SCHEMA)
+
+    # Copied once, straight into the v1 layout
+    output = capsys.readouterr().out
+    assert output.count('Migrating') == 1
+    assert rows(db, 'PRAGMA user_version') == [(Database.SCHEMA_VERSION,)]
+    assert rows(db, '''
+        SELECT m.id, m.ledger_seq, s.name, m.node FROM validator_metrics m
+        JOIN server_states s ON s.id = m.state ORDER BY m.id
+    ''') == [(i + 1, 100 + i, 'full' if i < 2 else 'proposing', DEFAULT_NODE) for i in range(5)]
+    assert db.get_last_transition(DEFAULT_NODE) == (1002.0, 'full', 'proposing')
+    assert rows(db, '''
+        SELECT node, ledger_seq, did_validate, agreed, ledger_hash, close_time
+        FROM ledger_validations ORDER BY ledger_seq
+    ''') == [(DEFAULT_NODE, 100 + i, int(i != 3), None if i == 3 else 1, None, None)
+             for i in range(5)]
+    assert db.get_validation_stats_period(24 * 365 * 100, node=DEFAULT_NODE)['missed_count'] == 1
+
+
+def test_multi_node_rows_are_kept(migrated):
+    db = migrated(V0_NODE_SCHEMA, nodes=('alpha', 'beta'))
+
+    assert rows(db, 'SELECT node, COUNT(*) FROM validator_metrics GROUP BY node') == [
+        ('alpha', 5), ('beta', 5)]
+    # Both nodes' copies of the same ledgers survive the new key
+    assert rows(db, 'SELECT node, COUNT(*) FROM ledger_validations GROUP BY node') == [
+        ('alpha', 5), ('beta', 5)]
+    assert db.get_last_transition('beta') == (1002.0, 'full', 'proposing')
+
+
+def test_old_tables_and_indexes_are_dropped(migrated):
+    db = migrated(V0_SCHEMA)
+
+    names = [name for (name,) in rows(db, "SELECT name FROM sqlite_master WHERE sql IS NOT NULL")]
+    assert not [name for name in names if name.endswith('_v0') or name.endswith('_old')]
+    assert 'idx_ledger_seq' not in names
+    assert 'idx_validations_ledger' not in names
+    assert rows(db, "SELECT name FROM sqlite_master WHERE name = 'sqlite_sequence'") == []
+
+
+def test_a_migrated_database_opens_without_migrating_again(migrated, tmp_path, capsys):
+    migrated(V0_SCHEMA).close()
+    capsys.readouterr()
+
+    db = Database(str(tmp_path / 'monitor.db'))
+    db.close()
+    assert 'Migrating' not in capsys.readouterr().out
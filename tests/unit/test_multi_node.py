@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for monitoring several nodes from one process
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from prometheus_client import REGISTRY
+
+from src.collectors.fast_poller import stop_monitors
+
+
+def sample(name: str, node: str, **labels):
+    return REGISTRY.get_sample_value(name, dict(labels, node=node))
+
+
+def test_views_label_updates_with_their_node(prometheus):
+    alpha = prometheus.for_node('alpha')
+    beta = prometheus.for_node('beta')
+
+    alpha.update_peers(10)
+    beta.update_peers(30)
+    alpha.update_state('proposing')
+
+    assert sample('xrpl_peer_count', 'alpha') == 10
+    assert sample('xrpl_peer_count', 'beta') == 30
+    assert sample('xrpl_validator_state_value', 'alpha') == prometheus.state_values['proposing']
+    assert sample('xrpl_validator_state_value', 'beta') is None
+
+
+def test_views_keep_their_own_counter_baselines(prometheus):
+    gamma = prometheus.for_node('gamma')
+    gamma.update_api_cache_stats(5, 2)
+    # A view made after the parent saw totals starts from zero again
+    prometheus.update_api_cache_stats(100, 100)
+    delta = prometheus.for_node('delta')
+    delta.update_api_cache_stats(3, 1)
+    gamma.update_api_cache_stats(8, 2)
+
+    assert sample('xrpl_monitor_api_cache_hits_total', 'gamma') == 8
+    assert sample('xrpl_monitor_api_cache_misses_total', 'gamma') == 2
+    assert sample('xrpl_monitor_api_cache_hits_total', 'delta') == 3
+
+
+class SlowToStopMonitor:
+    """Monitor whose loop takes stop_delay seconds to return after stop()"""
+
+    def __init__(self, node: str, stop_delay: float):
+        self.node = node
+        self.stop_delay = stop_delay
+        self.events = []
+        self._stop = threading.Event()
+
+    def loop(self):
+        self._stop.wait()
+        time.sleep(self.stop_delay)
+        self.events.append('returned')
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self.events.append('closed')
+
+    def print_summary(self):
+        self.events.append('summary')
+
+
+def start(monitors):
+    threads = [threading.Thread(target=monitor.loop, daemon=True) for monitor in monitors]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_monitors_are_closed_after_their_loops_return():
+    monitors = [SlowToStopMonitor('alpha', 0.2), SlowToStopMonitor('beta', 0.1)]
+    threads = start(monitors)
+
+    stop_monitors(monitors, threads, timeout=5)
+
+    for monitor in monitors:
+        assert monitor.events == ['returned', 'closed', 'summary']
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_a_stuck_monitor_is_closed_after_the_timeout(capsys):
+    monitors = [SlowToStopMonitor('stuck', 5)]
+    threads = start(monitors)
+
+    started = time.monotonic()
+    stop_monitors(monitors, threads, timeout=0.1)
+
+    assert time.monotonic() - started < 1
+    assert monitors[0].events == ['closed', 'summary']
+    assert 'stuck did not stop' in capsys.readouterr().out
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the collect / persist / export pipeline
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from prometheus_client import REGISTRY
+
+from src.processors.pipeline import BoundedQueue, Pipeline
+from src.processors.samples import MetricsSample
+from src.storage.database import Database
+
+
+def test_block_policy_waits_then_drops_the_new_item():
+    queue = BoundedQueue('test', 2, 'block', put_timeout=0.1)
+    assert queue.put(1) and queue.put(2)
+
+    started = time.monotonic()
+    assert not queue.put(3)
+    assert time.monotonic() - started >= 0.1
+    assert queue.dropped == 1
+    assert [queue.get(0), queue.get(0)] == [1, 2]
+
+
+def test_block_policy_accepts_once_space_frees_up():
+    queue = BoundedQueue('test', 1, 'block', put_timeout=5)
+    queue.put(1)
+    threading.Timer(0.1, queue.get, args=(0,)).start()
+
+    assert queue.put(2)
+    assert queue.dropped == 0
+    assert queue.get(0) == 2
+
+
+def test_drop_oldest_policy_never_waits():
+    queue = BoundedQueue('test', 2, 'drop_oldest', put_timeout=5)
+    started = time.monotonic()
+    for item in range(5):
+        assert queue.put(item)
+
+    assert time.monotonic() - started < 0.1
+    assert queue.dropped == 3
+    assert queue.enqueued == 5
+    assert [queue.get(0), queue.get(0), queue.get(0)] == [3, 4, None]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedQueue('test', 2, 'drop_newest')
+
+
+def test_drops_are_exported(prometheus):
+    queue = BoundedQueue('dropcheck', 1, 'drop_oldest', prometheus=prometheus)
+    queue.put(1)
+    queue.put(2)
+
+    assert REGISTRY.get_sample_value('xrpl_monitor_queue_dropped_total',
+                                     {'queue': 'dropcheck'}) == 1
+
+
+def metrics(count: int):
+    return [MetricsSample(1000.0 + i, 'proposing', 90000000 + i, 21, 1.0, 'test')
+            for i in range(count)]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+def count_metrics(db: Database) -> int:
+    with db.get_reader() as conn:
+        return conn.execute('SELECT COUNT(*) FROM validator_metrics').fetchone()[0]
+
+
+def test_samples_are_written_synchronously_until_started(db):
+    pipeline = Pipeline(db)
+    for sample in metrics(3):
+        pipeline.persist(sample)
+
+    assert count_metrics(db) == 3
+    assert pipeline.persist_queue.enqueued == 0
+
+
+def test_stop_drains_the_queues(db):
+    pipeline = Pipeline(db)
+    pipeline.start()
+    for sample in metrics(200):
+        assert pipeline.persist(sample)
+    pipeline.stop()
+
+    assert not pipeline.running
+    assert count_metrics(db) == 200
+    assert pipeline.persisted == 200
+
+
+def test_a_failed_write_does_not_stop_the_worker(db, capsys):
+    pipeline = Pipeline(db)
+    pipeline.start()
+    pipeline.persist(MetricsSample(1000.0, 'proposing', None, 21, 1.0, 'test'))
+    for sample in metrics(2):
+        pipeline.persist(sample)
+    pipeline.stop()
+
+    assert pipeline.errors == 1
+    assert count_metrics(db) == 2
+    assert 'persist stage failed' in capsys.readouterr().out
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the Database read-only reader pool
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'), max_readers=2)
+    db.write_metrics(1000.0, 'proposing', 90000000, 21, 1.0)
+    yield db
+    db.close()
+
+
+def query(db: Database):
+    with db.get_reader() as conn:
+        return conn.execute('SELECT COUNT(*) FROM validator_metrics').fetchone()[0]
+
+
+def test_short_lived_threads_share_the_pooled_readers(db):
+    for _ in range(20):
+        thread = threading.Thread(target=query, args=(db,))
+        thread.start()
+        thread.join()
+
+    assert len(db._readers) == 1
+    assert db.active_readers == 0
+
+
+def test_no_more_readers_than_slots_are_opened(db):
+    release = threading.Event()
+    running = []
+
+    def slow_query():
+        with db.get_reader() as conn:
+            running.append(conn)
+            release.wait(timeout=5)
+
+    threads = [threading.Thread(target=slow_query) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    # Both slots taken: a third query waits
+    while len(running) < 2:
+        time.sleep(0.01)
+    waiting = threading.Thread(target=query, args=(db,))
+    waiting.start()
+    time.sleep(0.1)
+    assert waiting.is_alive()
+
+    release.set()
+    for thread in threads + [waiting]:
+        thread.join(timeout=5)
+    assert running[0] is not running[1]
+    assert len(db._readers) == 2
+
+
+def test_nested_reads_share_one_connection(db):
+    with db.get_reader() as outer:
+        with db.get_reader() as inner:
+            assert inner is outer
+        assert db.active_readers == 1
+    assert db.active_readers == 0
+
+
+def test_readers_see_committed_writes(db):
+    assert query(db) == 1
+    db.write_metrics(1001.0, 'proposing', 90000001, 21, 1.0)
+    # The pooled connection starts a new snapshot per query
+    assert query(db) == 2
+
+
+def test_readers_refuse_writes(db):
+    with db.get_reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM validator_metrics")
+
+
+def test_readonly_database_has_no_writer(db):
+    reader = Database(db.db_path, readonly=True)
+    try:
+        assert query(reader) == 1
+        with pytest.raises(sqlite3.OperationalError):
+            reader.write_metrics(1001.0, 'full', 90000001, 21, 1.0)
+    finally:
+        reader.close()
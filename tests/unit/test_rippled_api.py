@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the RippledAPI response cache
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.rippled_api import RippledAPI, RippledAPIError
+from src.utils.transports import TransportError
+from tests.stand_ins.rippled import StandInRippled
+
+
+class GatedRippled(StandInRippled):
+    """Stand-in that holds every request until release() is called"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.fail = False
+
+    def release(self):
+        self.gate.set()
+
+    def request(self, command, params=None):
+        self.started.set()
+        assert self.gate.wait(timeout=5)
+        if self.fail:
+            self.requests += 1
+            raise TransportError('connection refused')
+        if command == 'validator_info':
+            self.requests += 1
+            return {'status': 'success', 'master_key': 'nHStandInMasterKey'}
+        return super().request(command, params)
+
+
+def call_concurrently(func, count: int, transport: GatedRippled):
+    """Start count callers of func, release the transport, return results"""
+    results = [None] * count
+
+    def call(i):
+        try:
+            results[i] = func()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    assert transport.started.wait(timeout=5)
+    # Give the followers time to find the request in flight
+    time.sleep(0.1)
+    transport.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_requests_share_one_round_trip():
+    transport = GatedRippled()
+    api = RippledAPI(transport=transport)
+
+    results = call_concurrently(api.get_validator_info, 4, transport)
+
+    assert transport.requests == 1
+    assert all(result is results[0] for result in results)
+    assert api.cache_misses == 1
+    assert api.cache_coalesced == 3
+
+
+def test_followers_see_the_leaders_error():
+    transport = GatedRippled()
+    transport.fail = True
+    api = RippledAPI(transport=transport)
+
+    results = call_concurrently(api.get_validator_info, 3, transport)
+
+    assert transport.requests == 1
+    assert all(isinstance(result, RippledAPIError) for result in results)
+    # Failures are not cached
+    transport.fail = False
+    assert api.get_validator_info()['master_key'] == 'nHStandInMasterKey'
+    assert transport.requests == 2
+
+
+def test_responses_expire_after_their_ttl():
+    transport = GatedRippled()
+    transport.release()
+    api = RippledAPI(transport=transport, cache_ttls={'validator_info': 0.1})
+
+    api.get_validator_info()
+    api.get_validator_info()
+    assert transport.requests == 1
+    assert api.cache_hits == 1
+
+    time.sleep(0.15)
+    api.get_validator_info()
+    assert transport.requests == 2
+    assert api.cache_misses == 2
+
+
+def test_invalidate_drops_cached_responses():
+    transport = GatedRippled()
+    transport.release()
+    api = RippledAPI(transport=transport)
+
+    api.get_validator_info()
+    api.invalidate_cache('validator_info')
+    api.get_validator_info()
+
+    assert transport.requests == 2
+
+
+@pytest.mark.parametrize('calls', [1, 3])
+def test_uncached_commands_are_not_cache_misses(calls):
+    transport = GatedRippled()
+    transport.release()
+    api = RippledAPI(transport=transport)
+
+    for _ in range(calls):
+        api.get_server_state()
+
+    assert transport.requests == calls
+    assert api.cache_hits == 0
+    assert api.cache_misses == 0
+
+
+def test_uncached_commands_are_not_counted_as_coalesced():
+    transport = GatedRippled()
+    api = RippledAPI(transport=transport)
+
+    call_concurrently(api.get_server_state, 3, transport)
+
+    # Still a single round trip, but outside the cache statistics
+    assert transport.requests == 1
+    assert api.cache_misses == 0
+    assert api.cache_coalesced == 0
+
+
+def test_static_info_comes_from_the_last_server_info():
+    transport = GatedRippled()
+    transport.release()
+    api = RippledAPI(transport=transport)
+
+    api.get_server_state()
+    info = api.get_static_info()
+
+    assert info['pubkey_validator'] == 'nHStandInValidatorKey'
+    assert transport.requests == 1
+    assert api.cache_hits == 1
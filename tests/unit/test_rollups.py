@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for rollup tiers, retention and the history read
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.outputs.export import HISTORY_COLUMNS, history_rows
+from src.storage.database import Database
+from src.storage.rollups import Rollups
+from src.utils.nodes import DEFAULT_NODE
+
+# Hour-aligned start of the synthetic history
+T0 = 1_700_002_800
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+def write_hours(db: Database, hours: int, interval: int = 3):
+    """A metrics row every interval seconds, alternating full / proposing every 10 minutes"""
+    for i in range(0, hours * 3600, interval):
+        state = 'proposing' if (i // 600) % 2 else 'full'
+        db.write_metrics(T0 + i, state, 90000000 + i // interval, 20 + (i // 3600), 1.0)
+
+
+def rollup_rows(db: Database, tier: str) -> list:
+    """(bucket, samples, full seconds, proposing seconds) of a tier, oldest first"""
+    with db.get_reader() as conn:
+        return conn.execute(f'''
+            SELECT bucket, samples, full_seconds, proposing_seconds FROM rollup_{tier}
+            WHERE node = ? ORDER BY bucket
+        ''', (DEFAULT_NODE,)).fetchall()
+
+
+def count_raw(db: Database) -> int:
+    with db.get_reader() as conn:
+        return conn.execute('SELECT COUNT(*) FROM validator_metrics').fetchone()[0]
+
+
+def test_state_time_is_the_gap_to_the_next_row(db):
+    for i in range(0, 120, 3):
+        db.write_metrics(T0 + i, 'proposing', 90000000 + i, 21, 1.0)
+    for i in range(600, 660, 3):
+        db.write_metrics(T0 + i, 'full', 90000000 + i, 21, 1.0)
+
+    assert db.rollup('1m', T0, T0 + 660) == 3
+    # The row at T0 + 117 is followed by a gap (monitor down): it counts
+    # for at most ROLLUP_MAX_DWELL, not the 483s to the next row
+    assert rollup_rows(db, '1m') == [
+        (T0, 20, 0, 60),
+        (T0 + 60, 20, 0, 57 + db.ROLLUP_MAX_DWELL),
+        (T0 + 600, 20, 57, 0)
+    ]
+
+
+def test_rows_past_the_range_give_the_last_row_its_gap(db):
+    write_hours(db, 1)
+
+    db.rollup('1m', T0, T0 + 60)
+    assert rollup_rows(db, '1m') == [(T0, 20, 60, 0)]
+
+
+def test_hour_buckets_add_up_the_minutes(db):
+    write_hours(db, 2)
+    Rollups(db, [DEFAULT_NODE], raw_days=0).run_once(now=T0 + 3 * 3600)
+
+    minutes = rollup_rows(db, '1m')
+    assert len(minutes) == 120
+    # The newest row has no next row yet, so no time in its state
+    assert rollup_rows(db, '1h') == [(T0, 1200, 1800, 1800), (T0 + 3600, 1200, 1800, 1797)]
+    assert sum(row[2] + row[3] for row in minutes) == 2 * 3600 - 3
+
+
+def test_raw_rows_are_rolled_up_before_they_are_pruned(db):
+    write_hours(db, 3)
+    result = Rollups(db, [DEFAULT_NODE], raw_days=1).run_once(now=T0 + 3 * 86400)
+
+    assert result['pruned'] == 3600
+    assert count_raw(db) == 0
+    assert len(rollup_rows(db, '1m')) == 180
+    assert sum(row[1] for row in rollup_rows(db, '1h')) == 3600
+
+
+def test_pruning_stops_where_the_rollup_ends(db):
+    write_hours(db, 3)
+    now = T0 + 3 * 86400
+    # Settled only up to T0 + 1h: newer raw rows are past retention but
+    # not rolled up yet, so they stay
+    Rollups(db, [DEFAULT_NODE], raw_days=1, minute_days=1, settle=now - T0 - 3600).run_once(now=now)
+
+    assert count_raw(db) == 2 * 1200
+    assert db.get_oldest_time('validator_metrics', DEFAULT_NODE) == T0 + 3600
+    # Minutes are pruned only once the hour tier holds them
+    assert rollup_rows(db, '1m') == []
+    assert rollup_rows(db, '1h') == [(T0, 1200, 1800, 1800)]
+
+
+def test_nothing_is_pruned_before_the_first_rollup(db):
+    write_hours(db, 1)
+    now = T0 + 3 * 86400
+    Rollups(db, [DEFAULT_NODE], raw_days=1, settle=now - T0).run_once(now=now)
+
+    assert count_raw(db) == 1200
+    assert rollup_rows(db, '1m') == []
+
+
+def test_history_reads_raw_rows_for_short_ranges(db):
+    write_hours(db, 1)
+
+    resolution, rows = db.get_metrics_history(T0, T0 + 300)
+    assert resolution == 0
+    assert len(rows) == 100
+    assert rows[0]['state_shares'] == {'full': 1.0}
+
+
+def test_history_reads_rollups_for_long_ranges(db):
+    write_hours(db, 3)
+    Rollups(db, [DEFAULT_NODE], raw_days=0).run_once(now=T0 + 4 * 3600)
+
+    resolution, rows = db.get_metrics_history(T0, T0 + 3 * 3600, max_points=10)
+    assert resolution == 3600
+    assert [row['time'] for row in rows] == [T0, T0 + 3600, T0 + 7200]
+    assert rows[1]['samples'] == 1200
+    assert rows[1]['state_shares'] == pytest.approx({'full': 0.5, 'proposing': 0.5})
+
+
+def test_history_export_has_one_column_per_state(db):
+    write_hours(db, 3)
+    Rollups(db, [DEFAULT_NODE], raw_days=0).run_once(now=T0 + 4 * 3600)
+
+    rows = [dict(zip(HISTORY_COLUMNS, row))
+            for row in history_rows(db, None, T0 + 3 * 3600, DEFAULT_NODE, max_points=10)]
+    assert len(rows) == 3
+    assert rows[0]['resolution'] == 3600
+    assert rows[0]['full_share'] == pytest.approx(0.5)
+    assert rows[0]['syncing_share'] == 0.0
+    assert rows[0]['peers_max'] == 20
+    assert rows[2]['peers_max'] == 22
+
+
+def test_history_export_of_an_empty_node(db):
+    assert list(history_rows(db, None, None, 'nobody', max_points=10)) == []
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for PollScheduler deadlines and period changes
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.collectors.scheduler import PollScheduler
+
+
+def run_until(scheduler: PollScheduler, condition, timeout: float = 5.0):
+    """Run the scheduler loop until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "scheduler did not get there in time"
+        time.sleep(min(scheduler.run_pending(), 0.01))
+
+
+def test_fixed_period_does_not_drift():
+    runs = []
+    scheduler = PollScheduler()
+    scheduler.add('tick', 0.05, lambda: runs.append(time.monotonic()))
+    scheduler.start()
+
+    run_until(scheduler, lambda: len(runs) >= 10)
+
+    assert abs((runs[-1] - runs[0]) - 9 * 0.05) < 0.03
+
+
+def test_retune_from_own_callback_uses_new_period():
+    # The adaptive poll rate calls set_period from inside the poll
+    runs = []
+    scheduler = PollScheduler()
+
+    def callback():
+        runs.append(time.monotonic())
+        if len(runs) == 2:
+            scheduler.set_period('server_state', 0.3)
+
+    scheduler.add('server_state', 0.05, callback)
+    scheduler.start()
+    run_until(scheduler, lambda: len(runs) >= 4)
+
+    gaps = [later - earlier for earlier, later in zip(runs, runs[1:])]
+    # 2 * new - old would be 0.55s
+    assert 0.28 <= gaps[1] < 0.36
+    assert 0.28 <= gaps[2] < 0.36
+    assert scheduler.get('server_state').period == 0.3
+    assert scheduler.overruns == 0
+
+
+def test_shorter_period_from_own_callback_runs_from_now():
+    runs = []
+    scheduler = PollScheduler()
+
+    def callback():
+        runs.append(time.monotonic())
+        if len(runs) == 1:
+            time.sleep(0.05)
+            scheduler.set_period('server_state', 0.1)
+
+    scheduler.add('server_state', 1.0, callback)
+    scheduler.start()
+    run_until(scheduler, lambda: len(runs) >= 3)
+
+    gaps = [later - earlier for earlier, later in zip(runs, runs[1:])]
+    # The deadline the new period gives is already past - run right away
+    assert gaps[0] < 0.2
+    assert 0.07 <= gaps[1] < 0.15
+    assert scheduler.overruns == 0
+
+
+def test_retune_from_another_task_reanchors_on_last_deadline():
+    runs = []
+    scheduler = PollScheduler()
+    scheduler.add('poll', 0.1, lambda: runs.append(time.monotonic()))
+    scheduler.start()
+    run_until(scheduler, lambda: len(runs) >= 1)
+
+    scheduler.set_period('poll', 0.25)
+    run_until(scheduler, lambda: len(runs) >= 2)
+
+    assert 0.22 <= runs[1] - runs[0] < 0.3
+
+
+def test_late_task_skips_missed_slots():
+    scheduler = PollScheduler()
+    scheduler.add('slow', 0.02, lambda: time.sleep(0.07))
+    scheduler.start()
+    task = scheduler.get('slow')
+
+    run_until(scheduler, lambda: task.runs >= 3)
+
+    # Every run is too long and starts late - nothing is replayed in a burst
+    assert task.runs == 3
+    assert task.overruns >= task.runs
+
+
+def test_run_stops_on_event():
+    runs = []
+    scheduler = PollScheduler()
+    scheduler.add('tick', 0.01, lambda: runs.append(1))
+    stop = threading.Event()
+    thread = threading.Thread(target=scheduler.run, args=(stop,))
+    thread.start()
+    time.sleep(0.1)
+    stop.set()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert runs
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Tests for StreamSubscriber against the stand-in rippled WebSocket
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.alerts.alerter import Alerter
+from src.collectors.fast_poller import FastPoller
+from src.collectors.stream_subscriber import StreamSubscriber
+from src.processors.pipeline import Pipeline
+from src.storage.archive import ArchiveReader
+from src.storage.database import Database
+from src.utils.rippled_api import RippledAPI
+from tests.stand_ins.rippled import VALIDATOR_KEY, StandInRippled
+from tests.stand_ins.websocket import StandInWebSocketServer
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    # Ahead of the stand-in server_info, like a stream ahead of a poll
+    server = StandInWebSocketServer(ledger_seq=95000000)
+    server.start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def poller(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield FastPoller(RippledAPI(transport=StandInRippled()), db,
+                     Alerter(str(tmp_path / 'alerts.log'), node='test'), node='test')
+    db.close()
+
+
+@pytest.fixture
+def subscriber(server, poller):
+    subscriber = StreamSubscriber(poller, url=server.url, reconnect_delay=0.05)
+    thread = threading.Thread(target=subscriber.loop, daemon=True)
+    thread.start()
+    yield subscriber
+    subscriber.stop()
+    # Wakes the subscriber from its read
+    server.drop()
+    thread.join(timeout=5)
+    subscriber.close()
+
+
+def test_subscribe_primes_the_snapshot(server, subscriber):
+    assert server.wait_for_subscriber()
+    poller = subscriber.poller
+    wait_until(lambda: poller.last_ledger_seq == 95000000)
+
+    assert server.received[0]['streams'] == StreamSubscriber.STREAMS
+    assert poller.last_state == 'proposing'
+    # server_info fields the streams do not carry
+    assert subscriber.state_info['peers'] == 21
+
+
+def test_ledger_and_server_streams_drive_the_poller(server, subscriber):
+    assert server.wait_for_subscriber()
+    poller = subscriber.poller
+
+    seq = server.ledger_closed()
+    wait_until(lambda: poller.last_ledger_seq == seq)
+    assert subscriber.ledgers_received == 2
+    assert seq in poller.validation_tracker.validated_hashes
+
+    server.server_status('full', load_factor=512)
+    wait_until(lambda: poller.last_state == 'full')
+    assert poller.state_changes == 1
+    assert subscriber.state_info['load_factor'] == 2.0
+
+    # Fragmented messages are reassembled
+    server.push({'type': 'serverStatus', 'server_status': 'proposing', 'pad': 'z' * 5000},
+                fragments=4)
+    wait_until(lambda: poller.last_state == 'proposing')
+    assert poller.state_changes == 2
+
+
+def test_server_info_refreshes_are_archived(server, tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    archive_dir = str(tmp_path / 'archive')
+    pipeline = Pipeline(db, archive_dir=archive_dir)
+    poller = FastPoller(RippledAPI(transport=StandInRippled()), db,
+                        Alerter(str(tmp_path / 'alerts.log'), node='test'), node='test',
+                        pipeline=pipeline)
+    subscriber = StreamSubscriber(poller, url=server.url, reconnect_delay=0.05)
+    thread = threading.Thread(target=subscriber.loop, daemon=True)
+    thread.start()
+    try:
+        assert server.wait_for_subscriber()
+        wait_until(lambda: poller.poll_count >= 1)
+        # Stream messages are not archived
+        server.ledger_closed()
+        server.server_status('full')
+        wait_until(lambda: poller.last_state == 'full')
+    finally:
+        subscriber.stop()
+        server.drop()
+        thread.join(timeout=5)
+        subscriber.close()
+        pipeline.stop()
+        db.close()
+
+    snapshots = list(ArchiveReader(archive_dir, 'test').iter_snapshots())
+    assert snapshots
+    assert {kind for _, kind, _ in snapshots} == {'server_info'}
+    # Archived as rippled sent it, not as the stream patched it
+    assert all(snapshot['server_state'] == 'proposing' for _, _, snapshot in snapshots)
+
+
+def test_own_validations_are_recorded(server, subscriber):
+    assert server.wait_for_subscriber()
+    tracker = subscriber.poller.validation_tracker
+
+    server.validation('nHSomeOtherValidator', 95000001)
+    server.validation(VALIDATOR_KEY, 95000002)
+    wait_until(lambda: subscriber.validations_received == 2)
+
+    assert 95000002 in tracker.own_validations
+    assert 95000001 not in tracker.own_validations
+    assert tracker.observing
+
+
+def test_pings_are_answered(server, subscriber):
+    assert server.wait_for_subscriber()
+    server.ping(b'still-there')
+
+    assert server.wait_for_pong() == b'still-there'
+
+
+def test_server_info_is_refreshed(server, poller):
+    subscriber = StreamSubscriber(poller, url=server.url, server_info_interval=0.1)
+    subscriber.run_once(duration=0.35)
+
+    # Once on subscribe, then every server_info_interval
+    assert poller.api.transport.commands.count('server_info') >= 4
+    assert subscriber.ws is None
+
+
+class SlowServerInfo(StandInRippled):
+    """Stand-in whose server_info takes latency seconds"""
+
+    def __init__(self, latency: float, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    def request(self, command, params=None):
+        if command == 'server_info':
+            time.sleep(self.latency)
+        return super().request(command, params)
+
+
+def test_slow_server_info_keeps_the_subscription(server, tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    poller = FastPoller(RippledAPI(transport=SlowServerInfo(0.2)), db,
+                        Alerter(str(tmp_path / 'alerts.log'), node='test'), node='test')
+    # Each refresh takes half its interval, so other tasks fall due meanwhile
+    subscriber = StreamSubscriber(poller, url=server.url, server_info_interval=0.4)
+    try:
+        subscriber.run_once(duration=0.9)
+    finally:
+        subscriber.close()
+        db.close()
+
+    assert poller.api_errors == 0
+    assert server.connections == 1
+
+
+def test_reconnects_after_a_dropped_connection(server, subscriber):
+    assert server.wait_for_subscriber()
+    poller = subscriber.poller
+
+    server.drop()
+    assert server.wait_for_subscriber(connections=2)
+    wait_until(lambda: subscriber.reconnects == 1)
+    assert poller.api_errors == 1
+
+    # The new subscription carries on where the old one stopped
+    seq = server.ledger_closed()
+    wait_until(lambda: poller.last_ledger_seq == seq)
+
+
+def test_reconnects_after_a_close_frame(server, subscriber):
+    assert server.wait_for_subscriber()
+
+    server.send_close()
+    assert server.wait_for_close()
+    assert server.wait_for_subscriber(connections=2)
+    assert subscriber.reconnects == 1
+
+
+def test_retries_a_failed_subscribe(server, poller):
+    server.subscribe_error = 'noPermission'
+    subscriber = StreamSubscriber(poller, url=server.url, reconnect_delay=0.05)
+    thread = threading.Thread(target=subscriber.loop, daemon=True)
+    thread.start()
+    try:
+        wait_until(lambda: subscriber.reconnects >= 2)
+        assert poller.poll_count == 0
+
+        server.subscribe_error = None
+        assert server.wait_for_subscriber()
+        wait_until(lambda: poller.poll_count >= 1)
+    finally:
+        subscriber.stop()
+        server.drop()
+        thread.join(timeout=5)
+        subscriber.close()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped time series ring buffer
+"""
+
+import math
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.timeseries import TimeSeriesStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'validator.ts')
+
+
+@pytest.fixture
+def store(path):
+    store = TimeSeriesStore(path, columns=['peers', 'load_factor'], capacity=8)
+    yield store
+    store.close()
+
+
+def fill(store: TimeSeriesStore, count: int, first: int = 0):
+    """One sample per second: peers = the second, load factor = a tenth of it"""
+    for t in range(first, first + count):
+        store.append(1000.0 + t, [t, t / 10])
+
+
+def values(segments) -> list:
+    return [v for segment in segments for v in segment]
+
+
+def test_reads_before_the_ring_is_full(store):
+    fill(store, 5)
+
+    assert len(store) == 5
+    assert store.columns == ['timestamp', 'peers', 'load_factor']
+    assert values(store.read('peers')) == [0, 1, 2, 3, 4]
+    assert values(store.read('peers', 1001, 1003)) == [1, 2]
+    assert store.read('peers', 1010) == []
+
+
+def test_wraparound_keeps_the_newest_samples(store):
+    fill(store, 13)
+
+    assert store.appends == 13
+    assert len(store) == 8
+    assert values(store.read('peers')) == list(range(5, 13))
+    # Slots 5..7 then 0..4: two segments, oldest first
+    segments = store.read('timestamp', 1006, 1010)
+    assert len(segments) == 2
+    assert values(segments) == [1006.0, 1007.0, 1008.0, 1009.0]
+    assert [row[1] for row in store.iter_rows(1006, 1010)] == [6, 7, 8, 9]
+    assert store.read('peers', 1000, 1005) == []
+
+
+def test_window_skips_missing_values(store):
+    fill(store, 10)
+    store.append(1010.0, [None, 1.0])
+
+    window = store.window('peers', 1005)
+    assert window == {'count': 5, 'min': 5, 'max': 9, 'avg': 7}
+    assert math.isnan(list(store.iter_rows(1010))[0][1])
+    assert store.window('peers', 2000)['count'] == 0
+
+
+def test_timestamps_never_step_back(store):
+    store.append(1000.0, [1, 1.0])
+    store.append(990.0, [2, 1.0])
+
+    assert values(store.read('timestamp')) == [1000.0, 1000.0]
+    assert values(store.read('peers', 1000, 1001)) == [1, 2]
+
+
+def test_samples_survive_reopening(store, path):
+    fill(store, 11)
+    store.close()
+
+    reopened = TimeSeriesStore(path, columns=['peers', 'load_factor'], capacity=8)
+    try:
+        assert reopened.appends == 11
+        assert values(reopened.read('peers')) == list(range(3, 11))
+        fill(reopened, 1, first=11)
+        assert values(reopened.read('peers')) == list(range(4, 12))
+    finally:
+        reopened.close()
+
+
+def test_readonly_takes_the_layout_from_the_file(store, path):
+    fill(store, 3)
+    store.flush()
+
+    reader = TimeSeriesStore(path, readonly=True)
+    try:
+        assert reader.columns == store.columns
+        assert reader.capacity == 8
+        assert values(reader.read('load_factor')) == pytest.approx([0.0, 0.1, 0.2])
+        with pytest.raises(TypeError):
+            reader.append(1003.0, [3, 0.3])
+    finally:
+        reader.close()
+
+
+def test_a_layout_change_starts_a_new_ring(store, path, capsys):
+    fill(store, 5)
+    store.close()
+
+    changed = TimeSeriesStore(path, columns=['peers', 'load_factor', 'io_latency'], capacity=8)
+    try:
+        assert 'different layout' in capsys.readouterr().out
+        assert changed.columns == ['timestamp', 'peers', 'load_factor', 'io_latency']
+        assert len(changed) == 0
+        assert os.path.getsize(path) == changed.column_offset('io_latency') + 8 * 8
+    finally:
+        changed.close()
+
+
+def test_opening_without_columns_keeps_the_existing_layout(store, path):
+    fill(store, 5)
+    store.close()
+
+    again = TimeSeriesStore(path)
+    try:
+        assert again.columns == ['timestamp', 'peers', 'load_factor']
+        assert len(again) == 5
+    finally:
+        again.close()
+
+
+def test_readonly_needs_an_existing_store(tmp_path):
+    not_a_store = tmp_path / 'other.ts'
+    not_a_store.write_bytes(b'x' * 5000)
+
+    with pytest.raises(ValueError):
+        TimeSeriesStore(str(tmp_path / 'missing.ts'), readonly=True)
+    with pytest.raises(ValueError):
+        TimeSeriesStore(str(not_a_store), readonly=True)
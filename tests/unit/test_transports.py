@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the Docker socket transport and its connection pool
+"""
+
+import os
+import struct
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.rippled_api import RippledAPI
+from src.utils.transports import DockerSocketTransport, TransportError
+from tests.stand_ins.docker import StandInDockerDaemon, multiplex
+from tests.stand_ins.rippled import StandInRippled
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    # Unix socket paths are limited to ~100 bytes; tmp_path can be longer
+    path = os.path.join('/tmp', f"docker-stand-in-{os.getpid()}-{tmp_path.name[-20:]}.sock")
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    daemon = StandInDockerDaemon(socket_path)
+    daemon.start()
+    yield daemon
+    daemon.close()
+
+
+@pytest.fixture
+def transport(daemon):
+    transport = DockerSocketTransport('rippledvalidator', socket_path=daemon.socket_path, timeout=2)
+    yield transport
+    transport.close()
+
+
+# Stream demultiplexing
+
+def test_demultiplex_interleaved_streams():
+    raw = (multiplex(1, b'{"result": ') + multiplex(2, b'Loading: ')
+           + multiplex(1, b'{}}') + multiplex(2, b'done\n'))
+
+    assert DockerSocketTransport.demultiplex(raw) == (b'{"result": {}}', b'Loading: done\n')
+
+
+def test_demultiplex_empty_and_truncated():
+    assert DockerSocketTransport.demultiplex(b'') == (b'', b'')
+    # A header cut short is ignored
+    assert DockerSocketTransport.demultiplex(multiplex(1, b'abc') + b'\x02\x00') == (b'abc', b'')
+    # A payload cut short keeps what arrived
+    raw = multiplex(1, b'abc') + struct.pack('>BxxxL', 2, 10) + b'de'
+    assert DockerSocketTransport.demultiplex(raw) == (b'abc', b'de')
+
+
+# Exec create / start / inspect
+
+def test_request_runs_rippled_in_the_container(daemon, transport):
+    result = transport.request('server_info')
+
+    assert result['info']['server_state'] == 'proposing'
+    assert daemon.commands == [['rippled', 'server_info']]
+
+
+def test_params_are_passed_as_json_argument(daemon, transport):
+    result = transport.request('ledger', {'ledger_index': 90000000, 'transactions': True})
+
+    assert result['ledger']['ledger_index'] == '90000000'
+    assert daemon.commands == [['rippled', 'ledger', '{"ledger_index": 90000000, "transactions": true}']]
+
+
+def test_stderr_between_stdout_frames_is_kept_out(socket_path):
+    daemon = StandInDockerDaemon(socket_path, rippled=StandInRippled(peers=400),
+                                 chunk_size=1000, stderr_noise=b'2026-10-16 Warning: slow\n')
+    daemon.start()
+    transport = DockerSocketTransport(socket_path=socket_path, timeout=2)
+    try:
+        result = transport.request('peers')
+    finally:
+        transport.close()
+        daemon.close()
+
+    # Well over one frame and one socket read of output
+    assert len(result['peers']) == 400
+
+
+def test_failed_command_reports_exit_code_and_stderr(daemon, transport):
+    with pytest.raises(TransportError, match=r'exit 1.*does not implement account_info'):
+        transport.request('account_info')
+    # Inspect only runs when something went wrong
+    assert daemon.inspects == 1
+
+    transport.request('server_info')
+    assert daemon.inspects == 1
+
+
+def test_missing_container(daemon):
+    transport = DockerSocketTransport('no-such-container', socket_path=daemon.socket_path, timeout=2)
+    try:
+        with pytest.raises(TransportError, match='returned 404: No such container: no-such-container'):
+            transport.request('server_info')
+    finally:
+        transport.close()
+
+
+def test_daemon_not_running(socket_path):
+    transport = DockerSocketTransport(socket_path=socket_path, timeout=1)
+    with pytest.raises(TransportError, match='Request failed'):
+        transport.request('server_info')
+
+
+def test_through_rippled_api(daemon, transport):
+    api = RippledAPI(transport=transport)
+
+    assert api.get_server_state()['validated_ledger']['seq'] > 0
+
+
+# Connection pool
+
+def test_exec_create_reuses_a_pooled_connection(daemon, transport):
+    for _ in range(5):
+        transport.request('server_info')
+
+    # One keep-alive connection for exec create, one per exec start
+    assert transport.pool.connections_opened == 1
+    assert transport.pool.requests_sent == 5
+    assert daemon.connections == 1 + 5
+
+
+def test_stale_pooled_connection_is_retried_once(daemon, transport):
+    transport.request('server_info')
+    daemon.drop_idle()
+
+    result = transport.request('server_info')
+
+    assert result['info']['server_state'] == 'proposing'
+    assert transport.pool.connections_opened == 2
+    assert len(daemon.commands) == 2
+
+
+def test_fresh_connection_failure_is_not_retried(daemon, transport):
+    transport.request('server_info')
+    daemon.close()
+
+    # The stale pooled socket is retried on a fresh one, which fails too
+    with pytest.raises(TransportError):
+        transport.request('server_info')
+    assert transport.pool.connections_opened == 2
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the rolling-window validation statistics
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.processors.validation_stats import RollingValidationStats
+from src.storage.database import Database
+
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'))
+    yield db
+    db.close()
+
+
+def write_ledgers(db: Database, now: float):
+    """One ledger every 10 minutes over two days; every 7th missed, every 5th disagreed"""
+    for i in range(288):
+        timestamp = now - 5 - i * 600
+        missed = i % 7 == 0
+        db.write_ledger_validation(timestamp, 90000000 - i, 'proposing', True, True,
+                                   not missed, None if missed else i % 5 != 0, 21, 1.0,
+                                   node='test')
+
+
+def test_seeded_stats_match_the_database(db):
+    now = time.time()
+    write_ledgers(db, now)
+    stats = RollingValidationStats()
+    since = now - stats.horizon * stats.bucket_seconds
+    stats.seed(db.get_validation_bucket_counts(since, node='test'), now=now)
+
+    for window, hours in (('1h', 1), ('24h', 24), ('7d', 168)):
+        assert stats.period_stats(window, now) == db.get_validation_stats_period(hours, node='test')
+    expected = db.get_validation_stats(24, node='test')
+    actual = stats.validation_stats('24h', now)
+    assert {key: actual[key] for key in expected} == expected
+
+
+def test_ledgers_leave_the_window_as_it_slides():
+    stats = RollingValidationStats()
+    stats.record(1, NOW, True, True, True)
+    stats.record(2, NOW + 1800, True, False, None)
+
+    assert stats.totals('1h', NOW + 1800)['total'] == 2
+    assert stats.totals('1h', NOW + 3700)['total'] == 1
+    assert stats.totals('1h', NOW + 3600 + 1800 + 60)['total'] == 0
+    # Still inside the longer windows
+    assert stats.totals('24h', NOW + 7200) == stats.totals('7d', NOW + 7200)
+    assert stats.totals('24h', NOW + 7200)['missed'] == 1
+
+
+def test_a_rewritten_ledger_is_counted_once():
+    stats = RollingValidationStats()
+    stats.record(1, NOW, True, None, None)
+    # INSERT OR REPLACE once the validation arrives
+    stats.record(1, NOW + 5, True, True, True)
+
+    totals = stats.totals('1h', NOW + 10)
+    assert totals['total'] == 1
+    assert totals['validated'] == 1
+
+
+def test_period_stats_report_hours():
+    stats = RollingValidationStats()
+    assert stats.period_stats('1h', NOW)['hours'] == 1
+    assert stats.period_stats('7d', NOW)['hours'] == 168
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tests for WebSocketClient (handshake, framing, control frames)
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.utils.websocket_client import (
+    WebSocketClient, WebSocketError, OP_BINARY, OP_CLOSE, OP_CONTINUATION, OP_PING, OP_PONG,
+    OP_TEXT
+)
+from tests.stand_ins.websocket import StandInWebSocketServer, decode_frame, encode_frame
+
+
+@pytest.fixture
+def pair():
+    """A client wired to a raw socket that plays the server"""
+    client_sock, server_sock = socket.socketpair()
+    client = WebSocketClient('ws://stand-in')
+    client.sock = client_sock
+    yield client, server_sock
+    client.close()
+    server_sock.close()
+
+
+def read_frame(sock: socket.socket):
+    """Next frame the client sent: (fin, opcode, masked, payload)"""
+    buffer = b''
+    while True:
+        frame = decode_frame(buffer)
+        if frame is not None:
+            return frame[:4]
+        chunk = sock.recv(65536)
+        assert chunk, "client closed the connection"
+        buffer += chunk
+
+
+@pytest.fixture
+def server():
+    server = StandInWebSocketServer()
+    server.start()
+    yield server
+    server.close()
+
+
+# Frame codec
+
+@pytest.mark.parametrize('size', [0, 125, 126, 65535, 65536, 200000])
+def test_parses_every_payload_length_encoding(pair, size):
+    client, server_sock = pair
+    message = {'type': 'ledgerClosed', 'pad': 'x' * max(0, size - 32)}
+    payload = json.dumps(message).encode('utf-8')
+    server_sock.sendall(encode_frame(OP_TEXT, payload))
+
+    assert client.recv_json(timeout=2) == message
+
+
+def test_partial_frames_wait_for_the_rest(pair):
+    client, _ = pair
+    frame = encode_frame(OP_TEXT, b'{"a": 1}' + b' ' * 300)
+    for cut in (1, 3, 5, len(frame) - 1):
+        client._buffer = frame[:cut]
+        assert client._parse_frame() is None
+    client._buffer = frame + b'\x81'
+    fin, opcode, payload = client._parse_frame()
+    assert (fin, opcode) == (True, OP_TEXT)
+    assert json.loads(payload) == {'a': 1}
+    # The start of the next frame is kept
+    assert client._buffer == b'\x81'
+
+
+@pytest.mark.parametrize('size', [5, 126, 70000])
+def test_client_frames_are_masked(pair, size):
+    client, server_sock = pair
+    message = {'command': 'subscribe', 'pad': 'y' * size}
+    client.send_json(message)
+
+    fin, opcode, masked, payload = read_frame(server_sock)
+    assert fin and masked
+    assert opcode == OP_TEXT
+    assert json.loads(payload) == message
+
+
+def test_fragmented_message_with_ping_in_between(pair):
+    client, server_sock = pair
+    payload = json.dumps({'type': 'serverStatus', 'server_status': 'full'}).encode('utf-8')
+    server_sock.sendall(
+        encode_frame(OP_TEXT, payload[:10], fin=False)
+        + encode_frame(OP_PING, b'keepalive')
+        + encode_frame(OP_CONTINUATION, payload[10:20], fin=False)
+        + encode_frame(OP_CONTINUATION, payload[20:])
+    )
+
+    assert client.recv_json(timeout=2) == {'type': 'serverStatus', 'server_status': 'full'}
+    # Control frames may arrive mid-message and are answered at once
+    fin, opcode, masked, pong = read_frame(server_sock)
+    assert (opcode, masked, pong) == (OP_PONG, True, b'keepalive')
+
+
+def test_binary_json_and_unsolicited_pong(pair):
+    client, server_sock = pair
+    server_sock.sendall(encode_frame(OP_PONG, b'') + encode_frame(OP_BINARY, b'{"b": 2}'))
+
+    assert client.recv_json(timeout=2) == {'b': 2}
+
+
+def test_close_frame_is_answered_and_raises(pair):
+    client, server_sock = pair
+    server_sock.sendall(encode_frame(OP_CLOSE, struct.pack('!H', 1001)))
+
+    with pytest.raises(WebSocketError, match='closed by server'):
+        client.recv_json(timeout=2)
+    fin, opcode, masked, payload = read_frame(server_sock)
+    assert opcode == OP_CLOSE
+    assert struct.unpack('!H', payload)[0] == 1000
+    assert client.sock is None
+
+
+def test_invalid_json_raises(pair):
+    client, server_sock = pair
+    server_sock.sendall(encode_frame(OP_TEXT, b'{not json'))
+
+    with pytest.raises(WebSocketError, match='Invalid JSON'):
+        client.recv_json(timeout=2)
+
+
+def test_timeout_returns_none(pair):
+    client, _ = pair
+    assert client.recv_json(timeout=0.05) is None
+
+
+@pytest.mark.parametrize('timeout', [0, -1])
+def test_zero_timeout_polls(pair, timeout):
+    client, server_sock = pair
+    assert client.recv_json(timeout=timeout) is None
+
+    server_sock.sendall(encode_frame(OP_PING, b'') + encode_frame(OP_TEXT, b'{"c": 3}'))
+    assert client.recv_json(timeout=timeout) == {'c': 3}
+
+
+def test_connection_loss_raises(pair):
+    client, server_sock = pair
+    server_sock.close()
+
+    with pytest.raises(WebSocketError, match='closed by server'):
+        client.recv_json(timeout=2)
+
+
+# Handshake against the stand-in server
+
+def test_handshake_and_subscribe(server):
+    client = WebSocketClient(server.url, timeout=2)
+    client.connect()
+    try:
+        client.send_json({'id': 1, 'command': 'subscribe', 'streams': ['ledger']})
+        response = client.recv_json(timeout=2)
+    finally:
+        client.close()
+
+    assert response['status'] == 'success'
+    assert response['result']['ledger_index'] == server.ledger_seq
+    assert server.received == [{'id': 1, 'command': 'subscribe', 'streams': ['ledger']}]
+
+
+def test_ping_from_server_gets_pong(server):
+    client = WebSocketClient(server.url, timeout=2)
+    client.connect()
+    try:
+        client.send_json({'id': 1, 'command': 'subscribe', 'streams': ['server']})
+        client.recv_json(timeout=2)
+        server.ping(b'are-you-there')
+        # Pongs are sent while the client is reading
+        assert client.recv_json(timeout=0.2) is None
+        assert server.wait_for_pong() == b'are-you-there'
+    finally:
+        client.close()
+
+
+def test_close_sends_close_frame(server):
+    client = WebSocketClient(server.url, timeout=2)
+    client.connect()
+    client.send_json({'id': 1, 'command': 'subscribe', 'streams': ['server']})
+    client.recv_json(timeout=2)
+    client.close()
+
+    assert server.wait_for_close()
+    assert server.close_frames == 1
+
+
+def test_rejected_upgrade(server):
+    server.reject = True
+    with pytest.raises(WebSocketError, match='Upgrade rejected: HTTP/1.1 403'):
+        WebSocketClient(server.url, timeout=2).connect()
+
+
+def test_wrong_accept_key(server):
+    server.bad_accept = True
+    with pytest.raises(WebSocketError, match='Sec-WebSocket-Accept'):
+        WebSocketClient(server.url, timeout=2).connect()
+
+
+def test_connect_refused():
+    server = StandInWebSocketServer()
+    server.start()
+    url = server.url
+    server.close()
+
+    with pytest.raises(WebSocketError, match='Connect to'):
+        WebSocketClient(url, timeout=1).connect()
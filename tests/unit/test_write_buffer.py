@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the Database write buffer (group commit)
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from src.storage.database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    # Short busy timeout: a held lock fails the commit quickly
+    db = Database(str(tmp_path / 'monitor.db'), busy_timeout=0.1)
+    # Long delay - the tests flush by hand
+    db.enable_write_buffer(max_rows=1000, max_delay=60)
+    yield db
+    db.close()
+
+
+def count_rows(db: Database, table: str) -> int:
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def hold_write_lock(db: Database) -> sqlite3.Connection:
+    """Another connection in the middle of a write transaction"""
+    conn = sqlite3.connect(db.db_path, isolation_level=None)
+    conn.execute('BEGIN IMMEDIATE')
+    return conn
+
+
+def write_metrics(db: Database, start: int, count: int):
+    for i in range(start, start + count):
+        db.write_metrics(1000.0 + i, 'proposing', 90000000 + i, 21, 1.0)
+
+
+def test_flush_writes_buffered_rows(db):
+    write_metrics(db, 0, 10)
+    assert count_rows(db, 'validator_metrics') == 0
+
+    assert db.write_buffer.flush() == 10
+    assert count_rows(db, 'validator_metrics') == 10
+
+
+def test_failed_commit_keeps_rows_for_the_next_flush(db):
+    buffer = db.write_buffer
+    write_metrics(db, 0, 5)
+
+    lock = hold_write_lock(db)
+    try:
+        # A transition forces a flush, which cannot get the lock
+        db.write_state_transition(1004.5, 'full', 'proposing', 60, 90000004, 21, 1.0)
+    finally:
+        lock.rollback()
+        lock.close()
+    assert buffer.errors == 1
+    assert buffer.dropped == 0
+
+    # Rows added after the failure are kept behind the failed ones
+    write_metrics(db, 5, 3)
+    assert buffer.flush() == 9
+
+    assert count_rows(db, 'validator_metrics') == 8
+    assert count_rows(db, 'state_transitions') == 1
+    conn = sqlite3.connect(db.db_path)
+    try:
+        seqs = [row[0] for row in conn.execute(
+            'SELECT ledger_seq FROM validator_metrics ORDER BY id')]
+    finally:
+        conn.close()
+    assert seqs == [90000000 + i for i in range(8)]
+
+
+def test_failed_commit_backs_off_size_triggered_flushes(db):
+    buffer = db.write_buffer
+    buffer.max_rows = 5
+    write_metrics(db, 0, 4)
+
+    lock = hold_write_lock(db)
+    try:
+        # The fifth row fills the buffer and the commit fails
+        write_metrics(db, 4, 1)
+        assert buffer.errors == 1
+        # Still full, but nothing retries before the backoff expires
+        started = time.monotonic()
+        write_metrics(db, 5, 5)
+        assert time.monotonic() - started < 0.1
+        assert buffer.errors == 1
+    finally:
+        lock.rollback()
+        lock.close()
+
+    assert buffer.flush() == 10
+    assert count_rows(db, 'validator_metrics') == 10
+
+
+def test_rows_beyond_max_pending_are_dropped_oldest_first(db):
+    buffer = db.write_buffer
+    buffer.max_pending = 6
+    write_metrics(db, 0, 8)
+
+    lock = hold_write_lock(db)
+    try:
+        db.write_state_transition(1008.5, 'full', 'proposing', 60, 90000008, 21, 1.0)
+    finally:
+        lock.rollback()
+        lock.close()
+    assert buffer.dropped == 3
+
+    assert buffer.flush() == 6
+    assert count_rows(db, 'state_transitions') == 1
+    conn = sqlite3.connect(db.db_path)
+    try:
+        seqs = [row[0] for row in conn.execute(
+            'SELECT ledger_seq FROM validator_metrics ORDER BY id')]
+    finally:
+        conn.close()
+    assert seqs == [90000000 + i for i in range(3, 8)]
+
+
+def test_flush_thread_retries_after_failure(tmp_path):
+    db = Database(str(tmp_path / 'monitor.db'), busy_timeout=0.05)
+    buffer = db.enable_write_buffer(max_rows=1000, max_delay=0.05)
+    try:
+        lock = hold_write_lock(db)
+        try:
+            write_metrics(db, 0, 5)
+            deadline = time.monotonic() + 5
+            while not buffer.errors and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert buffer.errors >= 1
+        finally:
+            lock.rollback()
+            lock.close()
+
+        deadline = time.monotonic() + 5
+        while buffer.rows_written < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert count_rows(db, 'validator_metrics') == 5
+    finally:
+        db.close()